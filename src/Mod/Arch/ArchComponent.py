@@ -498,6 +498,7 @@ class Component:
                 for host in link.Hosts:
                     if host == obj:
                         subs.append(link)
+        tools = []
         for o in subs:
 
             if base:
@@ -505,42 +506,77 @@ class Component:
                     base = None
 
             if base:
+                f = None
                 if (Draft.getType(o) == "Window") or (Draft.isClone(o,"Window",True)):
                         # windows can be additions or subtractions, treated the same way
                         f = o.Proxy.getSubVolume(o)
-                        if f:
-                            if base.Solids and f.Solids:
-                                if placement:
-                                    f.Placement = f.Placement.multiply(placement)
-                                if len(base.Solids) > 1:
-                                    base = Part.makeCompound([sol.cut(f) for sol in base.Solids])
-                                else:
-                                    base = base.cut(f)
+                        if f and placement:
+                            f.Placement = f.Placement.multiply(placement)
 
                 elif (Draft.getType(o) == "Roof") or (Draft.isClone(o,"Roof")):
                     # roofs define their own special subtraction volume
                     f = o.Proxy.getSubVolume(o)
-                    if f:
-                        if base.Solids and f.Solids:
-                            if len(base.Solids) > 1:
-                                base = Part.makeCompound([sol.cut(f) for sol in base.Solids])
-                            else:
-                                base = base.cut(f)
 
                 elif o.isDerivedFrom("Part::Feature"):
                     if o.Shape:
                         if not o.Shape.isNull():
-                            if o.Shape.Solids and base.Solids:
-                                    s = o.Shape.copy()
-                                    if placement:
-                                        s.Placement = s.Placement.multiply(placement)
-                                    try:
-                                        if len(base.Solids) > 1:
-                                            base = Part.makeCompound([sol.cut(s) for sol in base.Solids])
-                                        else:
-                                            base = base.cut(s)
-                                    except Part.OCCError:
-                                        print("Arch: unable to cut object ",o.Name, " from ", obj.Name)
+                            f = o.Shape.copy()
+                            if placement:
+                                f.Placement = f.Placement.multiply(placement)
+                if f:
+                    if f.Solids:
+                        tools.append((o,f))
+
+        if base and tools:
+            if base.Solids:
+                base = self.cutTools(obj,base,tools)
+        return base
+
+    def cutTools(self,obj,base,tools):
+
+        """cuts a list of (object,shape) tools from the base shape. Tools that don't
+        touch the base are skipped, and the others are cut together in one boolean
+        operation. The last result is kept and reused while base and tools don't change"""
+
+        import Part,hashlib
+
+        # skip tools that are away from the base
+        bb = FreeCAD.BoundBox(base.BoundBox)
+        bb.enlarge(Draft.tolerance())
+        tools = [t for t in tools if bb.intersect(t[1].BoundBox)]
+        if not tools:
+            return base
+
+        h = hashlib.sha1(base.exportBrepToString().encode("utf8"))
+        for o,f in tools:
+            h.update(f.exportBrepToString().encode("utf8"))
+        key = h.hexdigest()
+        if hasattr(self,"subcache") and self.subcache:
+            if self.subcache[0] == key:
+                return self.subcache[1].copy()
+
+        def multicut(shape):
+            sb = FreeCAD.BoundBox(shape.BoundBox)
+            sb.enlarge(Draft.tolerance())
+            t = [(o,f) for o,f in tools if sb.intersect(f.BoundBox)]
+            if not t:
+                return shape
+            try:
+                return shape.cut([f for o,f in t])
+            except Part.OCCError:
+                # fall back to cutting tools one by one
+                for o,f in t:
+                    try:
+                        shape = shape.cut(f)
+                    except Part.OCCError:
+                        print("Arch: unable to cut object ",o.Name, " from ", obj.Name)
+                return shape
+
+        if len(base.Solids) > 1:
+            base = Part.makeCompound([multicut(sol) for sol in base.Solids])
+        else:
+            base = multicut(base)
+        self.subcache = [key,base.copy()]
         return base
 
     def spread(self,obj,shape,placement=None):
@@ -628,55 +664,103 @@ class Component:
             return
         if not obj.Shape.Faces:
             return
-        import Drawing,Part
-        fmax = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch").GetInt("MaxComputeAreas",20)
-        if len(obj.Shape.Faces) > fmax:
+        fmax = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch").GetInt("MaxComputeAreas",0)
+        if fmax and (len(obj.Shape.Faces) > fmax):
             return
+        bb = obj.Shape.BoundBox
+        key = (obj.Shape.hashCode(),len(obj.Shape.Faces),len(obj.Shape.Edges),obj.Shape.Area,
+               bb.XMin,bb.YMin,bb.ZMin,bb.XMax,bb.YMax,bb.ZMax)
+        # the hashCode of a deleted shape can be reused, so the cached shape is checked too
+        if hasattr(self,"areacache") and self.areacache and (self.areacache[0] == key) and self.areacache[2].isSame(obj.Shape):
+            areas = self.areacache[1]
+        else:
+            areas = self.getAreas(obj)
+            if not areas:
+                return
+            self.areacache = [key,areas,obj.Shape]
+        a,ha,pl = areas
+        if a and hasattr(obj,"VerticalArea"):
+            if obj.VerticalArea.Value != a:
+                obj.VerticalArea = a
+        if (ha is not None) and hasattr(obj,"HorizontalArea"):
+            if obj.HorizontalArea.Value != ha:
+                obj.HorizontalArea = ha
+            if (pl is not None) and hasattr(obj,"PerimeterLength"):
+                if obj.PerimeterLength.Value != pl:
+                    obj.PerimeterLength = pl
+
+    def getAreas(self,obj):
+
+        """returns (vertical area, horizontal area, perimeter length) of the object,
+        horizontal area and perimeter being None if not computable, or None on error"""
+        import Part
         a = 0
         fset = []
+        normals = []
         for i,f in enumerate(obj.Shape.Faces):
             try:
-                ang = f.normalAt(0,0).getAngle(FreeCAD.Vector(0,0,1))
+                normals.append(f.normalAt(0,0))
             except Part.OCCError:
                 print("Debug: Error computing areas for ",obj.Label,": normalAt() Face ",i)
-                return
+                return None
+        # classify all faces from the Z component of their normal:
+        # vertical faces have a zero Z, faces pointing up a positive one
+        zmin = math.cos(1.571)
+        zmax = math.cos(1.57)
+        zup = math.cos(1.5707)
+        for f,n in zip(obj.Shape.Faces,normals):
+            z = n.z/n.Length
+            if (z > zmin) and (z < zmax):
+                a += f.Area
+            if z > zup:
+                fset.append(f)
+        if not fset:
+            return (a,None,None)
+        try:
+            self.flatarea = self.getFlatArea(fset)
+        except Part.OCCError:
+            # error in computing the areas. Better set them to zero than show a wrong value
+            print("Debug: Error computing areas for ",obj.Label,": unable to project faces")
+            return (a,0,0)
+        if not self.flatarea:
+            return (a,None,None)
+        pl = None
+        if len(self.flatarea.Faces) == 1:
+            pl = self.flatarea.Faces[0].OuterWire.Length
+        return (a,self.flatarea.Area,pl)
+
+    def getFlatArea(self,faces):
+
+        """returns the union of the given faces projected on the XY plane. Planar
+        faces are projected from their discretized outlines, others with Drawing"""
+        import Part
+        pset = []
+        for f in faces:
+            if isinstance(f.Surface,Part.Plane):
+                wires = []
+                for w in f.Wires:
+                    pts = [FreeCAD.Vector(p.x,p.y,0) for p in w.discretize(Deflection=0.01)]
+                    if len(pts) > 2:
+                        if (pts[0]-pts[-1]).Length > 1e-7:
+                            pts.append(pts[0])
+                        wires.append(Part.makePolygon(pts))
+                if not wires:
+                    continue
+                try:
+                    pf = Part.makeFace(wires,"Part::FaceMakerBullseye")
+                except Part.OCCError:
+                    # faces seen edge-on give no area
+                    continue
+                if pf.Area > 1e-7:
+                    pset.extend(pf.Faces)
             else:
-                if (ang > 1.57) and (ang < 1.571):
-                    a += f.Area
-                if ang < 1.5707:
-                    fset.append(f)
-        if a and hasattr(obj,"VerticalArea"):
-            if obj.VerticalArea.Value != a:
-                obj.VerticalArea = a
-        if fset and hasattr(obj,"HorizontalArea"):
-            pset = []
-            for f in fset:
-                if f.normalAt(0,0).getAngle(FreeCAD.Vector(0,0,1)) < 0.00001:
-                    # already horizontal
-                    pset.append(f)
-                else:
-                    try:
-                        pf = Part.Face(Part.Wire(Drawing.project(f,FreeCAD.Vector(0,0,1))[0].Edges))
-                    except Part.OCCError:
-                        # error in computing the areas. Better set them to zero than show a wrong value
-                        if obj.HorizontalArea.Value != 0:
-                            print("Debug: Error computing areas for ",obj.Label,": unable to project face: ",str([v.Point for v in f.Vertexes])," (face normal:",f.normalAt(0,0),")")
-                            obj.HorizontalArea = 0
-                        if hasattr(obj,"PerimeterLength"):
-                            if obj.PerimeterLength.Value != 0:
-                                obj.PerimeterLength = 0
-                    else:
-                        pset.append(pf)
-            if pset:
-                self.flatarea = pset.pop()
-                for f in pset:
-                    self.flatarea = self.flatarea.fuse(f)
-                self.flatarea = self.flatarea.removeSplitter()
-                if obj.HorizontalArea.Value != self.flatarea.Area:
-                    obj.HorizontalArea = self.flatarea.Area
-                if hasattr(obj,"PerimeterLength") and (len(self.flatarea.Faces) == 1):
-                    if obj.PerimeterLength.Value != self.flatarea.Faces[0].OuterWire.Length:
-                        obj.PerimeterLength = self.flatarea.Faces[0].OuterWire.Length
+                import Drawing
+                pset.append(Part.Face(Part.Wire(Drawing.project(f,FreeCAD.Vector(0,0,1))[0].Edges)))
+        if not pset:
+            return None
+        if len(pset) == 1:
+            return pset[0]
+        return pset[0].multiFuse(pset[1:]).removeSplitter()
 
     def isStandardCase(self,obj):
 
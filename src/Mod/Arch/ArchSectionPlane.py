@@ -106,8 +106,40 @@ def looksLikeDraft(o):
     # If we have a shape, but no volume, it looks like a flat 2D object
     return o.Shape.Volume < 0.0000001 # add a little tolerance...
 
+def getShapeKey(shape):
+
+    "returns a key identifying a shape and its position, to be used for caching"
+    bb = shape.BoundBox
+    return (shape.hashCode(),bb.XMin,bb.YMin,bb.ZMin,bb.XMax,bb.YMax,bb.ZMax)
+
+def isSameShapes(shapes1,shapes2):
+
+    """returns True if both lists hold the same shapes. Cached shapes are checked with
+    isSame, since the hashCode of a deleted shape can be reused by a new one"""
+    if len(shapes1) != len(shapes2):
+        return False
+    for s1,s2 in zip(shapes1,shapes2):
+        if not s1.isSame(s2):
+            return False
+    return True
+
+def getSectionKey(section):
+
+    "returns a key identifying the cutting made by a section plane"
+    p = section.Placement
+    clip = False
+    if hasattr(section, "Clip"):
+        clip = section.Clip
+    bb = section.Shape.BoundBox
+    return (tuple(p.Base),tuple(p.Rotation.Q),clip,section.OnlySolids,
+            bb.XMin,bb.YMin,bb.ZMin,bb.XMax,bb.YMax,bb.ZMax)
+
 def getCutShapes(objs,section,showHidden,groupSshapesByObject=False):
 
+    """getCutShapes(objs,section,showHidden,[groupSshapesByObject]): cuts the given
+    objects with the section plane. The results are cached per solid on the section
+    plane, so only solids that changed since the last call are cut again"""
+
     import Part,DraftGeomUtils
     shapes = []
     hshapes = []
@@ -137,35 +169,57 @@ def getCutShapes(objs,section,showHidden,groupSshapesByObject=False):
     cutface,cutvolume,invcutvolume = ArchCommands.getCutVolume(section.Shape.copy(),shapes,clip)
     shapes =[]
     if cutvolume:
+        # the cut of a solid only depends on the solid and the section plane, not
+        # on the other objects, so results can be reused while both don't change
+        cutcache = {}
+        sectionkey = getSectionKey(section)
+        proxy = getattr(section,"Proxy",None)
+        if hasattr(proxy,"cutcache") and proxy.cutcache:
+            if proxy.cutcache[0] == sectionkey:
+                cutcache = proxy.cutcache[1]
+        newcache = {}
         for o, shapeList in objectShapes:
             tmpSshapes = []
             for sh in shapeList:
                 for sol in sh.Solids:
-                    if sol.Volume < 0:
-                        sol.reverse()
-                    c = sol.cut(cutvolume)
-                    s = sol.section(cutface)
-                    try:
-                        wires = DraftGeomUtils.findWires(s.Edges)
-                        for w in wires:
-                            f = Part.Face(w)
-                            tmpSshapes.append(f)
-                        #s = Part.Wire(s.Edges)
-                        #s = Part.Face(s)
-                    except Part.OCCError:
-                        #print "ArchDrawingView: unable to get a face"
-                        tmpSshapes.append(s)
-                    shapes.extend(c.Solids)
+                    key = getShapeKey(sol)
+                    if (key in cutcache) and cutcache[key][3].isSame(sol):
+                        entry = cutcache[key]
+                    else:
+                        if sol.Volume < 0:
+                            sol.reverse()
+                        c = sol.cut(cutvolume)
+                        s = sol.section(cutface)
+                        faces = []
+                        try:
+                            wires = DraftGeomUtils.findWires(s.Edges)
+                            for w in wires:
+                                f = Part.Face(w)
+                                faces.append(f)
+                            #s = Part.Wire(s.Edges)
+                            #s = Part.Face(s)
+                        except Part.OCCError:
+                            #print "ArchDrawingView: unable to get a face"
+                            faces.append(s)
+                        entry = [c.Solids,faces,None,sol]
+                    if showHidden and (entry[2] is None):
+                        if sol.Volume < 0:
+                            sol.reverse()
+                        entry[2] = sol.cut(invcutvolume)
+                    newcache[key] = entry
+                    tmpSshapes.extend(entry[1])
+                    shapes.extend(entry[0])
                     #sshapes.append(s)
                     if showHidden:
-                        c = sol.cut(invcutvolume)
-                        hshapes.append(c)
+                        hshapes.append(entry[2])
 
             if len(tmpSshapes) > 0:
                 sshapes.extend(tmpSshapes)
 
                 if groupSshapesByObject:
                     objectSshapes.append((o, tmpSshapes))
+        if proxy:
+            proxy.cutcache = [sectionkey,newcache]
 
     if groupSshapesByObject:
         return shapes,hshapes,sshapes,cutface,cutvolume,invcutvolume,objectSshapes
@@ -244,20 +298,20 @@ def getSVG(section, renderMode="Wireframe", allOn=False, showHidden=False, scale
     svgLineColor = Draft.getrgb(lineColor)
     svg = ''
 
+    # the cached versions are shared by all views of this section plane, and
+    # stay valid while the section plane and the cut objects don't change
+    objshapes = [o.Shape for o in objs if o.isDerivedFrom("Part::Feature")]
+    objkeys = tuple([(o.Name,getShapeKey(o.Shape)) for o in objs if o.isDerivedFrom("Part::Feature")])
+    cachekey = [renderMode,showHidden,showFill,fillSpaces,objkeys]
+
     # reading cached version
     svgcache = None
     if hasattr(section.Proxy,"svgcache") and section.Proxy.svgcache:
         svgcache = section.Proxy.svgcache[0]
-        if section.Proxy.svgcache[1] != renderMode:
-            svgcache = None
-        if section.Proxy.svgcache[2] != showHidden:
-            svgcache = None
-        if section.Proxy.svgcache[3] != showFill:
-            svgcache = None
-        if section.Proxy.svgcache[4] != fillSpaces:
+        if (section.Proxy.svgcache[1:-1] != cachekey) or not isSameShapes(section.Proxy.svgcache[-1],objshapes):
             svgcache = None
 
-    if hasattr(section.Proxy,"boolcache") and section.Proxy.boolcache:
+    if hasattr(section.Proxy,"boolcache") and section.Proxy.boolcache and (section.Proxy.boolcache[7:10] == [showHidden,showFill,objkeys]) and isSameShapes(section.Proxy.boolcache[10],objshapes):
         vshapes = section.Proxy.boolcache[0]
         hshapes = section.Proxy.boolcache[1]
         sshapes = section.Proxy.boolcache[2]
@@ -271,7 +325,7 @@ def getSVG(section, renderMode="Wireframe", allOn=False, showHidden=False, scale
         else:
             vshapes,hshapes,sshapes,cutface,cutvolume,invcutvolume = getCutShapes(objs,section,showHidden)
             objectSshapes = []
-        section.Proxy.boolcache = [vshapes,hshapes,sshapes,cutface,cutvolume,invcutvolume,objectSshapes]
+        section.Proxy.boolcache = [vshapes,hshapes,sshapes,cutface,cutvolume,invcutvolume,objectSshapes,showHidden,showFill,objkeys,objshapes]
 
     # generating SVG
     if renderMode in ["Solid",1]:
@@ -298,7 +352,7 @@ def getSVG(section, renderMode="Wireframe", allOn=False, showHidden=False, scale
                 svgcache += render.getHiddenSVG(linewidth="SVGLINEWIDTH")
             svgcache += '</g>\n'
             # print(render.info())
-            section.Proxy.svgcache = [svgcache,renderMode,showHidden,showFill]
+            section.Proxy.svgcache = [svgcache]+cachekey+[objshapes]
     else:
 
         if not svgcache:
@@ -344,7 +398,7 @@ def getSVG(section, renderMode="Wireframe", allOn=False, showHidden=False, scale
                     sshapes, direction,
                     hStyle=style, h0Style=style, h1Style=style,
                     vStyle=style, v0Style=style, v1Style=style)
-            section.Proxy.svgcache = [svgcache,renderMode,showHidden,showFill,fillSpaces]
+            section.Proxy.svgcache = [svgcache]+cachekey+[objshapes]
     svgcache = svgcache.replace("SVGLINECOLOR",svgLineColor)
     svgcache = svgcache.replace("SVGLINEWIDTH",svgLineWidth)
     svgcache = svgcache.replace("SVGHIDDENPATTERN",svgHiddenPattern)
@@ -539,6 +593,7 @@ class _SectionPlane:
         if prop in ["Placement","Objects","OnlySolids","UseMaterialColorForFill","Clip"]:
             self.svgcache = None
             self.boolcache = None
+            self.cutcache = None
 
     def getNormal(self,obj):
 
@@ -27,6 +27,7 @@ FreeCAD.addExportType("Industry Foundation Classes (*.ifc)","importIFC")
 FreeCAD.addImportType("Wavefront OBJ - Arch module (*.obj)","importOBJ")
 FreeCAD.addExportType("Wavefront OBJ - Arch module (*.obj)","importOBJ")
 FreeCAD.addExportType("WebGL file (*.html)","importWebGL")
+FreeCAD.addExportType("glTF binary (*.glb)","importWebGL")
 FreeCAD.addExportType("JavaScript Object Notation (*.json)","importJSON")
 FreeCAD.addImportType("Collada (*.dae)","importDAE")
 FreeCAD.addExportType("Collada (*.dae)","importDAE")
@@ -23,7 +23,7 @@
 #*                                                                         *
 #***************************************************************************/
 
-import FreeCAD, os, unittest, FreeCADGui, Arch, Draft, Part, Sketcher
+import FreeCAD, os, json, struct, unittest, FreeCADGui, Arch, Draft, Part, Sketcher
 
 class ArchTest(unittest.TestCase):
 
@@ -165,6 +165,172 @@ class ArchTest(unittest.TestCase):
         r = (w.Shape.Volume < 0.75)
         self.failUnless(r,"Arch Remove failed")
 
+    def testSubtractions(self):
+        FreeCAD.Console.PrintLog ('Checking Arch subtractions...\n')
+        l = Draft.makeLine(FreeCAD.Vector(0,0,0),FreeCAD.Vector(4000,0,0))
+        w = Arch.makeWall(l,width=200,height=3000)
+        windows = []
+        # three windows in the wall and one away from it
+        for x in [500,1500,2500,10000]:
+            pl = FreeCAD.Placement(FreeCAD.Vector(x,0,1000),FreeCAD.Rotation(FreeCAD.Vector(1,0,0),90))
+            win = Arch.makeWindowPreset("Fixed",400,400,50,50,0,100,40,0,50,placement=pl)
+            win.Hosts = [w]
+            windows.append(win)
+        FreeCAD.ActiveDocument.recompute()
+        vol = 4000*200*3000 - 3*400*400*200
+        self.failUnless(abs(w.Shape.Volume-vol) < 1,"Arch subtraction of windows failed")
+        # moving a window gives a new shape, not the cached one
+        windows[0].Base.Placement.Base = FreeCAD.Vector(3200,0,1000)
+        FreeCAD.ActiveDocument.recompute()
+        self.failUnless(abs(w.Shape.Volume-vol) < 1,"Arch subtraction of a moved window failed")
+        self.failUnless(w.Shape.isInside(FreeCAD.Vector(700,0,1200),0.001,True),"Arch subtraction cache failed")
+        self.failIf(w.Shape.isInside(FreeCAD.Vector(3400,0,1200),0.001,True),"Arch subtraction of a moved window failed")
+        # a tool cutting both solids of a multi-solid base
+        b = FreeCAD.ActiveDocument.addObject('Part::Feature','Base')
+        b.Shape = Part.makeCompound([Part.makeBox(1000,1000,1000),Part.makeBox(1000,1000,1000,FreeCAD.Vector(2000,0,0))])
+        s = Arch.makeStructure(b)
+        t = FreeCAD.ActiveDocument.addObject('Part::Feature','Tool')
+        t.Shape = Part.makeBox(2000,500,500,FreeCAD.Vector(500,0,0))
+        Arch.removeComponents(t,s)
+        FreeCAD.ActiveDocument.recompute()
+        self.failUnless(len(s.Shape.Solids) == 2,"Arch subtraction from a multi-solid base failed")
+        self.failUnless(abs(s.Shape.Volume-(2*1000**3-2*500*500*500)) < 1,"Arch subtraction from a multi-solid base failed")
+
+    def testAreas(self):
+        FreeCAD.Console.PrintLog ('Checking Arch areas...\n')
+        def check(obj,area,perimeter,msg):
+            self.failUnless(abs(obj.HorizontalArea.Value-area) < 0.001,"Arch "+msg+" HorizontalArea failed")
+            self.failUnless(abs(obj.PerimeterLength.Value-perimeter) < 0.001,"Arch "+msg+" PerimeterLength failed")
+        def solid(shape):
+            b = FreeCAD.ActiveDocument.addObject('Part::Feature','Base')
+            b.Shape = shape
+            return b
+        # stepped slab, more faces than the former MaxComputeAreas default of 20
+        steps = [Part.makeBox(1000-100*i,1000,100,FreeCAD.Vector(0,0,100*i)) for i in range(10)]
+        s1 = Arch.makeStructure(solid(steps[0].multiFuse(steps[1:]).removeSplitter()))
+        # slab with a hole, the perimeter is the outer one
+        s2 = Arch.makeStructure(solid(Part.makeBox(4000,3000,200).cut(Part.makeBox(1000,1000,200,FreeCAD.Vector(1500,1000,0)))))
+        # sloped roof, a gable of 4000 x 3000
+        gable = Part.Face(Part.makePolygon([FreeCAD.Vector(0,0,0),FreeCAD.Vector(4000,0,0),FreeCAD.Vector(2000,0,1000),FreeCAD.Vector(0,0,0)]))
+        r = Arch.makeRoof(solid(gable.extrude(FreeCAD.Vector(0,3000,0))))
+        FreeCAD.ActiveDocument.recompute()
+        self.failUnless(len(s1.Shape.Faces) > 20,"Arch stepped slab failed")
+        check(s1,1000000,4000,"stepped slab")
+        check(s2,11000000,14000,"slab with hole")
+        check(r,12000000,14000,"sloped roof")
+
+    def testSectionCache(self):
+        FreeCAD.Console.PrintLog ('Checking Arch section plane cache...\n')
+        import ArchSectionPlane
+        b1 = FreeCAD.ActiveDocument.addObject('Part::Feature','Box')
+        b1.Shape = Part.makeBox(1000,1000,1000)
+        b2 = FreeCAD.ActiveDocument.addObject('Part::Feature','Box')
+        b2.Shape = Part.makeBox(1000,1000,1000)
+        b2.Placement.Base = FreeCAD.Vector(2000,0,0)
+        s = Arch.makeSectionPlane([b1,b2])
+        s.Placement = FreeCAD.Placement(FreeCAD.Vector(1500,500,500),FreeCAD.Rotation())
+        FreeCAD.ActiveDocument.recompute()
+        svg1 = ArchSectionPlane.getSVG(s,allOn=True,showHidden=True)
+        self.failUnless(svg1,"Arch section SVG failed")
+        self.failUnless(len(s.Proxy.cutcache[1]) == 2,"Arch section cut cache failed")
+        entries = dict(s.Proxy.cutcache[1])
+        # a second view of the same plane reuses the cached svg and cuts
+        svgcache = s.Proxy.svgcache
+        boolcache = s.Proxy.boolcache
+        svg2 = ArchSectionPlane.getSVG(s,allOn=True,showHidden=True)
+        self.failUnless(svg2 == svg1,"Arch section SVG cache failed")
+        self.failUnless((s.Proxy.svgcache is svgcache) and (s.Proxy.boolcache is boolcache),"Arch section SVG cache failed")
+        # moving one object only cuts that one again
+        b2.Placement.Base = FreeCAD.Vector(2000,500,0)
+        FreeCAD.ActiveDocument.recompute()
+        svg3 = ArchSectionPlane.getSVG(s,allOn=True,showHidden=True)
+        self.failUnless(svg3 != svg1,"Arch section SVG update failed")
+        moved = [v for k,v in s.Proxy.cutcache[1].items() if not k in entries]
+        kept = [v for k,v in s.Proxy.cutcache[1].items() if k in entries]
+        self.failUnless(len(moved) == 1 and moved[0][3].isSame(b2.Shape.Solids[0]),"Arch section cut cache update failed")
+        self.failUnless(len(kept) == 1 and kept[0] is entries[ArchSectionPlane.getShapeKey(b1.Shape.Solids[0])],"Arch section cut cache reuse failed")
+        # the result matches the one of a section plane without cache
+        s2 = Arch.makeSectionPlane([b1,b2])
+        s2.Placement = s.Placement
+        FreeCAD.ActiveDocument.recompute()
+        self.failUnless(ArchSectionPlane.getSVG(s2,allOn=True,showHidden=True) == svg3,"Arch section cached SVG failed")
+        # the solid mode reads back its own cache
+        svg4 = ArchSectionPlane.getSVG(s,renderMode="Solid",allOn=True)
+        self.failUnless(svg4 and ArchSectionPlane.getSVG(s,renderMode="Solid",allOn=True) == svg4,"Arch section solid SVG cache failed")
+
+    def testWebGLExport(self):
+        FreeCAD.Console.PrintLog ('Checking Arch WebGL binary export...\n')
+        import importWebGL
+        b1 = FreeCAD.ActiveDocument.addObject('Part::Feature','Box')
+        b1.Shape = Part.makeBox(1,1,1)
+        b2 = FreeCAD.ActiveDocument.addObject('Part::Feature','Box')
+        b2.Shape = Part.makeBox(1,1,1)
+        b2.Placement.Base = FreeCAD.Vector(2,0,0)
+        glb = importWebGL.getGLB([b1,b2])
+        magic,version,length = struct.unpack("<4sII",glb[:12])
+        self.failUnless((magic,version,length) == (b"glTF",2,len(glb)),"Arch WebGL header failed")
+        jsonlength,jsontype = struct.unpack("<II",glb[12:20])
+        self.failUnless((jsontype == 0x4E4F534A) and (jsonlength % 4 == 0),"Arch WebGL JSON chunk failed")
+        gltf = json.loads(glb[20:20+jsonlength].decode("utf8"))
+        binlength,bintype = struct.unpack("<II",glb[20+jsonlength:28+jsonlength])
+        self.failUnless((bintype == 0x004E4942) and (28+jsonlength+binlength == len(glb)),"Arch WebGL BIN chunk failed")
+        self.failUnless(gltf["buffers"][0]["byteLength"] == binlength,"Arch WebGL buffer failed")
+        # both boxes share the same mesh, placed by their nodes
+        self.failUnless(len(gltf["meshes"]) == 1,"Arch WebGL shared mesh failed")
+        self.failUnless(len(gltf["nodes"][0]["children"]) == 2,"Arch WebGL nodes failed")
+        for view in gltf["bufferViews"]:
+            self.failUnless(view["byteOffset"]+view["byteLength"] <= binlength,"Arch WebGL buffer view failed")
+
+    def testOBJRoundTrip(self):
+        FreeCAD.Console.PrintLog ('Checking Arch OBJ export and import...\n')
+        import tempfile, Mesh, importOBJ
+        b = FreeCAD.ActiveDocument.addObject('Part::Feature','Block')
+        b.Shape = Part.makeBox(10,10,10)
+        # the faces with a hole are exported as triangles, the others as polygons
+        t = FreeCAD.ActiveDocument.addObject('Part::Feature','Tube')
+        t.Shape = Part.makeBox(10,10,10).cut(Part.makeBox(4,4,20,FreeCAD.Vector(3,3,-5)))
+        t.Placement.Base = FreeCAD.Vector(20,0,0)
+        m = FreeCAD.ActiveDocument.addObject('Mesh::Feature','Mesh')
+        m.Mesh = Mesh.Mesh(Part.makeBox(5,5,5,FreeCAD.Vector(0,20,0)).tessellate(1))
+        FreeCAD.ActiveDocument.recompute()
+        (fd, filename) = tempfile.mkstemp(".obj")
+        os.close(fd)
+        try:
+            importOBJ.export([b,t,m],filename)
+            # the first facet line of each object
+            first = {}
+            with open(filename) as f:
+                lines = f.read().splitlines()
+            verts = [[float(c) for c in l.split()[1:4]] for l in lines if l.startswith("v ")]
+            name = None
+            for l in lines:
+                if l.startswith("o "):
+                    name = l[2:]
+                elif l.startswith("f ") and not name in first:
+                    first[name] = [verts[int(i)-1] for i in l.split()[1:]]
+            doc = FreeCAD.newDocument("ArchTestOBJ")
+            try:
+                importOBJ.insert(filename,doc.Name)
+                self.failUnless(len(doc.Objects) == 3,"Arch OBJ import failed")
+                for obj in [b,t,m]:
+                    imp = doc.getObject(obj.Name)
+                    self.failUnless(imp and imp.isDerivedFrom("Mesh::Feature"),"Arch OBJ import failed")
+                    if obj.isDerivedFrom("Mesh::Feature"):
+                        ref = obj.Mesh
+                    else:
+                        ref = obj.Shape
+                    self.failUnless(abs(imp.Mesh.Area-ref.Area) < 1e-6,"Arch OBJ round trip area failed")
+                    self.failUnless(imp.Mesh.BoundBox.isInside(ref.BoundBox.Center),"Arch OBJ round trip placement failed")
+                    # facets keep the order of the file
+                    for p in imp.Mesh.Facets[0].Points:
+                        self.failUnless(min(sum((a-c)**2 for a,c in zip(p,v)) for v in first[obj.Name]) < 1e-9,"Arch OBJ facet order failed")
+            finally:
+                FreeCAD.closeDocument(doc.Name)
+        finally:
+            os.remove(filename)
+            if os.path.exists(filename[:-4]+".mtl"):
+                os.remove(filename[:-4]+".mtl")
+
     def tearDown(self):
         FreeCAD.closeDocument("ArchTest")
         pass
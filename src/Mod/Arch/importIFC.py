@@ -229,6 +229,7 @@ def getPreferences():
     global FORCE_BREP, IMPORT_PROPERTIES, STORE_UID, SERIALIZE
     global SPLIT_LAYERS, EXPORT_2D, FULL_PARAMETRIC, FITVIEW_ONIMPORT
     global ADD_DEFAULT_SITE, ADD_DEFAULT_STOREY, ADD_DEFAULT_BUILDING
+    global MULTICORE
     p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch")
     if FreeCAD.GuiUp and p.GetBool("ifcShowDialog",False):
         import FreeCADGui
@@ -259,6 +260,7 @@ def getPreferences():
     ADD_DEFAULT_SITE = p.GetBool("IfcAddDefaultSite",False)
     ADD_DEFAULT_STOREY = p.GetBool("IfcAddDefaultStorey",False)
     ADD_DEFAULT_BUILDING = p.GetBool("IfcAddDefaultBuilding",True)
+    MULTICORE = p.GetInt("ifcMultiCore",0)
 
 # ************************************************************************************************
 # ********** open and import IFC ****************
@@ -457,7 +459,25 @@ def insert(filename,docname,skip=[],only=[],root=None):
 
     # handle IFC products
 
-    for product in products:
+    if MULTICORE > 0:
+        # the geometry is computed while the objects are created. Structural objects
+        # need a different setting for curves, they are computed one by one
+        geomproducts = []
+        for product in products:
+            try:
+                if not product.Representation:
+                    continue
+            except:
+                continue
+            ptype = product.is_a()
+            if (ptype in structuralifcobjects) or (MERGE_MODE_ARCH == 4) or (ptype in SKIP) or (product.id() in skip):
+                continue
+            geomproducts.append(product)
+        productshapes = getProductShapes(filename,ifcfile,products,geomproducts,MULTICORE)
+    else:
+        productshapes = ((product,None) for product in products)
+
+    for product,productshape in productshapes:
 
         count += 1
 
@@ -534,25 +554,31 @@ def insert(filename,docname,skip=[],only=[],root=None):
                             sharedobjects[bid] = None
                             store = bid
 
-        # additional setting for structural entities
-        if hasattr(settings,"INCLUDE_CURVES"):
-            if structobj:
-                settings.set(settings.INCLUDE_CURVES,True)
-            else:
-                settings.set(settings.INCLUDE_CURVES,False)
-        try:
-            cr = ifcopenshell.geom.create_shape(settings,product)
-            brep = cr.geometry.brep_data
-        except:
-            pass # IfcOpenShell will yield an error if a given product has no shape, but we don't care, we're brave enough
+        if productshape is not None:
+            # already computed by the geometry iterator
+            shape = productshape
+        else:
+            # additional setting for structural entities
+            if hasattr(settings,"INCLUDE_CURVES"):
+                if structobj:
+                    settings.set(settings.INCLUDE_CURVES,True)
+                else:
+                    settings.set(settings.INCLUDE_CURVES,False)
+            try:
+                cr = ifcopenshell.geom.create_shape(settings,product)
+                brep = cr.geometry.brep_data
+            except:
+                pass # IfcOpenShell will yield an error if a given product has no shape, but we don't care, we're brave enough
+
+            if brep:
+                if DEBUG: print(" "+str(int(len(brep)/1000))+"k ",end="")
 
-        if brep:
-            if DEBUG: print(" "+str(int(len(brep)/1000))+"k ",end="")
+                shape = Part.Shape()
+                shape.importBrepFromString(brep,False)
 
-            shape = Part.Shape()
-            shape.importBrepFromString(brep,False)
+                shape.scale(1000.0) # IfcOpenShell always outputs in meters, we convert to mm, the freecad internal unit
 
-            shape.scale(1000.0) # IfcOpenShell always outputs in meters, we convert to mm, the freecad internal unit
+        if shape is not None:
 
             if not shape.isNull():
                 if FITVIEW_ONIMPORT and FreeCAD.GuiUp:
@@ -1460,6 +1486,151 @@ class recycler:
             return c
 
 
+def getProductShapes(filename,ifcfile,products,geomproducts,cores,batch=100):
+
+    """getProductShapes(filename,ifcfile,products,geomproducts,cores,[batch]): generator
+    that yields a (product,shape) pair for each of the given products. The geometry of
+    geomproducts is computed by the multi-threaded geometry iterator of IfcOpenShell in
+    a separate thread, on its own copy of the file, while the caller creates the FreeCAD
+    objects. Geometry shared by several products (IfcMappedItem) is converted only once,
+    then each product gets a copy transformed to world coordinates, without placement.
+    Products are yielded in the given order, unless more than 4*batch shapes arrive ahead
+    of it, in which case the oldest ones are yielded first. Products without geometry
+    get a shape of None."""
+
+    import threading
+    import collections
+    try:
+        import queue
+    except ImportError:
+        import Queue as queue
+    import ifcopenshell
+    from ifcopenshell import geom
+
+    ids = [p.id() for p in geomproducts]
+    items = queue.Queue(maxsize=4*batch)
+    stop = threading.Event()
+    errors = []
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item,timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def compute():
+        try:
+            itersettings = ifcopenshell.geom.settings()
+            itersettings.set(itersettings.USE_BREP_DATA,True)
+            itersettings.set(itersettings.SEW_SHELLS,True)
+            # local coordinates, so products sharing a representation share their geometry
+            itersettings.set(itersettings.USE_WORLD_COORDS,False)
+            if SEPARATE_OPENINGS:
+                itersettings.set(itersettings.DISABLE_OPENING_SUBTRACTIONS,True)
+            if SPLIT_LAYERS and hasattr(itersettings,"APPLY_LAYERSETS"):
+                itersettings.set(itersettings.APPLY_LAYERSETS,True)
+            if hasattr(itersettings,"INCLUDE_CURVES"):
+                itersettings.set(itersettings.INCLUDE_CURVES,False)
+            iterfile = ifcopenshell.open(filename)
+            iterator = ifcopenshell.geom.iterator(itersettings,iterfile,cores,include=[iterfile[i] for i in ids])
+            if iterator.initialize():
+                converted = set()
+                while not stop.is_set():
+                    item = iterator.get()
+                    gid = item.geometry.id
+                    brep = None
+                    if not gid in converted:
+                        converted.add(gid)
+                        brep = item.geometry.brep_data
+                    if not put((item.id,gid,brep,tuple(item.transformation.matrix.data))):
+                        break
+                    if not iterator.next():
+                        break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(None)
+
+    def getShape(gid,m):
+        # returns a copy of the geometry transformed by the 4x3 column-major matrix m
+        if not shapes.get(gid):
+            return None
+        mat = FreeCAD.Matrix(m[0],m[3],m[6],m[9]*1000.0,
+                             m[1],m[4],m[7],m[10]*1000.0,
+                             m[2],m[5],m[8],m[11]*1000.0,
+                             0,0,0,1)
+        cols = [FreeCAD.Vector(m[0],m[1],m[2]),FreeCAD.Vector(m[3],m[4],m[5]),FreeCAD.Vector(m[6],m[7],m[8])]
+        lengths = [c.Length for c in cols]
+        similar = (max(lengths)-min(lengths) < 1e-7*max(lengths)) and \
+                  all(abs(cols[i].dot(cols[j])) < 1e-7*max(lengths)**2 for i,j in ((0,1),(0,2),(1,2)))
+        try:
+            if similar:
+                # rotation, translation and uniform scale: copies the geometry into place
+                shape = shapes[gid].copy()
+                shape.transformShape(mat,True)
+            else:
+                # non-uniform scale or shear, the geometry itself must change
+                shape = shapes[gid].transformGeometry(mat)
+        except Part.OCCError:
+            return None
+        return shape
+
+    thread = threading.Thread(target=compute)
+    thread.daemon = True
+    thread.start()
+
+    # converted geometries, by geometry id
+    shapes = {}
+    # product shapes that arrived ahead of their product, in iterator order
+    ahead = collections.OrderedDict()
+    yielded = set()
+    pending = set(ids)
+    finished = False
+    count = 0
+    try:
+        for product in products:
+            pid = product.id()
+            if pid in yielded:
+                continue
+            if not pid in pending:
+                yield product,None
+                continue
+            while (not pid in ahead) and (not pid in yielded) and (not finished):
+                item = items.get()
+                if item is None:
+                    finished = True
+                    break
+                iid,gid,brep,m = item
+                if brep:
+                    shape = Part.Shape()
+                    try:
+                        shape.importBrepFromString(brep,False)
+                    except Part.OCCError:
+                        shape = None
+                    else:
+                        shape.scale(1000.0) # IfcOpenShell always outputs in meters, we convert to mm, the freecad internal unit
+                    shapes[gid] = shape
+                ahead[iid] = getShape(gid,m)
+                count += 1
+                if count % batch == 0:
+                    FreeCAD.Console.PrintMessage("IFC geometry: "+str(count)+"/"+str(len(ids))+" objects\n")
+                if len(ahead) > 4*batch:
+                    # bound the look-ahead, the oldest shape is yielded out of order
+                    fid,fshape = ahead.popitem(last=False)
+                    yielded.add(fid)
+                    yield ifcfile[fid],fshape
+            if pid in yielded:
+                continue
+            yield product,ahead.pop(pid,None)
+        if errors:
+            FreeCAD.Console.PrintWarning("IfcOpenShell geometry iterator failed: "+str(errors[0])+"\n")
+    finally:
+        stop.set()
+
+
 # ************************************************************************************************
 # ********** export IFC ****************
 
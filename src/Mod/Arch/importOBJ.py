@@ -80,42 +80,39 @@ def getIndices(shape,offset):
     elif isinstance(shape,Mesh.Mesh):
         curves = shape.Topology
     if curves:
-        for v in curves[0]:
-            vlist.append(" "+str(round(v.x,p))+" "+str(round(v.y,p))+" "+str(round(v.z,p)))
-        for f in curves[1]:
-            fi = ""
-            for vi in f:
-                fi += " " + str(vi + offset)
-            flist.append(fi)
+        vlist = [" %s %s %s" % (round(v.x,p),round(v.y,p),round(v.z,p)) for v in curves[0]]
+        flist = ["".join([" " + str(vi + offset) for vi in f]) for f in curves[1]]
     else:
-        for v in shape.Vertexes:
-            vlist.append(" "+str(round(v.X,p))+" "+str(round(v.Y,p))+" "+str(round(v.Z,p)))
+        # index vertices by their rounded coordinates
+        vindex = {}
+        for i,v in enumerate(shape.Vertexes):
+            key = (round(v.X,p),round(v.Y,p),round(v.Z,p))
+            vlist.append(" %s %s %s" % key)
+            vindex.setdefault(key,i)
+        def getIndex(point):
+            return vindex.get((round(point.x,p),round(point.y,p),round(point.z,p)))
         if not shape.Faces:
             for e in shape.Edges:
                 if DraftGeomUtils.geomType(e) == "Line":
-                    ei = " " + str(findVert(e.Vertexes[0],shape.Vertexes) + offset)
-                    ei += " " + str(findVert(e.Vertexes[-1],shape.Vertexes) + offset)
-                    elist.append(ei)
+                    ei = [getIndex(e.Vertexes[0].Point),getIndex(e.Vertexes[-1].Point)]
+                    if None in ei:
+                        return None,None,None
+                    elist.append(" " + str(ei[0] + offset) + " " + str(ei[1] + offset))
         for f in shape.Faces:
             if len(f.Wires) > 1:
                 # if we have holes, we triangulate
                 tris = f.tessellate(1)
+                tinds = [getIndex(v) for v in tris[0]]
                 for fdata in tris[1]:
-                    fi = ""
-                    for vi in fdata:
-                        vdata = Part.Vertex(tris[0][vi])
-                        fi += " " + str(findVert(vdata,shape.Vertexes) + offset)
-                    flist.append(fi)
-            else:
-                fi = ""
-                for e in f.OuterWire.OrderedEdges:
-                    #print(e.Vertexes[0].Point,e.Vertexes[1].Point)
-                    v = e.Vertexes[0]
-                    ind = findVert(v,shape.Vertexes)
-                    if ind == None:
+                    fi = [tinds[vi] for vi in fdata]
+                    if None in fi:
                         return None,None,None
-                    fi += " " + str(ind + offset)
-                flist.append(fi)
+                    flist.append("".join([" " + str(ind + offset) for ind in fi]))
+            else:
+                fi = [getIndex(e.Vertexes[0].Point) for e in f.OuterWire.OrderedEdges]
+                if None in fi:
+                    return None,None,None
+                flist.append("".join([" " + str(ind + offset) for ind in fi]))
     return vlist,elist,flist
 
 
@@ -208,12 +205,9 @@ def export(exportList,filename,colors=None):
                                 materials.append(("color_" + mn,obj.ViewObject.ShapeColor,obj.ViewObject.Transparency))
 
                     # write geometry
-                    for v in vlist:
-                        outfile.write("v" + v + "\n")
-                    for e in elist:
-                        outfile.write("l" + e + "\n")
-                    for f in flist:
-                        outfile.write("f" + f + "\n")
+                    outfile.writelines(["v" + v + "\n" for v in vlist])
+                    outfile.writelines(["l" + e + "\n" for e in elist])
+                    outfile.writelines(["f" + f + "\n" for f in flist])
     outfile.close()
     FreeCAD.Console.PrintMessage(translate("Arch","Successfully written") + " " + decode(filename) + "\n")
     if materials: 
@@ -271,6 +265,7 @@ def insert(filename,docname):
     with pythonopen(filename,"r") as infile:
         verts = []
         facets = []
+        objects = []
         activeobject = None
         material = None
         colortable = {}
@@ -299,12 +294,13 @@ def insert(filename,docname):
                             colortable[mname] = [color,trans]
             elif line[:2] == "o ":
                 if activeobject:
-                    makeMesh(doc,activeobject,verts,facets,material,colortable)
+                    objects.append((activeobject,facets,material))
                 material = None
                 facets = []
                 activeobject = line[2:]
             elif line[:2] == "v ":
-                verts.append([float(i) for i in line[2:].split()])
+                # vertices are parsed all together below
+                verts.append(line[2:])
             elif line[:2] == "f ":
                 fa = []
                 for i in line[2:].split():
@@ -315,28 +311,59 @@ def insert(filename,docname):
             elif line[:7] == "usemtl ":
                 material = line[7:]
         if activeobject:
-            makeMesh(doc,activeobject,verts,facets,material,colortable)
+            objects.append((activeobject,facets,material))
+    verts = getVerts(verts)
+    for activeobject,facets,material in objects:
+        makeMesh(doc,activeobject,verts,facets,material,colortable)
     FreeCAD.Console.PrintMessage(translate("Arch","Successfully imported") + ' ' + decode(filename) + "\n")
     return doc
 
+def getVerts(vlines):
+    "returns the coordinates of the given obj vertex lines"
+    try:
+        import numpy
+    except ImportError:
+        return [[float(i) for i in l.split()] for l in vlines]
+    if not vlines:
+        return numpy.zeros((0,3))
+    try:
+        verts = numpy.fromstring(" ".join(vlines),sep=" ")
+    except ValueError:
+        # malformed numbers, recent numpy versions raise here
+        verts = None
+    if (verts is None) or (verts.size != 3*len(vlines)):
+        # some vertices have a weight or a color
+        verts = numpy.array([[float(i) for i in l.split()[:3]] for l in vlines])
+    return verts.reshape(-1,3)
+
 def makeMesh(doc,activeobject,verts,facets,material,colortable):
     mfacets = []
-    if facets:
-        for facet in facets:
-            if len(facet) > 3:
-                vecs = [FreeCAD.Vector(*verts[i-1]) for i in facet]
-                vecs.append(vecs[0])
-                pol = Part.makePolygon(vecs)
-                try:
-                    face = Part.Face(pol)
-                except Part.OCCError:
-                    print("Skipping non-planar polygon:",vecs)
-                else:
-                    tris = face.tessellate(1)
-                    for tri in tris[1]:
-                        mfacets.append([tris[0][i] for i in tri])
+    tris = []
+    if facets and hasattr(verts,"shape"):
+        # triangles are taken from the vertex array all at once,
+        # then added in file order with the other facets below
+        tris = [facet for facet in facets if len(facet) == 3]
+        if tris:
+            tris = verts[[[i-1 for i in facet] for facet in tris]].tolist()
+    t = 0
+    for facet in facets:
+        if len(facet) > 3:
+            vecs = [FreeCAD.Vector(*verts[i-1]) for i in facet]
+            vecs.append(vecs[0])
+            pol = Part.makePolygon(vecs)
+            try:
+                face = Part.Face(pol)
+            except Part.OCCError:
+                print("Skipping non-planar polygon:",vecs)
             else:
-                mfacets.append([verts[i-1] for i in facet])
+                ftris = face.tessellate(1)
+                for tri in ftris[1]:
+                    mfacets.append([ftris[0][i] for i in tri])
+        elif tris and (len(facet) == 3):
+            mfacets.append(tris[t])
+            t += 1
+        else:
+            mfacets.append([verts[i-1] for i in facet])
     if mfacets:
         mobj = doc.addObject("Mesh::Feature",activeobject)
         mobj.Mesh = Mesh.Mesh(mfacets)
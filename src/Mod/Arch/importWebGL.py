@@ -26,9 +26,14 @@
 options: importWebGL.wireframeStyle = "faceloop" (can also be "multimaterial" or None)
 importWebGL.template = a complete html file, where $CameraData is a placeholder for the 
 FreeCAD camera, and $ObjectsData a placeholder for the FreeCAD objects.
-importWebGL.linewidth = an integer, specifying the width of lines in "faceloop" mode"""
+importWebGL.linewidth = an integer, specifying the width of lines in "faceloop" mode
 
-import FreeCAD,Draft,Part,DraftGeomUtils
+If the exported file name ends with .glb, a binary glTF 2.0 file is written instead,
+with packed vertex and index buffers, and objects sharing the same geometry and color
+written once and instanced"""
+
+import FreeCAD,Draft,Part,DraftGeomUtils,sys,json,struct,hashlib
+from array import array
 
 if FreeCAD.GuiUp:
     import FreeCADGui
@@ -36,7 +41,7 @@ if FreeCAD.GuiUp:
 else:
     FreeCADGui = None
     # \cond
-    def translate(ctxt,txt):
+    def translate(ctxt,txt,utf8_decode=False):
         return txt
     # \endcond
 
@@ -120,8 +125,11 @@ if open.__module__ in ['__builtin__','io']:
     pythonopen = open
     
 def export(exportList,filename):
-    "exports the given objects to an .html file"
+    "exports the given objects to an .html or .glb file"
 
+    if filename.lower().endswith(".glb"):
+        exportGLB(exportList,filename)
+        return
     html = getHTML(exportList)
     outfile = pythonopen(filename,"w")
     outfile.write(html)
@@ -132,9 +140,7 @@ def getHTML(objectsList):
     "returns the complete HTML code of a viewer for the given objects"
     
     # get objects data
-    objectsData = ''
-    for obj in objectsList:
-        objectsData += getObjectData(obj)
+    objectsData = "".join([getObjectData(obj) for obj in objectsList])
     t = template.replace("$CameraData",getCameraData())
     t = t.replace("$ObjectsData",objectsData)
     return t
@@ -162,22 +168,22 @@ def getObjectData(obj,wireframeMode=wireframeStyle):
     """returns the geometry data of an object as three.js snippet. 
     wireframeMode can be multimaterial, faceloop, or None"""
     
-    result = ""
+    result = []
     wires = []
 
     if obj.isDerivedFrom("Part::Feature"):
         fcmesh = obj.Shape.tessellate(0.1)
-        result = "var geom = new THREE.Geometry();\n"
+        result.append("var geom = new THREE.Geometry();\n")
         # adding vertices data
         for i in range(len(fcmesh[0])):
             v = fcmesh[0][i]
-            result += tab+"var v"+str(i)+" = new THREE.Vector3("+str(v.x)+","+str(v.y)+","+str(v.z)+");\n"
-        result += tab+"console.log(geom.vertices)\n"
+            result.append(tab+"var v"+str(i)+" = new THREE.Vector3("+str(v.x)+","+str(v.y)+","+str(v.z)+");\n")
+        result.append(tab+"console.log(geom.vertices)\n")
         for i in range(len(fcmesh[0])):
-            result += tab+"geom.vertices.push(v"+str(i)+");\n"
+            result.append(tab+"geom.vertices.push(v"+str(i)+");\n")
         # adding facets data
         for f in fcmesh[1]:
-            result += tab+"geom.faces.push( new THREE.Face3"+str(f).replace("L","")+" );\n"
+            result.append(tab+"geom.faces.push( new THREE.Face3"+str(f).replace("L","")+" );\n")
         for f in obj.Shape.Faces:
             for w in f.Wires:
                 wo = Part.Wire(Part.__sortEdges__(w.Edges))
@@ -185,19 +191,19 @@ def getObjectData(obj,wireframeMode=wireframeStyle):
 
     elif obj.isDerivedFrom("Mesh::Feature"):
         mesh = obj.Mesh
-        result = "var geom = new THREE.Geometry();\n"
+        result.append("var geom = new THREE.Geometry();\n")
         # adding vertices data 
         for p in mesh.Points:
             v = p.Vector
             i = p.Index
-            result += tab+"var v"+str(i)+" = new THREE.Vector3("+str(v.x)+","+str(v.y)+","+str(v.z)+");\n"
-        result += tab+"console.log(geom.vertices)\n"
+            result.append(tab+"var v"+str(i)+" = new THREE.Vector3("+str(v.x)+","+str(v.y)+","+str(v.z)+");\n")
+        result.append(tab+"console.log(geom.vertices)\n")
         for p in mesh.Points:
-            result += tab+"geom.vertices.push(v"+str(p.Index)+");\n"
+            result.append(tab+"geom.vertices.push(v"+str(p.Index)+");\n")
         # adding facets data
         for f in mesh.Facets:
             pointIndices = tuple([ int(i) for i in f.PointIndices ])
-            result += tab+"geom.faces.push( new THREE.Face3"+str(pointIndices).replace("L","")+" );\n"
+            result.append(tab+"geom.faces.push( new THREE.Face3"+str(pointIndices).replace("L","")+" );\n")
             
     if result:
         # adding a base material
@@ -206,34 +212,161 @@ def getObjectData(obj,wireframeMode=wireframeStyle):
             rgb = Draft.getrgb(col,testbw=False)
         else:
             rgb = "#888888" # test color
-        result += tab+"var basematerial = new THREE.MeshBasicMaterial( { color: 0x"+str(rgb)[1:]+" } );\n"
-        #result += tab+"var basematerial = new THREE.MeshLambertMaterial( { color: 0x"+str(rgb)[1:]+" } );\n"
+        result.append(tab+"var basematerial = new THREE.MeshBasicMaterial( { color: 0x"+str(rgb)[1:]+" } );\n")
+        #result.append(tab+"var basematerial = new THREE.MeshLambertMaterial( { color: 0x"+str(rgb)[1:]+" } );\n")
         
         if wireframeMode == "faceloop":
             # adding the mesh to the scene with a wireframe copy
-            result += tab+"var mesh = new THREE.Mesh( geom, basematerial );\n"
-            result += tab+"scene.add( mesh );\n"
-            result += tab+"var linematerial = new THREE.LineBasicMaterial({linewidth: %d, color: 0x000000,});\n" % linewidth
+            result.append(tab+"var mesh = new THREE.Mesh( geom, basematerial );\n")
+            result.append(tab+"scene.add( mesh );\n")
+            result.append(tab+"var linematerial = new THREE.LineBasicMaterial({linewidth: %d, color: 0x000000,});\n" % linewidth)
             for w in wires:
-                result += tab+"var wire = new THREE.Geometry();\n"
+                result.append(tab+"var wire = new THREE.Geometry();\n")
                 for p in w:
-                    result += tab+"wire.vertices.push(new THREE.Vector3("
-                    result += str(p.x)+", "+str(p.y)+", "+str(p.z)+"));\n"
-                result += tab+"var line = new THREE.Line(wire, linematerial);\n"
-                result += tab+"scene.add(line);\n"
+                    result.append(tab+"wire.vertices.push(new THREE.Vector3(")
+                    result.append(str(p.x)+", "+str(p.y)+", "+str(p.z)+"));\n")
+                result.append(tab+"var line = new THREE.Line(wire, linematerial);\n")
+                result.append(tab+"scene.add(line);\n")
             
         elif wireframeMode == "multimaterial":
             # adding a wireframe material
-            result += tab+"var wireframe = new THREE.MeshBasicMaterial( { color: "
-            result += "0x000000, wireframe: true, transparent: true } );\n"
-            result += tab+"var material = [ basematerial, wireframe ];\n"
-            result += tab+"var mesh = new THREE.SceneUtils.createMultiMaterialObject( geom, material );\n"
-            result += tab+"scene.add( mesh );\n"+tab
+            result.append(tab+"var wireframe = new THREE.MeshBasicMaterial( { color: ")
+            result.append("0x000000, wireframe: true, transparent: true } );\n")
+            result.append(tab+"var material = [ basematerial, wireframe ];\n")
+            result.append(tab+"var mesh = new THREE.SceneUtils.createMultiMaterialObject( geom, material );\n")
+            result.append(tab+"scene.add( mesh );\n"+tab)
             
         else:
             # adding the mesh to the scene with simple material
-            result += tab+"var mesh = new THREE.Mesh( geom, basematerial );\n"
-            result += tab+"scene.add( mesh );\n"+tab
-        
-    return result
+            result.append(tab+"var mesh = new THREE.Mesh( geom, basematerial );\n")
+            result.append(tab+"scene.add( mesh );\n"+tab)
         
+    return "".join(result)
+
+
+def getColor(obj):
+    "returns the (r,g,b,a) color of an object"
+
+    if FreeCADGui and hasattr(obj.ViewObject,"ShapeColor"):
+        col = obj.ViewObject.ShapeColor
+        alpha = 1.0
+        if hasattr(obj.ViewObject,"Transparency"):
+            alpha = 1.0 - obj.ViewObject.Transparency/100.0
+        return (col[0],col[1],col[2],alpha)
+    return (0.533,0.533,0.533,1.0) # test color
+
+
+def getBufferData(obj):
+    """returns (key,positions,indices,vmin,vmax,placement) for an object, with the
+    positions and indices packed as little-endian float32 and uint32 buffers in the
+    object's local coordinates, or None if the object has no faces"""
+
+    if obj.isDerivedFrom("Part::Feature"):
+        if obj.Shape.isNull() or not obj.Shape.Faces:
+            return None
+        placement = obj.Shape.Placement
+        points,facets = obj.Shape.tessellate(0.1)
+    elif obj.isDerivedFrom("Mesh::Feature"):
+        placement = obj.Mesh.Placement
+        points,facets = obj.Mesh.Topology
+    else:
+        return None
+    if not facets:
+        return None
+    inv = placement.inverse()
+    p = Draft.precision()
+    coords = array("f")
+    for v in points:
+        v = inv.multVec(v)
+        coords.extend((round(v.x,p),round(v.y,p),round(v.z,p)))
+    indices = array("I")
+    for f in facets:
+        indices.extend(f)
+    vmin = [min(coords[i::3]) for i in range(3)]
+    vmax = [max(coords[i::3]) for i in range(3)]
+    if sys.byteorder == "big":
+        coords.byteswap()
+        indices.byteswap()
+    coords = coords.tobytes()
+    indices = indices.tobytes()
+    key = hashlib.sha1(coords+indices).hexdigest()
+    return key,coords,indices,vmin,vmax,placement
+
+
+def getGLB(objectsList):
+    """returns the contents of a binary glTF 2.0 file for the given objects. Objects
+    with identical geometry and color share the same glTF mesh"""
+
+    gltf = {"asset":{"version":"2.0","generator":"FreeCAD Arch module"},
+            "scene":0,
+            "scenes":[{"nodes":[0]}],
+            # FreeCAD works in millimeters with Z up, glTF in meters with Y up
+            "nodes":[{"matrix":[0.001,0,0,0,0,0,-0.001,0,0,0.001,0,0,0,0,0,1],"children":[]}],
+            "meshes":[],
+            "materials":[],
+            "accessors":[],
+            "bufferViews":[]}
+    chunks = []
+    offset = 0
+    meshes = {}
+    materials = {}
+    for obj in objectsList:
+        data = getBufferData(obj)
+        if not data:
+            continue
+        key,coords,indices,vmin,vmax,placement = data
+        color = getColor(obj)
+        if not color in materials:
+            materials[color] = len(gltf["materials"])
+            gltf["materials"].append({"pbrMetallicRoughness":{"baseColorFactor":list(color),
+                                                               "metallicFactor":0.0},
+                                      "doubleSided":True})
+            if color[3] < 1.0:
+                gltf["materials"][-1]["alphaMode"] = "BLEND"
+        if not (key,color) in meshes:
+            # both buffers have a length multiple of 4, so views stay aligned
+            acc = len(gltf["accessors"])
+            for buf,target in ((coords,34962),(indices,34963)):
+                gltf["bufferViews"].append({"buffer":0,"byteOffset":offset,"byteLength":len(buf),"target":target})
+                chunks.append(buf)
+                offset += len(buf)
+            gltf["accessors"].append({"bufferView":acc,"componentType":5126,"count":len(coords)//12,
+                                      "type":"VEC3","min":vmin,"max":vmax})
+            gltf["accessors"].append({"bufferView":acc+1,"componentType":5125,"count":len(indices)//4,
+                                      "type":"SCALAR"})
+            meshes[(key,color)] = len(gltf["meshes"])
+            gltf["meshes"].append({"primitives":[{"attributes":{"POSITION":acc},"indices":acc+1,
+                                                  "material":materials[color]}]})
+        node = {"name":obj.Label,"mesh":meshes[(key,color)]}
+        if not placement.isIdentity():
+            m = placement.toMatrix()
+            node["matrix"] = [m.A11,m.A21,m.A31,m.A41,m.A12,m.A22,m.A32,m.A42,
+                              m.A13,m.A23,m.A33,m.A43,m.A14,m.A24,m.A34,m.A44]
+        gltf["nodes"][0]["children"].append(len(gltf["nodes"]))
+        gltf["nodes"].append(node)
+    gltf["buffers"] = [{"byteLength":offset}]
+    for k in ["meshes","materials","accessors","bufferViews"]:
+        if not gltf[k]:
+            del gltf[k]
+    if not offset:
+        del gltf["buffers"]
+    jsondata = json.dumps(gltf,separators=(",",":")).encode("utf8")
+    jsondata += b" " * (-len(jsondata) % 4)
+    length = 12 + 8 + len(jsondata)
+    if offset:
+        length += 8 + offset
+    result = [struct.pack("<4sII",b"glTF",2,length),struct.pack("<II",len(jsondata),0x4E4F534A),jsondata]
+    if offset:
+        result.append(struct.pack("<II",offset,0x004E4942))
+        result.extend(chunks)
+    return b"".join(result)
+
+
+def exportGLB(exportList,filename):
+    "exports the given objects to a binary glTF (.glb) file"
+
+    objectsList = Draft.getGroupContents(exportList,walls=True,addgroups=False)
+    outfile = pythonopen(filename,"wb")
+    outfile.write(getGLB(objectsList))
+    outfile.close()
+    FreeCAD.Console.PrintMessage(translate("Arch","Successfully written", utf8_decode=True) + ' ' + filename + "\n")
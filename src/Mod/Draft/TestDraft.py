@@ -142,6 +142,128 @@ class DraftTest(unittest.TestCase):
 
     # modification tools
 
+    # svg export
+
+    def testSVGProjection(self):
+        FreeCAD.Console.PrintLog ('Checking Draft SVG projection...\n')
+        import getSVG, WorkingPlane, Part
+        points = [FreeCAD.Vector(1,2,3),FreeCAD.Vector(-4.5,0.25,7),FreeCAD.Vector(0,-3,-2)]
+        for d in [FreeCAD.Vector(0,0,1),FreeCAD.Vector(1,0,0),FreeCAD.Vector(0,-1,0),FreeCAD.Vector(1,1,1)]:
+            plane = WorkingPlane.plane()
+            plane.alignToPointAndAxis_SVG(FreeCAD.Vector(0,0,0),d,0)
+            for p,(x,y) in zip(points,getSVG.getProjList(points,plane)):
+                ref = getSVG.getProj(p,plane)
+                self.failUnless(abs(ref.x-x) < 1e-7 and abs(ref.y-y) < 1e-7,"Draft SVG projection matrix failed")
+            # an arc discretized with the matrix gives the points of getProj
+            e = Part.makeCircle(10,FreeCAD.Vector(1,1,1),FreeCAD.Vector(0,1,1),0,90)
+            data = getSVG.getDiscretized(e,plane,2.0).split()
+            pts = e.discretize(Number=int(e.Length/2.0)+1)
+            self.failUnless(data[0::3] == ['M']+['L']*(len(pts)-1),"Draft SVG discretization failed")
+            for p,x,y in zip(pts,data[1::3],data[2::3]):
+                ref = getSVG.getProj(p,plane)
+                self.failUnless(abs(ref.x-float(x)) < 1e-7 and abs(ref.y-float(y)) < 1e-7,"Draft SVG discretization failed")
+
+    def testSVGCache(self):
+        FreeCAD.Console.PrintLog ('Checking Draft SVG cache...\n')
+        import getSVG, Part
+        getSVG.clearSVGCache()
+        obj = FreeCAD.ActiveDocument.addObject("Part::Feature","Shape")
+        obj.Shape = Part.makeBox(2,3,4)
+        d = FreeCAD.Vector(1,1,1)
+        def fresh(**kw):
+            # the svg built without the cache
+            getSVG.clearSVGCache()
+            return getSVG.getSVG(obj,direction=d,**kw)
+        svg = getSVG.getSVG(obj,direction=d)
+        self.failUnless(getSVG.getSVG(obj,direction=d) == svg,"Draft SVG cache failed")
+        self.failUnless((obj.Document.Name,obj.Name) in getSVG.svgCache,"Draft SVG cache failed")
+        # changed shape
+        obj.Shape = Part.makeBox(2,3,5)
+        svg2 = getSVG.getSVG(obj,direction=d)
+        self.failUnless(svg2 != svg and svg2 == fresh(),"Draft SVG cache of a changed shape failed")
+        # changed placement
+        getSVG.getSVG(obj,direction=d)
+        obj.Placement.Base = FreeCAD.Vector(10,0,0)
+        svg3 = getSVG.getSVG(obj,direction=d)
+        self.failUnless(svg3 != svg2 and svg3 == fresh(),"Draft SVG cache of a moved shape failed")
+        # changed style
+        getSVG.getSVG(obj,direction=d)
+        svg4 = getSVG.getSVG(obj,direction=d,linewidth=1.5)
+        self.failUnless(svg4 != svg3 and svg4 == fresh(linewidth=1.5),"Draft SVG cache of a changed style failed")
+        # the cache is bounded
+        size = getSVG.svgCacheSize
+        getSVG.svgCacheSize = 1
+        try:
+            other = FreeCAD.ActiveDocument.addObject("Part::Feature","Shape")
+            other.Shape = Part.makeBox(1,1,1)
+            getSVG.getSVG(other,direction=d)
+            self.failUnless(list(getSVG.svgCache.keys()) == [(other.Document.Name,other.Name)],"Draft SVG cache size failed")
+        finally:
+            getSVG.svgCacheSize = size
+            getSVG.clearSVGCache()
+
+    # dxf import
+
+    # lines and polylines on two layers, with the colors 1 (red) and 5 (blue)
+    bulkDXF = """0\nSECTION\n2\nENTITIES
+0\nLINE\n8\nL1\n62\n1\n10\n0.0\n20\n0.0\n30\n0.0\n11\n10.0\n21\n0.0\n31\n0.0
+0\nLINE\n8\nL1\n62\n1\n10\n10.0\n20\n0.0\n30\n0.0\n11\n10.0\n21\n10.0\n31\n0.0
+0\nLWPOLYLINE\n8\nL1\n62\n1\n90\n3\n70\n0\n10\n0.0\n20\n5.0\n10\n5.0\n20\n5.0\n10\n5.0\n20\n8.0
+0\nLWPOLYLINE\n8\nL2\n62\n5\n90\n2\n70\n0\n10\n0.0\n20\n20.0\n42\n1.0\n10\n10.0\n20\n20.0
+0\nLINE\n8\nL2\n62\n1\n10\n0.0\n20\n30.0\n30\n0.0\n11\n10.0\n21\n30.0\n31\n0.0
+0\nENDSEC\n0\nEOF\n"""
+
+    def testDXFBulkImport(self):
+        FreeCAD.Console.PrintLog ('Checking Draft DXF bulk import...\n')
+        import sys, tempfile, importDXF
+        if FreeCAD.ConfigGet("UserAppData") not in sys.path:
+            sys.path.append(FreeCAD.ConfigGet("UserAppData"))
+        try:
+            import dxfReader
+        except ImportError:
+            FreeCAD.Console.PrintWarning("DXF libraries not found, skipping the DXF bulk import test\n")
+            return
+        p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Draft")
+        names = ["dxfBulkImport","dxfGetOriginalColors","dxfCreateDraft","dxfCreateSketch","groupLayers","joingeometry","dxfShowDialog"]
+        saved = [p.GetBool(n,False) for n in names]
+        (fd, filename) = tempfile.mkstemp(".dxf")
+        os.close(fd)
+        try:
+            with open(filename,"w") as f:
+                f.write(self.bulkDXF)
+            for colors in [False,True]:
+                for n in names:
+                    p.SetBool(n,False)
+                p.SetBool("dxfBulkImport",True)
+                p.SetBool("dxfGetOriginalColors",colors)
+                importDXF.getDXFlibs()
+                importDXF.readPreferences()
+                doc = FreeCAD.newDocument("DraftTestDXF")
+                try:
+                    importDXF.processdxf(doc,filename)
+                    objs = [o for o in doc.Objects if o.isDerivedFrom("Part::Feature")]
+                    edges = sorted(len(o.Shape.Edges) for o in objs)
+                    if colors:
+                        # one object per layer and color
+                        self.failUnless(edges == [1,1,4],"Draft DXF bulk import by color failed")
+                        if FreeCAD.GuiUp:
+                            for o in objs:
+                                c = o.ViewObject.LineColor
+                                if len(o.Shape.Edges) == 1 and o.Shape.Edges[0].Curve.TypeId == "Part::GeomCircle":
+                                    self.failUnless(c[:3] == (0.0,0.0,1.0),"Draft DXF bulk import color failed")
+                                else:
+                                    self.failUnless(c[:3] == (1.0,0.0,0.0),"Draft DXF bulk import color failed")
+                    else:
+                        # one object per layer
+                        self.failUnless(edges == [2,4],"Draft DXF bulk import failed")
+                finally:
+                    FreeCAD.closeDocument(doc.Name)
+        finally:
+            os.remove(filename)
+            for n,v in zip(names,saved):
+                p.SetBool(n,v)
+            importDXF.readPreferences()
+
     def tearDown(self):
         FreeCAD.closeDocument("DraftTest")
         pass
@@ -1,6 +1,6 @@
 import six
 
-import FreeCAD, math, os, DraftVecUtils, WorkingPlane
+import FreeCAD, math, os, collections, DraftVecUtils, WorkingPlane
 import Part, DraftGeomUtils
 from FreeCAD import Vector
 from Draft import getType, getrgb, svgpatterns, gui
@@ -45,21 +45,91 @@ def getProj(vec, plane):
     return Vector(lx,ly,0)
 
 
-def getDiscretized(edge, plane):
+def getProjMatrix(plane):
+    "returns a matrix projecting points onto the given plane"
+    m = FreeCAD.Matrix()
+    if plane:
+        u = Vector(plane.u).normalize()
+        v = Vector(plane.v).normalize()
+        n = Vector(plane.axis).normalize()
+        m.A11, m.A12, m.A13 = u.x, u.y, u.z
+        m.A21, m.A22, m.A23 = v.x, v.y, v.z
+        m.A31, m.A32, m.A33 = n.x, n.y, n.z
+    return m
+
+
+def getProjList(points, plane, matrix=None):
+    """getProjList(points, plane, [matrix]): projects a list of points onto
+    the given plane at once and returns a list of (x,y) tuples. This gives the
+    same coordinates as getProj, a precomputed projection matrix can be given"""
+    if matrix is None:
+        matrix = getProjMatrix(plane)
+    return [(v.x,v.y) for v in map(matrix.multVec,points)]
+
+
+def getDiscretizationLength():
+    "returns the max segment length used to discretize curves"
     ml = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Draft").GetFloat("svgDiscretization",10.0)
     if ml == 0:
         ml = 10
+    return ml
+
+
+def getDiscretized(edge, plane, ml=None, matrix=None):
+    """getDiscretized(edge, plane, [ml], [matrix]): returns svg path data of
+    the given edge discretized in segments of ml max length"""
+    if ml is None:
+        ml = getDiscretizationLength()
     d = int(edge.Length/ml)
     if d == 0:
         d = 1
-    edata = ""
-    for i in range(d+1):
-        v = getProj(edge.valueAt(edge.FirstParameter+((float(i)/d)*(edge.LastParameter-edge.FirstParameter))), plane)
-        if not edata:
-            edata += 'M ' + str(v.x) +' '+ str(v.y) + ' '
-        else:
-            edata += 'L ' + str(v.x) +' '+ str(v.y) + ' '
-    return edata
+    points = getProjList(edge.discretize(Number=d+1), plane, matrix)
+    edata = ['M %s %s' % (str(points[0][0]),str(points[0][1]))]
+    edata.extend(['L %s %s' % (str(x),str(y)) for x,y in points[1:]])
+    return ' '.join(edata) + ' '
+
+
+# cache of the svg paths of Part-based objects, indexed by document and object
+# names, each entry holding the shape and the key it was built with and the svg
+# data. The least recently used entries are dropped above svgCacheSize entries
+svgCache = collections.OrderedDict()
+svgCacheSize = 1000
+
+
+def clearSVGCache():
+    "clears the svg paths cache"
+    svgCache.clear()
+
+
+def getSVGCacheKey(plane, *style):
+    "returns a key identifying the svg output of a shape on a plane with a given style"
+    if plane:
+        p = (tuple(plane.u), tuple(plane.v), tuple(plane.axis))
+    elif hasattr(FreeCAD,"DraftWorkingPlane"):
+        # arcs are oriented after the working plane if no plane is given
+        p = tuple(FreeCAD.DraftWorkingPlane.axis)
+    else:
+        p = None
+    return (p,) + style
+
+
+def getCachedSVG(name, shape, key):
+    "returns the cached svg of a shape, or None if the shape or the key changed"
+    entry = svgCache.pop(name, None)
+    if entry is None:
+        return None
+    if (entry[1] != key) or (not entry[0].isSame(shape)):
+        return None
+    svgCache[name] = entry
+    return entry[2]
+
+
+def setCachedSVG(name, shape, key, svg):
+    "stores the svg of a shape in the cache"
+    svgCache.pop(name, None)
+    svgCache[name] = (shape, key, svg)
+    while len(svgCache) > svgCacheSize:
+        svgCache.popitem(last=False)
 
 
 def getPattern(pat):
@@ -101,6 +171,10 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                 plane.alignToPointAndAxis_SVG(Vector(0,0,0),direction.negative().negative(),0)
         elif isinstance(direction,WorkingPlane.plane):
             plane = direction
+    # the projection matrix and discretization length are shared by all edges
+    projmatrix = getProjMatrix(plane)
+    ml = getDiscretizationLength()
+    fill_opacity = None
     stroke = "#000000"
     if color:
         if "#" in color:
@@ -130,7 +204,7 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                 w1.fixWire()
                 egroups.append(Part.__sortEdges__(w1.Edges))
         for egroupindex, edges in enumerate(egroups):
-            edata = ""
+            edata = []
             vs=() #skipped for the first edge
             for edgeindex,e in enumerate(edges):
                 previousvs = vs
@@ -141,7 +215,7 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                         vs.reverse()
                 if edgeindex == 0:
                     v = getProj(vs[0].Point, plane)
-                    edata += 'M '+ str(v.x) +' '+ str(v.y) + ' '
+                    edata.append('M '+ str(v.x) +' '+ str(v.y) + ' ')
                 else:
                     if (vs[0].Point-previousvs[-1].Point).Length > 1e-6:
                         raise ValueError('edges not ordered')
@@ -168,7 +242,7 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                                 except:
                                     pass
                                 else:
-                                    edata += a
+                                    edata.append(a)
                                     done = True
                         if not done:
                             if len(e.Vertexes) == 1 and iscircle: #complete curve
@@ -205,15 +279,15 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                             t2 = e.tangentAt(e.FirstParameter + (e.LastParameter-e.FirstParameter)/10)
                             flag_sweep = (DraftVecUtils.angle(t1,t2,drawing_plane_normal) < 0)
                             for v in endpoints:
-                                edata += 'A %s %s %s %s %s %s %s ' % \
+                                edata.append('A %s %s %s %s %s %s %s ' % \
                                         (str(rx),str(ry),str(rot),\
                                         str(int(flag_large_arc)),\
-                                        str(int(flag_sweep)),str(v.x),str(v.y))
+                                        str(int(flag_sweep)),str(v.x),str(v.y)))
                     else:
-                        edata += getDiscretized(e, plane)
+                        edata.append(getDiscretized(e, plane, ml, projmatrix))
                 elif DraftGeomUtils.geomType(e) == "Line":
                     v = getProj(vs[-1].Point, plane)
-                    edata += 'L '+ str(v.x) +' '+ str(v.y) + ' '
+                    edata.append('L '+ str(v.x) +' '+ str(v.y) + ' ')
                 else:
                     bspline=e.Curve.toBSpline(e.FirstParameter,e.LastParameter)
                     if bspline.Degree > 3 or bspline.isRational():
@@ -226,22 +300,21 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                             if bezierseg.Degree>3: #should not happen
                                 raise AssertionError
                             elif bezierseg.Degree==1:
-                                edata +='L '
+                                edata.append('L ')
                             elif bezierseg.Degree==2:
-                                edata +='Q '
+                                edata.append('Q ')
                             elif bezierseg.Degree==3:
-                                edata +='C '
-                            for pole in bezierseg.getPoles()[1:]:
-                                v = getProj(pole, plane)
-                                edata += str(v.x) +' '+ str(v.y) + ' '
+                                edata.append('C ')
+                            for x,y in getProjList(bezierseg.getPoles()[1:], plane, projmatrix):
+                                edata.append(str(x) +' '+ str(y) + ' ')
                     else:
                         print("Debug: one edge (hash ",e.hashCode(),\
                                 ") has been discretized with parameter 0.1")
-                        for linepoint in bspline.discretize(0.1)[1:]:
-                            v = getProj(linepoint, plane)
-                            edata += 'L '+ str(v.x) +' '+ str(v.y) + ' '
+                        points = getProjList(bspline.discretize(0.1)[1:], plane, projmatrix)
+                        edata.append(' '.join(['L %s %s' % (str(x),str(y)) for x,y in points]) + ' ')
             if fill != 'none':
-                edata += 'Z '
+                edata.append('Z ')
+            edata = "".join(edata)
             if edata in pathdata:
                 # do not draw a path on another identical path
                 return ""
@@ -255,10 +328,8 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
         svg += ';stroke-miterlimit:4'
         svg += ';stroke-dasharray:' + lstyle
         svg += ';fill:' + fill
-        try:
+        if fill_opacity is not None:
             svg += ';fill-opacity:' + str(fill_opacity)
-        except NameError:
-            pass
         svg += ';fill-rule: evenodd "'
         svg += '/>\n'
         return svg
@@ -792,30 +863,44 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
             fill = 'none'
         lstyle = getLineStyle(linestyle, scale)
 
+        # reuse the paths of unchanged objects
+        cachename = (obj.Document.Name,obj.Name)
+        cachekey = getSVGCacheKey(plane,fill,fill_opacity,lstyle,stroke,linewidth,ml)
+        cachedsvg = getCachedSVG(cachename,obj.Shape,cachekey)
         if len(obj.Shape.Vertexes) > 1:
-            wiredEdges = []
-            if obj.Shape.Faces:
-                for i,f in enumerate(obj.Shape.Faces):
-                    svg += getPath(wires=f.Wires,pathname='%s_f%04d' % \
-                            (obj.Name,i))
-                    wiredEdges.extend(f.Edges)
+            if cachedsvg is not None:
+                svg += cachedsvg
             else:
-                for i,w in enumerate(obj.Shape.Wires):
-                    svg += getPath(w.Edges,pathname='%s_w%04d' % \
-                            (obj.Name,i))
-                    wiredEdges.extend(w.Edges)
-            if len(wiredEdges) != len(obj.Shape.Edges):
-                for i,e in enumerate(obj.Shape.Edges):
-                    if (DraftGeomUtils.findEdge(e,wiredEdges) == None):
-                        svg += getPath([e],pathname='%s_nwe%04d' % \
-                                (obj.Name,i))
+                shapesvg = []
+                wiredEdges = []
+                if obj.Shape.Faces:
+                    for i,f in enumerate(obj.Shape.Faces):
+                        shapesvg.append(getPath(wires=f.Wires,pathname='%s_f%04d' % \
+                                (obj.Name,i)))
+                        wiredEdges.extend(f.Edges)
+                else:
+                    for i,w in enumerate(obj.Shape.Wires):
+                        shapesvg.append(getPath(w.Edges,pathname='%s_w%04d' % \
+                                (obj.Name,i)))
+                        wiredEdges.extend(w.Edges)
+                if len(wiredEdges) != len(obj.Shape.Edges):
+                    for i,e in enumerate(obj.Shape.Edges):
+                        if (DraftGeomUtils.findEdge(e,wiredEdges) == None):
+                            shapesvg.append(getPath([e],pathname='%s_nwe%04d' % \
+                                    (obj.Name,i)))
+                shapesvg = "".join(shapesvg)
+                setCachedSVG(cachename,obj.Shape,cachekey,shapesvg)
+                svg += shapesvg
         else:
             # closed circle or spline
-            if obj.Shape.Edges:
+            if cachedsvg is not None:
+                svg = cachedsvg
+            elif obj.Shape.Edges:
                 if isinstance(obj.Shape.Edges[0].Curve,Part.Circle):
                     svg = getCircle(obj.Shape.Edges[0])
                 else:
                     svg = getPath(obj.Shape.Edges)
+                setCachedSVG(cachename,obj.Shape,cachekey,svg)
         if FreeCAD.GuiUp:
             if hasattr(obj.ViewObject,"EndArrow") and hasattr(obj.ViewObject,"ArrowType") and (len(obj.Shape.Vertexes) > 1):
                 if obj.ViewObject.EndArrow:
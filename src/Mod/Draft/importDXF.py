@@ -1068,6 +1068,122 @@ def addToBlock(obj,layer):
     else:
         layerBlocks[layer] = [obj]
 
+def getBulkPoints(points):
+    "returns an array of rounded and scaled coordinates from a list of dxf points"
+    import numpy
+    pts = numpy.round(numpy.array([(p[0],p[1],p[2]) for p in points],dtype=float),prec())
+    if dxfScaling != 1:
+        pts *= dxfScaling
+    return pts
+
+def drawBulkPolyline(polyline):
+    """returns a Part shape from a dxf polyline without bulges, built in one
+    go from its points, or None if the polyline needs the standard path"""
+    import numpy
+    if len(polyline.points) < 2:
+        return None
+    if any(p.bulge for p in polyline.points):
+        return None
+    if dxfRenderPolylineWidth and rawValue(polyline,43):
+        return None
+    pts = getBulkPoints(polyline.points)
+    if polyline.closed:
+        pts = numpy.vstack((pts,pts[:1]))
+    # skip coincident consecutive points
+    keep = numpy.concatenate(([True],numpy.any(pts[1:] != pts[:-1],axis=1)))
+    pts = pts[keep]
+    if len(pts) < 2:
+        return None
+    try:
+        w = Part.makePolygon([Vector(*p) for p in pts.tolist()])
+        w.Placement = placementFromDXFOCS(polyline)
+        if polyline.closed and dxfFillMode:
+            return Part.Face(w)
+        return w
+    except Part.OCCError:
+        warn(polyline)
+    return None
+
+def drawBulk(drawing):
+    """drawBulk(drawing): imports the lines, polylines, arcs, circles, ellipses,
+    splines, solids and 3D faces of the drawing as one compound shape per layer,
+    or per layer and color if dxfGetColors is on, then removes these entities
+    from the drawing so they are not processed again. Returns the list of created
+    objects"""
+    import numpy
+    bulkdrawers = {"arc":drawArc,
+                   "circle":drawCircle,
+                   "ellipse":drawEllipse,
+                   "spline":drawSpline,
+                   "lwpolyline":drawPolyline,
+                   "polyline":drawPolyline}
+    layershapes = {}
+    layerlines = {}
+    # the first entity of each group, giving its color to the object
+    layerents = {}
+    remaining = []
+    count = 0
+    for ent in drawing.entities.data:
+        t = getattr(ent,"type",None)
+        if t not in ["line","lwpolyline","polyline","arc","circle","ellipse","spline","solid","3dface"]:
+            remaining.append(ent)
+            continue
+        if (t in ["lwpolyline","polyline"]) and (getattr(ent,"flags",None) in [16,64]):
+            # polyface and polygon meshes
+            remaining.append(ent)
+            continue
+        if (t != "3dface") and (not dxfImportLayouts) and rawValue(ent,67):
+            continue
+        layer = getattr(ent,"layer",None) or rawValue(ent,8)
+        if dxfGetColors:
+            group = (layer,getattr(ent,"color_index",None))
+        else:
+            group = (layer,None)
+        layerents.setdefault(group,ent)
+        count += 1
+        if t == "line":
+            # lines are only gathered here, and built per layer below
+            if len(ent.points) > 1:
+                layerlines.setdefault(group,[]).extend(ent.points[:2])
+            continue
+        shape = None
+        if t in ["lwpolyline","polyline"]:
+            shape = drawBulkPolyline(ent)
+        if not shape:
+            if t == "solid":
+                shape = drawSolid(ent)
+            elif t == "3dface":
+                shape = drawFace(ent)
+            else:
+                shape = bulkdrawers[t](ent,forceShape=True)
+        if shape:
+            layershapes.setdefault(group,[]).append(shape)
+    drawing.entities.data = remaining
+    FreeCAD.Console.PrintMessage("drawing "+str(count)+" entities on "+str(len(set(g[0] for g in set(layershapes.keys()) | set(layerlines.keys()))))+" layers...\n")
+    for group,coords in layerlines.items():
+        pts = getBulkPoints(coords).reshape(-1,6)
+        # skip zero length lines
+        pts = pts[numpy.any(pts[:,:3] != pts[:,3:],axis=1)]
+        edges = layershapes.setdefault(group,[])
+        for p in pts.tolist():
+            try:
+                edges.append(Part.makeLine(tuple(p[:3]),tuple(p[3:])))
+            except Part.OCCError:
+                warn(p)
+    del layerlines
+    objects = []
+    for group in list(layershapes.keys()):
+        shapes = layershapes.pop(group)
+        if shapes:
+            layer = group[0]
+            newob = addObject(Part.makeCompound(shapes),"Shape",layer)
+            if layer:
+                newob.Label = decodeName(layer)
+            if gui:
+                formatObject(newob,layerents[group])
+            objects.append(newob)
+    return objects
+
 def processdxf(document,filename,getShapes=False,reComputeFlag=True):
     "Recompute causes OpenSCAD import to loop, supply flag to make conditional"
     "this does the translation of the dxf contents into FreeCAD Part objects"
@@ -1092,6 +1208,11 @@ def processdxf(document,filename,getShapes=False,reComputeFlag=True):
     sketch = None
     shapes = []
 
+    # bulk importing simple geometry
+
+    if dxfBulkImport and not (getShapes or dxfCreateDraft or dxfCreateSketch or dxfMakeBlocks or dxfJoin):
+        drawBulk(drawing)
+
     # drawing lines
 
     lines = drawing.entities.get_type("line")
@@ -2317,7 +2438,7 @@ def readPreferences():
     global dxfMakeBlocks, dxfJoin, dxfRenderPolylineWidth, dxfImportTexts, dxfImportLayouts
     global dxfImportPoints, dxfImportHatches, dxfUseStandardSize, dxfGetColors, dxfUseDraftVisGroups
     global dxfFillMode, dxfBrightBackground, dxfDefaultColor, dxfUseLegacyImporter, dxfExportBlocks, dxfScaling
-    global dxfUseLegacyExporter
+    global dxfUseLegacyExporter, dxfBulkImport
     dxfCreatePart = p.GetBool("dxfCreatePart",True)
     dxfCreateDraft = p.GetBool("dxfCreateDraft",False)
     dxfCreateSketch = p.GetBool("dxfCreateSketch",False)
@@ -2334,6 +2455,7 @@ def readPreferences():
     dxfGetColors = p.GetBool("dxfGetOriginalColors",False)
     dxfUseDraftVisGroups = p.GetBool("dxfUseDraftVisGroups",False)
     dxfFillMode = p.GetBool("fillmode",True)
+    dxfBulkImport = p.GetBool("dxfBulkImport",False)
     dxfUseLegacyImporter = p.GetBool("dxfUseLegacyImporter",False)
     dxfUseLegacyExporter = p.GetBool("dxfUseLegacyExporter",False)
     dxfBrightBackground = isBrightBackground()
@@ -25,6 +25,8 @@
 
 #ifndef _PreComp_
 # include <algorithm>
+# include <map>
+# include <type_traits>
 # include <stdexcept>
 # include <SMESH_Gen.hxx>
 # include <SMESH_Group.hxx>
@@ -595,6 +597,190 @@ PyObject* FemMeshPy::addVolume(PyObject *args)
     return 0;
 }
 
+namespace {
+template <typename T, typename S>
+void getBufferValues(const Py_buffer& view, std::vector<T>& values)
+{
+    const S* data = static_cast<const S*>(view.buf);
+    Py_ssize_t size = view.len / view.itemsize;
+    values.reserve(size);
+    for (Py_ssize_t i = 0; i < size; ++i)
+        values.push_back(static_cast<T>(data[i]));
+}
+
+// reads the values of a contiguous buffer of native numbers, e.g. a numpy array
+// returns false if the object does not provide such a buffer
+template <typename T>
+bool getBufferValues(PyObject* obj, std::vector<T>& values)
+{
+    if (!PyObject_CheckBuffer(obj))
+        return false;
+    Py_buffer view;
+    if (PyObject_GetBuffer(obj, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0) {
+        PyErr_Clear();
+        return false;
+    }
+    std::string format(view.format ? view.format : "B");
+    if (format.size() == 2 && (format[0] == '@' || format[0] == '='))
+        format.erase(0, 1);
+    bool ok = format.size() == 1;
+    if (ok) {
+        switch (format[0]) {
+        case 'b': getBufferValues<T, signed char>(view, values); break;
+        case 'B': getBufferValues<T, unsigned char>(view, values); break;
+        case 'h': getBufferValues<T, short>(view, values); break;
+        case 'H': getBufferValues<T, unsigned short>(view, values); break;
+        case 'i': getBufferValues<T, int>(view, values); break;
+        case 'I': getBufferValues<T, unsigned int>(view, values); break;
+        case 'l': getBufferValues<T, long>(view, values); break;
+        case 'L': getBufferValues<T, unsigned long>(view, values); break;
+        case 'q': getBufferValues<T, long long>(view, values); break;
+        case 'Q': getBufferValues<T, unsigned long long>(view, values); break;
+        case 'f': getBufferValues<T, float>(view, values); break;
+        case 'd': getBufferValues<T, double>(view, values); break;
+        default: ok = false;
+        }
+    }
+    PyBuffer_Release(&view);
+    return ok;
+}
+
+// reads a flat sequence of numbers, buffers like numpy arrays are read directly
+template <typename T>
+std::vector<T> getSequenceValues(PyObject* obj, const char* name)
+{
+    std::vector<T> values;
+    if (getBufferValues<T>(obj, values))
+        return values;
+
+    PyObject* seq = PySequence_Fast(obj, name);
+    if (!seq)
+        throw Py::Exception();
+    Py_ssize_t size = PySequence_Fast_GET_SIZE(seq);
+    PyObject** items = PySequence_Fast_ITEMS(seq);
+    values.reserve(size);
+    for (Py_ssize_t i = 0; i < size; ++i) {
+        if (std::is_floating_point<T>::value)
+            values.push_back(static_cast<T>(PyFloat_AsDouble(items[i])));
+        else
+            values.push_back(static_cast<T>(PyLong_AsLong(items[i])));
+    }
+    Py_DECREF(seq);
+    if (PyErr_Occurred())
+        throw Py::Exception();
+    return values;
+}
+
+SMDS_MeshElement* addElementWithID(SMESHDS_Mesh* meshDS, const std::string& type,
+                                   const std::vector<const SMDS_MeshNode*>& n, int id)
+{
+    if (type == "Seg2")
+        return meshDS->AddEdgeWithID(n[0],n[1],id);
+    if (type == "Seg3")
+        return meshDS->AddEdgeWithID(n[0],n[1],n[2],id);
+    if (type == "Tria3")
+        return meshDS->AddFaceWithID(n[0],n[1],n[2],id);
+    if (type == "Tria6")
+        return meshDS->AddFaceWithID(n[0],n[1],n[2],n[3],n[4],n[5],id);
+    if (type == "Quad4")
+        return meshDS->AddFaceWithID(n[0],n[1],n[2],n[3],id);
+    if (type == "Quad8")
+        return meshDS->AddFaceWithID(n[0],n[1],n[2],n[3],n[4],n[5],n[6],n[7],id);
+    if (type == "Tetra4")
+        return meshDS->AddVolumeWithID(n[0],n[1],n[2],n[3],id);
+    if (type == "Tetra10")
+        return meshDS->AddVolumeWithID(n[0],n[1],n[2],n[3],n[4],n[5],n[6],n[7],n[8],n[9],id);
+    if (type == "Penta6")
+        return meshDS->AddVolumeWithID(n[0],n[1],n[2],n[3],n[4],n[5],id);
+    if (type == "Penta15")
+        return meshDS->AddVolumeWithID(n[0],n[1],n[2],n[3],n[4],n[5],n[6],n[7],n[8],n[9],n[10],n[11],n[12],n[13],n[14],id);
+    if (type == "Hexa8")
+        return meshDS->AddVolumeWithID(n[0],n[1],n[2],n[3],n[4],n[5],n[6],n[7],id);
+    if (type == "Hexa20")
+        return meshDS->AddVolumeWithID(n[0],n[1],n[2],n[3],n[4],n[5],n[6],n[7],n[8],n[9],n[10],n[11],n[12],n[13],n[14],n[15],n[16],n[17],n[18],n[19],id);
+    return 0;
+}
+}
+
+PyObject* FemMeshPy::addNodes(PyObject *args)
+{
+    PyObject *ids_obj, *coords_obj;
+    if (!PyArg_ParseTuple(args, "OO", &ids_obj, &coords_obj))
+        return 0;
+
+    try {
+        std::vector<int> ids = getSequenceValues<int>(ids_obj, "node ids must be a sequence");
+        std::vector<double> coords = getSequenceValues<double>(coords_obj, "node coordinates must be a sequence");
+        if (coords.size() != 3 * ids.size())
+            throw std::runtime_error("Three coordinates per node id are needed");
+
+        SMESH_Mesh* mesh = getFemMeshPtr()->getSMesh();
+        SMESHDS_Mesh* meshDS = mesh->GetMeshDS();
+        for (std::size_t i = 0; i < ids.size(); ++i) {
+            SMDS_MeshNode* node = meshDS->AddNodeWithID(coords[3*i], coords[3*i+1], coords[3*i+2], ids[i]);
+            if (!node)
+                throw std::runtime_error("Failed to add node");
+        }
+        Py_Return;
+    }
+    catch (const Py::Exception&) {
+        return 0;
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+}
+
+PyObject* FemMeshPy::addElements(PyObject *args)
+{
+    char* type_name;
+    PyObject *ids_obj, *nodes_obj;
+    if (!PyArg_ParseTuple(args, "sOO", &type_name, &ids_obj, &nodes_obj))
+        return 0;
+
+    static const std::map<std::string, std::size_t> node_counts = {
+        {"Seg2", 2}, {"Seg3", 3},
+        {"Tria3", 3}, {"Tria6", 6}, {"Quad4", 4}, {"Quad8", 8},
+        {"Tetra4", 4}, {"Tetra10", 10}, {"Penta6", 6}, {"Penta15", 15},
+        {"Hexa8", 8}, {"Hexa20", 20}
+    };
+
+    try {
+        std::string type(type_name);
+        std::map<std::string, std::size_t>::const_iterator count_it = node_counts.find(type);
+        if (count_it == node_counts.end())
+            throw std::runtime_error("Unknown element type");
+        std::size_t count = count_it->second;
+
+        std::vector<int> ids = getSequenceValues<int>(ids_obj, "element ids must be a sequence");
+        std::vector<int> node_ids = getSequenceValues<int>(nodes_obj, "element nodes must be a sequence");
+        if (node_ids.size() != count * ids.size())
+            throw std::runtime_error("Number of element nodes does not match the element type");
+
+        SMESH_Mesh* mesh = getFemMeshPtr()->getSMesh();
+        SMESHDS_Mesh* meshDS = mesh->GetMeshDS();
+        std::vector<const SMDS_MeshNode*> nodes(count);
+        for (std::size_t i = 0; i < ids.size(); ++i) {
+            for (std::size_t j = 0; j < count; ++j) {
+                nodes[j] = meshDS->FindNode(node_ids[count*i+j]);
+                if (!nodes[j])
+                    throw std::runtime_error("Failed to get node of the given indices");
+            }
+            if (!addElementWithID(meshDS, type, nodes, ids[i]))
+                throw std::runtime_error("Failed to add element with given ElementId");
+        }
+        Py_Return;
+    }
+    catch (const Py::Exception&) {
+        return 0;
+    }
+    catch (const std::exception& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.what());
+        return 0;
+    }
+}
+
 PyObject* FemMeshPy::copy(PyObject *args)
 {
     if (!PyArg_ParseTuple(args, ""))
@@ -959,6 +1145,61 @@ PyObject* FemMeshPy::getElementNodes(PyObject *args)
     }
 }
 
+PyObject* FemMeshPy::getElementsNodes(PyObject *args)
+{
+    char* type_name;
+    if (!PyArg_ParseTuple(args, "s", &type_name))
+         return 0;
+
+    std::string type(type_name);
+    SMDSAbs_ElementType elemType;
+    if (type == "Volume")
+        elemType = SMDSAbs_Volume;
+    else if (type == "Face")
+        elemType = SMDSAbs_Face;
+    else if (type == "Edge")
+        elemType = SMDSAbs_Edge;
+    else {
+        PyErr_SetString(PyExc_ValueError, "Type must be one of Volume, Face, Edge");
+        return 0;
+    }
+
+    try {
+        // sorted by id like the Volumes, Faces and Edges properties
+        std::map<int, const SMDS_MeshElement*> elements;
+        std::size_t nodeCount = 0;
+        SMDS_ElemIteratorPtr aElemIter = getFemMeshPtr()->getSMesh()->GetMeshDS()->elementsIterator(elemType);
+        while (aElemIter->more()) {
+            const SMDS_MeshElement* aElem = aElemIter->next();
+            elements[aElem->GetID()] = aElem;
+            nodeCount += aElem->NbNodes();
+        }
+
+        Py::Tuple ids(elements.size());
+        Py::Tuple counts(elements.size());
+        Py::Tuple nodes(nodeCount);
+        int index = 0;
+        int nodeIndex = 0;
+        for (std::map<int, const SMDS_MeshElement*>::const_iterator it = elements.begin(); it != elements.end(); ++it) {
+            const SMDS_MeshElement* aElem = it->second;
+            ids.setItem(index, Py::Long(it->first));
+            counts.setItem(index++, Py::Long(aElem->NbNodes()));
+            for (int i = 0; i < aElem->NbNodes(); i++)
+                nodes.setItem(nodeIndex++, Py::Long(aElem->GetNode(i)->GetID()));
+        }
+
+        Py::Tuple ret(3);
+        ret.setItem(0, ids);
+        ret.setItem(1, counts);
+        ret.setItem(2, nodes);
+        return Py::new_reference_to(ret);
+    }
+    catch (Standard_Failure& e) {
+        PyErr_SetString(Base::BaseExceptionFreeCADError, e.GetMessageString());
+        return 0;
+    }
+}
+
 PyObject* FemMeshPy::getGroupName(PyObject *args)
 {
     int id;
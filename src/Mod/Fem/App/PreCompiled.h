@@ -66,6 +66,7 @@
 
 #include <algorithm>
 #include <stdexcept>
+#include <type_traits>
 // Python
 #include <Python.h>
 
@@ -36,6 +36,7 @@ from femtest.testmesh import TestMeshEleTetra10
 from femtest.testresult import TestResult
 from femtest.testccxtools import TestCcxTools
 from femtest.testsolverframework import TestSolverFrameWork
+from femtest.testbenchmark import TestBenchmark
 
 
 # For more information on how to run a specific test class or a test method see
@@ -74,6 +75,7 @@ unittest.TextTestRunner().run(mytest)
 ./bin/FreeCADCmd --run-test "TestFem"
 
 # module
+./bin/FreeCAD --run-test "femtest.testbenchmark"
 ./bin/FreeCAD --run-test "femtest.testccxtools"
 ./bin/FreeCAD --run-test "femtest.testcommon"
 ./bin/FreeCAD --run-test "femtest.testmaterial"
@@ -81,6 +83,7 @@ unittest.TextTestRunner().run(mytest)
 ./bin/FreeCAD --run-test "femtest.testobject"
 ./bin/FreeCAD --run-test "femtest.testresult"
 ./bin/FreeCAD --run-test "femtest.testsolverframework"
+./bin/FreeCADCmd --run-test "femtest.testbenchmark"
 ./bin/FreeCADCmd --run-test "femtest.testccxtools"
 ./bin/FreeCADCmd --run-test "femtest.testcommon"
 ./bin/FreeCADCmd --run-test "femtest.testmaterial"
@@ -100,6 +103,9 @@ unittest.TextTestRunner().run(mytest)
 from femtest.utilstest import get_fem_test_defs as gf
 gf()
 
+./bin/FreeCADCmd --run-test "femtest.testbenchmark.TestBenchmark.test_box_mesh"
+./bin/FreeCADCmd --run-test "femtest.testbenchmark.TestBenchmark.test_frd_fixture"
+./bin/FreeCADCmd --run-test "femtest.testbenchmark.TestBenchmark.test_run"
 ./bin/FreeCADCmd --run-test "femtest.testccxtools.TestCcxTools.test_1_static_analysis"
 ./bin/FreeCADCmd --run-test "femtest.testccxtools.TestCcxTools.test_2_static_multiple_material"
 ./bin/FreeCADCmd --run-test "femtest.testccxtools.TestCcxTools.test_3_freq_analysis"
@@ -113,6 +119,11 @@ gf()
 ./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_mesh_seg3_python"
 ./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_unv_save_load"
 ./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_writeAbaqus_precision"
+./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_femelement_index"
+./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_make_femmesh_from_arrays"
+./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_read_inp_include"
+./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_read_inp_duplicate_nodes"
+./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshCommon.test_gmsh_mesh_cache_eviction"
 ./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshEleTetra10.test_tetra10_create"
 ./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshEleTetra10.test_tetra10_inp"
 ./bin/FreeCADCmd --run-test "femtest.testmesh.TestMeshEleTetra10.test_tetra10_unv"
@@ -125,10 +136,13 @@ gf()
 ./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femobjects_derivedfromfem"
 ./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femobjects_derivedfromstd"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_read_frd_massflow_networkpressure"
+./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_read_frd_streaming"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_stress_von_mises"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_stress_principal"
+./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_stress_batch"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_disp_abs"
 ./bin/FreeCADCmd --run-test "femtest.testsolverframework.TestSolverFrameWork.test_solver_framework"
+./bin/FreeCADCmd --run-test "femtest.testsolverframework.TestSolverFrameWork.test_solver_scheduler"
 
 
 # to get all command to start FreeCAD from build dir on Linux and run FEM unit test this could be used
@@ -174,6 +188,21 @@ unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.t
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshCommon.test_writeAbaqus_precision"))
 
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshCommon.test_femelement_index"))
+
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshCommon.test_make_femmesh_from_arrays"))
+
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshCommon.test_read_inp_include"))
+
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshCommon.test_read_inp_duplicate_nodes"))
+
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshCommon.test_gmsh_mesh_cache_eviction"))
+
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testmesh.TestMeshEleTetra10.test_tetra10_create"))
 
@@ -210,18 +239,27 @@ unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.t
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_read_frd_massflow_networkpressure"))
 
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_read_frd_streaming"))
+
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_stress_von_mises"))
 
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_stress_principal"))
 
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_stress_batch"))
+
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_disp_abs"))
 
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testsolverframework.TestSolverFrameWork.test_solver_framework"))
 
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testsolverframework.TestSolverFrameWork.test_solver_scheduler"))
+
 
 # open files from FEM test suite source code
 # be careful on updating these files, they contain the original results!
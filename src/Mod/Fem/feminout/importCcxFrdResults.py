@@ -31,6 +31,9 @@ __url__ = "http://www.freecadweb.org"
 #  \brief FreeCAD Calculix FRD Reader for FEM workbench
 
 import FreeCAD
+import itertools
+import mmap
+import numpy as np
 import os
 
 
@@ -66,15 +69,34 @@ def insert(
 def importFrd(
     filename,
     analysis=None,
-    result_name_prefix=None
+    result_name_prefix=None,
+    streaming=None
 ):
     from . import importToolsFem
     import ObjectsFem
     if result_name_prefix is None:
         result_name_prefix = ''
-    m = read_frd_result(filename)
+    if streaming is None:
+        ccx_prefs = FreeCAD.ParamGet(
+            "User parameter:BaseApp/Preferences/Mod/Fem/Ccx"
+        )
+        streaming = ccx_prefs.GetBool("StreamingFrdReader", False)
+    if streaming:
+        # the mesh is read first, the result sets are read one by one
+        # while the result objects are created
+        # the mesh arrays are passed to the bulk FemMesh construction
+        m = read_frd_mesh_arrays(filename)
+        nodes_count = len(m['NodeIds'])
+        result_sets = (
+            make_result_set_from_arrays(result_arrays)
+            for result_arrays in iter_frd_result_arrays(filename)
+        )
+    else:
+        m = read_frd_result(filename)
+        nodes_count = len(m['Nodes'])
+        result_sets = iter(m['Results'])
     result_mesh_object = None
-    if len(m['Nodes']) > 0:
+    if nodes_count > 0:
         if analysis:
             analysis_object = analysis
 
@@ -85,55 +107,59 @@ def importFrd(
         )
         result_mesh_object.FemMesh = mesh
 
-        number_of_increments = len(m['Results'])
+        # the result names depend on if there is more than one increment
+        # thus the first two result sets are read before the loop starts
+        first_result_sets = list(itertools.islice(result_sets, 2))
+        multiple_increments = len(first_result_sets) > 1
+        number_of_increments = 0
+        for result_set in itertools.chain(first_result_sets, result_sets):
+            number_of_increments += 1
+            if 'number' in result_set:
+                eigenmode_number = result_set['number']
+            else:
+                eigenmode_number = 0
+            step_time = result_set['time']
+            step_time = round(step_time, 2)
+            if eigenmode_number > 0:
+                results_name = (
+                    '{}mode_{}_results'
+                    .format(result_name_prefix, eigenmode_number)
+                )
+            elif multiple_increments:
+                results_name = (
+                    '{}time_{}_results'
+                    .format(result_name_prefix, step_time)
+                )
+            else:
+                results_name = (
+                    '{}results'
+                    .format(result_name_prefix)
+                )
+
+            res_obj = ObjectsFem.makeResultMechanical(FreeCAD.ActiveDocument, results_name)
+            res_obj.Mesh = result_mesh_object
+            res_obj = importToolsFem.fill_femresult_mechanical(res_obj, result_set)
+            if analysis:
+                analysis_object.addObject(res_obj)
+            # complementary result object calculations
+            import femresult.resulttools as restools
+            if not res_obj.MassFlowRate:
+                # only compact result if not Flow 1D results
+                # compact result object, workaround for bug 2873
+                # https://www.freecadweb.org/tracker/view.php?id=2873
+                res_obj = restools.compact_result(res_obj)
+            # fill DisplacementLengths
+            res_obj = restools.add_disp_apps(res_obj)
+            # fill StressValues
+            res_obj = restools.add_von_mises(res_obj)
+            # fill PrincipalMax, PrincipalMed, PrincipalMin, MaxShear
+            res_obj = restools.add_principal_stress(res_obj)
+            # fill Stats
+            res_obj = restools.fill_femresult_stats(res_obj)
         FreeCAD.Console.PrintLog(
             'Increments: ' + str(number_of_increments) + '\n'
         )
-        if len(m['Results']) > 0:
-            for result_set in m['Results']:
-                if 'number' in result_set:
-                    eigenmode_number = result_set['number']
-                else:
-                    eigenmode_number = 0
-                step_time = result_set['time']
-                step_time = round(step_time, 2)
-                if eigenmode_number > 0:
-                    results_name = (
-                        '{}mode_{}_results'
-                        .format(result_name_prefix, eigenmode_number)
-                    )
-                elif number_of_increments > 1:
-                    results_name = (
-                        '{}time_{}_results'
-                        .format(result_name_prefix, step_time)
-                    )
-                else:
-                    results_name = (
-                        '{}results'
-                        .format(result_name_prefix)
-                    )
-
-                res_obj = ObjectsFem.makeResultMechanical(FreeCAD.ActiveDocument, results_name)
-                res_obj.Mesh = result_mesh_object
-                res_obj = importToolsFem.fill_femresult_mechanical(res_obj, result_set)
-                if analysis:
-                    analysis_object.addObject(res_obj)
-                # complementary result object calculations
-                import femresult.resulttools as restools
-                if not res_obj.MassFlowRate:
-                    # only compact result if not Flow 1D results
-                    # compact result object, workaround for bug 2873
-                    # https://www.freecadweb.org/tracker/view.php?id=2873
-                    res_obj = restools.compact_result(res_obj)
-                # fill DisplacementLengths
-                res_obj = restools.add_disp_apps(res_obj)
-                # fill StressValues
-                res_obj = restools.add_von_mises(res_obj)
-                # fill PrincipalMax, PrincipalMed, PrincipalMin, MaxShear
-                res_obj = restools.add_principal_stress(res_obj)
-                # fill Stats
-                res_obj = restools.fill_femresult_stats(res_obj)
-        else:
+        if number_of_increments == 0:
             error_message = (
                 "We have nodes but no results in frd file, "
                 "which means we only have a mesh in frd file. "
@@ -158,15 +184,11 @@ def importFrd(
     return res_obj
 
 
-# read a calculix result file and extract the nodes
-# displacement vectors and stress values.
-def read_frd_result(
+def read_inout_nodes(
     frd_input
 ):
-    FreeCAD.Console.PrintMessage(
-        'Read ccx results from frd file: {}\n'
-        .format(frd_input)
-    )
+    ''' reads the special 1DFlow inout nodes file which belongs to a frd file
+    '''
     inout_nodes = []
     inout_nodes_file = frd_input.rsplit('.', 1)[0] + '_inout_nodes.txt'
     if os.path.exists(inout_nodes_file):
@@ -178,6 +200,19 @@ def read_frd_result(
             inout_nodes.append(a)
         f.close()
         print(inout_nodes)
+    return inout_nodes
+
+
+# read a calculix result file and extract the nodes
+# displacement vectors and stress values.
+def read_frd_result(
+    frd_input
+):
+    FreeCAD.Console.PrintMessage(
+        'Read ccx results from frd file: {}\n'
+        .format(frd_input)
+    )
+    inout_nodes = read_inout_nodes(frd_input)
     frd_file = pyopen(frd_input, "r")
     nodes = {}
     elements_hexa8 = {}
@@ -705,3 +740,354 @@ def read_frd_result(
         'Penta15Elem': elements_penta15,
         'Results': results
     }
+
+
+# ********* streaming array based frd reader *********
+# The line based reader read_frd_result() above builds Python dicts with
+# one entry per node and element. For large result files the methods below
+# are used. They memory map the frd file and jump from block to block.
+# The node, element and result blocks are parsed in bulk with fixed width
+# slicing on NumPy arrays. The result sets are returned one by one.
+# see read_frd_result() for the node order of the element types
+
+# frd element type: (mesh data key, number of nodes, FreeCAD node order)
+frd_element_types = {
+    1: ('Hexa8Elem', 8, (5, 6, 7, 4, 1, 2, 3, 0)),
+    2: ('Penta6Elem', 6, (4, 5, 3, 1, 2, 0)),
+    3: ('Tetra4Elem', 4, (1, 0, 2, 3)),
+    4: ('Hexa20Elem', 20, (
+        7, 4, 5, 6, 3, 0, 1, 2, 19, 16, 17, 18, 11, 8, 9, 10, 15, 12, 13, 14
+    )),
+    5: ('Penta15Elem', 15, (4, 5, 3, 1, 2, 0, 13, 14, 12, 7, 8, 6, 10, 11, 9)),
+    6: ('Tetra10Elem', 10, (1, 0, 2, 3, 4, 6, 5, 8, 7, 9)),
+    7: ('Tria3Elem', 3, (0, 1, 2)),
+    8: ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5)),
+    9: ('Quad4Elem', 4, (0, 1, 2, 3)),
+    10: ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7)),
+    11: ('Seg2Elem', 2, (0, 1)),
+    12: ('Seg3Elem', 3, (0, 1, 2)),
+}
+
+# frd result block name: (result set key, FreeCAD component order, factor)
+# CalculiX frd files: (Sxx, Syy, Szz, Sxy, Syz, Szx)
+# FreeCAD:            (Sxx, Syy, Szz, Sxy, Sxz, Syz)
+# the mass flow is converted to kg/s from t/s
+frd_result_blocks = (
+    ('DISP', ('disp', (0, 1, 2), 1.0)),
+    ('STRESS', ('stress', (0, 1, 2, 3, 5, 4), 1.0)),
+    ('TOSTRAIN', ('strain', (0, 1, 2, 3, 5, 4), 1.0)),
+    ('PE', ('peeq', (0,), 1.0)),
+    ('NDTEMP', ('temp', (0,), 1.0)),
+    ('MAFLOW', ('mflow', (0,), 1000.0)),
+    ('STPRES', ('npressure', (0,), 1.0)),
+)
+
+
+def read_frd_mesh_arrays(
+    frd_input
+):
+    ''' reads the nodes and elements of a frd file into NumPy arrays
+    returns a dict with the node ids, a (N,3) array with the node coordinates
+    and for every element type found a tuple (element ids, (M,k) node ids)
+    '''
+    FreeCAD.Console.PrintMessage(
+        'Read ccx mesh from frd file: {}\n'
+        .format(frd_input)
+    )
+    inout_nodes = read_inout_nodes(frd_input)
+    mesh_arrays = {
+        'NodeIds': np.zeros(0, dtype=np.int64),
+        'NodeCoords': np.zeros((0, 3)),
+    }
+    blocks = _iter_frd_blocks(frd_input)
+    try:
+        for block in blocks:
+            if block[0] == 'nodes':
+                chars = _get_frd_data_lines(block[1], b'-1')
+                if chars is not None:
+                    mesh_arrays['NodeIds'] = _get_fixed_width_column(chars, 3, 13, np.int64)
+                    mesh_arrays['NodeCoords'] = _get_fixed_width_columns(chars, 13, 3, np.float64)
+            elif block[0] == 'elements':
+                mesh_arrays.update(_read_frd_element_block(block[1], inout_nodes))
+                # the mesh is complete, results are read by iter_frd_result_arrays
+                break
+    finally:
+        blocks.close()
+    if not len(mesh_arrays['NodeIds']):
+        FreeCAD.Console.PrintError('FEM: No nodes found in Frd file.\n')
+    return mesh_arrays
+
+
+def iter_frd_result_arrays(
+    frd_input
+):
+    ''' generator, yields the result sets of a frd file one by one
+    a result set is a dict with the keys 'number' and 'time' and a tuple
+    (node ids, values array) for every result type found in the frd file
+    the result sets are split the same way as in read_frd_result()
+    '''
+    FreeCAD.Console.PrintMessage(
+        'Read ccx results from frd file: {}\n'
+        .format(frd_input)
+    )
+    inout_nodes = read_inout_nodes(frd_input)
+    remap_nodes = [(int(n[1]), int(n[2])) for n in inout_nodes]
+    result_set = {'number': float('NaN'), 'time': float('NaN')}
+    has_results = False
+    first_set = True
+    eigenmode = 0
+    timestep = 0
+    for block in _iter_frd_blocks(frd_input):
+        if block[0] in ('mode', 'time'):
+            if block[0] == 'mode':
+                changed = block[1] > eigenmode
+                if changed:
+                    eigenmode = block[1]
+            else:
+                changed = block[1] > timestep
+                if changed:
+                    timestep = block[1]
+            if changed:
+                if has_results:
+                    yield result_set
+                    first_set = False
+                    # https://forum.freecadweb.org/viewtopic.php?f=18&t=32649&start=10#p274686
+                    result_set = {'number': float('NaN'), 'time': float('NaN')}
+                    has_results = False
+                result_set['number' if block[0] == 'mode' else 'time'] = block[1]
+        elif block[0] == 'result':
+            for name, (key, order, factor) in frd_result_blocks:
+                if block[1].startswith(name):
+                    break
+            else:
+                # result type not supported by FreeCAD result objects
+                continue
+            if first_set and not remap_nodes and key in ('mflow', 'npressure'):
+                FreeCAD.Console.PrintError(
+                    'We have mflow or npressure, but no inout_nodes file.\n'
+                )
+            result_set[key] = _read_frd_result_block(
+                block[2],
+                order,
+                factor,
+                remap_nodes if key in ('mflow', 'npressure') else []
+            )
+            has_results = True
+        elif block[0] == 'end':
+            if has_results:
+                yield result_set
+            return
+
+
+def make_result_set_from_arrays(
+    result_arrays
+):
+    ''' makes the result set dict structure of read_frd_result() from one
+    result set of iter_frd_result_arrays(), the displacements are the only
+    values which are returned as FreeCAD.Vector
+    '''
+    result_set = {}
+    for key, value in result_arrays.items():
+        if key in ('number', 'time'):
+            result_set[key] = value
+            continue
+        ids, values = value
+        if key == 'disp':
+            values = [FreeCAD.Vector(*v) for v in values.tolist()]
+        elif values.ndim > 1:
+            values = map(tuple, values.tolist())
+        else:
+            values = values.tolist()
+        result_set[key] = dict(zip(ids.tolist(), values))
+    return result_set
+
+
+def _iter_frd_blocks(
+    frd_input
+):
+    ''' generator, walks through the memory mapped frd file and yields:
+    ('nodes', data), ('elements', data), ('mode', eigenmode number),
+    ('time', step time), ('result', block name, data) and ('end', )
+    data are the raw data lines of a block, they are not split in Python
+    '''
+    with pyopen(frd_input, 'rb') as frd_file:
+        try:
+            mm = mmap.mmap(frd_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return
+        try:
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                eol = mm.find(b'\n', pos)
+                if eol == -1:
+                    eol = size
+                line = mm[pos:eol]
+                pos = eol + 1
+                if line[4:6] == b'2C' or line[4:6] == b'3C':
+                    pos, data = _get_frd_block_data(mm, pos)
+                    yield ('nodes' if line[4:6] == b'2C' else 'elements', data)
+                elif line[1:3] == b'-4':
+                    # skip the component lines of the result block
+                    while mm[pos:pos + 3] == b' -5':
+                        pos = mm.find(b'\n', pos) + 1 or size
+                    name = line[5:13].strip().decode('ascii')
+                    pos, data = _get_frd_block_data(mm, pos)
+                    yield ('result', name, data)
+                elif line[5:10] == b'PMODE':
+                    yield ('mode', int(line[30:36]))
+                elif line[2:7] == b'100CL':
+                    yield ('time', float(line[13:25]))
+                elif line[1:5] == b'9999':
+                    yield ('end', )
+        finally:
+            mm.close()
+
+
+def _get_frd_block_data(
+    mm,
+    pos
+):
+    # a data block ends with the first line starting with ' -3'
+    end = mm.find(b'\n -3', pos - 1)
+    if end == -1:
+        return len(mm), mm[pos:]
+    data = mm[pos:end + 1]
+    next_line = mm.find(b'\n', end + 1)
+    return (len(mm) if next_line == -1 else next_line + 1), data
+
+
+def _get_frd_data_lines(
+    data,
+    record_key
+):
+    ''' returns the data lines with the record key as (lines, columns)
+    array of single characters, None if there are no such lines
+    '''
+    lines = data.splitlines()
+    if not lines:
+        return None
+    lines = np.array(lines, dtype=bytes)
+    if lines.dtype.itemsize < 3:
+        return None
+    chars = lines.view('S1').reshape(len(lines), lines.dtype.itemsize)
+    keys = np.ascontiguousarray(chars[:, 1:3]).view('S2').ravel()
+    chars = chars[keys == record_key]
+    if not len(chars):
+        return None
+    return chars
+
+
+def _get_fixed_width_column(
+    chars,
+    start,
+    stop,
+    dtype
+):
+    field = np.ascontiguousarray(chars[:, start:stop])
+    return field.view('S{}'.format(stop - start)).ravel().astype(dtype)
+
+
+def _get_fixed_width_columns(
+    chars,
+    start,
+    count,
+    dtype,
+    width=12
+):
+    columns = [
+        _get_fixed_width_column(chars, start + i * width, start + (i + 1) * width, dtype)
+        for i in range(count)
+    ]
+    return np.column_stack(columns)
+
+
+def _read_frd_element_block(
+    data,
+    inout_nodes
+):
+    lines = data.splitlines()
+    if not lines:
+        return {}
+    lines = np.array(lines, dtype=bytes)
+    chars = lines.view('S1').reshape(len(lines), lines.dtype.itemsize)
+    keys = np.ascontiguousarray(chars[:, 1:3]).view('S2').ravel()
+    # every element starts with a ' -1' line
+    # followed by one or two ' -2' lines with up to ten node ids
+    first_lines = np.flatnonzero(keys == b'-1')
+    elem_ids = _get_fixed_width_column(chars[first_lines], 3, 13, np.int64)
+    elem_types = _get_fixed_width_column(chars[first_lines], 13, 18, np.int64)
+    elements = {}
+    for elem_type in np.unique(elem_types).tolist():
+        if elem_type not in frd_element_types:
+            FreeCAD.Console.PrintError(
+                'FEM: frd element type {} not supported.\n'.format(elem_type)
+            )
+            continue
+        key, count, order = frd_element_types[elem_type]
+        type_mask = elem_types == elem_type
+        type_lines = first_lines[type_mask]
+        columns = []
+        for i in range(count):
+            node_lines = chars[type_lines + 1 + i // 10]
+            start = 3 + (i % 10) * 10
+            columns.append(_get_fixed_width_column(node_lines, start, start + 10, np.int64))
+        nodes = np.column_stack(columns)[:, order]
+        ids = elem_ids[type_mask]
+        if key == 'Seg3Elem' and inout_nodes:
+            ids, nodes = _remap_frd_seg3_inout_nodes(ids, nodes, inout_nodes)
+        elements[key] = (ids, nodes)
+    return elements
+
+
+def _remap_frd_seg3_inout_nodes(
+    ids,
+    nodes,
+    inout_nodes
+):
+    # same node numbering as in read_frd_result()
+    # seg3 elements without an inout node are not returned
+    new_ids = []
+    new_nodes = []
+    for elem, (nd1, nd2, nd3) in zip(ids.tolist(), nodes.tolist()):
+        element_nodes = None
+        for inout in inout_nodes:
+            if nd1 == int(inout[1]):
+                # fluid inlet node numbering
+                element_nodes = (int(inout[2]), nd3, nd1)
+            elif nd3 == int(inout[1]):
+                # fluid outlet node numbering
+                element_nodes = (nd1, int(inout[2]), nd3)
+        if element_nodes is not None:
+            new_ids.append(elem)
+            new_nodes.append(element_nodes)
+    return (
+        np.array(new_ids, dtype=np.int64),
+        np.array(new_nodes, dtype=np.int64).reshape(-1, 3)
+    )
+
+
+def _read_frd_result_block(
+    data,
+    order,
+    factor,
+    remap_nodes
+):
+    chars = _get_frd_data_lines(data, b'-1')
+    if chars is None:
+        return (np.zeros(0, dtype=np.int64), np.zeros((0, len(order))))
+    ids = _get_fixed_width_column(chars, 3, 13, np.int64)
+    values = _get_fixed_width_columns(chars, 13, max(order) + 1, np.float64)
+    values = values[:, order] * factor
+    if len(order) == 1:
+        values = values.ravel()
+    if remap_nodes:
+        # the values of the 1DFlow inout nodes are added for the fluid nodes
+        # right after the inout node, same order as in read_frd_result()
+        for frd_node, node in remap_nodes:
+            found = np.flatnonzero(ids == frd_node)
+            if len(found):
+                ids = np.insert(ids, found + 1, node)
+                values = np.insert(values, found + 1, values[found], axis=0)
+    return (ids, values)
@@ -30,7 +30,10 @@ __date__ = "04/08/2016"
 #  \brief FreeCAD INP file reader for FEM workbench
 
 import FreeCAD
+import mmap
+import numpy as np
 import os
+import re
 
 
 # ********* generic FreeCAD import and export methods *********
@@ -78,183 +81,215 @@ def import_inp(filename):
         mesh_object.FemMesh = femmesh
 
 
+# ccx element types: (mesh data key, number of nodes, FreeCAD node order)
+# numbering does not change for tria3, tria6, quad4, quad8, seg2
+inp_element_types = {}
+for ccx_types, element_type in (
+    (("S3", "CPS3", "CPE3", "CAX3"), ('Tria3Elem', 3, (0, 1, 2))),
+    (("S6", "CPS6", "CPE6", "CAX6"), ('Tria6Elem', 6, (0, 1, 2, 3, 4, 5))),
+    (
+        ("S4", "S4R", "CPS4", "CPS4R", "CPE4", "CPE4R", "CAX4", "CAX4R"),
+        ('Quad4Elem', 4, (0, 1, 2, 3))
+    ),
+    (
+        ("S8", "S8R", "CPS8", "CPS8R", "CPE8", "CPE8R", "CAX8", "CAX8R"),
+        ('Quad8Elem', 8, (0, 1, 2, 3, 4, 5, 6, 7))
+    ),
+    (("C3D4", ), ('Tetra4Elem', 4, (1, 0, 2, 3))),
+    (("C3D10", ), ('Tetra10Elem', 10, (1, 0, 2, 3, 4, 6, 5, 8, 7, 9))),
+    (("C3D8", "C3D8R", "C3D8I"), ('Hexa8Elem', 8, (5, 6, 7, 4, 1, 2, 3, 0))),
+    (
+        ("C3D20", "C3D20R", "C3D20RI"),
+        ('Hexa20Elem', 20, (
+            5, 6, 7, 4, 1, 2, 3, 0, 13, 14, 15, 12, 9, 10, 11, 8, 17, 18, 19, 16
+        ))
+    ),
+    (("C3D6", ), ('Penta6Elem', 6, (4, 5, 3, 1, 2, 0))),
+    (
+        ("C3D15", ),
+        ('Penta15Elem', 15, (4, 5, 3, 1, 2, 0, 10, 11, 9, 7, 8, 6, 13, 14, 12))
+    ),
+    (("B31", "B31R", "T3D2"), ('Seg2Elem', 2, (0, 1))),
+    (("B32", "B32R", "T3D3"), ('Seg3Elem', 3, (0, 2, 1))),
+):
+    for ccx_type in ccx_types:
+        inp_element_types[ccx_type] = element_type
+del ccx_types, element_type, ccx_type
+
+
 def read_inp(file_name):
-    '''read .inp file '''
+    '''read .inp file
+    returns the mesh arrays of importToolsFem.make_mesh_arrays()
+    '''
     # ATM only mesh reading is supported (no boundary conditions)
+    # the files are memory mapped and split at the keyword lines, the numeric
+    # data blocks of *NODE and *ELEMENT are parsed in bulk by NumPy
+    # the blocks of the file and its included files are independent, they are
+    # parsed by a thread pool since NumPy releases the GIL for the text conversion
+    from multiprocessing.pool import ThreadPool
+    mapped_files = []
+    try:
+        blocks = _split_inp_keyword_blocks(file_name, mapped_files)
+        if len(blocks) > 1:
+            pool = ThreadPool()
+            try:
+                parsed_blocks = pool.map(_read_inp_block, blocks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            parsed_blocks = [_read_inp_block(block) for block in blocks]
+    finally:
+        for mm in mapped_files:
+            mm.close()
 
-    class elements():
-
-        tria3 = {}
-        tria6 = {}
-        quad4 = {}
-        quad8 = {}
-        tetra4 = {}
-        tetra10 = {}
-        hexa8 = {}
-        hexa20 = {}
-        penta6 = {}
-        penta15 = {}
-        seg2 = {}
-        seg3 = {}
-    error_seg3 = False  # to print "not supported"
-    nodes = {}
+    # nodes are only read in the model definition
+    # thus the blocks are merged in file order
+    node_ids = []
+    node_coords = []
+    element_ids = {}
+    element_nodes = {}
     model_definition = True
+    for parsed_block in parsed_blocks:
+        if parsed_block[0] == 'step':
+            model_definition = False
+        elif parsed_block[0] == 'node' and model_definition is True:
+            node_ids.append(parsed_block[1])
+            node_coords.append(parsed_block[2])
+        elif parsed_block[0] == 'element':
+            key = parsed_block[1]
+            element_ids.setdefault(key, []).append(parsed_block[2])
+            element_nodes.setdefault(key, []).append(parsed_block[3])
+    if 'Seg3Elem' in element_ids:  # to print "not supported"
+        FreeCAD.Console.PrintError("Error: seg3 (3-node beam element type) not supported, yet.\n")
 
-    f = pyopen(file_name, "r")
-    line = "\n"
-    include = ""
-    f_include = None
-    while line != "":
-        if include:
-            line = f_include.readline()
-            if line == "":
-                f_include.close()
-                include = ""
-                line = f.readline()
+    mesh_arrays = {
+        'NodeIds': np.concatenate(node_ids) if node_ids else np.zeros(0, dtype=np.int64),
+        'NodeCoords': np.concatenate(node_coords) if node_coords else np.zeros((0, 3))
+    }
+    # a node defined more than once gets the coordinates of its last definition
+    rows = _get_last_definitions(mesh_arrays['NodeIds'])
+    if rows is not None:
+        FreeCAD.Console.PrintWarning(
+            'Nodes defined more than once, the last definition is used.\n'
+        )
+        mesh_arrays['NodeIds'] = mesh_arrays['NodeIds'][rows]
+        mesh_arrays['NodeCoords'] = mesh_arrays['NodeCoords'][rows]
+    for key, count, order in set(inp_element_types.values()):
+        if key in element_ids:
+            # switch from the CalculiX node numbering to the FreeCAD node numbering
+            ids = np.concatenate(element_ids[key])
+            nodes = np.concatenate(element_nodes[key])[:, order]
+            rows = _get_last_definitions(ids)
+            if rows is not None:
+                FreeCAD.Console.PrintWarning(
+                    'Elements defined more than once, the last definition is used.\n'
+                )
+                ids = ids[rows]
+                nodes = nodes[rows]
+            mesh_arrays[key] = (ids, nodes)
         else:
-            line = f.readline()
-        if line.strip() == '':
-            continue
-        elif line[0] == '*':  # start/end of a reading set
-            if line[0:2] == '**':  # comments
-                continue
-            if line[:8].upper() == "*INCLUDE":
-                start = 1 + line.index("=")
-                include = line[start:].strip().strip('"')
-                include_path = os.path.normpath(include)
-                if os.path.isfile(include_path) is True:
-                    f_include = pyopen(include_path, "r")
-                else:
-                    path_start = os.path.split(file_name)[0]
-                    include_full_path = os.path.join(path_start, include_path)
-                    f_include = pyopen(include_full_path, "r")
-                continue
-            read_node = False
-            elm_category = []
-            elm_2nd_line = False
+            mesh_arrays[key] = (
+                np.zeros(0, dtype=np.int64),
+                np.zeros((0, count), dtype=np.int64)
+            )
+    return mesh_arrays
 
-        # reading nodes
-        if (line[:5].upper() == "*NODE") and (model_definition is True):
-            read_node = True
-        elif read_node is True:
-            line_list = line.split(',')
-            number = int(line_list[0])
-            x = float(line_list[1])
-            y = float(line_list[2])
-            z = float(line_list[3])
-            nodes[number] = [x, y, z]
 
-        # reading elements
-        elif line[:8].upper() == "*ELEMENT":
-            line_list = line[8:].upper().split(',')
-            for line_part in line_list:
-                if line_part.lstrip()[:4] == "TYPE":
-                    elm_type = line_part.split('=')[1].strip()
+def _get_last_definitions(ids):
+    ''' returns the rows of the last definition of each id in the order of the
+    first definitions, like a dict which is updated in file order
+    returns None if every id is defined only once
+    '''
+    unique_ids, first_rows = np.unique(ids, return_index=True)
+    if len(unique_ids) == len(ids):
+        return None
+    reversed_unique_ids, reversed_rows = np.unique(ids[::-1], return_index=True)
+    last_rows = len(ids) - 1 - reversed_rows
+    return last_rows[np.argsort(first_rows, kind='mergesort')]
 
-            if elm_type in ["S3", "CPS3", "CPE3", "CAX3"]:
-                elm_category = elements.tria3
-                number_of_nodes = 3
-            elif elm_type in ["S6", "CPS6", "CPE6", "CAX6"]:
-                elm_category = elements.tria6
-                number_of_nodes = 6
-            elif elm_type in ["S4", "S4R", "CPS4", "CPS4R", "CPE4", "CPE4R",
-                              "CAX4", "CAX4R"]:
-                elm_category = elements.quad4
-                number_of_nodes = 4
-            elif elm_type in ["S8", "S8R", "CPS8", "CPS8R", "CPE8", "CPE8R",
-                              "CAX8", "CAX8R"]:
-                elm_category = elements.quad8
-                number_of_nodes = 8
-            elif elm_type == "C3D4":
-                elm_category = elements.tetra4
-                number_of_nodes = 4
-            elif elm_type == "C3D10":
-                elm_category = elements.tetra10
-                number_of_nodes = 10
-            elif elm_type in ["C3D8", "C3D8R", "C3D8I"]:
-                elm_category = elements.hexa8
-                number_of_nodes = 8
-            elif elm_type in ["C3D20", "C3D20R", "C3D20RI"]:
-                elm_category = elements.hexa20
-                number_of_nodes = 20
-            elif elm_type == "C3D6":
-                elm_category = elements.penta6
-                number_of_nodes = 6
-            elif elm_type == "C3D15":
-                elm_category = elements.penta15
-                number_of_nodes = 15
-            elif elm_type in ["B31", "B31R", "T3D2"]:
-                elm_category = elements.seg2
-                number_of_nodes = 2
-            elif elm_type in ["B32", "B32R", "T3D3"]:
-                elm_category = elements.seg3
-                number_of_nodes = 3
-                error_seg3 = True  # to print "not supported"
 
-        elif elm_category != []:
-            line_list = line.split(',')
-            if elm_2nd_line is False:
-                number = int(line_list[0])
-                elm_category[number] = []
-                pos = 1
+def _split_inp_keyword_blocks(file_name, mapped_files):
+    ''' memory maps the inp file and splits it at the keyword lines,
+    included files are split too and their blocks are inserted in place
+    returns a list of blocks, ('node', data segments), ('element', data segments,
+    ccx element type) and ('step', ), a data segment is (memory map, start, end)
+    other keywords are not needed for the mesh and are ignored
+    '''
+    with pyopen(file_name, 'rb') as inp_file:
+        try:
+            mm = mmap.mmap(inp_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return []
+    mapped_files.append(mm)
+    blocks = []
+    block = None
+    data_start = 0
+    for keyword_match in re.finditer(br'^\*[^\n]*', mm, re.MULTILINE):
+        if block is not None:
+            block[1].append((mm, data_start, keyword_match.start()))
+        data_start = keyword_match.end()
+        keyword_line = keyword_match.group().decode('utf-8', 'replace').strip()
+        if keyword_line[:2] == '**':  # comments
+            continue
+        block = None
+        keyword_parts = keyword_line[1:].split(',')
+        keyword = keyword_parts[0].strip().upper()
+        if keyword == 'INCLUDE':
+            start = 1 + keyword_line.index("=")
+            include = keyword_line[start:].strip().strip('"')
+            include_path = os.path.normpath(include)
+            if os.path.isfile(include_path) is False:
+                path_start = os.path.split(file_name)[0]
+                include_path = os.path.join(path_start, include_path)
+            blocks.extend(_split_inp_keyword_blocks(include_path, mapped_files))
+        elif keyword == 'NODE':
+            block = ('node', [])
+        elif keyword == 'ELEMENT':
+            elm_type = None
+            for keyword_part in keyword_parts[1:]:
+                if keyword_part.strip().upper()[:4] == "TYPE":
+                    elm_type = keyword_part.split('=')[1].strip().upper()
+            if elm_type in inp_element_types:
+                block = ('element', [], elm_type)
             else:
-                pos = 0
-                elm_2nd_line = False
-            for en in range(pos, pos + number_of_nodes - len(elm_category[number])):
-                try:
-                    enode = int(line_list[en])
-                    elm_category[number].append(enode)
-                except:
-                    elm_2nd_line = True
-                    break
+                FreeCAD.Console.PrintWarning(
+                    'Element type {} is not supported.\n'.format(elm_type)
+                )
+        elif keyword == 'STEP':
+            block = ('step', [])
+        if block is not None:
+            blocks.append(block)
+    if block is not None:
+        block[1].append((mm, data_start, len(mm)))
+    return blocks
 
-        elif line[:5].upper() == "*STEP":
-            model_definition = False
-    if error_seg3 is True:  # to print "not supported"
-        FreeCAD.Console.PrintError("Error: seg3 (3-node beam element type) not supported, yet.\n")
-    f.close()
 
-    # switch from the CalculiX node numbering to the FreeCAD node numbering
-    # numbering do not change: tria3, tria6, quad4, quad8, seg2
-    for en in elements.tetra4:
-        n = elements.tetra4[en]
-        elements.tetra4[en] = [n[1], n[0], n[2], n[3]]
-    for en in elements.tetra10:
-        n = elements.tetra10[en]
-        elements.tetra10[en] = [n[1], n[0], n[2], n[3], n[4], n[6], n[5],
-                                n[8], n[7], n[9]]
-    for en in elements.hexa8:
-        n = elements.hexa8[en]
-        elements.hexa8[en] = [n[5], n[6], n[7], n[4], n[1], n[2], n[3], n[0]]
-    for en in elements.hexa20:
-        n = elements.hexa20[en]
-        elements.hexa20[en] = [n[5], n[6], n[7], n[4], n[1], n[2], n[3], n[0],
-                               n[13], n[14], n[15], n[12], n[9], n[10], n[11],
-                               n[8], n[17], n[18], n[19], n[16]]
-    for en in elements.penta6:
-        n = elements.penta6[en]
-        elements.penta6[en] = [n[4], n[5], n[3], n[1], n[2], n[0]]
-    for en in elements.penta15:
-        n = elements.penta15[en]
-        elements.penta15[en] = [n[4], n[5], n[3], n[1], n[2], n[0],
-                                n[10], n[11], n[9], n[7], n[8], n[6], n[13],
-                                n[14], n[12]]
-    for en in elements.seg3:
-        n = elements.seg3[en]
-        elements.seg3[en] = [n[0], n[2], n[1]]
-
-    return {
-        'Nodes': nodes,
-        'Seg2Elem': elements.seg2,
-        'Seg3Elem': elements.seg3,
-        'Tria3Elem': elements.tria3,
-        'Tria6Elem': elements.tria6,
-        'Quad4Elem': elements.quad4,
-        'Quad8Elem': elements.quad8,
-        'Tetra4Elem': elements.tetra4,
-        'Tetra10Elem': elements.tetra10,
-        'Hexa8Elem': elements.hexa8,
-        'Hexa20Elem': elements.hexa20,
-        'Penta6Elem': elements.penta6,
-        'Penta15Elem': elements.penta15
-    }
+def _read_inp_block(block):
+    ''' parses the data lines of a *NODE or *ELEMENT block in bulk
+    the data lines are joined, thus element definitions
+    continued on the next line are supported
+    '''
+    if block[0] == 'step':
+        return block
+    data = b' '.join(mm[start:end] for mm, start, end in block[1])
+    # any whitespace separates the values in NumPy, thus only the commas are replaced
+    data = data.replace(b',', b' ')
+    if block[0] == 'node':
+        try:
+            values = np.fromstring(data, dtype=float, sep=' ').reshape(-1, 4)
+        except ValueError:
+            FreeCAD.Console.PrintError('Error reading *NODE data, 4 values per line expected.\n')
+            return ('node', np.zeros(0, dtype=np.int64), np.zeros((0, 3)))
+        return ('node', values[:, 0].astype(np.int64), values[:, 1:])
+    key, count, order = inp_element_types[block[2]]
+    try:
+        values = np.fromstring(data, dtype=np.int64, sep=' ').reshape(-1, count + 1)
+    except ValueError:
+        FreeCAD.Console.PrintError(
+            'Error reading *ELEMENT data of type {}, {} nodes per element expected.\n'
+            .format(block[2], count)
+        )
+        return ('element', key, np.zeros(0, dtype=np.int64), np.zeros((0, count), np.int64))
+    return ('element', key, values[:, 0], values[:, 1:])
@@ -29,6 +29,7 @@ __url__ = "http://www.freecadweb.org"
 #  \brief FreeCAD FEM import tools
 
 import FreeCAD
+import numpy as np
 
 
 def get_FemMeshObjectMeshGroups(
@@ -130,110 +131,77 @@ def get_MaxDimElementFromList(
     return elem_list[-1]
 
 
+# mesh data key, SMESH element type name and node count of the supported elements
+# the elements are added to the FemMesh in this order, volumes first
+mesh_element_types = (
+    ('Hexa8Elem', 'Hexa8', 8),
+    ('Penta6Elem', 'Penta6', 6),
+    ('Tetra4Elem', 'Tetra4', 4),
+    ('Tetra10Elem', 'Tetra10', 10),
+    ('Penta15Elem', 'Penta15', 15),
+    ('Hexa20Elem', 'Hexa20', 20),
+    ('Tria3Elem', 'Tria3', 3),
+    ('Tria6Elem', 'Tria6', 6),
+    ('Quad4Elem', 'Quad4', 4),
+    ('Quad8Elem', 'Quad8', 8),
+    ('Seg2Elem', 'Seg2', 2),
+    ('Seg3Elem', 'Seg3', 3),
+)
+
+
 def make_femmesh(
     mesh_data
 ):
     ''' makes an FreeCAD FEM Mesh object from FEM Mesh data
+    mesh_data might be the dict structure with node and element dicts
+    or the array structure of make_mesh_arrays()
+    '''
+    if 'NodeIds' in mesh_data:
+        return make_femmesh_from_arrays(mesh_data)
+    return make_femmesh_from_arrays(make_mesh_arrays(mesh_data))
+
+
+def make_femmesh_from_arrays(
+    mesh_arrays
+):
+    ''' makes an FreeCAD FEM Mesh object from FEM Mesh arrays
+    mesh_arrays['NodeIds']: node ids, shape (N,)
+    mesh_arrays['NodeCoords']: node coordinates, shape (N, 3)
+    mesh_arrays['<Type>Elem']: tuple of element ids, shape (M,)
+        and element nodes in FreeCAD node order, shape (M, k)
+    all nodes and all elements of one type are added to the mesh in one call
     '''
     import Fem
     mesh = Fem.FemMesh()
-    m = mesh_data
-    if ('Nodes' in m) and (len(m['Nodes']) > 0):
+    m = mesh_arrays
+    if ('NodeIds' in m) and (len(m['NodeIds']) > 0):
         FreeCAD.Console.PrintLog("Found: nodes\n")
-        if (
-            ('Seg2Elem' in m)
-            or ('Seg3Elem' in m)
-            or ('Tria3Elem' in m)
-            or ('Tria6Elem' in m)
-            or ('Quad4Elem' in m)
-            or ('Quad8Elem' in m)
-            or ('Tetra4Elem' in m)
-            or ('Tetra10Elem' in m)
-            or ('Penta6Elem' in m)
-            or ('Penta15Elem' in m)
-            or ('Hexa8Elem' in m)
-            or ('Hexa20Elem' in m)
-        ):
-
-            nds = m['Nodes']
+        element_counts = [
+            len(m[key][0]) if key in m else 0
+            for key, element_type, node_count in mesh_element_types
+        ]
+        if any(key in m for key, element_type, node_count in mesh_element_types):
             FreeCAD.Console.PrintLog("Found: elements\n")
-            for i in nds:
-                n = nds[i]
-                mesh.addNode(n[0], n[1], n[2], i)
-            elms_hexa8 = m['Hexa8Elem']
-            for i in elms_hexa8:
-                e = elms_hexa8[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7]], i)
-            elms_penta6 = m['Penta6Elem']
-            for i in elms_penta6:
-                e = elms_penta6[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5]], i)
-            elms_tetra4 = m['Tetra4Elem']
-            for i in elms_tetra4:
-                e = elms_tetra4[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3]], i)
-            elms_tetra10 = m['Tetra10Elem']
-            for i in elms_tetra10:
-                e = elms_tetra10[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9]], i)
-            elms_penta15 = m['Penta15Elem']
-            for i in elms_penta15:
-                e = elms_penta15[i]
-                mesh.addVolume([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9],
-                                e[10], e[11], e[12], e[13], e[14]], i)
-            elms_hexa20 = m['Hexa20Elem']
-            for i in elms_hexa20:
-                e = elms_hexa20[i]
-                mesh.addVolume([
-                    e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7], e[8], e[9],
-                    e[10], e[11], e[12], e[13], e[14], e[15], e[16], e[17], e[18], e[19]
-                ], i)
-            elms_tria3 = m['Tria3Elem']
-            for i in elms_tria3:
-                e = elms_tria3[i]
-                mesh.addFace([e[0], e[1], e[2]], i)
-            elms_tria6 = m['Tria6Elem']
-            for i in elms_tria6:
-                e = elms_tria6[i]
-                mesh.addFace([e[0], e[1], e[2], e[3], e[4], e[5]], i)
-            elms_quad4 = m['Quad4Elem']
-            for i in elms_quad4:
-                e = elms_quad4[i]
-                mesh.addFace([e[0], e[1], e[2], e[3]], i)
-            elms_quad8 = m['Quad8Elem']
-            for i in elms_quad8:
-                e = elms_quad8[i]
-                mesh.addFace([e[0], e[1], e[2], e[3], e[4], e[5], e[6], e[7]], i)
-            elms_seg2 = m['Seg2Elem']
-            for i in elms_seg2:
-                e = elms_seg2[i]
-                mesh.addEdge([e[0], e[1]], i)
-            elms_seg3 = m['Seg3Elem']
-            for i in elms_seg3:
-                e = elms_seg3[i]
-                mesh.addEdge([e[0], e[1], e[2]], i)
+            # contiguous arrays are read by FemMesh through the buffer protocol
+            mesh.addNodes(
+                np.ascontiguousarray(m['NodeIds'], dtype=np.intc),
+                np.ascontiguousarray(m['NodeCoords'], dtype=np.double).ravel()
+            )
+            for key, element_type, node_count in mesh_element_types:
+                if key in m and len(m[key][0]) > 0:
+                    element_ids, element_nodes = m[key]
+                    mesh.addElements(
+                        element_type,
+                        np.ascontiguousarray(element_ids, dtype=np.intc),
+                        np.ascontiguousarray(element_nodes, dtype=np.intc).ravel()
+                    )
             FreeCAD.Console.PrintLog(
                 "imported mesh: {} nodes, {} HEXA8, {} PENTA6, {} TETRA4, {} TETRA10, {} PENTA15"
-                .format(
-                    len(nds),
-                    len(elms_hexa8),
-                    len(elms_penta6),
-                    len(elms_tetra4),
-                    len(elms_tetra10),
-                    len(elms_penta15)
-                )
+                .format(len(m['NodeIds']), *element_counts[:5])
             )
             FreeCAD.Console.PrintLog(
                 "imported mesh: {} HEXA20, {} TRIA3, {} TRIA6, {} QUAD4, {} QUAD8, {} SEG2, {} SEG3"
-                .format(
-                    len(elms_hexa20),
-                    len(elms_tria3),
-                    len(elms_tria6),
-                    len(elms_quad4),
-                    len(elms_quad8),
-                    len(elms_seg2),
-                    len(elms_seg3)
-                )
+                .format(*element_counts[5:])
             )
         else:
             FreeCAD.Console.PrintError("No Elements found!\n")
@@ -242,6 +210,50 @@ def make_femmesh(
     return mesh
 
 
+def make_mesh_arrays(
+    mesh_data
+):
+    ''' converts the dict structure of FEM Mesh data into the array structure
+    used by make_femmesh_from_arrays(), element types missing in mesh_data are omitted
+    '''
+    nodes = mesh_data.get('Nodes', {})
+    mesh_arrays = {
+        'NodeIds': np.array(list(nodes.keys()), dtype=int),
+        'NodeCoords': np.array(
+            [(n[0], n[1], n[2]) for n in nodes.values()],
+            dtype=float
+        ).reshape(-1, 3)
+    }
+    for key, element_type, node_count in mesh_element_types:
+        if key in mesh_data:
+            elements = mesh_data[key]
+            mesh_arrays[key] = (
+                np.array(list(elements.keys()), dtype=int),
+                np.array(list(elements.values()), dtype=int).reshape(-1, node_count)
+            )
+    return mesh_arrays
+
+
+def make_mesh_data_from_arrays(
+    mesh_arrays
+):
+    ''' converts the array structure of FEM Mesh data into the dict structure
+    '''
+    mesh_data = {
+        'Nodes': dict(zip(
+            mesh_arrays['NodeIds'].tolist(),
+            map(tuple, mesh_arrays['NodeCoords'].tolist())
+        ))
+    }
+    for key, element_type, node_count in mesh_element_types:
+        if key in mesh_arrays:
+            ids, nodes = mesh_arrays[key]
+            mesh_data[key] = dict(zip(ids.tolist(), map(tuple, nodes.tolist())))
+        else:
+            mesh_data[key] = {}
+    return mesh_data
+
+
 def make_dict_from_femmesh(
     femmesh
 ):
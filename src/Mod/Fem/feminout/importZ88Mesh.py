@@ -30,6 +30,7 @@ __url__ = "http://www.freecadweb.org"
 
 import os
 import FreeCAD
+import numpy as np
 
 # ************************************************************************************************
 # ********* generic FreeCAD import and export methods ********************************************
@@ -150,20 +151,17 @@ def read_z88_mesh(
 ):
     ''' reads a z88 mesh file z88i1.txt (Z88OSV14) or z88structure.txt (Z88AuroraV3)
         and extracts the nodes and elements
+        returns the mesh arrays of importToolsFem.make_mesh_arrays()
     '''
-    nodes = {}
-    elements_hexa8 = {}
-    elements_penta6 = {}
-    elements_tetra4 = {}
-    elements_tetra10 = {}
-    elements_penta15 = {}
-    elements_hexa20 = {}
-    elements_tria3 = {}
-    elements_tria6 = {}
-    elements_quad4 = {}
-    elements_quad8 = {}
-    elements_seg2 = {}
-    elements_seg3 = {}
+    from . import importToolsFem
+    node_ids = []
+    node_coords = []
+    # element ids and element nodes in FreeCAD node order for each mesh data key
+    element_ids = {}
+    element_nodes = {}
+    for key, element_type, node_count in importToolsFem.mesh_element_types:
+        element_ids[key] = []
+        element_nodes[key] = []
 
     input_continues = False
     # elem = -1
@@ -211,7 +209,8 @@ def read_z88_mesh(
                 node_z = 0.0
             elif nodes_dimension == 3:
                 node_z = float(linecolumns[4])
-            nodes[node_no] = FreeCAD.Vector(node_x, node_y, node_z)
+            node_ids.append(node_no)
+            node_coords.append((node_x, node_y, node_z))
 
         if lno >= elemts_first_line and lno <= elements_last_line:
             # first element line
@@ -289,7 +288,8 @@ def read_z88_mesh(
                     # N1, N2
                     nd1 = int(linecolumns[0])
                     nd2 = int(linecolumns[1])
-                    elements_seg2[elem_no] = (nd1, nd2)
+                    element_ids['Seg2Elem'].append(elem_no)
+                    element_nodes['Seg2Elem'].append((nd1, nd2))
                     input_continues = False
                 elif z88_element_type == 3 or z88_element_type == 14 or z88_element_type == 24:
                     # scheibe3 or scheibe14 or schale24 Z88 --> tria6 FreeCAD
@@ -300,7 +300,8 @@ def read_z88_mesh(
                     nd4 = int(linecolumns[3])
                     nd5 = int(linecolumns[4])
                     nd6 = int(linecolumns[5])
-                    elements_tria6[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6)
+                    element_ids['Tria6Elem'].append(elem_no)
+                    element_nodes['Tria6Elem'].append((nd1, nd2, nd3, nd4, nd5, nd6))
                     input_continues = False
                 elif z88_element_type == 7 or z88_element_type == 20 or z88_element_type == 23:
                     # scheibe7 or platte20 or schale23 Z88 --> quad8 FreeCAD
@@ -313,7 +314,8 @@ def read_z88_mesh(
                     nd6 = int(linecolumns[5])
                     nd7 = int(linecolumns[6])
                     nd8 = int(linecolumns[7])
-                    elements_quad8[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8)
+                    element_ids['Quad8Elem'].append(elem_no)
+                    element_nodes['Quad8Elem'].append((nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8))
                     input_continues = False
                 elif z88_element_type == 17:
                     # volume17 Z88 --> tetra4 FreeCAD
@@ -322,7 +324,8 @@ def read_z88_mesh(
                     nd2 = int(linecolumns[1])
                     nd3 = int(linecolumns[2])
                     nd4 = int(linecolumns[3])
-                    elements_tetra4[elem_no] = (nd4, nd2, nd3, nd1)
+                    element_ids['Tetra4Elem'].append(elem_no)
+                    element_nodes['Tetra4Elem'].append((nd4, nd2, nd3, nd1))
                     input_continues = False
                 elif z88_element_type == 16:
                     # volume16 Z88 --> tetra10 FreeCAD
@@ -338,9 +341,10 @@ def read_z88_mesh(
                     nd8 = int(linecolumns[7])
                     nd9 = int(linecolumns[8])
                     nd10 = int(linecolumns[9])
-                    elements_tetra10[elem_no] = (
+                    element_ids['Tetra10Elem'].append(elem_no)
+                    element_nodes['Tetra10Elem'].append((
                         nd1, nd2, nd4, nd3, nd5, nd8, nd10, nd7, nd6, nd9
-                    )
+                    ))
                     input_continues = False
                 elif z88_element_type == 1:
                     # volume1 Z88 --> hexa8 FreeCAD
@@ -353,7 +357,8 @@ def read_z88_mesh(
                     nd6 = int(linecolumns[5])
                     nd7 = int(linecolumns[6])
                     nd8 = int(linecolumns[7])
-                    elements_hexa8[elem_no] = (nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8)
+                    element_ids['Hexa8Elem'].append(elem_no)
+                    element_nodes['Hexa8Elem'].append((nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8))
                     input_continues = False
                 elif z88_element_type == 10:
                     # volume10 Z88 --> hexa20 FreeCAD
@@ -382,10 +387,11 @@ def read_z88_mesh(
                     nd18 = int(linecolumns[17])
                     nd19 = int(linecolumns[18])
                     nd20 = int(linecolumns[19])
-                    elements_hexa20[elem_no] = (
+                    element_ids['Hexa20Elem'].append(elem_no)
+                    element_nodes['Hexa20Elem'].append((
                         nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8, nd9, nd10,
                         nd11, nd12, nd13, nd14, nd15, nd16, nd17, nd18, nd19, nd20
-                    )
+                    ))
                     input_continues = False
 
                 # unknown elements
@@ -394,29 +400,23 @@ def read_z88_mesh(
                     FreeCAD.Console.PrintError("Unknown element\n")
                     return {}
 
-    for n in nodes:
-        FreeCAD.Console.PrintLog(str(n) + '  ' + str(nodes[n]) + '\n')
-    for e in elements_tria6:
-        FreeCAD.Console.PrintLog(str(e) + '  ' + str(elements_tria6[e]) + '\n')
-    FreeCAD.Console.PrintLog('\n')
+    FreeCAD.Console.PrintLog('{} nodes\n'.format(len(node_ids)))
+    for key in element_ids:
+        if element_ids[key]:
+            FreeCAD.Console.PrintLog('{} {}\n'.format(len(element_ids[key]), key))
 
     z88_mesh_file.close()
 
-    return {
-        'Nodes': nodes,
-        'Seg2Elem': elements_seg2,
-        'Seg3Elem': elements_seg3,
-        'Tria3Elem': elements_tria3,
-        'Tria6Elem': elements_tria6,
-        'Quad4Elem': elements_quad4,
-        'Quad8Elem': elements_quad8,
-        'Tetra4Elem': elements_tetra4,
-        'Tetra10Elem': elements_tetra10,
-        'Hexa8Elem': elements_hexa8,
-        'Hexa20Elem': elements_hexa20,
-        'Penta6Elem': elements_penta6,
-        'Penta15Elem': elements_penta15
+    mesh_arrays = {
+        'NodeIds': np.array(node_ids, dtype=int),
+        'NodeCoords': np.array(node_coords, dtype=float).reshape(-1, 3)
     }
+    for key, element_type, node_count in importToolsFem.mesh_element_types:
+        mesh_arrays[key] = (
+            np.array(element_ids[key], dtype=int),
+            np.array(element_nodes[key], dtype=int).reshape(-1, node_count)
+        )
+    return mesh_arrays
 
 
 # ********* writer *******************************************************************************
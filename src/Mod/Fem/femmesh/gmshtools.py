@@ -31,12 +31,19 @@ import FreeCAD
 import Fem
 from . import meshtools
 from FreeCAD import Units
+import hashlib
+import os
+import shutil
 import subprocess
 import tempfile
 from platform import system
 import sys
 
 
+# Gmsh version by Gmsh binary, the version is part of the mesh cache key
+_gmsh_versions = {}
+
+
 class GmshTools():
     def __init__(self, gmsh_mesh_obj, analysis=None):
         self.mesh_obj = gmsh_mesh_obj
@@ -132,10 +139,31 @@ class GmshTools():
         self.temp_file_mesh = ''
         self.temp_file_geo = ''
         self.mesh_name = ''
+        self.tmp_file_suffix = ''  # makes the temporary files unique for parallel runs
         self.gmsh_bin = ''
         self.error = False
 
+        # mesh cache
+        gmsh_prefs = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Fem/Gmsh")
+        if gmsh_prefs.GetBool("UseMeshCache", True):
+            self.mesh_cache_dir = gmsh_prefs.GetString("MeshCachePath")
+            if not self.mesh_cache_dir:
+                self.mesh_cache_dir = os.path.join(
+                    FreeCAD.getUserAppDataDir(), "Fem", "GmshCache"
+                )
+            # maximal size of all cached mesh files in MB
+            self.mesh_cache_size = gmsh_prefs.GetInt("MeshCacheSize", 256)
+        else:
+            self.mesh_cache_dir = ''
+        self.mesh_cache_file = ''
+
     def create_mesh(self):
+        self.prepare_mesh()
+        error = self.run_gmsh()
+        self.read_and_set_new_mesh()
+        return error
+
+    def prepare_mesh(self):
         print("\nWe are going to start Gmsh FEM mesh run!")
         print(
             '  Part to mesh: Name --> {},  Label --> {}, ShapeType --> {}'
@@ -152,9 +180,7 @@ class GmshTools():
         self.get_boundary_layer_data()
         self.write_part_file()
         self.write_geo()
-        error = self.run_gmsh_with_geo()
-        self.read_and_set_new_mesh()
-        return error
+        self.get_mesh_cache_file()
 
     def get_dimension(self):
         # Dimension
@@ -207,14 +233,16 @@ class GmshTools():
             path_sep = "/"
         tmpdir = tempfile.gettempdir()
         # geometry file
-        self.temp_file_geometry = tmpdir + path_sep + self.part_obj.Name + '_Geometry.brep'
+        self.temp_file_geometry = (
+            tmpdir + path_sep + self.part_obj.Name + '_Geometry' + self.tmp_file_suffix + '.brep'
+        )
         print('  ' + self.temp_file_geometry)
         # mesh file
-        self.mesh_name = self.part_obj.Name + '_Mesh_TmpGmsh'
+        self.mesh_name = self.part_obj.Name + '_Mesh_TmpGmsh' + self.tmp_file_suffix
         self.temp_file_mesh = tmpdir + path_sep + self.mesh_name + '.unv'
         print('  ' + self.temp_file_mesh)
         # Gmsh input file
-        self.temp_file_geo = tmpdir + path_sep + 'shape2mesh.geo'
+        self.temp_file_geo = tmpdir + path_sep + 'shape2mesh' + self.tmp_file_suffix + '.geo'
         print('  ' + self.temp_file_geo)
 
     def get_gmsh_command(self):
@@ -726,6 +754,78 @@ class GmshTools():
         geo.write("// " + self.gmsh_bin + " " + self.temp_file_geo + "\n")
         geo.close()
 
+    def get_gmsh_version(self):
+        if self.gmsh_bin not in _gmsh_versions:
+            try:
+                p = subprocess.Popen(
+                    [self.gmsh_bin, '-version'],
+                    shell=False,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
+                output, error = p.communicate()
+                # Gmsh prints the version to stderr
+                version = (output + error).strip()
+                if sys.version_info.major >= 3:
+                    version = version.decode('utf-8')
+            except:
+                version = ''
+            _gmsh_versions[self.gmsh_bin] = version
+        return _gmsh_versions[self.gmsh_bin]
+
+    def get_mesh_cache_file(self):
+        # the mesh cache is content addressed, the key is the hash of the BREP
+        # geometry, the geo file (all mesh parameters) and the Gmsh version
+        self.mesh_cache_file = ''
+        if not self.mesh_cache_dir:
+            return
+        gmsh_version = self.get_gmsh_version()
+        if not gmsh_version:
+            return
+        sha = hashlib.sha1()
+        sha.update(gmsh_version.encode('utf-8'))
+        with open(self.temp_file_geometry, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        with open(self.temp_file_geo, 'r') as f:
+            geo = f.read()
+        # the temporary file paths are not part of the mesh parameter
+        for tmp_file, placeholder in (
+            (self.temp_file_geometry, '<geometry>'),
+            (self.temp_file_mesh, '<mesh>'),
+            (self.temp_file_geo, '<geo>')
+        ):
+            geo = geo.replace(tmp_file, placeholder)
+        sha.update(geo.encode('utf-8'))
+        self.mesh_cache_file = os.path.join(self.mesh_cache_dir, sha.hexdigest() + '.unv')
+
+    def run_gmsh(self):
+        # runs Gmsh if the mesh is not in the mesh cache
+        if self.mesh_cache_file and os.path.isfile(self.mesh_cache_file):
+            print('  Mesh taken from the mesh cache: ' + self.mesh_cache_file)
+            # the modification time is the last use for the LRU eviction
+            os.utime(self.mesh_cache_file, None)
+            self.temp_file_mesh = self.mesh_cache_file
+            return ''
+        if self.mesh_cache_file and os.path.isfile(self.temp_file_mesh):
+            # a mesh of an old run must not get into the mesh cache
+            os.remove(self.temp_file_mesh)
+        error = self.run_gmsh_with_geo()
+        if self.mesh_cache_file and not self.error and os.path.isfile(self.temp_file_mesh):
+            self.store_mesh_in_cache()
+        return error
+
+    def store_mesh_in_cache(self):
+        try:
+            if not os.path.isdir(self.mesh_cache_dir):
+                os.makedirs(self.mesh_cache_dir)
+            shutil.copyfile(self.temp_file_mesh, self.mesh_cache_file)
+            evict_mesh_cache(self.mesh_cache_dir, self.mesh_cache_size * 1024 * 1024)
+        except (IOError, OSError):
+            FreeCAD.Console.PrintWarning(
+                'Mesh could not be stored in the mesh cache: {}\n'.format(self.mesh_cache_dir)
+            )
+
     def run_gmsh_with_geo(self):
         comandlist = [self.gmsh_bin, '-', self.temp_file_geo]
         # print(comandlist)
@@ -760,4 +860,47 @@ class GmshTools():
         del self.temp_file_geometry
         del self.temp_file_mesh
 
+
+def evict_mesh_cache(cache_dir, max_size):
+    '''removes the least recently used meshes until
+    the mesh files in cache_dir do not need more than max_size bytes
+    '''
+    cache_files = []
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.unv'):
+            file_path = os.path.join(cache_dir, file_name)
+            file_stat = os.stat(file_path)
+            cache_files.append((file_stat.st_mtime, file_stat.st_size, file_path))
+    cache_size = sum(size for mtime, size, file_path in cache_files)
+    for mtime, size, file_path in sorted(cache_files):
+        if cache_size <= max_size:
+            break
+        os.remove(file_path)
+        cache_size -= size
+
+
+def create_meshes(gmsh_mesh_objs, analysis=None, max_jobs=None):
+    '''creates the meshes of several Gmsh mesh objects, e.g. variants
+    of the mesh regions of a part. The geo files are written one after
+    the other, up to max_jobs Gmsh processes (default all cores) run at
+    the same time. Returns a list of the Gmsh errors.
+    '''
+    from multiprocessing.pool import ThreadPool
+    tools = []
+    for mesh_obj in gmsh_mesh_objs:
+        gmsh_mesh = GmshTools(mesh_obj, analysis)
+        gmsh_mesh.tmp_file_suffix = '_' + mesh_obj.Name
+        gmsh_mesh.prepare_mesh()
+        tools.append(gmsh_mesh)
+    # the threads only wait for the Gmsh processes
+    pool = ThreadPool(max_jobs)
+    try:
+        errors = pool.map(lambda gmsh_mesh: gmsh_mesh.run_gmsh(), tools)
+    finally:
+        pool.close()
+        pool.join()
+    for gmsh_mesh in tools:
+        gmsh_mesh.read_and_set_new_mesh()
+    return errors
+
 ##  @}
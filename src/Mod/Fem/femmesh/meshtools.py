@@ -28,6 +28,21 @@ __url__ = "http://www.freecadweb.org"
 #  @{
 
 import FreeCAD
+import itertools
+import numpy as np
+
+
+# ************************************************************************************************
+# bit masks of the CalculiX element faces, the bit of the position of each
+# face node in the volume element is set, {element node count: {mask: face number}}
+ccx_face_masks = {
+    4: {7: 1, 11: 2, 13: 3, 14: 4},  # tetra4
+    6: {56: 1, 7: 2, 54: 3, 45: 4, 27: 5},  # penta6
+    8: {240: 1, 15: 2, 102: 3, 204: 4, 153: 5, 51: 6},  # hexa8
+    10: {119: 1, 411: 2, 717: 3, 814: 4},  # tetra10
+    15: {3640: 1, 455: 2, 25782: 3, 22829: 4, 12891: 5},  # penta15
+    20: {61680: 1, 3855: 2, 402022: 3, 804044: 4, 624793: 5, 201011: 6}  # hexa20
+}
 
 
 # ************************************************************************************************
@@ -232,6 +247,253 @@ def get_femnodes_ele_table(
     return femnodes_ele_table
 
 
+# ************************************************************************************************
+class FemElementIndex(object):
+    '''node to element incidence index of a femelement_table
+    The index is stored in CSR style (offset and index arrays):
+    element_offsets, element_nodes: the nodes of the element with row i are
+        element_nodes[element_offsets[i]:element_offsets[i + 1]]
+    node_offsets, node_elements, node_positions: the element rows and the
+        positions of the node in these elements of the node node_ids[j] are
+        node_elements[node_offsets[j]:node_offsets[j + 1]] and
+        node_positions[node_offsets[j]:node_offsets[j + 1]]
+    The searches for the elements and element faces of a node set are vectorized.
+    They return the same as the search methods with the femnodes_ele_table.
+    Since the femelement_table contains either
+    volume or face or edgemesh the index only
+    has either volume or face or edge elements
+    see get_femelement_table()
+    '''
+
+    def __init__(
+        self,
+        element_ids,
+        element_node_counts,
+        element_nodes
+    ):
+        # element_ids, element_node_counts, element_nodes as returned by get_femelement_arrays()
+        self.element_ids = np.asarray(element_ids, dtype=np.int64)
+        self.element_node_counts = np.asarray(element_node_counts, dtype=np.int64)
+        self.element_nodes = np.asarray(element_nodes, dtype=np.int64)
+        element_count = len(self.element_ids)
+        self.element_offsets = np.zeros(element_count + 1, dtype=np.int64)
+        np.cumsum(self.element_node_counts, out=self.element_offsets[1:])
+        element_rows = np.repeat(np.arange(element_count), self.element_node_counts)
+        positions = (
+            np.arange(len(self.element_nodes))
+            - np.repeat(self.element_offsets[:-1], self.element_node_counts)
+        )
+        # sort the incidences by node to get the node to element index
+        order = np.argsort(self.element_nodes, kind='mergesort')
+        self.node_ids, node_starts = np.unique(self.element_nodes[order], return_index=True)
+        self.node_offsets = np.append(node_starts, len(order)).astype(np.int64)
+        self.node_elements = element_rows[order]
+        self.node_positions = positions[order]
+        FreeCAD.Console.PrintLog(
+            'FemElementIndex: {} elements, {} nodes\n'
+            .format(element_count, len(self.node_ids))
+        )
+
+    def has_elements(
+        self,
+        element_ids,
+        element_node_counts,
+        element_nodes
+    ):
+        '''returns True if the index was built from these element arrays
+        '''
+        return (
+            len(self.element_ids) == len(element_ids)
+            and len(self.element_nodes) == len(element_nodes)
+            and np.array_equal(self.element_ids, element_ids)
+            and np.array_equal(self.element_node_counts, element_node_counts)
+            and np.array_equal(self.element_nodes, element_nodes)
+        )
+
+    def get_incidences(
+        self,
+        node_set
+    ):
+        '''returns the indices into node_elements and node_positions
+        of all element memberships of the nodes of the node_set
+        '''
+        node_set = np.unique(np.asarray(list(node_set), dtype=np.int64))
+        rows = np.searchsorted(self.node_ids, node_set)
+        # nodes which are not used by any element are ignored
+        found = rows < len(self.node_ids)
+        found[found] = self.node_ids[rows[found]] == node_set[found]
+        rows = rows[found]
+        starts = self.node_offsets[rows]
+        lengths = self.node_offsets[rows + 1] - starts
+        # concatenate the ranges starts[i] ... starts[i] + lengths[i]
+        range_offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return range_offsets + np.arange(lengths.sum())
+
+    def get_bit_patterns(
+        self,
+        node_set
+    ):
+        '''returns an integer (bit array) for each element row, the bit at the position
+        of a node in the element is set, if the node is in the node_set
+        see get_bit_pattern_dict()
+        '''
+        incidences = self.get_incidences(node_set)
+        bits = np.left_shift(1, self.node_positions[incidences])
+        return np.bincount(
+            self.node_elements[incidences],
+            weights=bits,
+            minlength=len(self.element_ids)
+        ).astype(np.int64)
+
+    def get_node_counts(
+        self,
+        node_set
+    ):
+        '''returns the number of nodes of the node_set in each element row
+        '''
+        incidences = self.get_incidences(node_set)
+        return np.bincount(
+            self.node_elements[incidences],
+            minlength=len(self.element_ids)
+        )
+
+    def get_elements_by_nodes(
+        self,
+        node_set
+    ):
+        '''returns the elements which have all their nodes in the node_set
+        see get_femelements_by_femnodes_bin()
+        '''
+        full_patterns = np.left_shift(1, self.element_node_counts) - 1
+        found = self.get_bit_patterns(node_set) == full_patterns
+        return self.element_ids[found].tolist()
+
+    def get_ccxelement_faces_by_nodes(
+        self,
+        node_set
+    ):
+        '''returns [[eleID, ccx face number], ...] for all element faces
+        with all their nodes in the node_set
+        see get_ccxelement_faces_from_binary_search()
+        '''
+        bit_patterns = self.get_bit_patterns(node_set)
+        face_rows = []
+        face_numbers = []
+        for node_count, mask_dict in ccx_face_masks.items():
+            rows = np.flatnonzero(self.element_node_counts == node_count)
+            if not len(rows):
+                continue
+            for mask, face_number in mask_dict.items():
+                found = rows[(bit_patterns[rows] & mask) == mask]
+                face_rows.append(found)
+                face_numbers.append(np.full(len(found), face_number, dtype=np.int64))
+        if not face_rows:
+            return []
+        face_rows = np.concatenate(face_rows)
+        face_numbers = np.concatenate(face_numbers)
+        order = np.lexsort((face_numbers, face_rows))
+        return np.column_stack((
+            self.element_ids[face_rows[order]],
+            face_numbers[order]
+        )).tolist()
+
+    def get_volumes_by_face_nodes(
+        self,
+        node_set
+    ):
+        '''returns the sorted volume elements with an element face on the node_set
+        see get_femvolumeelements_by_femfacenodes()
+        '''
+        node_counts = self.get_node_counts(node_set)
+        counts = self.element_node_counts
+        found = (
+            ((counts == 4) & (node_counts == 3))  # tetra4
+            | ((counts == 10) & (node_counts == 4))  # tetra10
+            | ((counts == 8) & (node_counts == 4))  # hexa8
+            | ((counts == 20) & (node_counts == 8))  # hexa20
+            | ((counts == 6) & ((node_counts == 3) | (node_counts == 4)))  # penta6
+            | ((counts == 15) & ((node_counts == 6) | (node_counts == 8)))  # penta15
+        )
+        return np.sort(self.element_ids[found]).tolist()
+
+
+def get_femelement_arrays(
+    femmesh
+):
+    '''returns the element ids, the node count of each element and the flat element nodes
+    as numpy arrays, the elements are the same as in get_femelement_table()
+    '''
+    if is_solid_femmesh(femmesh):
+        element_type = 'Volume'
+    elif is_face_femmesh(femmesh):
+        element_type = 'Face'
+    elif is_edge_femmesh(femmesh):
+        element_type = 'Edge'
+    else:
+        FreeCAD.Console.PrintError('Neither solid nor face nor edge femmesh!\n')
+        return get_femelement_table_arrays({})
+    element_ids, element_node_counts, element_nodes = femmesh.getElementsNodes(element_type)
+    return (
+        np.array(element_ids, dtype=np.int64),
+        np.array(element_node_counts, dtype=np.int64),
+        np.array(element_nodes, dtype=np.int64)
+    )
+
+
+def get_femelement_table_arrays(
+    femelement_table
+):
+    '''returns the arrays of get_femelement_arrays() for a femelement_table
+    '''
+    element_count = len(femelement_table)
+    element_node_counts = np.fromiter(
+        (len(nodes) for nodes in femelement_table.values()),
+        np.int64,
+        element_count
+    )
+    return (
+        np.fromiter(femelement_table.keys(), np.int64, element_count),
+        element_node_counts,
+        np.fromiter(
+            itertools.chain.from_iterable(femelement_table.values()),
+            np.int64,
+            element_node_counts.sum()
+        )
+    )
+
+
+# the FemElementIndex of the last used femmeshes
+# a FemMesh returns a new Python object on every access of the FemMesh property
+# thus the index is kept as long as the elements of the femmesh have not changed
+_femelement_index_cache = []
+_femelement_index_cache_size = 4
+
+
+def get_femelement_index(
+    femmesh,
+    femelement_table=None
+):
+    '''returns the FemElementIndex of the femmesh
+    it is built once and cached until the elements of the femmesh change
+    if the femelement_table is given, the index is built from it instead of the femmesh
+    '''
+    if femelement_table is None:
+        element_arrays = get_femelement_arrays(femmesh)
+    else:
+        element_arrays = get_femelement_table_arrays(femelement_table)
+    # comparing the element arrays is much cheaper than building the index
+    # the index holds the arrays, thus nothing else is stored in the cache
+    for i, index in enumerate(_femelement_index_cache):
+        if index.has_elements(*element_arrays):
+            if i:
+                _femelement_index_cache.insert(0, _femelement_index_cache.pop(i))
+            return index
+    index = FemElementIndex(*element_arrays)
+    _femelement_index_cache.insert(0, index)
+    del _femelement_index_cache[_femelement_index_cache_size:]
+    return index
+
+
 # ************************************************************************************************
 def get_copy_of_empty_femelement_table(
     femelement_table
@@ -283,52 +545,9 @@ def get_ccxelement_faces_from_binary_search(
 ):
     '''get the CalculiX element face numbers
     '''
-    tet10_mask = {
-        119: 1,
-        411: 2,
-        717: 3,
-        814: 4}
-    tet4_mask = {
-        7: 1,
-        11: 2,
-        13: 3,
-        14: 4}
-    hex8_mask = {
-        240: 1,
-        15: 2,
-        102: 3,
-        204: 4,
-        153: 5,
-        51: 6}
-    hex20_mask = {
-        61680: 1,
-        3855: 2,
-        402022: 3,
-        804044: 4,
-        624793: 5,
-        201011: 6}
-    pent6_mask = {
-        56: 1,
-        7: 2,
-        54: 3,
-        45: 4,
-        27: 5}
-    pent15_mask = {
-        3640: 1,
-        455: 2,
-        25782: 3,
-        22829: 4,
-        12891: 5}
-    vol_dict = {
-        4: tet4_mask,
-        6: pent6_mask,
-        8: hex8_mask,
-        10: tet10_mask,
-        15: pent15_mask,
-        20: hex20_mask}
     faces = []
     for ele in bit_pattern_dict:
-        mask_dict = vol_dict[bit_pattern_dict[ele][0]]
+        mask_dict = ccx_face_masks[bit_pattern_dict[ele][0]]
         for key in mask_dict:
             if (key & bit_pattern_dict[ele][1]) == key:
                 faces.append([ele, mask_dict[key]])
@@ -347,8 +566,13 @@ def get_femelements_by_femnodes_bin(
     if all nodes of the femelement are in node_list,
     the femelement is added to the list which is returned
     blind fast binary search, but works for volumes only
+    femnodes_ele_table could be a FemElementIndex too, see get_femelement_index()
     '''
     FreeCAD.Console.PrintMessage('binary search: get_femelements_by_femnodes_bin\n')
+    if isinstance(femnodes_ele_table, FemElementIndex):
+        ele_list = femnodes_ele_table.get_elements_by_nodes(node_list)
+        FreeCAD.Console.PrintMessage('found Volumes: {}\n'.format(len(ele_list)))
+        return ele_list
     vol_masks = {
         4: 15,
         6: 63,
@@ -400,7 +624,8 @@ def get_femelements_by_femnodes_std(
 
 def get_femvolumeelements_by_femfacenodes(
     femelement_table,
-    node_list
+    node_list,
+    femelement_index=None
 ):
     '''assume femelement_table only has volume elements
     for every femvolumeelement of femelement_table
@@ -413,8 +638,12 @@ def get_femvolumeelements_by_femfacenodes(
         --> if exact 3 or 6 element nodes are in node_list --> add femelement
     if penta15 volume element
         --> if exact 6 or 8 element nodes are in node_list --> add femelement
+    the vectorized search of the femelement_index is used if it is given
     e: elementlist
     nodes: nodelist '''
+    if femelement_index is not None:
+        return femelement_index.get_volumes_by_face_nodes(node_list)
+    node_list = set(node_list)
     e = []  # elementlist
     for elementID in sorted(femelement_table):
         nodecount = 0
@@ -1206,8 +1435,10 @@ def get_ref_facenodes_table(
                 # list of integer [mv]
                 ref_face_volume_elements = get_femvolumeelements_by_femfacenodes(
                     femelement_table,
-                    ref_face_nodes
+                    ref_face_nodes,
+                    get_femelement_index(femmesh, femelement_table)
                 )
+                ref_face_nodes = set(ref_face_nodes)
                 for veID in ref_face_volume_elements:
                     ve_ref_face_nodes = []
                     for nodeID in femelement_table[veID]:
@@ -1572,13 +1803,19 @@ def get_pressure_obj_faces(
         # sorted and duplicates removed
         prs_face_node_set = get_femnodes_by_femobj_with_references(femmesh, femobj)
         # FreeCAD.Console.PrintMessage('prs_face_node_set: {}\n'.format(prs_face_node_set))
-        # fill the bit_pattern_dict and search for the faces
-        bit_pattern_dict = get_bit_pattern_dict(
-            femelement_table,
-            femnodes_ele_table,
-            prs_face_node_set
-        )
-        pressure_faces = get_ccxelement_faces_from_binary_search(bit_pattern_dict)
+        if isinstance(femnodes_ele_table, FemElementIndex):
+            # vectorized search for the faces
+            pressure_faces = femnodes_ele_table.get_ccxelement_faces_by_nodes(
+                prs_face_node_set
+            )
+        else:
+            # fill the bit_pattern_dict and search for the faces
+            bit_pattern_dict = get_bit_pattern_dict(
+                femelement_table,
+                femnodes_ele_table,
+                prs_face_node_set
+            )
+            pressure_faces = get_ccxelement_faces_from_binary_search(bit_pattern_dict)
     elif is_face_femmesh(femmesh):
         pressure_faces = []
         # normally we should call get_femelements_by_references and
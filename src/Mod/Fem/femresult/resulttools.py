@@ -187,76 +187,46 @@ def fill_femresult_stats(res_obj):
     FreeCAD.Console.PrintLog(
         'Calculate stats list for result obj: ' + res_obj.Name + '\n'
     )
-    no_of_values = 1  # to avoid division by zero
-    # set stats values to 0, they may not exist in res_obj
-    x_min = y_min = z_min = x_max = y_max = z_max = x_avg = y_avg = z_avg = 0
-    a_max = a_min = a_avg = s_max = s_min = s_avg = 0
-    p1_min = p1_avg = p1_max = p2_min = p2_avg = p2_max = p3_min = p3_avg = p3_max = 0
-    ms_min = ms_avg = ms_max = peeq_min = peeq_avg = peeq_max = 0
-    temp_min = temp_avg = temp_max = 0
-    mflow_min = mflow_avg = mflow_max = npress_min = npress_avg = npress_max = 0
-
+    # result values in the order of the stats list, see get_all_stats()
     if res_obj.DisplacementVectors:
-        no_of_values = len(res_obj.DisplacementVectors)
-        x_max, y_max, z_max = map(max, zip(*res_obj.DisplacementVectors))
-        x_min, y_min, z_min = map(min, zip(*res_obj.DisplacementVectors))
-        sum_list = map(sum, zip(*res_obj.DisplacementVectors))
-        x_avg, y_avg, z_avg = [i / no_of_values for i in sum_list]
-        a_min = min(res_obj.DisplacementLengths)
-        a_avg = sum(res_obj.DisplacementLengths) / no_of_values
-        a_max = max(res_obj.DisplacementLengths)
-    if res_obj.StressValues:
-        s_min = min(res_obj.StressValues)
-        s_avg = sum(res_obj.StressValues) / no_of_values
-        s_max = max(res_obj.StressValues)
-    if res_obj.PrincipalMax:
-        p1_min = min(res_obj.PrincipalMax)
-        p1_avg = sum(res_obj.PrincipalMax) / no_of_values
-        p1_max = max(res_obj.PrincipalMax)
-    if res_obj.PrincipalMed:
-        p2_min = min(res_obj.PrincipalMed)
-        p2_avg = sum(res_obj.PrincipalMed) / no_of_values
-        p2_max = max(res_obj.PrincipalMed)
-    if res_obj.PrincipalMin:
-        p3_min = min(res_obj.PrincipalMin)
-        p3_avg = sum(res_obj.PrincipalMin) / no_of_values
-        p3_max = max(res_obj.PrincipalMin)
-    if res_obj.MaxShear:
-        ms_min = min(res_obj.MaxShear)
-        ms_avg = sum(res_obj.MaxShear) / no_of_values
-        ms_max = max(res_obj.MaxShear)
-    if res_obj.Peeq:
-        peeq_min = min(res_obj.Peeq)
-        peeq_avg = sum(res_obj.Peeq) / no_of_values
-        peeq_max = max(res_obj.Peeq)
-    if res_obj.Temperature:
-        temp_min = min(res_obj.Temperature)
-        temp_avg = sum(res_obj.Temperature) / no_of_values
-        temp_max = max(res_obj.Temperature)
+        disp = np.array(res_obj.DisplacementVectors, dtype=float)
+        disp_values = [disp[:, 0], disp[:, 1], disp[:, 2], res_obj.DisplacementLengths]
+    else:
+        disp_values = [[], [], [], []]
+    result_values = disp_values + [
+        res_obj.StressValues,
+        res_obj.PrincipalMax,
+        res_obj.PrincipalMed,
+        res_obj.PrincipalMin,
+        res_obj.MaxShear,
+        res_obj.Peeq,
+        res_obj.Temperature,
+        res_obj.MassFlowRate,
+        res_obj.NetworkPressure
+    ]
+    # the average is taken over the number of displacement values, to avoid
+    # division by zero it is 1 if there are none, Flow 1D results do not have
+    # DisplacementVectors, mflow and npress are averaged by number of mflow values
+    no_of_values = len(res_obj.DisplacementVectors) or 1
+    divisors = np.full(len(result_values), float(no_of_values))
     if res_obj.MassFlowRate:
-        # DisplacementVectors is empty, no_of_values needs to be set
-        no_of_values = len(res_obj.MassFlowRate)
-        mflow_min = min(res_obj.MassFlowRate)
-        mflow_avg = sum(res_obj.MassFlowRate) / no_of_values
-        mflow_max = max(res_obj.MassFlowRate)
-    if res_obj.NetworkPressure:
-        npress_min = min(res_obj.NetworkPressure)
-        npress_avg = sum(res_obj.NetworkPressure) / no_of_values
-        npress_max = max(res_obj.NetworkPressure)
-
-    res_obj.Stats = [x_min, x_avg, x_max,
-                     y_min, y_avg, y_max,
-                     z_min, z_avg, z_max,
-                     a_min, a_avg, a_max,
-                     s_min, s_avg, s_max,
-                     p1_min, p1_avg, p1_max,
-                     p2_min, p2_avg, p2_max,
-                     p3_min, p3_avg, p3_max,
-                     ms_min, ms_avg, ms_max,
-                     peeq_min, peeq_avg, peeq_max,
-                     temp_min, temp_avg, temp_max,
-                     mflow_min, mflow_avg, mflow_max,
-                     npress_min, npress_avg, npress_max]
+        divisors[-2:] = len(res_obj.MassFlowRate)
+
+    # stats values are 0, if the values do not exist in res_obj
+    # values of the same length are stacked and computed in one pass
+    # NaN values (CalculiX frd result files may have them) are ignored
+    stats = np.zeros((len(result_values), 3))
+    lengths = [len(values) for values in result_values]
+    for length in set(lengths):
+        if length == 0:
+            continue
+        rows = [i for i, l in enumerate(lengths) if l == length]
+        values = np.array([result_values[i] for i in rows], dtype=float)
+        stats[rows, 0] = np.nanmin(values, axis=1)
+        stats[rows, 1] = np.nansum(values, axis=1) / divisors[rows]
+        stats[rows, 2] = np.nanmax(values, axis=1)
+
+    res_obj.Stats = stats.ravel().tolist()
     '''
     stat_types = [
         "U1",
@@ -294,47 +264,39 @@ def add_disp_apps(res_obj):
 
 
 def add_von_mises(res_obj):
-    mstress = []
-    iterator = zip(
-        res_obj.NodeStressXX,
-        res_obj.NodeStressYY,
-        res_obj.NodeStressZZ,
-        res_obj.NodeStressXY,
-        res_obj.NodeStressXZ,
-        res_obj.NodeStressYZ
-    )
-    for Sxx, Syy, Szz, Sxy, Sxz, Syz in iterator:
-        mstress.append(calculate_von_mises((Sxx, Syy, Szz, Sxy, Sxz, Syz)))
-    res_obj.StressValues = mstress
+    stress = get_stress_tensors(res_obj)
+    res_obj.StressValues = calculate_von_mises_batch(stress).tolist()
     FreeCAD.Console.PrintMessage('Added StressValues (von Mises).\n')
     return res_obj
 
 
 def add_principal_stress(res_obj):
-    prinstress1 = []
-    prinstress2 = []
-    prinstress3 = []
-    shearstress = []
-    iterator = zip(
+    stress = get_stress_tensors(res_obj)
+    prinstress = calculate_principal_stress_batch(stress)
+    res_obj.PrincipalMax = prinstress[:, 0].tolist()
+    res_obj.PrincipalMed = prinstress[:, 1].tolist()
+    res_obj.PrincipalMin = prinstress[:, 2].tolist()
+    res_obj.MaxShear = prinstress[:, 3].tolist()
+    FreeCAD.Console.PrintMessage('Added principal stress and max shear values.\n')
+    return res_obj
+
+
+def get_stress_tensors(res_obj):
+    '''
+    returns the node stresses of a result object as (N,6) array
+    with the rows (Sxx, Syy, Szz, Sxy, Sxz, Syz)
+    '''
+    components = [
         res_obj.NodeStressXX,
         res_obj.NodeStressYY,
         res_obj.NodeStressZZ,
         res_obj.NodeStressXY,
         res_obj.NodeStressXZ,
         res_obj.NodeStressYZ
-    )
-    for Sxx, Syy, Szz, Sxy, Sxz, Syz in iterator:
-        prin1, prin2, prin3, shear = calculate_principal_stress((Sxx, Syy, Szz, Sxy, Sxz, Syz))
-        prinstress1.append(prin1)
-        prinstress2.append(prin2)
-        prinstress3.append(prin3)
-        shearstress.append(shear)
-    res_obj.PrincipalMax = prinstress1
-    res_obj.PrincipalMed = prinstress2
-    res_obj.PrincipalMin = prinstress3
-    res_obj.MaxShear = shearstress
-    FreeCAD.Console.PrintMessage('Added principal stress and max shear values.\n')
-    return res_obj
+    ]
+    # same as zip, ignore values without all stress components
+    no_of_values = min(len(c) for c in components)
+    return np.array([c[:no_of_values] for c in components], dtype=float).T.reshape(-1, 6)
 
 
 def compact_result(res_obj):
@@ -399,8 +361,45 @@ def calculate_principal_stress(stress_tensor):
     # https://forum.freecadweb.org/viewtopic.php?f=22&t=33911&start=10#p284229
 
 
+def calculate_von_mises_batch(stress_tensors):
+    # same as calculate_von_mises for all rows of a (N,6) array at once
+    # stress_tensors ... rows (Sxx, Syy, Szz, Sxy, Sxz, Syz)
+    stress_tensors = np.asarray(stress_tensors, dtype=float).reshape(-1, 6)
+    normal = stress_tensors[:, :3]
+    shear = stress_tensors[:, 3:]
+    pressure = normal.mean(axis=1)[:, None]
+    return np.sqrt(
+        1.5 * ((normal - pressure)**2).sum(axis=1) + 3.0 * (shear**2).sum(axis=1)
+    )
+
+
+def calculate_principal_stress_batch(stress_tensors):
+    # same as calculate_principal_stress for all rows of a (N,6) array at once
+    # returns a (N,4) array with the rows (prin1, prin2, prin3, maxshear)
+    # rows with NaN values return NaN, as calculate_principal_stress does
+    stress_tensors = np.asarray(stress_tensors, dtype=float).reshape(-1, 6)
+    nan_rows = np.isnan(stress_tensors).any(axis=1)
+    s = np.where(nan_rows[:, None], 0.0, stress_tensors)
+    sigma = np.empty((len(s), 3, 3))
+    sigma[:, 0, 0] = s[:, 0]  # Sxx
+    sigma[:, 1, 1] = s[:, 1]  # Syy
+    sigma[:, 2, 2] = s[:, 2]  # Szz
+    sigma[:, 0, 1] = sigma[:, 1, 0] = s[:, 3]  # Sxy
+    sigma[:, 0, 2] = sigma[:, 2, 0] = s[:, 4]  # Sxz
+    sigma[:, 1, 2] = sigma[:, 2, 1] = s[:, 5]  # Syz
+    prinstress = np.empty((len(s), 4))
+    if len(s):
+        # eigvalsh returns the eigenvalues in ascending order
+        prinstress[:, :3] = np.linalg.eigvalsh(sigma)[:, ::-1]
+    prinstress[:, 3] = (prinstress[:, 0] - prinstress[:, 2]) / 2.0
+    prinstress[nan_rows] = float('NaN')
+    return prinstress
+
+
 def calculate_disp_abs(displacements):
     # see https://forum.freecadweb.org/viewtopic.php?f=18&t=33106&start=100#p296657
-    return [np.linalg.norm(nd) for nd in displacements]
+    if not len(displacements):
+        return []
+    return np.linalg.norm(np.array(displacements, dtype=float), axis=1).tolist()
 
 ##  @}
@@ -43,7 +43,8 @@ from .. import settings
 from . import writer
 
 
-_inputFileName = None
+# input file name by working directory, several machines might run at the same time
+_inputFileNames = {}
 
 
 class Check(run.Check):
@@ -57,7 +58,6 @@ class Check(run.Check):
 class Prepare(run.Prepare):
 
     def run(self):
-        global _inputFileName
         self.pushStatus("Preparing input files...\n")
         c = _Container(self.analysis)
         w = writer.FemInputWriterCcx(
@@ -89,23 +89,25 @@ class Prepare(run.Prepare):
             self.pushStatus("Write completed!")
         else:
             self.pushStatus("Writing CalculiX input file failed!")
-        _inputFileName = os.path.splitext(os.path.basename(path))[0]
+        _inputFileNames[self.directory] = os.path.splitext(os.path.basename(path))[0]
 
 
 class Solve(run.Solve):
 
     def run(self):
-        if not _inputFileName:
+        inputFileName = _inputFileNames.get(self.directory)
+        if not inputFileName:
             # TODO do not run solver
             # do not try to read results in a smarter way than an Exception
             raise Exception('Error on writing CalculiX input file.\n')
         self.pushStatus("Executing solver...\n")
         binary = settings.get_binary("Calculix")
         self._process = subprocess.Popen(
-            [binary, "-i", _inputFileName],
+            [binary, "-i", inputFileName],
             cwd=self.directory,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE)
+            stderr=subprocess.PIPE,
+            env=self._getEnvironment())
         self.signalAbort.add(self._process.terminate)
         output = self._observeSolver(self._process)
         self._process.communicate()
@@ -118,7 +120,8 @@ class Solve(run.Solve):
 class Results(run.Results):
 
     def run(self):
-        if not _inputFileName:
+        inputFileName = _inputFileNames.get(self.directory)
+        if not inputFileName:
             # TODO do not run solver
             # do not try to read results in a smarter way than an Exception
             raise Exception('Error on writing CalculiX input file.\n')
@@ -126,8 +129,8 @@ class Results(run.Results):
             "User parameter:BaseApp/Preferences/Mod/Fem/General")
         if not prefs.GetBool("KeepResultsOnReRun", False):
             self.purge_results()
-        self.load_results_ccxfrd()
-        self.load_results_ccxdat()
+        self.load_results_ccxfrd(inputFileName)
+        self.load_results_ccxdat(inputFileName)
 
     def purge_results(self):
         for m in femutils.get_member(self.analysis, "Fem::FemResultObject"):
@@ -136,9 +139,9 @@ class Results(run.Results):
             self.analysis.Document.removeObject(m.Name)
         FreeCAD.ActiveDocument.recompute()
 
-    def load_results_ccxfrd(self):
+    def load_results_ccxfrd(self, inputFileName):
         frd_result_file = os.path.join(
-            self.directory, _inputFileName + '.frd')
+            self.directory, inputFileName + '.frd')
         if os.path.isfile(frd_result_file):
             result_name_prefix = 'CalculiX_' + self.solver.AnalysisType + '_'
             importCcxFrdResults.importFrd(
@@ -147,9 +150,9 @@ class Results(run.Results):
             raise Exception(
                 'FEM: No results found at {}!'.format(frd_result_file))
 
-    def load_results_ccxdat(self):
+    def load_results_ccxdat(self, inputFileName):
         dat_result_file = os.path.join(
-            self.directory, _inputFileName + '.dat')
+            self.directory, inputFileName + '.dat')
         if os.path.isfile(dat_result_file):
             mode_frequencies = importCcxDatResults.import_dat(
                 dat_result_file, self.analysis)
@@ -26,14 +26,19 @@ __url__ = "http://www.freecadweb.org"
 ## \addtogroup FEM
 #  @{
 
+import collections
+import multiprocessing
 import os
 import os.path
 import tempfile
 import threading
 import shutil
 
+from six.moves import queue
+
 import FreeCAD as App
 import femtools.femutils as femutils
+from . import report
 from . import settings
 from . import signal
 from . import task
@@ -236,6 +241,7 @@ class BaseTask(task.Thread):
         self.solver = None
         self.directory = None
         self.testmode = None
+        self.threads = None
 
     @property
     def analysis(self):
@@ -260,6 +266,8 @@ class Machine(BaseTask):
         self._pendingState = None
         self._isReset = False
         self.testmode = testmode
+        # number of threads of the solver process, None uses the system setting
+        self.threads = None
 
     @property
     def state(self):
@@ -305,6 +313,7 @@ class Machine(BaseTask):
             t.solver = self.solver
             t.directory = self.directory
             t.testmode = self.testmode
+            t.threads = self.threads
 
     def _applyPending(self):
         if not self._isReset:
@@ -382,6 +391,15 @@ class Check(BaseTask):
 
 class Solve(BaseTask):
 
+    def _getEnvironment(self):
+        # environment of the solver process, the number of threads
+        # is set if the job is run by a Scheduler
+        if self.threads is None:
+            return None
+        env = dict(os.environ)
+        env["OMP_NUM_THREADS"] = str(self.threads)
+        return env
+
     def _observeSolver(self, process):
         output = ""
         line = femutils.pydecode(process.stdout.readline())
@@ -404,6 +422,164 @@ class Results(BaseTask):
     pass
 
 
+class Scheduler(task.Thread):
+    """ Runs the machines of several solvers, e.g. of a parameter study.
+
+    Check and prepare of the jobs as well as the loading of the results
+    use the document and run one after the other in the scheduler thread.
+    Up to maxJobs solver processes run at the same time, each with
+    threads OpenMP threads. The results of a job are loaded as soon as
+    its solver process has finished. The status lines of the jobs are
+    pushed with the solver label, signalJobFinished is notified with the
+    machine of every finished job. If workingDir is given every solver
+    runs in a subdirectory named by the solver label.
+    """
+
+    def __init__(
+            self, solvers, maxJobs=None, threads=None,
+            cpuBudget=None, workingDir=None):
+        super(Scheduler, self).__init__()
+        self.solvers = list(solvers)
+        self.workingDir = workingDir
+        self.machines = []
+        self.signalJobFinished = set()
+        if cpuBudget is None:
+            cpuBudget = multiprocessing.cpu_count()
+        if maxJobs is None:
+            if threads is None:
+                maxJobs = cpuBudget
+            else:
+                maxJobs = cpuBudget // threads
+        self.maxJobs = max(1, min(maxJobs, len(self.solvers)))
+        if threads is None:
+            threads = cpuBudget // self.maxJobs
+        self.threads = max(1, threads)
+        self._finished = queue.Queue()
+        self._statusProxies = {}
+
+    def run(self):
+        self.pushStatus(
+            "Running {} jobs, {} at the same time with {} threads each.\n"
+            .format(len(self.solvers), self.maxJobs, self.threads)
+        )
+        pending = collections.deque(self._getMachines())
+        running = []
+
+        def killer():
+            for m in running:
+                m.abort()
+        self.signalAbort.add(killer)
+        while (pending or running) and not self.aborted:
+            while pending and len(running) < self.maxJobs and not self.aborted:
+                m = pending.popleft()
+                self._runMachine(m, PREPARE)
+                if m.failed or m.aborted:
+                    self._finishJob(m)
+                    continue
+                self._startSolve(m)
+                running.append(m)
+            if running:
+                m = self._finished.get()
+                running.remove(m)
+                m.join()
+                self._collectReport(m)
+                if not (m.failed or m.aborted or self.aborted):
+                    self._runMachine(m, RESULTS)
+                self._finishJob(m)
+        self.signalAbort.remove(killer)
+        # after an abort the killed jobs are finished like the others,
+        # the jobs which were never started only lose their status proxy
+        for m in running:
+            m.join()
+            self._collectReport(m)
+            self._finishJob(m)
+        for m in pending:
+            m.threads = None
+            m.signalStatus.discard(self._statusProxies.pop(m))
+
+    def _getMachines(self):
+        for solver in self.solvers:
+            if not hasattr(solver.Proxy, "createMachine"):
+                self.report.warning(
+                    "%s: solver is not supported by the scheduler." % solver.Label)
+                continue
+            try:
+                if self.workingDir is not None:
+                    path = os.path.join(self.workingDir, solver.Label)
+                    if not os.path.isdir(path):
+                        os.makedirs(path)
+                    m = getMachine(solver, path)
+                else:
+                    m = getMachine(solver)
+            except (MustSaveError, DirectoryDoesNotExistError):
+                self.report.error(
+                    "%s: no working directory available." % solver.Label)
+                continue
+            if m.running:
+                self.report.warning(
+                    "%s: solver is already running." % solver.Label)
+                continue
+            m.threads = self.threads
+            m.reset()
+            self._statusProxies[m] = self._getStatusProxy(m)
+            m.signalStatus.add(self._statusProxies[m])
+            self.machines.append(m)
+            yield m
+
+    def _getStatusProxy(self, m):
+        def statusProxy(line):
+            self.pushStatus("%s: %s" % (m.solver.Label, line))
+        return statusProxy
+
+    def _runMachine(self, m, target):
+        m.target = target
+        m.start()
+        m.join()
+        self._collectReport(m)
+
+    def _startSolve(self, m):
+        def waitForSolve():
+            m.join()
+            self._finished.put(m)
+        m.target = SOLVE
+        m.start()
+        thread = threading.Thread(target=waitForSolve)
+        thread.daemon = True
+        thread.start()
+
+    def _collectReport(self, m):
+        jobReport = report.Report()
+        for i in m.report.infos:
+            jobReport.info("%s: %s" % (m.solver.Label, i))
+        for w in m.report.warnings:
+            jobReport.warning("%s: %s" % (m.solver.Label, w))
+        for e in m.report.errors:
+            jobReport.error("%s: %s" % (m.solver.Label, e))
+        self.report.extend(jobReport)
+
+    def _finishJob(self, m):
+        m.threads = None
+        m.signalStatus.discard(self._statusProxies.pop(m))
+        if m.failed:
+            self.pushStatus("%s: failed.\n" % m.solver.Label)
+        elif m.aborted:
+            self.pushStatus("%s: aborted.\n" % m.solver.Label)
+        else:
+            self.pushStatus("%s: finished.\n" % m.solver.Label)
+        signal.notify(self.signalJobFinished, m)
+
+
+def run_fem_solvers(solvers, maxJobs=None, threads=None, working_dir=None):
+    """ Runs the solvers with a Scheduler and waits for all jobs. """
+    _DocObserver.attach()
+    scheduler = Scheduler(solvers, maxJobs, threads, workingDir=working_dir)
+    scheduler.signalStatus.add(App.Console.PrintMessage)
+    scheduler.start()
+    scheduler.join()
+    report.display(scheduler.report, "Solver Scheduler")
+    return scheduler
+
+
 class _DocObserver(object):
 
     _instance = None
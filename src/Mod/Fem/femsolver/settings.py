@@ -35,6 +35,7 @@ Parameter editor: menu Tools --> Edit parameter
 '''
 
 import FreeCAD
+import os
 
 
 # working directory: possible choices
@@ -166,4 +167,28 @@ def get_dir_setting():
         return CUSTOM
 
 
+# ******** constraint cache parameter ************************************************************
+def get_constraint_cache_dir():
+    '''
+    directory where the input writer stores the mesh nodes and faces of the
+    constraint references, an empty string if the cache is not used
+    '''
+    param_group = FreeCAD.ParamGet(_GENERAL_PARAM)
+    if not param_group.GetBool("UseConstraintCache", True):
+        return ""
+    cache_dir = param_group.GetString("ConstraintCachePath")
+    if not cache_dir:
+        cache_dir = os.path.join(FreeCAD.getUserAppDataDir(), "Fem", "ConstraintCache")
+    return cache_dir
+
+
+def get_constraint_cache_size():
+    '''
+    maximal size of all constraint cache files in MB,
+    the least recently used files are removed
+    '''
+    param_group = FreeCAD.ParamGet(_GENERAL_PARAM)
+    return param_group.GetInt("ConstraintCacheSize", 64)
+
+
 ##  @}
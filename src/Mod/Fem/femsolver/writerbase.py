@@ -28,7 +28,11 @@ __url__ = "http://www.freecadweb.org"
 
 import FreeCAD
 from femmesh import meshtools
+from . import settings
+import hashlib
 import os
+import pickle
+import tempfile
 
 
 class FemInputWriter():
@@ -113,14 +117,109 @@ class FemInputWriter():
         self.femnodes_mesh = {}
         self.femelement_table = {}
         self.constraint_conflict_nodes = []
-        self.femnodes_ele_table = {}
+        self.femnodes_ele_table = None
         self.femelements_edges_only = []
         self.femelements_faces_only = []
         self.femelement_volumes_table = {}
         self.femelement_faces_table = {}
         self.femelement_edges_table = {}
         self.femelement_count_test = True
+        # disk cache of the mesh nodes and faces found for the constraint references
+        self.constraint_cache_dir = settings.get_constraint_cache_dir()
+        self.femmesh_hash = None
 
+    # ********************************************************************************************
+    # constraint cache
+    # The search for the mesh nodes and faces of the constraint references is the most time
+    # consuming part of writing the input file. The results are stored on disk. They are keyed
+    # by the hash of the mesh and the geometry of the references. Thus rewriting an analysis
+    # after changing a material or a solver setting does not search the mesh again.
+    def get_femmesh_hash(self):
+        if self.femmesh_hash is None:
+            sha = hashlib.sha1()
+            # the C++ mesh writer is much faster than reading the mesh data in Python
+            # the file is a temporary file, the solver working dir is not touched
+            file_handle, mesh_file = tempfile.mkstemp(suffix='.inp')
+            os.close(file_handle)
+            try:
+                self.femmesh.writeABAQUS(mesh_file, 1, False)
+                with open(mesh_file, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        sha.update(chunk)
+            finally:
+                os.remove(mesh_file)
+            # node sets might be taken from the mesh group data
+            for group_id in self.femmesh.Groups:
+                sha.update(repr((
+                    self.femmesh.getGroupName(group_id),
+                    self.femmesh.getGroupElements(group_id)
+                )).encode('utf-8'))
+            self.femmesh_hash = sha.hexdigest()
+        return self.femmesh_hash
+
+    def get_constraint_cache_key(self, femobj, data_type, key_values=()):
+        sha = hashlib.sha1()
+        sha.update(self.get_femmesh_hash().encode('utf-8'))
+        sha.update(repr((data_type, key_values)).encode('utf-8'))
+        # the mesh group data of a constraint is found by the constraint name
+        sha.update(femobj['Object'].Name.encode('utf-8'))
+        for ref_obj, ref_elements in femobj['Object'].References:
+            sha.update(ref_obj.Name.encode('utf-8'))
+            for ref_element in ref_elements:
+                sha.update(ref_element.encode('utf-8'))
+                ref_shape = meshtools.get_element(ref_obj, ref_element)
+                sha.update(ref_shape.exportBrepToString().encode('utf-8'))
+        return sha.hexdigest()
+
+    def get_cached_constraint_data(self, femobj, data_type, get_data, key_values=()):
+        '''returns the data of the function get_data, the data is read from the
+        constraint cache if the mesh and the constraint references did not change
+        key_values are additional values the data depends on
+        '''
+        if not self.constraint_cache_dir or not femobj['Object'].References:
+            return get_data()
+        try:
+            cache_file = os.path.join(
+                self.constraint_cache_dir,
+                self.get_constraint_cache_key(femobj, data_type, key_values) + '.pickle'
+            )
+        except Exception as e:
+            FreeCAD.Console.PrintWarning(
+                '  Constraint cache not used: {}\n'.format(e)
+            )
+            return get_data()
+        if os.path.isfile(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    data = pickle.load(f)
+                # the modification time is the last use for the LRU eviction
+                os.utime(cache_file, None)
+                FreeCAD.Console.PrintMessage(
+                    '  {} of {} taken from the constraint cache.\n'
+                    .format(data_type, femobj['Object'].Name)
+                )
+                return data
+            except Exception:
+                FreeCAD.Console.PrintWarning(
+                    '  Constraint cache file could not be read: {}\n'.format(cache_file)
+                )
+        data = get_data()
+        try:
+            if not os.path.isdir(self.constraint_cache_dir):
+                os.makedirs(self.constraint_cache_dir)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(data, f, 2)
+            evict_constraint_cache(
+                self.constraint_cache_dir,
+                settings.get_constraint_cache_size() * 1024 * 1024
+            )
+        except (IOError, OSError):
+            FreeCAD.Console.PrintWarning(
+                '  Constraint cache file could not be written: {}\n'.format(cache_file)
+            )
+        return data
+
+    # ********************************************************************************************
     def get_constraints_fixed_nodes(self):
         # get nodes
         for femobj in self.fixed_objects:
@@ -128,9 +227,13 @@ class FemInputWriter():
             FreeCAD.Console.PrintMessage(
                 "Constraint fixed:" + ' ' + femobj['Object'].Name + '\n'
             )
-            femobj['Nodes'] = meshtools.get_femnodes_by_femobj_with_references(
-                self.femmesh,
-                femobj
+            femobj['Nodes'] = self.get_cached_constraint_data(
+                femobj,
+                'Nodes',
+                lambda: meshtools.get_femnodes_by_femobj_with_references(
+                    self.femmesh,
+                    femobj
+                )
             )
             # add nodes to constraint_conflict_nodes, needed by constraint plane rotation
             for node in femobj['Nodes']:
@@ -167,9 +270,13 @@ class FemInputWriter():
             FreeCAD.Console.PrintMessage(
                 "Constraint displacement:" + ' ' + femobj['Object'].Name + '\n'
             )
-            femobj['Nodes'] = meshtools.get_femnodes_by_femobj_with_references(
-                self.femmesh,
-                femobj
+            femobj['Nodes'] = self.get_cached_constraint_data(
+                femobj,
+                'Nodes',
+                lambda: meshtools.get_femnodes_by_femobj_with_references(
+                    self.femmesh,
+                    femobj
+                )
             )
             # add nodes to constraint_conflict_nodes, needed by constraint plane rotation
             for node in femobj['Nodes']:
@@ -182,9 +289,13 @@ class FemInputWriter():
             FreeCAD.Console.PrintMessage(
                 "Constraint plane rotation:" + ' ' + femobj['Object'].Name + '\n'
             )
-            femobj['Nodes'] = meshtools.get_femnodes_by_femobj_with_references(
-                self.femmesh,
-                femobj
+            femobj['Nodes'] = self.get_cached_constraint_data(
+                femobj,
+                'Nodes',
+                lambda: meshtools.get_femnodes_by_femobj_with_references(
+                    self.femmesh,
+                    femobj
+                )
             )
 
     def get_constraints_transform_nodes(self):
@@ -194,9 +305,13 @@ class FemInputWriter():
             FreeCAD.Console.PrintMessage(
                 "Constraint transform nodes:" + ' ' + femobj['Object'].Name + '\n'
             )
-            femobj['Nodes'] = meshtools.get_femnodes_by_femobj_with_references(
-                self.femmesh,
-                femobj
+            femobj['Nodes'] = self.get_cached_constraint_data(
+                femobj,
+                'Nodes',
+                lambda: meshtools.get_femnodes_by_femobj_with_references(
+                    self.femmesh,
+                    femobj
+                )
             )
 
     def get_constraints_temperature_nodes(self):
@@ -206,9 +321,13 @@ class FemInputWriter():
             FreeCAD.Console.PrintMessage(
                 "Constraint temperature:" + ' ' + femobj['Object'].Name + '\n'
             )
-            femobj['Nodes'] = meshtools.get_femnodes_by_femobj_with_references(
-                self.femmesh,
-                femobj
+            femobj['Nodes'] = self.get_cached_constraint_data(
+                femobj,
+                'Nodes',
+                lambda: meshtools.get_femnodes_by_femobj_with_references(
+                    self.femmesh,
+                    femobj
+                )
             )
 
     def get_constraints_fluidsection_nodes(self):
@@ -218,44 +337,16 @@ class FemInputWriter():
             FreeCAD.Console.PrintMessage(
                 "Constraint fluid section:" + ' ' + femobj['Object'].Name + '\n'
             )
-            femobj['Nodes'] = meshtools.get_femnodes_by_femobj_with_references(
-                self.femmesh,
-                femobj
+            femobj['Nodes'] = self.get_cached_constraint_data(
+                femobj,
+                'Nodes',
+                lambda: meshtools.get_femnodes_by_femobj_with_references(
+                    self.femmesh,
+                    femobj
+                )
             )
 
     def get_constraints_force_nodeloads(self):
-        # check shape type of reference shape
-        for femobj in self.force_objects:
-            # femobj --> dict, FreeCAD document object is femobj['Object']
-            FreeCAD.Console.PrintMessage(
-                "Constraint force:" + ' ' + femobj['Object'].Name + '\n'
-            )
-            frc_obj = femobj['Object']
-            if femobj['RefShapeType'] == 'Vertex':
-                FreeCAD.Console.PrintLog(
-                    "load on vertices --> we do not need the "
-                    "femelement_table and femnodes_mesh for node load calculation"
-                )
-            elif femobj['RefShapeType'] == 'Face' \
-                    and meshtools.is_solid_femmesh(self.femmesh) \
-                    and not meshtools.has_no_face_data(self.femmesh):
-                FreeCAD.Console.PrintLog(
-                    "solid_mesh with face data --> we do not need the "
-                    "femelement_table but we need the femnodes_mesh for node load calculation"
-                )
-                if not self.femnodes_mesh:
-                    self.femnodes_mesh = self.femmesh.Nodes
-            else:
-                FreeCAD.Console.PrintLog(
-                    "mesh without needed data --> we need the "
-                    "femelement_table and femnodes_mesh for node load calculation"
-                )
-                if not self.femnodes_mesh:
-                    self.femnodes_mesh = self.femmesh.Nodes
-                if not self.femelement_table:
-                    self.femelement_table = meshtools.get_femelement_table(
-                        self.femmesh
-                    )
         # get node loads
         FreeCAD.Console.PrintMessage(
             "  Finite element mesh nodes will be retrieved by searching "
@@ -267,26 +358,65 @@ class FemInputWriter():
         )
         for femobj in self.force_objects:
             # femobj --> dict, FreeCAD document object is femobj['Object']
+            FreeCAD.Console.PrintMessage(
+                "Constraint force:" + ' ' + femobj['Object'].Name + '\n'
+            )
             frc_obj = femobj['Object']
             if frc_obj.Force == 0:
                 FreeCAD.Console.PrintMessage('  Warning --> Force = 0\n')
-            if femobj['RefShapeType'] == 'Vertex':  # point load on vertices
-                femobj['NodeLoadTable'] = meshtools.get_force_obj_vertex_nodeload_table(
-                    self.femmesh,
-                    frc_obj
-                )
-            elif femobj['RefShapeType'] == 'Edge':  # line load on edges
-                femobj['NodeLoadTable'] = meshtools.get_force_obj_edge_nodeload_table(
-                    self.femmesh,
-                    self.femelement_table,
-                    self.femnodes_mesh, frc_obj
-                )
-            elif femobj['RefShapeType'] == 'Face':  # area load on faces
-                femobj['NodeLoadTable'] = meshtools.get_force_obj_face_nodeload_table(
-                    self.femmesh,
-                    self.femelement_table,
-                    self.femnodes_mesh, frc_obj
+            femobj['NodeLoadTable'] = self.get_cached_constraint_data(
+                femobj,
+                'NodeLoadTable',
+                lambda: self.get_force_obj_nodeload_table(femobj),
+                (femobj['RefShapeType'], frc_obj.Force)
+            )
+
+    def get_force_obj_nodeload_table(self, femobj):
+        # check shape type of reference shape
+        # the mesh data is only retrieved if the node loads are not in the constraint cache
+        frc_obj = femobj['Object']
+        if femobj['RefShapeType'] == 'Vertex':
+            FreeCAD.Console.PrintLog(
+                "load on vertices --> we do not need the "
+                "femelement_table and femnodes_mesh for node load calculation"
+            )
+        elif femobj['RefShapeType'] == 'Face' \
+                and meshtools.is_solid_femmesh(self.femmesh) \
+                and not meshtools.has_no_face_data(self.femmesh):
+            FreeCAD.Console.PrintLog(
+                "solid_mesh with face data --> we do not need the "
+                "femelement_table but we need the femnodes_mesh for node load calculation"
+            )
+            if not self.femnodes_mesh:
+                self.femnodes_mesh = self.femmesh.Nodes
+        else:
+            FreeCAD.Console.PrintLog(
+                "mesh without needed data --> we need the "
+                "femelement_table and femnodes_mesh for node load calculation"
+            )
+            if not self.femnodes_mesh:
+                self.femnodes_mesh = self.femmesh.Nodes
+            if not self.femelement_table:
+                self.femelement_table = meshtools.get_femelement_table(
+                    self.femmesh
                 )
+        if femobj['RefShapeType'] == 'Vertex':  # point load on vertices
+            return meshtools.get_force_obj_vertex_nodeload_table(
+                self.femmesh,
+                frc_obj
+            )
+        elif femobj['RefShapeType'] == 'Edge':  # line load on edges
+            return meshtools.get_force_obj_edge_nodeload_table(
+                self.femmesh,
+                self.femelement_table,
+                self.femnodes_mesh, frc_obj
+            )
+        elif femobj['RefShapeType'] == 'Face':  # area load on faces
+            return meshtools.get_force_obj_face_nodeload_table(
+                self.femmesh,
+                self.femelement_table,
+                self.femnodes_mesh, frc_obj
+            )
 
     def get_constraints_pressure_faces(self):
         # TODO see comments in get_constraints_force_nodeloads()
@@ -304,29 +434,34 @@ class FemInputWriter():
             # print(femobj['PressureFaces'])
         '''
 
-        if not self.femnodes_mesh:
-            self.femnodes_mesh = self.femmesh.Nodes
-        if not self.femelement_table:
-            self.femelement_table = meshtools.get_femelement_table(self.femmesh)
-        if not self.femnodes_ele_table:
-            self.femnodes_ele_table = meshtools.get_femnodes_ele_table(
-                self.femnodes_mesh,
-                self.femelement_table
-            )
-
         for femobj in self.pressure_objects:
             # femobj --> dict, FreeCAD document object is femobj['Object']
             FreeCAD.Console.PrintMessage(
                 "Constraint pressure: " + femobj['Object'].Name + '\n'
             )
-            pressure_faces = meshtools.get_pressure_obj_faces(
-                self.femmesh,
-                self.femelement_table,
-                self.femnodes_ele_table, femobj
+            pressure_faces = self.get_cached_constraint_data(
+                femobj,
+                'PressureFaces',
+                lambda: self.get_pressure_obj_faces(femobj)
             )
             femobj['PressureFaces'] = [(femobj['Object'].Name + ': face load', pressure_faces)]
             FreeCAD.Console.PrintLog('{}\n'.format(femobj['PressureFaces']))
 
+    def get_pressure_obj_faces(self, femobj):
+        # the mesh data is only retrieved if the faces are not in the constraint cache
+        if not self.femnodes_mesh:
+            self.femnodes_mesh = self.femmesh.Nodes
+        if not self.femelement_table:
+            self.femelement_table = meshtools.get_femelement_table(self.femmesh)
+        if not self.femnodes_ele_table:
+            # node to element incidence index, built once per mesh
+            self.femnodes_ele_table = meshtools.get_femelement_index(self.femmesh)
+        return meshtools.get_pressure_obj_faces(
+            self.femmesh,
+            self.femelement_table,
+            self.femnodes_ele_table, femobj
+        )
+
     def get_element_geometry2D_elements(self):
         # get element ids and write them into the objects
         FreeCAD.Console.PrintMessage('Shell thicknesses\n')
@@ -409,10 +544,7 @@ class FemInputWriter():
                 if not self.femnodes_mesh:
                     self.femnodes_mesh = self.femmesh.Nodes
                 if not self.femnodes_ele_table:
-                    self.femnodes_ele_table = meshtools.get_femnodes_ele_table(
-                        self.femnodes_mesh,
-                        self.femelement_table
-                    )
+                    self.femnodes_ele_table = meshtools.get_femelement_index(self.femmesh)
                 control = meshtools.get_femelement_sets(
                     self.femmesh,
                     self.femelement_table,
@@ -443,4 +575,23 @@ class FemInputWriter():
                 self.material_objects
             )
 
+
+def evict_constraint_cache(cache_dir, max_size):
+    '''removes the least recently used constraint data until
+    the cache files in cache_dir do not need more than max_size bytes
+    '''
+    cache_files = []
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.pickle'):
+            file_path = os.path.join(cache_dir, file_name)
+            file_stat = os.stat(file_path)
+            cache_files.append((file_stat.st_mtime, file_stat.st_size, file_path))
+    cache_size = sum(size for mtime, size, file_path in cache_files)
+    for mtime, size, file_path in sorted(cache_files):
+        if cache_size <= max_size:
+            break
+        os.remove(file_path)
+        cache_size -= size
+
+
 ##  @}
@@ -99,7 +99,8 @@ class Solve(run.Solve):
             [binary, "-t", "-choly"],
             cwd=self.directory,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE)
+            stderr=subprocess.PIPE,
+            env=self._getEnvironment())
         self.signalAbort.add(self._process.terminate)
         output = self._observeSolver(self._process)
         self._process.communicate()
@@ -111,7 +112,8 @@ class Solve(run.Solve):
             [binary, "-c", "-choly"],
             cwd=self.directory,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE)
+            stderr=subprocess.PIPE,
+            env=self._getEnvironment())
         self.signalAbort.add(self._process.terminate)
         output = self._observeSolver(self._process)
         self._process.communicate()
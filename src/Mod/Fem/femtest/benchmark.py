@@ -0,0 +1,566 @@
+# ***************************************************************************
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This file is part of the FreeCAD CAx development system.              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   FreeCAD is distributed in the hope that it will be useful,            *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with FreeCAD; if not, write to the Free Software        *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************/
+
+__title__ = "Benchmark of the FEM CalculiX pipeline"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+
+'''
+Times the CalculiX input file writing, frd result reading with the line based and the
+streaming reader and result post-processing
+on generated structured box meshes of Tetra10 and Hexa20 elements.
+CalculiX is not needed, the frd result files are generated from the mesh and a
+synthetic result field and stored in the FEM test temp directory for reuse.
+Every step is reported with its wall time and peak memory in a JSON file,
+reports of different commits can be compared with compare_reports().
+
+# run from within FreeCAD or from shell in build dir
+./bin/FreeCADCmd -c "from femtest import benchmark; benchmark.run()"
+./bin/FreeCADCmd -c "from femtest import benchmark; benchmark.run(sizes=[10000], report_file='/tmp/fem_bench.json')"
+
+# compare two reports
+from femtest import benchmark
+benchmark.compare_reports('/tmp/fem_bench_old.json', '/tmp/fem_bench_new.json')
+'''
+
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from os.path import join
+
+import numpy as np
+
+import FreeCAD
+from . import utilstest as testtools
+from .utilstest import fcc_print
+
+
+# version of the generated meshes and frd files, increase it if they change
+FIXTURE_VERSION = 1
+
+# element type: (frd element type, edges of the midside nodes in frd node order)
+# corner offsets are in half element size units of the structured grid
+element_types = {
+    'tetra10': (6, (
+        (0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3)
+    )),
+    'hexa20': (4, (
+        (0, 1), (1, 2), (2, 3), (3, 0),
+        (0, 4), (1, 5), (2, 6), (3, 7),
+        (4, 5), (5, 6), (6, 7), (7, 4)
+    )),
+}
+
+hexa_corners = np.array([
+    (0, 0, 0), (2, 0, 0), (2, 2, 0), (0, 2, 0),
+    (0, 0, 2), (2, 0, 2), (2, 2, 2), (0, 2, 2)
+])
+
+
+# ********* mesh and frd fixture generation *******************************************************
+def get_tetra_corners(
+):
+    ''' the six tetrahedra of the Kuhn split of a cube, all share the cube diagonal
+    the split is conforming between neighbor cubes, the tetrahedra are positive oriented
+    '''
+    tetras = []
+    for axes in ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)):
+        corner = np.zeros(3, dtype=int)
+        corners = [corner.copy()]
+        for axis in axes:
+            corner[axis] = 2
+            corners.append(corner.copy())
+        corners = np.array(corners)
+        edges = corners[1:] - corners[0]
+        if np.linalg.det(edges) < 0:
+            corners = corners[[0, 2, 1, 3]]
+        tetras.append(corners)
+    return tetras
+
+
+def get_cell_count(
+    element_type,
+    elements
+):
+    ''' number of cells per box edge to get about the given number of elements
+    '''
+    per_cell = 6 if element_type == 'tetra10' else 1
+    return max(1, int(round((float(elements) / per_cell) ** (1.0 / 3.0))))
+
+
+def make_box_mesh_arrays(
+    element_type,
+    cells,
+    size=1.0
+):
+    ''' makes a structured mesh of a box with cells**3 cubes of edge length size
+    the cubes are split into six tetra10 or kept as one hexa20 element
+    returns the mesh arrays of importToolsFem.make_femmesh_from_arrays()
+    and the element nodes in frd node order
+    '''
+    from feminout.importCcxFrdResults import frd_element_types
+    frd_type, mid_edges = element_types[element_type]
+    key, count, order = frd_element_types[frd_type]
+    if element_type == 'tetra10':
+        cell_corners = get_tetra_corners()
+    else:
+        cell_corners = [hexa_corners]
+
+    # grid points are indexed on a grid with half the element size
+    points = 2 * cells + 1
+    base = np.indices((cells, cells, cells)).reshape(3, -1).T * 2
+    grid_nodes = []
+    for corners in cell_corners:
+        mids = np.array([(corners[a] + corners[b]) // 2 for a, b in mid_edges])
+        offsets = np.vstack((corners, mids))
+        positions = base[:, np.newaxis, :] + offsets[np.newaxis, :, :]
+        grid_nodes.append(
+            positions[:, :, 0] + points * (positions[:, :, 1] + points * positions[:, :, 2])
+        )
+    grid_nodes = np.vstack(grid_nodes)
+
+    # only the grid points used by the elements are nodes
+    used, element_nodes = np.unique(grid_nodes, return_inverse=True)
+    element_nodes = element_nodes.reshape(grid_nodes.shape) + 1
+    grid = np.column_stack((used % points, (used // points) % points, used // points ** 2))
+    element_ids = np.arange(1, len(element_nodes) + 1)
+    mesh_arrays = {
+        'NodeIds': np.arange(1, len(used) + 1),
+        'NodeCoords': grid * (size / 2.0),
+        key: (element_ids, element_nodes[:, list(order)])
+    }
+    return mesh_arrays, element_nodes
+
+
+def get_result_field(
+    coords
+):
+    ''' smooth synthetic displacements and stresses (frd component order) for the nodes
+    '''
+    length = max(coords.max(), 1.0)
+    x, y, z = (coords / length).T
+    disp = 1e-3 * np.column_stack((x * z, y * z, -0.5 * (x * x + y * y)))
+    stress = np.column_stack((
+        100.0 * (1.0 - z),
+        50.0 * x - 20.0,
+        20.0 * y,
+        10.0 * x * y,
+        5.0 * y * z,
+        -5.0 * z * x
+    ))
+    return disp, stress
+
+
+def write_frd_file(
+    frd_file,
+    element_type,
+    mesh_arrays,
+    frd_element_nodes
+):
+    ''' writes the mesh and a static result step with DISP and STRESS like CalculiX does
+    '''
+    frd_type = element_types[element_type][0]
+    node_ids = mesh_arrays['NodeIds'].tolist()
+    coords = mesh_arrays['NodeCoords']
+    disp, stress = get_result_field(coords)
+    node_count = len(node_ids)
+    element_count = len(frd_element_nodes)
+    with open(frd_file, 'w') as f:
+        f.write('    1C\n')
+        f.write('    1UUSER\n')
+        f.write('    1UPGM               CalculiX\n')
+        f.write('    1UMAT    1MECHANICALMATERIAL\n')
+        f.write('    2C{:>30d}{:>37d}\n'.format(node_count, 1))
+        f.writelines(
+            ' -1%10d%12.5E%12.5E%12.5E\n' % (n, c[0], c[1], c[2])
+            for n, c in zip(node_ids, coords.tolist())
+        )
+        f.write(' -3\n')
+        f.write('    3C{:>30d}{:>37d}\n'.format(element_count, 1))
+        node_line = ' -2' + '%10d' * 10 + '\n'
+        # Tetra10 and Hexa20 have one and two full lines of ten nodes
+        for e, nodes in enumerate(frd_element_nodes.tolist()):
+            f.write(' -1%10d%5d%5d%5d\n' % (e + 1, frd_type, 0, 1))
+            for i in range(0, len(nodes), 10):
+                f.write(node_line % tuple(nodes[i:i + 10]))
+        f.write(' -3\n')
+        blocks = (
+            ('DISP', 1, disp, (
+                ' -5  D1          1    2    1    0\n',
+                ' -5  D2          1    2    2    0\n',
+                ' -5  D3          1    2    3    0\n',
+                ' -5  ALL         1    2    0    0    1ALL\n'
+            )),
+            ('STRESS', 2, stress, (
+                ' -5  SXX         1    4    1    1\n',
+                ' -5  SYY         1    4    2    2\n',
+                ' -5  SZZ         1    4    3    3\n',
+                ' -5  SXY         1    4    1    2\n',
+                ' -5  SYZ         1    4    2    3\n',
+                ' -5  SZX         1    4    3    1\n'
+            )),
+        )
+        for name, step, values, components in blocks:
+            columns = values.shape[1]
+            f.write('    1PSTEP{:>26d}{:>12d}{:>12d}\n'.format(step, 1, 1))
+            f.write('  100CL  101 1.000000000{:>12d}{:>22d}{:>5d}{:>12d}\n'.format(
+                node_count, 0, 1, 1
+            ))
+            f.write(' -4  {:<8s}{:>5d}    1\n'.format(name, columns if columns == 6 else 4))
+            f.writelines(components)
+            value_line = ' -1%10d' + '%12.5E' * columns + '\n'
+            f.writelines(
+                value_line % ((n, ) + tuple(v))
+                for n, v in zip(node_ids, values.tolist())
+            )
+            f.write(' -3\n')
+        f.write(' 9999\n')
+    return frd_file
+
+
+def get_fixture(
+    element_type,
+    elements
+):
+    ''' returns the mesh arrays and the path of the stored frd file of a generated box mesh
+    the frd file is written on first use only
+    '''
+    cells = get_cell_count(element_type, elements)
+    mesh_arrays, frd_element_nodes = make_box_mesh_arrays(element_type, cells)
+    fixture_dir = testtools.get_unit_test_tmp_dir(
+        testtools.get_fem_test_tmp_dir(),
+        'FEM_benchmark'
+    )
+    frd_file = join(
+        fixture_dir,
+        'box_v{}_{}_{}.frd'.format(FIXTURE_VERSION, element_type, cells)
+    )
+    if not os.path.isfile(frd_file):
+        fcc_print('Writing frd fixture {}'.format(frd_file))
+        write_frd_file(frd_file + '.part', element_type, mesh_arrays, frd_element_nodes)
+        os.rename(frd_file + '.part', frd_file)
+    return cells, mesh_arrays, frd_file
+
+
+# ********* measurement ***************************************************************************
+def get_proc_status_bytes(
+    key
+):
+    ''' reads a memory value (VmRSS, VmHWM) of this process on Linux, None elsewhere
+    '''
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(key + ':'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError, ValueError):
+        pass
+    return None
+
+
+def reset_peak_memory(
+):
+    ''' resets the peak resident set size VmHWM of this process, Linux only
+    '''
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except (IOError, OSError):
+        return False
+
+
+def measure(
+    func,
+    *args
+):
+    ''' calls func(*args), returns its result and a dict with the wall time in seconds
+    and the peak memory in bytes used above the memory in use before the call
+    the peak memory is the resident set size, it includes the C++ allocations of FemMesh
+    it is None if the peak of the process can not be reset
+    '''
+    gc.collect()
+    reset = reset_peak_memory()
+    before = get_proc_status_bytes('VmRSS')
+    start = time.time()
+    result = func(*args)
+    wall_time = time.time() - start
+    peak = get_proc_status_bytes('VmHWM')
+    if reset and before is not None and peak is not None:
+        peak_memory = max(0, peak - before)
+    else:
+        peak_memory = None
+    return result, {'time': wall_time, 'peak_memory': peak_memory}
+
+
+# ********* pipeline steps ************************************************************************
+def make_analysis(
+    doc,
+    cells,
+    femmesh
+):
+    ''' static analysis of the box with a fixed and a force constraint
+    the box geometry fits the generated mesh, which is needed for the reference shape lookups
+    '''
+    import ObjectsFem
+    box = doc.addObject("Part::Box", "Box")
+    box.Length = cells
+    box.Width = cells
+    box.Height = cells
+    analysis = ObjectsFem.makeAnalysis(doc, 'Analysis')
+    solver_object = ObjectsFem.makeSolverCalculixCcxTools(doc, 'CalculiX')
+    solver_object.AnalysisType = 'static'
+    solver_object.GeometricalNonlinearity = 'linear'
+    solver_object.SplitInputWriter = False
+    analysis.addObject(solver_object)
+    material_object = ObjectsFem.makeMaterialSolid(doc, 'MechanicalMaterial')
+    mat = material_object.Material
+    mat['Name'] = "Steel-Generic"
+    mat['YoungsModulus'] = "200000 MPa"
+    mat['PoissonRatio'] = "0.30"
+    mat['Density'] = "7900 kg/m^3"
+    material_object.Material = mat
+    analysis.addObject(material_object)
+    fixed_constraint = doc.addObject("Fem::ConstraintFixed", "FemConstraintFixed")
+    fixed_constraint.References = [(box, "Face1")]
+    analysis.addObject(fixed_constraint)
+    force_constraint = doc.addObject("Fem::ConstraintForce", "FemConstraintForce")
+    force_constraint.References = [(box, "Face6")]
+    force_constraint.Force = 40000.0
+    force_constraint.Direction = (box, ["Edge5"])
+    force_constraint.Reversed = True
+    analysis.addObject(force_constraint)
+    mesh_object = doc.addObject('Fem::FemMeshObject', 'Mesh')
+    mesh_object.FemMesh = femmesh
+    analysis.addObject(mesh_object)
+    doc.recompute()
+    return box, analysis, solver_object, mesh_object
+
+
+def write_ccx_input(
+    analysis,
+    solver_object,
+    working_dir
+):
+    ''' writes the CalculiX input file without the constraint cache
+    '''
+    from femtools import ccxtools
+    import femsolver.calculix.writer as iw
+    fea = ccxtools.FemToolsCcx(analysis, solver_object, test_mode=True)
+    fea.update_objects()
+    inp_writer = iw.FemInputWriterCcx(
+        fea.analysis,
+        fea.solver,
+        fea.mesh,
+        fea.materials_linear,
+        fea.materials_nonlinear,
+        fea.fixed_constraints,
+        fea.displacement_constraints,
+        fea.contact_constraints,
+        fea.planerotation_constraints,
+        fea.transform_constraints,
+        fea.selfweight_constraints,
+        fea.force_constraints,
+        fea.pressure_constraints,
+        fea.temperature_constraints,
+        fea.heatflux_constraints,
+        fea.initialtemperature_constraints,
+        fea.beam_sections,
+        fea.beam_rotations,
+        fea.shell_thicknesses,
+        fea.fluid_sections,
+        working_dir
+    )
+    # a benchmark of the cache would only measure the lookup of the cache files
+    inp_writer.constraint_cache_dir = ''
+    return inp_writer.write_calculix_input_file()
+
+
+def read_frd_streaming(
+    frd_file
+):
+    ''' reads the mesh and all result sets of the frd file with the streaming array reader
+    '''
+    from feminout import importCcxFrdResults
+    from feminout import importToolsFem
+    mesh_data = importToolsFem.make_mesh_data_from_arrays(
+        importCcxFrdResults.read_frd_mesh_arrays(frd_file)
+    )
+    result_sets = [
+        importCcxFrdResults.make_result_set_from_arrays(result_arrays)
+        for result_arrays in importCcxFrdResults.iter_frd_result_arrays(frd_file)
+    ]
+    return mesh_data, result_sets
+
+
+def make_result(
+    doc,
+    result_set
+):
+    from feminout import importToolsFem
+    import femresult.resulttools as restools
+    import ObjectsFem
+    res_obj = ObjectsFem.makeResultMechanical(doc, 'results')
+    res_obj = importToolsFem.fill_femresult_mechanical(res_obj, result_set)
+    res_obj = restools.add_disp_apps(res_obj)
+    res_obj = restools.add_von_mises(res_obj)
+    return res_obj
+
+
+def run_case(
+    element_type,
+    elements
+):
+    ''' runs all pipeline steps for one generated mesh, returns the list of step reports
+    '''
+    from feminout import importToolsFem
+    from feminout import importCcxFrdResults
+    import femresult.resulttools as restools
+    from femmesh import meshtools
+
+    cells, mesh_arrays, frd_file = get_fixture(element_type, elements)
+    element_count = sum(
+        len(value[0]) for key, value in mesh_arrays.items() if key.endswith('Elem')
+    )
+    node_count = len(mesh_arrays['NodeIds'])
+    fcc_print('Benchmark {} mesh with {} elements and {} nodes'.format(
+        element_type, element_count, node_count
+    ))
+    doc_name = 'FemBenchmark'
+    doc = FreeCAD.newDocument(doc_name)
+    reports = []
+
+    def add_report(step, measured):
+        measured.update({
+            'element_type': element_type,
+            'elements': element_count,
+            'nodes': node_count,
+            'step': step
+        })
+        fcc_print('  {:<28s} {:10.3f} s'.format(step, measured['time']))
+        reports.append(measured)
+
+    try:
+        femmesh, measured = measure(importToolsFem.make_femmesh, mesh_arrays)
+        add_report('make_femmesh', measured)
+
+        box, analysis, solver_object, mesh_object = make_analysis(doc, cells, femmesh)
+        femmesh = mesh_object.FemMesh
+        working_dir = testtools.get_unit_test_tmp_dir(
+            testtools.get_fem_test_tmp_dir(),
+            'FEM_benchmark_ccx'
+        )
+        inp_file, measured = measure(write_ccx_input, analysis, solver_object, working_dir)
+        add_report('write_calculix_input_file', measured)
+        if inp_file and os.path.isfile(inp_file):
+            os.remove(inp_file)
+
+        nodes, measured = measure(meshtools.get_femnodes_by_refshape, femmesh, (box, ('Face1', )))
+        measured['result_size'] = len(nodes)
+        add_report('get_femnodes_by_refshape', measured)
+
+        frd_content, measured = measure(importCcxFrdResults.read_frd_result, frd_file)
+        add_report('read_frd_result', measured)
+        frd_streamed, measured = measure(read_frd_streaming, frd_file)
+        add_report('read_frd_streaming', measured)
+        frd_streamed = None
+        result_set = frd_content['Results'][0]
+        frd_content = None
+
+        res_obj = make_result(doc, result_set)
+        result_set = None
+        res_obj, measured = measure(restools.add_principal_stress, res_obj)
+        add_report('add_principal_stress', measured)
+        res_obj, measured = measure(restools.fill_femresult_stats, res_obj)
+        add_report('fill_femresult_stats', measured)
+    finally:
+        FreeCAD.closeDocument(doc_name)
+    return reports
+
+
+def run(
+    sizes=(10 ** 4, 10 ** 5, 10 ** 6),
+    types=('tetra10', 'hexa20'),
+    report_file=None
+):
+    ''' runs the benchmark for all element types and approximate element counts
+    the report is written as JSON to report_file, the report is returned
+    '''
+    report = {
+        'fixture_version': FIXTURE_VERSION,
+        'freecad': FreeCAD.Version()[:3],
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': []
+    }
+    for element_type in types:
+        for elements in sizes:
+            report['results'].extend(run_case(element_type, elements))
+    if report_file is None:
+        report_file = join(testtools.get_fem_test_tmp_dir(), 'fem_benchmark.json')
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    fcc_print('Benchmark report written to {}'.format(report_file))
+    return report
+
+
+def compare_reports(
+    old_report_file,
+    new_report_file
+):
+    ''' prints the time and peak memory ratio new / old of the steps found in both reports
+    returns a dict with (element_type, elements, step) as key and the time ratio as value
+    '''
+    with open(old_report_file) as f:
+        old_results = json.load(f)['results']
+    with open(new_report_file) as f:
+        new_results = json.load(f)['results']
+
+    def result_key(r):
+        return (r['element_type'], r['elements'], r['step'])
+
+    old_by_key = dict((result_key(r), r) for r in old_results)
+    ratios = {}
+    for new in new_results:
+        old = old_by_key.get(result_key(new))
+        if old is None or not old['time']:
+            continue
+        ratios[result_key(new)] = new['time'] / old['time']
+        memory = ''
+        if old['peak_memory'] and new['peak_memory'] is not None:
+            memory = '  memory {:6.2f}x'.format(float(new['peak_memory']) / old['peak_memory'])
+        fcc_print('{:<8s} {:>8d} {:<28s} {:10.3f} s -> {:10.3f} s  {:6.2f}x{}'.format(
+            new['element_type'],
+            new['elements'],
+            new['step'],
+            old['time'],
+            new['time'],
+            ratios[result_key(new)],
+            memory
+        ))
+    return ratios
@@ -0,0 +1,124 @@
+# ***************************************************************************
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This file is part of the FreeCAD CAx development system.              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   FreeCAD is distributed in the hope that it will be useful,            *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with FreeCAD; if not, write to the Free Software        *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************/
+
+
+import json
+import unittest
+import numpy as np
+from . import benchmark
+from . import utilstest as testtools
+from .utilstest import fcc_print
+
+from os.path import join
+
+
+class TestBenchmark(unittest.TestCase):
+    fcc_print('import TestBenchmark')
+
+    # ********************************************************************************************
+    def setUp(
+        self
+    ):
+        # init, is executed before every test
+        self.temp_dir = testtools.get_unit_test_tmp_dir(
+            testtools.get_fem_test_tmp_dir(),
+            'FEM_benchmark_test'
+        )
+
+    # ********************************************************************************************
+    def test_box_mesh(
+        self
+    ):
+        # 2 x 2 x 2 cubes, every point of the half element size grid is a tetra10 node,
+        # hexa20 do not have nodes at face and cube centers
+        expected = {
+            'tetra10': ('Tetra10Elem', 48, 125),
+            'hexa20': ('Hexa20Elem', 8, 81),
+        }
+        for element_type, (key, elements, nodes) in expected.items():
+            mesh_arrays, frd_nodes = benchmark.make_box_mesh_arrays(element_type, 2)
+            self.assertEqual(len(mesh_arrays['NodeIds']), nodes)
+            self.assertEqual(len(mesh_arrays[key][0]), elements)
+            self.assertEqual(frd_nodes.shape[0], elements)
+            coords = mesh_arrays['NodeCoords']
+            self.assertEqual(coords.min(), 0.0)
+            self.assertEqual(coords.max(), 2.0)
+
+        # all tetra are positive oriented in frd node order
+        mesh_arrays, frd_nodes = benchmark.make_box_mesh_arrays('tetra10', 2)
+        corners = mesh_arrays['NodeCoords'][frd_nodes[:, :4] - 1]
+        volumes = np.linalg.det(corners[:, 1:] - corners[:, :1]) / 6.0
+        self.assertTrue((volumes > 0).all())
+        self.assertAlmostEqual(volumes.sum(), 8.0)
+
+    # ********************************************************************************************
+    def test_frd_fixture(
+        self
+    ):
+        from feminout.importCcxFrdResults import read_frd_mesh_arrays
+        from feminout.importCcxFrdResults import read_frd_result
+        for element_type, key in (('tetra10', 'Tetra10Elem'), ('hexa20', 'Hexa20Elem')):
+            mesh_arrays, frd_nodes = benchmark.make_box_mesh_arrays(element_type, 2)
+            frd_file = benchmark.write_frd_file(
+                join(self.temp_dir, 'box_{}.frd'.format(element_type)),
+                element_type,
+                mesh_arrays,
+                frd_nodes
+            )
+            read_arrays = read_frd_mesh_arrays(frd_file)
+            np.testing.assert_array_equal(read_arrays['NodeIds'], mesh_arrays['NodeIds'])
+            np.testing.assert_allclose(read_arrays['NodeCoords'], mesh_arrays['NodeCoords'])
+            np.testing.assert_array_equal(read_arrays[key][1], mesh_arrays[key][1])
+
+            frd_content = read_frd_result(frd_file)
+            self.assertEqual(len(frd_content['Results']), 1)
+            result_set = frd_content['Results'][0]
+            self.assertEqual(len(result_set['disp']), len(mesh_arrays['NodeIds']))
+            self.assertEqual(len(result_set['stress']), len(mesh_arrays['NodeIds']))
+
+    # ********************************************************************************************
+    def test_run(
+        self
+    ):
+        report_file = join(self.temp_dir, 'fem_benchmark.json')
+        report = benchmark.run(sizes=[8], types=['hexa20'], report_file=report_file)
+        with open(report_file) as f:
+            self.assertEqual(json.load(f), json.loads(json.dumps(report)))
+        steps = [r['step'] for r in report['results']]
+        self.assertEqual(steps, [
+            'make_femmesh',
+            'write_calculix_input_file',
+            'get_femnodes_by_refshape',
+            'read_frd_result',
+            'read_frd_streaming',
+            'add_principal_stress',
+            'fill_femresult_stats'
+        ])
+        for r in report['results']:
+            self.assertEqual(r['elements'], 8)
+            self.assertEqual(r['nodes'], 81)
+            self.assertGreaterEqual(r['time'], 0.0)
+        # nodes on the face x = 0 of the box
+        self.assertEqual(report['results'][2]['result_size'], 21)
+        ratios = benchmark.compare_reports(report_file, report_file)
+        self.assertTrue(all(r == 1.0 for r in ratios.values()))
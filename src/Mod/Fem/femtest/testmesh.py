@@ -202,6 +202,226 @@ class TestMeshCommon(unittest.TestCase):
             )
         )
 
+    # ********************************************************************************************
+    def test_femelement_index(
+        self
+    ):
+        # the vectorized searches on the FemElementIndex
+        # have to return the same as the searches on the femnodes_ele_table
+        from femmesh import meshtools
+        from .testfiles.ccx.cube_mesh import create_nodes_cube
+        from .testfiles.ccx.cube_mesh import create_elements_cube
+        femmesh = Fem.FemMesh()
+        create_nodes_cube(femmesh)
+        create_elements_cube(femmesh)
+        femelement_table = meshtools.get_femelement_table(femmesh)
+        femnodes_ele_table = meshtools.get_femnodes_ele_table(femmesh.Nodes, femelement_table)
+        femelement_index = meshtools.get_femelement_index(femmesh)
+        self.assertTrue(
+            femelement_index is meshtools.get_femelement_index(femmesh),
+            "FemElementIndex of an unchanged mesh is not taken from the cache"
+        )
+        self.assertTrue(
+            femelement_index is meshtools.get_femelement_index(femmesh, femelement_table),
+            "FemElementIndex of the femelement_table differs from the one of the mesh"
+        )
+        # nodes of the cube face x = 0 and all nodes of the mesh
+        face_nodes = [n for n, v in femmesh.Nodes.items() if v.x == 0.0]
+        for node_set in (face_nodes, list(femmesh.Nodes)):
+            self.assertEqual(
+                meshtools.get_femelements_by_femnodes_bin(
+                    femelement_table,
+                    femnodes_ele_table,
+                    node_set
+                ),
+                femelement_index.get_elements_by_nodes(node_set),
+                "Elements found by the FemElementIndex are unexpected"
+            )
+            self.assertEqual(
+                meshtools.get_ccxelement_faces_from_binary_search(
+                    meshtools.get_bit_pattern_dict(
+                        femelement_table,
+                        femnodes_ele_table,
+                        node_set
+                    )
+                ),
+                femelement_index.get_ccxelement_faces_by_nodes(node_set),
+                "Element faces found by the FemElementIndex are unexpected"
+            )
+            self.assertEqual(
+                meshtools.get_femvolumeelements_by_femfacenodes(
+                    femelement_table,
+                    node_set
+                ),
+                femelement_index.get_volumes_by_face_nodes(node_set),
+                "Volume elements found by the FemElementIndex are unexpected"
+            )
+
+    # ********************************************************************************************
+    def test_make_femmesh_from_arrays(
+        self
+    ):
+        # a mesh made by the bulk construction has to be equal to the original mesh
+        from feminout import importToolsFem
+        from .testfiles.ccx.cube_mesh import create_nodes_cube
+        from .testfiles.ccx.cube_mesh import create_elements_cube
+        femmesh = Fem.FemMesh()
+        create_nodes_cube(femmesh)
+        create_elements_cube(femmesh)
+        mesh_data = importToolsFem.make_dict_from_femmesh(femmesh)
+        mesh_arrays = importToolsFem.make_mesh_arrays(mesh_data)
+        self.assertEqual(
+            (len(mesh_arrays['NodeIds']), 3),
+            mesh_arrays['NodeCoords'].shape,
+            "Shape of the node coordinate array is unexpected"
+        )
+        for bulk_mesh in (
+            importToolsFem.make_femmesh_from_arrays(mesh_arrays),
+            importToolsFem.make_femmesh(mesh_data)
+        ):
+            self.assertEqual(
+                femmesh.Nodes,
+                bulk_mesh.Nodes,
+                "Nodes of the bulk constructed mesh are unexpected"
+            )
+            for element_id in femmesh.Volumes + femmesh.Faces + femmesh.Edges:
+                self.assertEqual(
+                    femmesh.getElementNodes(element_id),
+                    bulk_mesh.getElementNodes(element_id),
+                    "Element nodes of the bulk constructed mesh are unexpected"
+                )
+        # besides the buffers of numpy arrays plain sequences are accepted too
+        sequence_mesh = Fem.FemMesh()
+        sequence_mesh.addNodes(
+            mesh_arrays['NodeIds'].tolist(),
+            mesh_arrays['NodeCoords'].ravel().tolist()
+        )
+        self.assertEqual(
+            femmesh.Nodes,
+            sequence_mesh.Nodes,
+            "Nodes added from sequences are unexpected"
+        )
+
+    # ********************************************************************************************
+    def test_read_inp_include(
+        self
+    ):
+        # included files, element definitions on two lines and
+        # node output in the step have to be read as the plain mesh file
+        from feminout import importInpMesh
+        inp_file = join(testtools.get_fem_test_home_dir(), 'mesh', 'tetra10_mesh.inp')
+        test_dir = testtools.get_unit_test_tmp_dir(
+            testtools.get_fem_test_tmp_dir(),
+            'FEM_inp_include'
+        )
+        include_file = join(test_dir, 'tetra10_include.inp')
+        with open(include_file, 'w') as f:
+            f.write(
+                '** nodes and elements are in the included file\n'
+                '*INCLUDE, INPUT="{}"\n'
+                '*ELEMENT, TYPE=C3D10, ELSET=Evolumes\n'
+                '2, 2, 1, 3, 4, 5, 7,\n'
+                '** element definition continues on the next line\n'
+                '6, 9, 8, 10\n'
+                '*STEP\n'
+                '*NODE PRINT, NSET=Nall\n'
+                'U\n'
+                '*END STEP\n'
+                .format(inp_file)
+            )
+        mesh_arrays = importInpMesh.read_inp(inp_file)
+        include_mesh_arrays = importInpMesh.read_inp(include_file)
+        self.assertEqual(
+            mesh_arrays['NodeIds'].tolist(),
+            include_mesh_arrays['NodeIds'].tolist(),
+            "Node ids of the inp file with include are unexpected"
+        )
+        self.assertEqual(
+            mesh_arrays['NodeCoords'].tolist(),
+            include_mesh_arrays['NodeCoords'].tolist(),
+            "Node coordinates of the inp file with include are unexpected"
+        )
+        self.assertEqual(
+            [1, 2],
+            include_mesh_arrays['Tetra10Elem'][0].tolist(),
+            "Element ids of the inp file with include are unexpected"
+        )
+        self.assertEqual(
+            mesh_arrays['Tetra10Elem'][1].tolist() * 2,
+            include_mesh_arrays['Tetra10Elem'][1].tolist(),
+            "Element nodes of the inp file with include are unexpected"
+        )
+
+    # ********************************************************************************************
+    def test_read_inp_duplicate_nodes(
+        self
+    ):
+        # a node or an element defined more than once gets its last definition
+        from feminout import importInpMesh
+        test_dir = testtools.get_unit_test_tmp_dir(
+            testtools.get_fem_test_tmp_dir(),
+            'FEM_inp_duplicate'
+        )
+        inp_file = join(test_dir, 'tetra4_duplicate.inp')
+        with open(inp_file, 'w') as f:
+            f.write(
+                '*NODE, NSET=Nall\n'
+                '1, 0.0, 0.0, 0.0\n'
+                '2, 1.0, 0.0, 0.0\n'
+                '3, 0.0, 1.0, 0.0\n'
+                '4, 0.0, 0.0, 1.0\n'
+                '*NODE, NSET=Nall\n'
+                '1, 0.0, 0.0, 2.0\n'
+                '*ELEMENT, TYPE=C3D4, ELSET=Evolumes\n'
+                '1, 1, 2, 3, 4\n'
+                '1, 2, 1, 3, 4\n'
+            )
+        mesh_arrays = importInpMesh.read_inp(inp_file)
+        self.assertEqual(
+            [1, 2, 3, 4],
+            mesh_arrays['NodeIds'].tolist(),
+            "Node ids of the inp file with a duplicate node are unexpected"
+        )
+        self.assertEqual(
+            [0.0, 0.0, 2.0],
+            mesh_arrays['NodeCoords'][0].tolist(),
+            "Coordinates of the duplicate node are not the last ones"
+        )
+        self.assertEqual(
+            ([1], [[1, 2, 3, 4]]),
+            (
+                mesh_arrays['Tetra4Elem'][0].tolist(),
+                mesh_arrays['Tetra4Elem'][1].tolist()
+            ),
+            "Nodes of the duplicate element are not the last ones"
+        )
+
+    # ********************************************************************************************
+    def test_gmsh_mesh_cache_eviction(
+        self
+    ):
+        # the least recently used meshes are removed from the mesh cache
+        import os
+        from femmesh import gmshtools
+        cache_dir = testtools.get_unit_test_tmp_dir(
+            testtools.get_fem_test_tmp_dir(),
+            'FEM_gmsh_mesh_cache'
+        )
+        for file_name in os.listdir(cache_dir):
+            os.remove(join(cache_dir, file_name))
+        for i in range(4):
+            cache_file = join(cache_dir, 'mesh{}.unv'.format(i))
+            with open(cache_file, 'w') as f:
+                f.write('x' * 1000)
+            # mesh1 is the least recently used, mesh0 was used after mesh3
+            os.utime(cache_file, (1000 + i, 1000 + i) if i else (2000, 2000))
+        gmshtools.evict_mesh_cache(cache_dir, 2500)
+        self.assertEqual(
+            ['mesh0.unv', 'mesh3.unv'],
+            sorted(os.listdir(cache_dir)),
+            "Meshes left in the mesh cache are unexpected"
+        )
+
     # ********************************************************************************************
     def tearDown(
         self
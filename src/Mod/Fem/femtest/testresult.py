@@ -269,6 +269,67 @@ class TestResult(unittest.TestCase):
             "Values of read npressure result data are unexpected"
         )
 
+    # ********************************************************************************************
+    def test_read_frd_streaming(
+        self
+    ):
+        # the streaming array reader has to return the same data as the line based reader
+        # the timing of both readers is in femtest/benchmark.py
+        from feminout import importCcxFrdResults as frd_reader
+        from feminout import importToolsFem
+        for frd_name in (
+            'cube_frequency.frd',
+            'cube_static.frd',
+            'Flow1D_thermomech.frd',
+            'spine_thermomech.frd'
+        ):
+            frd_file = join(testtools.get_fem_test_home_dir(), 'ccx', frd_name)
+            frd_content = frd_reader.read_frd_result(frd_file)
+            mesh_data = importToolsFem.make_mesh_data_from_arrays(
+                frd_reader.read_frd_mesh_arrays(frd_file)
+            )
+            result_sets = [
+                frd_reader.make_result_set_from_arrays(result_arrays)
+                for result_arrays in frd_reader.iter_frd_result_arrays(frd_file)
+            ]
+
+            self.assertEqual(
+                {n: tuple(v) for n, v in frd_content['Nodes'].items()},
+                {n: tuple(v) for n, v in mesh_data['Nodes'].items()},
+                "Values of streamed node data are unexpected"
+            )
+            for key in mesh_data:
+                if key != 'Nodes':
+                    self.assertEqual(
+                        frd_content[key],
+                        mesh_data[key],
+                        "Values of streamed {} data are unexpected".format(key)
+                    )
+            self.assertEqual(
+                len(frd_content['Results']),
+                len(result_sets),
+                "Number of streamed result sets is unexpected"
+            )
+            for expected_set, result_set in zip(frd_content['Results'], result_sets):
+                self.assertEqual(
+                    sorted(expected_set.keys()),
+                    sorted(result_set.keys()),
+                    "Types of streamed result data are unexpected"
+                )
+                for key in expected_set:
+                    if key in ('number', 'time'):
+                        continue
+                    self.assertEqual(
+                        list(expected_set[key].keys()),
+                        list(result_set[key].keys()),
+                        "Node numbers of streamed {} result data are unexpected".format(key)
+                    )
+                    self.assertEqual(
+                        list(expected_set[key].values()),
+                        list(result_set[key].values()),
+                        "Values of streamed {} result data are unexpected".format(key)
+                    )
+
     # ********************************************************************************************
     def get_stress_values(
         self
@@ -332,6 +393,44 @@ class TestResult(unittest.TestCase):
             "Calculated principal stresses are not the expected values."
         )
 
+    # ********************************************************************************************
+    def test_stress_batch(
+        self
+    ):
+        # the batched calculation has to return the values of the node by node calculation
+        # a row with NaN values returns NaN for the principal stresses and max shear
+        from femresult.resulttools import calculate_von_mises_batch as vm_batch
+        from femresult.resulttools import calculate_principal_stress_batch as pr_batch
+        nan = float('NaN')
+        stress = [
+            self.get_stress_values(),
+            (1.0, 2.0, 3.0, 0.0, 0.0, 0.0),
+            (10.0, nan, 0.0, 0.0, 0.0, 0.0)
+        ]
+        mises = vm_batch(stress)
+        prin = pr_batch(stress)
+        # fcc_print(mises)
+        # fcc_print(prin)
+        self.assertEqual(
+            [round(m, 4) for m in mises[:2]],
+            [283.2082, 1.7321],
+            "Batched von Mises stress are not the expected values."
+        )
+        self.assertEqual(
+            [round(p, 4) for p in prin[0]],
+            [-178.0076, -194.0749, -468.9075, 145.4499],
+            "Batched principal stresses are not the expected values."
+        )
+        self.assertEqual(
+            [round(p, 4) for p in prin[1]],
+            [3.0, 2.0, 1.0, 1.0],
+            "Batched principal stresses are not the expected values."
+        )
+        self.assertTrue(
+            all(p != p for p in prin[2]),
+            "Batched principal stresses of a NaN stress are not NaN."
+        )
+
     # ********************************************************************************************
     def test_disp_abs(
         self
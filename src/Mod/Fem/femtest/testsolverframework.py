@@ -248,6 +248,58 @@ class TestSolverFrameWork(unittest.TestCase):
         self.active_doc.saveAs(save_fc_file)
         fcc_print('--------------- End of FEM tests solver frame work ---------------')
 
+    # ********************************************************************************************
+    def test_solver_scheduler(
+        self
+    ):
+        # jobs with tasks which do not need a solver binary
+        jobs_log = []
+        solvers = [
+            _SchedulerTestSolver(self.active_doc, 'Solver{}'.format(i), jobs_log)
+            for i in range(5)
+        ]
+        solvers.append(_SchedulerTestSolver(self.active_doc, 'FailingSolver', jobs_log))
+        finished_jobs = []
+        scheduler = femsolver.run.Scheduler(
+            solvers,
+            maxJobs=2,
+            cpuBudget=4,
+            workingDir=testtools.get_unit_test_tmp_dir(self.temp_dir, 'FEM_solver_scheduler')
+        )
+        scheduler.signalJobFinished.add(
+            lambda m: finished_jobs.append((m.solver.Label, m.failed))
+        )
+        scheduler.start()
+        scheduler.join()
+
+        self.assertEqual(2, scheduler.threads, "Threads per job are unexpected")
+        self.assertEqual(
+            sorted([(s.Label, s.Label == 'FailingSolver') for s in solvers]),
+            sorted(finished_jobs),
+            "Finished jobs are unexpected"
+        )
+        self.assertEqual(
+            ['2'] * len(solvers),
+            [entry[2] for entry in jobs_log if entry[0] == 'solve_start'],
+            "OMP_NUM_THREADS of the solver processes is unexpected"
+        )
+        results_loaded = [entry[1] for entry in jobs_log if entry[0] == 'results']
+        self.assertEqual(
+            sorted(s.Label for s in solvers[:-1]),
+            sorted(results_loaded),
+            "Results are not loaded for every successful job"
+        )
+        # never more than maxJobs solver processes at the same time
+        running = 0
+        max_running = 0
+        for entry in jobs_log:
+            if entry[0] == 'solve_start':
+                running += 1
+            elif entry[0] == 'solve_end':
+                running -= 1
+            max_running = max(running, max_running)
+        self.assertEqual(2, max_running, "Number of concurrent jobs is unexpected")
+
     # ********************************************************************************************
     def tearDown(
         self
@@ -255,3 +307,52 @@ class TestSolverFrameWork(unittest.TestCase):
         # clearance, is executed after every test
         FreeCAD.closeDocument(self.doc_name)
         pass
+
+
+# ************************************************************************************************
+class _SchedulerTestSolver(object):
+
+    def __init__(self, doc, label, jobs_log):
+        self.Document = doc
+        self.Label = label
+        self.Proxy = self
+        self.jobs_log = jobs_log
+
+    def createMachine(self, obj, directory, testmode=False):
+        return femsolver.run.Machine(
+            obj, directory,
+            _SchedulerTestCheck(), _SchedulerTestPrepare(),
+            _SchedulerTestSolve(), _SchedulerTestResults(),
+            testmode
+        )
+
+
+class _SchedulerTestCheck(femsolver.run.Check):
+
+    def run(self):
+        self.pushStatus("Checking analysis...\n")
+
+
+class _SchedulerTestPrepare(femsolver.run.Prepare):
+
+    def run(self):
+        self.pushStatus("Preparing input files...\n")
+
+
+class _SchedulerTestSolve(femsolver.run.Solve):
+
+    def run(self):
+        import time
+        env = self._getEnvironment()
+        self.solver.jobs_log.append(('solve_start', self.solver.Label, env["OMP_NUM_THREADS"]))
+        time.sleep(0.2)
+        self.solver.jobs_log.append(('solve_end', self.solver.Label))
+        if self.solver.Label == 'FailingSolver':
+            self.report.error("Solver failed.")
+            self.fail()
+
+
+class _SchedulerTestResults(femsolver.run.Results):
+
+    def run(self):
+        self.solver.jobs_log.append(('results', self.solver.Label))
@@ -29,13 +29,20 @@ import PathScripts.PathOp as PathOp
 import PathScripts.PathUtils as PathUtils
 import Path
 import FreeCAD
-import FreeCADGui
 from FreeCAD import Console
+import collections
+import hashlib
+import multiprocessing
 import time
 import json
 import math
 import area
-from pivy import coin
+
+from multiprocessing.pool import ThreadPool
+
+if FreeCAD.GuiUp:
+    import FreeCADGui
+    from pivy import coin
 
 __doc__ = "Class and implementation of the Adaptive path operation."
 
@@ -306,26 +313,70 @@ def GenerateGCode(op,obj,adaptiveResults, helixDiameter):
 
     lz = z
 
-def Execute(op,obj):
+def splitRegions(paths, margin):
+    """splitRegions(paths, margin) ... groups the 2d paths into independent regions.
+    Paths whose bounding boxes, grown by margin, overlap end up in the same region."""
+    boxes = []
+    for pth in paths:
+        xs = [pt[0] for pt in pth]
+        ys = [pt[1] for pt in pth]
+        boxes.append((min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin))
+
+    parent = list(range(len(paths)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # sweep along x, only boxes still open at the current xmin can overlap
+    active = []
+    for i in sorted(range(len(boxes)), key=lambda i: boxes[i][0]):
+        active = [j for j in active if boxes[j][2] >= boxes[i][0]]
+        for j in active:
+            if boxes[j][1] <= boxes[i][3] and boxes[i][1] <= boxes[j][3]:
+                parent[find(j)] = find(i)
+        active.append(i)
+
+    regions = collections.OrderedDict()
+    for i, pth in enumerate(paths):
+        regions.setdefault(find(i), []).append(pth)
+    return list(regions.values())
+
+def regionKey(region, inputStateObject):
+    """regionKey(region, inputStateObject) ... hash of the region's geometry and all parameters influencing its result."""
+    state = dict((k, v) for k, v in inputStateObject.items() if k != "geometry")
+    return hashlib.sha1(json.dumps([region, state], sort_keys=True).encode('utf-8')).hexdigest()
+
+def Execute(op, obj, threads=None):
+    """Execute(op, obj, [threads=None]) ... generates the adaptive toolpath of obj.
+    The geometry is split into independent regions which are computed in a pool of threads
+    (default is one per cpu). The results are cached per region in op.regionCache, which is
+    not saved with the document, and only regions whose geometry or parameters changed are recomputed.
+    If the whole input state is unchanged the saved obj.AdaptiveOutputState is used.
+    Progress is drawn into the 3D view if the GUI is up, otherwise nothing GUI related is touched."""
     global sceneGraph
     global topZ
 
-    sceneGraph = FreeCADGui.ActiveDocument.ActiveView.getSceneGraph()
+    gui = FreeCAD.GuiUp and FreeCADGui.ActiveDocument is not None and obj.ViewObject is not None
+    if gui:
+        sceneGraph = FreeCADGui.ActiveDocument.ActiveView.getSceneGraph()
 
     Console.PrintMessage("*** Adaptive toolpath processing started...\n")
 
     #hide old toolpaths during recalculation
     obj.Path = Path.Path("(Calculating...)")
 
-    #store old visibility state
-    job = op.getJob(obj)
-    oldObjVisibility = obj.ViewObject.Visibility
-    oldJobVisibility = job.ViewObject.Visibility
+    if gui:
+        #store old visibility state
+        job = op.getJob(obj)
+        oldObjVisibility = obj.ViewObject.Visibility
+        oldJobVisibility = job.ViewObject.Visibility
 
-    obj.ViewObject.Visibility = False
-    job.ViewObject.Visibility = False
+        obj.ViewObject.Visibility = False
+        job.ViewObject.Visibility = False
 
-    FreeCADGui.updateGui()
+        FreeCADGui.updateGui()
     try:
         helixDiameter = obj.HelixDiameterLimit.Value
         topZ = op.stock.Shape.BoundBox.ZMax
@@ -396,32 +447,44 @@ def Execute(op,obj):
             "stockToLeave": float(obj.StockToLeave)
         }
 
-        inputStateChanged = False
-        adaptiveResults = None
+        # clearing outside works on the whole stock, everything else only interacts within the tool's reach
+        if opType == area.AdaptiveOperationType.ClearingOutside or not path2d:
+            regions = [path2d]
+        else:
+            regions = splitRegions(path2d, float(op.tool.Diameter) + float(obj.StockToLeave) + float(obj.Tolerance))
+        keys = [regionKey(region, inputStateObject) for region in regions]
 
-        if obj.AdaptiveOutputState != None and obj.AdaptiveOutputState != "":
-             adaptiveResults = obj.AdaptiveOutputState
+        regionCache = dict(getattr(op, 'regionCache', {}))
+        regionResults = dict((i, regionCache[key]) for i, key in enumerate(keys) if key in regionCache)
+        todo = [i for i in range(len(regions)) if i not in regionResults]
+        if todo and obj.AdaptiveOutputState and json.dumps(obj.AdaptiveInputState, sort_keys=True) == json.dumps(inputStateObject, sort_keys=True):
+            # unchanged operation of a restored document, the saved results are still valid
+            regionResults = {0: obj.AdaptiveOutputState}
+            todo = []
 
-        if json.dumps(obj.AdaptiveInputState) != json.dumps(inputStateObject):
-             inputStateChanged = True
-             adaptiveResults = None
+        stop = [False]
+        progress = []
 
         # progress callback fn, if return true it will stop processing
+        # it is called from the worker threads, drawing happens in the main thread
         def progressFn(tpaths):
-            for path in tpaths: #path[0] contains the MotionType, #path[1] contains list of points
-                if path[0] == area.AdaptiveMotionType.Cutting:
-                    sceneDrawPath(path[1],(0,0,1))
-
-                else:
-                    sceneDrawPath(path[1],(1,0,1))
+            if gui:
+                progress.append(tpaths)
+            return stop[0]
+
+        def drawProgress():
+            pending = progress[:]
+            del progress[:len(pending)]
+            for tpaths in pending:
+                for path in tpaths: #path[0] contains the MotionType, #path[1] contains list of points
+                    if path[0] == area.AdaptiveMotionType.Cutting:
+                        sceneDrawPath(path[1],(0,0,1))
 
+                    else:
+                        sceneDrawPath(path[1],(1,0,1))
             FreeCADGui.updateGui()
 
-            return  obj.StopProcessing
-
-        start = time.time()
-
-        if inputStateChanged or adaptiveResults == None:
+        def processRegion(i):
             a2d = area.Adaptive2d()
             a2d.stepOverFactor = 0.01*obj.StepOver
             a2d.toolDiameter = float(op.tool.Diameter)
@@ -433,7 +496,7 @@ def Execute(op,obj):
             a2d.opType = opType
 
             # EXECUTE
-            results = a2d.Execute(stockPath2d,path2d,progressFn)
+            results = a2d.Execute(stockPath2d,regions[i],progressFn)
 
             # need to convert results to python object to be JSON serializable
             adaptiveResults = []
@@ -443,7 +506,36 @@ def Execute(op,obj):
                     "StartPoint": result.StartPoint,
                     "AdaptivePaths": result.AdaptivePaths,
                     "ReturnMotionType": result.ReturnMotionType })
+            # results of a cancelled region are incomplete and must not be cached
+            return (i, adaptiveResults, stop[0])
+
+        start = time.time()
 
+        if todo:
+            Console.PrintMessage("*** Computing %d of %d regions\n" % (len(todo), len(regions)))
+            pool = ThreadPool(min(len(todo), threads if threads else multiprocessing.cpu_count()))
+            try:
+                pending = pool.imap_unordered(processRegion, todo)
+                while True:
+                    try:
+                        (i, adaptiveResults, stopped) = pending.next(0.1)
+                        regionResults[i] = adaptiveResults
+                        if not stopped:
+                            regionCache[keys[i]] = adaptiveResults
+                    except multiprocessing.TimeoutError:
+                        pass
+                    except StopIteration:
+                        break
+                    if gui:
+                        drawProgress()
+                    stop[0] = obj.StopProcessing
+            finally:
+                pool.close()
+                pool.join()
+
+        adaptiveResults = []
+        for i in range(len(regions)):
+            adaptiveResults.extend(regionResults.get(i, []))
 
         # GENERATE
         GenerateGCode(op,obj,adaptiveResults,helixDiameter)
@@ -452,14 +544,17 @@ def Execute(op,obj):
             Console.PrintMessage("*** Done. Elapsed time: %f sec\n\n" %(time.time()-start))
             obj.AdaptiveOutputState = adaptiveResults
             obj.AdaptiveInputState=inputStateObject
+            # only keep the regions of the current geometry
+            op.regionCache = dict((key, regionCache[key]) for key in keys if key in regionCache)
 
         else:
             Console.PrintMessage("*** Processing cancelled (after: %f sec).\n\n" %(time.time()-start))
 
     finally:
-        obj.ViewObject.Visibility = oldObjVisibility
-        job.ViewObject.Visibility = oldJobVisibility
-        sceneClean()
+        if gui:
+            obj.ViewObject.Visibility = oldObjVisibility
+            job.ViewObject.Visibility = oldJobVisibility
+            sceneClean()
 
 
 class PathAdaptive(PathOp.ObjectOp):
@@ -55,6 +55,9 @@ else:
 class ObjectOp(PathOp.ObjectOp):
     '''Base class for proxy objects of all operations on circular holes.'''
 
+    # ordering of the holes for new operations, one of PathUtils.SortingStrategies
+    DefaultSortingStrategy = 'NearestNeighbor'
+
     def opFeatures(self, obj):
         '''opFeatures(obj) ... calls circularHoleFeatures(obj) and ORs in the standard features required for processing circular holes.
         Do not overwrite, implement circularHoleFeatures(obj) instead'''
@@ -66,11 +69,27 @@ class ObjectOp(PathOp.ObjectOp):
         return 0
 
     def initOperation(self, obj):
-        '''initOperation(obj) ... adds Disabled properties and calls initCircularHoleOperation(obj).
+        '''initOperation(obj) ... adds Disabled and sorting properties and calls initCircularHoleOperation(obj).
         Do not overwrite, implement initCircularHoleOperation(obj) instead.'''
         obj.addProperty("App::PropertyStringList", "Disabled", "Base", QtCore.QT_TRANSLATE_NOOP("Path", "List of disabled features"))
+        self.initSortingProperties(obj)
         self.initCircularHoleOperation(obj)
 
+    def initSortingProperties(self, obj):
+        '''initSortingProperties(obj) ... adds the properties controlling the order of the holes if they don't exist yet.'''
+        if not hasattr(obj, 'SortingStrategy'):
+            obj.addProperty("App::PropertyEnumeration", "SortingStrategy", "Sort", QtCore.QT_TRANSLATE_NOOP("App::Property", "The order in which the holes are processed"))
+            obj.SortingStrategy = PathUtils.SortingStrategies
+            obj.SortingStrategy = self.DefaultSortingStrategy
+        if not hasattr(obj, 'SortingTimeout'):
+            obj.addProperty("App::PropertyFloat", "SortingTimeout", "Sort", QtCore.QT_TRANSLATE_NOOP("App::Property", "Maximum time in seconds spent improving the order of the holes with NearestNeighbor2Opt"))
+            obj.SortingTimeout = 1.0
+
+    def opOnDocumentRestored(self, obj):
+        '''opOnDocumentRestored(obj) ... adds the sorting properties to operations created before they existed.
+        Subclasses overwriting this function must call it.'''
+        self.initSortingProperties(obj)
+
     def initCircularHoleOperation(self, obj):
         '''initCircularHoleOperation(obj) ... overwrite if the subclass needs initialisation.
         Can safely be overwritten by subclasses.'''
@@ -149,7 +168,8 @@ class ObjectOp(PathOp.ObjectOp):
 
     def opExecute(self, obj):
         '''opExecute(obj) ... processes all Base features and Locations and collects
-        them in a list of positions and radii which is then passed to circularHoleExecute(obj, holes).
+        them in a list of positions and radii which is then ordered according to SortingStrategy
+        and passed to circularHoleExecute(obj, holes).
         If no Base geometries and no Locations are present, the job's Base is inspected and all
         drillable features are added to Base. In this case appropriate values for depths are also
         calculated and assigned.
@@ -174,6 +194,7 @@ class ObjectOp(PathOp.ObjectOp):
                 holes.append({'x': location.x, 'y': location.y, 'r': 0})
 
         if len(holes) > 0:
+            holes = PathUtils.order_jobs(holes, ['x', 'y'], obj.SortingStrategy, obj.SortingTimeout)
             self.circularHoleExecute(obj, holes)
 
     def circularHoleExecute(self, obj, holes):
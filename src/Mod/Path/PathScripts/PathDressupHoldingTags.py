@@ -520,33 +520,88 @@ class MapWireToTag:
 class _RapidEdges:
     def __init__(self, rapid):
         self.rapid = rapid
+        # bucket the rapids by the grid cell of their first vertex, so isRapid only compares close by edges
+        self.buckets = {}
+        for r in rapid:
+            self.buckets.setdefault(self.cell(r.Vertexes[0].Point), []).append(r)
+
+    def cell(self, pt):
+        return (int(math.floor(pt.x)), int(math.floor(pt.y)), int(math.floor(pt.z)))
+
+    def cells(self, pt):
+        lo = self.cell(pt - FreeCAD.Vector(PathGeom.Tolerance, PathGeom.Tolerance, PathGeom.Tolerance))
+        hi = self.cell(pt + FreeCAD.Vector(PathGeom.Tolerance, PathGeom.Tolerance, PathGeom.Tolerance))
+        return set((x, y, z) for x in range(lo[0], hi[0] + 1) for y in range(lo[1], hi[1] + 1) for z in range(lo[2], hi[2] + 1))
 
     def isRapid(self, edge):
         if type(edge.Curve) == Part.Line or type(edge.Curve) == Part.LineSegment:
             v0 = edge.Vertexes[0]
             v1 = edge.Vertexes[1]
-            for r in self.rapid:
-                r0 = r.Vertexes[0]
-                r1 = r.Vertexes[1]
-                if PathGeom.isRoughly(r0.X, v0.X) and PathGeom.isRoughly(r0.Y, v0.Y) and PathGeom.isRoughly(r0.Z, v0.Z) and PathGeom.isRoughly(r1.X, v1.X) and PathGeom.isRoughly(r1.Y, v1.Y) and PathGeom.isRoughly(r1.Z, v1.Z):
-                    return True
+            for cell in self.cells(v0.Point):
+                for r in self.buckets.get(cell, []):
+                    r0 = r.Vertexes[0]
+                    r1 = r.Vertexes[1]
+                    if PathGeom.isRoughly(r0.X, v0.X) and PathGeom.isRoughly(r0.Y, v0.Y) and PathGeom.isRoughly(r0.Z, v0.Z) and PathGeom.isRoughly(r1.X, v1.X) and PathGeom.isRoughly(r1.Y, v1.Y) and PathGeom.isRoughly(r1.Z, v1.Z):
+                        return True
         return False
 
 
+class _TagIndex:
+    '''Uniform grid over the XY footprints of the tags. An edge can only intersect the tags
+    whose footprint overlaps the edge's bounding box, all other tags are skipped.'''
+
+    def __init__(self, boxes, margin=0.01):
+        self.boxes = [(bb.XMin - margin, bb.YMin - margin, bb.XMax + margin, bb.YMax + margin) for bb in boxes]
+        self.margin = margin
+        self.size = max([max(b[2] - b[0], b[3] - b[1]) for b in self.boxes] + [1.0])
+        self.grid = {}
+        for i, box in enumerate(self.boxes):
+            for cell in self.cells(box):
+                self.grid.setdefault(cell, []).append(i)
+
+    @classmethod
+    def forTags(cls, tags):
+        return cls([tag.solid.BoundBox for tag in tags])
+
+    def cellRange(self, box):
+        return (int(math.floor(box[0] / self.size)), int(math.floor(box[1] / self.size)),
+                int(math.floor(box[2] / self.size)), int(math.floor(box[3] / self.size)))
+
+    def cells(self, box):
+        (x0, y0, x1, y1) = self.cellRange(box)
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def candidates(self, bb):
+        '''candidates(bb) ... returns the sorted indices of all tags whose footprint overlaps the bound box bb.'''
+        box = (bb.XMin - self.margin, bb.YMin - self.margin, bb.XMax + self.margin, bb.YMax + self.margin)
+        (x0, y0, x1, y1) = self.cellRange(box)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.boxes):
+            indices = range(len(self.boxes))
+        else:
+            indices = set()
+            for cell in self.cells(box):
+                indices.update(self.grid.get(cell, []))
+        return sorted(i for i in indices if self.overlaps(self.boxes[i], box))
+
+    def overlaps(self, b0, b1):
+        return b0[0] <= b1[2] and b1[0] <= b0[2] and b0[1] <= b1[3] and b1[1] <= b0[3]
+
+
 class PathData:
     def __init__(self, obj):
         PathLog.track(obj.Base.Name)
         self.obj = obj
-        self.wire, rapid = PathGeom.wireForPath(obj.Base.Path)
+        self.geometry = PathGeom.geometryForPath(obj.Base.Path)
+        self.wire, rapid = self.geometry.wire()
         self.rapid = _RapidEdges(rapid)
         self.edges = self.wire.Edges
-        self.baseWire = self.findBottomWire(self.edges)
+        self.baseWire = self.findBottomWire()
 
-    def findBottomWire(self, edges):
-        (minZ, maxZ) = self.findZLimits(edges)
+    def findBottomWire(self):
+        (minZ, maxZ) = self.findZLimits()
         self.minZ = minZ
         self.maxZ = maxZ
-        bottom = [e for e in edges if PathGeom.isRoughly(e.Vertexes[0].Point.z, minZ) and PathGeom.isRoughly(e.Vertexes[1].Point.z, minZ)]
+        bottom = self.geometry.edgesAt(minZ)
         self.bottomEdges = bottom
         try:
             wire = Part.Wire(bottom)
@@ -562,19 +617,9 @@ class PathData:
     def supportsTagGeneration(self):
         return self.baseWire is not None
 
-    def findZLimits(self, edges):
+    def findZLimits(self):
         # not considering arcs and spheres in Z direction, find the highest and lowest Z values
-        minZ = 99999999999
-        maxZ = -99999999999
-        for e in edges:
-            if self.rapid.isRapid(e):
-                continue
-            for v in e.Vertexes:
-                if v.Point.z < minZ:
-                    minZ = v.Point.z
-                if v.Point.z > maxZ:
-                    maxZ = v.Point.z
-        return (minZ, maxZ)
+        return self.geometry.zLimits()
 
     def shortestAndLongestPathEdge(self):
         edges = sorted(self.bottomEdges, key=lambda e: e.Length)
@@ -597,15 +642,16 @@ class PathData:
 
         # start assigning tags on the longest segment
         (shortestEdge, longestEdge) = self.shortestAndLongestPathEdge()
+        baseEdges = self.baseWire.Edges
         startIndex = 0
-        for i in range(0, len(self.baseWire.Edges)):
-            edge = self.baseWire.Edges[i]
+        for i in range(0, len(baseEdges)):
+            edge = baseEdges[i]
             PathLog.debug('  %d: %.2f' % (i, edge.Length))
             if PathGeom.isRoughly(edge.Length, longestEdge.Length):
                 startIndex = i
                 break
 
-        startEdge = self.baseWire.Edges[startIndex]
+        startEdge = baseEdges[startIndex]
         startCount = int(startEdge.Length / tagDistance)
         if (longestEdge.Length - shortestEdge.Length) > shortestEdge.Length:
             startCount = int(startEdge.Length / tagDistance) + 1
@@ -622,17 +668,17 @@ class PathData:
 
         edgeDict = {startIndex: startCount}
 
-        for i in range(startIndex + 1, len(self.baseWire.Edges)):
-            edge = self.baseWire.Edges[i]
+        for i in range(startIndex + 1, len(baseEdges)):
+            edge = baseEdges[i]
             (currentLength, lastTagLength) = self.processEdge(i, edge, currentLength, lastTagLength, tagDistance, minLength, edgeDict)
         for i in range(0, startIndex):
-            edge = self.baseWire.Edges[i]
+            edge = baseEdges[i]
             (currentLength, lastTagLength) = self.processEdge(i, edge, currentLength, lastTagLength, tagDistance, minLength, edgeDict)
 
         tags = []
 
         for (i, count) in PathUtil.keyValueIter(edgeDict):
-            edge = self.baseWire.Edges[i]
+            edge = baseEdges[i]
             PathLog.debug(" %d: %d" % (i, count))
             # debugMarker(edge.Vertexes[0].Point, 'base', (1.0, 0.0, 0.0), 0.2)
             # debugMarker(edge.Vertexes[1].Point, 'base', (0.0, 1.0, 0.0), 0.2)
@@ -681,13 +727,17 @@ class PathData:
 
     def sortedTags(self, tags):
         ordered = []
+        placed = set()
+        index = _TagIndex([FreeCAD.BoundBox(t.originAt(self.minZ), t.originAt(self.minZ)) for t in tags], 0.1)
         for edge in self.bottomEdges:
-            ts = [t for t in tags if PathGeom.isRoughly(0, Part.Vertex(t.originAt(self.minZ)).distToShape(edge)[0], 0.1)]
-            for t in sorted(ts, key=lambda t: (t.originAt(self.minZ) - edge.valueAt(edge.FirstParameter)).Length):
-                tags.remove(t)
-                ordered.append(t)
+            ts = [i for i in index.candidates(edge.BoundBox) if i not in placed and PathGeom.isRoughly(0, Part.Vertex(tags[i].originAt(self.minZ)).distToShape(edge)[0], 0.1)]
+            for i in sorted(ts, key=lambda i: (tags[i].originAt(self.minZ) - edge.valueAt(edge.FirstParameter)).Length):
+                placed.add(i)
+                ordered.append(tags[i])
         # disable all tags that are not on the base wire.
-        for tag in tags:
+        for i, tag in enumerate(tags):
+            if i in placed:
+                continue
             PathLog.info("Tag #%d (%.2f, %.2f, %.2f) not on base wire - disabling\n" % (len(ordered), tag.x, tag.y, self.minZ))
             tag.enabled = False
             ordered.append(tag)
@@ -790,6 +840,7 @@ class ObjectTagDressup:
         vertFeed = tc.VertFeed.Value
         horizRapid = tc.HorizRapid.Value
         vertRapid = tc.VertRapid.Value
+        index = _TagIndex.forTags(tags)
 
         while edge or lastEdge < len(pathData.edges):
             PathLog.debug("------- lastEdge = %d/%d.%d/%d" % (lastEdge, lastTag, t, len(tags)))
@@ -809,13 +860,17 @@ class ObjectTagDressup:
                     edge = None
 
             if edge:
-                tIndex = (t + lastTag) % len(tags)
-                t += 1
-                i = tags[tIndex].intersects(edge, edge.FirstParameter)
-                if i and self.isValidTagStartIntersection(edge, i):
-                    mapper = MapWireToTag(edge, tags[tIndex], i, segm, pathData.maxZ, hSpeed = horizFeed, vSpeed = vertFeed)
-                    self.mappers.append(mapper)
-                    edge = mapper.tail
+                # only the tags close to the edge can intersect it, continue with the first one not tried yet
+                tIndex = next((c for c in index.candidates(edge.BoundBox) if c >= t), None)
+                if tIndex is None:
+                    t = len(tags)
+                else:
+                    t = tIndex + 1
+                    i = tags[tIndex].intersects(edge, edge.FirstParameter)
+                    if i and self.isValidTagStartIntersection(edge, i):
+                        mapper = MapWireToTag(edge, tags[tIndex], i, segm, pathData.maxZ, hSpeed = horizFeed, vSpeed = vertFeed)
+                        self.mappers.append(mapper)
+                        edge = mapper.tail
 
             if not mapper and t >= len(tags):
                 # gone through all tags, consume edge and move on
@@ -84,7 +84,6 @@ class ObjectDrilling(PathCircularHoleBase.ObjectOp):
         if obj.AddTipLength:
             tiplength = PathUtils.drillTipLength(self.tool)
 
-        holes = PathUtils.sort_jobs(holes, ['x', 'y'])
         self.commandlist.append(Path.Command('G90'))
         self.commandlist.append(Path.Command(obj.ReturnLevel))
 
@@ -129,6 +128,8 @@ def SetupProperties():
     setup.append("AddTipLength")
     setup.append("ReturnLevel")
     setup.append("RetractHeight")
+    setup.append("SortingStrategy")
+    setup.append("SortingTimeout")
     return setup
 
 def Create(name, obj = None):
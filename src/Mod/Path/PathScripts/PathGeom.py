@@ -26,7 +26,10 @@ import FreeCAD
 import Part
 import Path
 import PathScripts.PathLog as PathLog
+import collections
+import hashlib
 import math
+import numpy
 
 from FreeCAD import Vector
 from PySide import QtCore
@@ -366,38 +369,233 @@ def edgeForCmd(cmd, startPoint):
         return helix.Edges[0]
     return None
 
-def wireForPath(path, startPoint = Vector(0, 0, 0)):
-    """(path, [startPoint=Vector(0,0,0)])
-    Returns a wire representing all move commands found in the given path."""
-    edges = []
-    rapid = []
-    if hasattr(path, "Commands"):
-        for cmd in path.Commands:
-            edge = edgeForCmd(cmd, startPoint)
+class PathGeometry(object):
+    """PathGeometry(path, [startPoint=Vector(0,0,0)])
+    Array representation of all move commands of a path. The start and end points, the arc
+    centers and the kind of each move are stored in NumPy arrays, Part.Edge objects are only
+    created when requested and are kept for subsequent requests.
+    Use geometryForPath to get a shared instance for a given path."""
+
+    Rapid    = 0
+    Straight = 1
+    CW       = 2
+    CCW      = 3
+
+    def __init__(self, path, startPoint = Vector(0, 0, 0)):
+        self.commands = path.Commands if hasattr(path, "Commands") else []
+        index = []
+        kinds = []
+        starts = []
+        ends = []
+        offsets = []
+        pos = (startPoint.x, startPoint.y, startPoint.z)
+        for i, cmd in enumerate(self.commands):
+            name = cmd.Name
+            if name in CmdMoveRapid:
+                kind = self.Rapid
+            elif name in CmdMoveStraight:
+                kind = self.Straight
+            elif name in CmdMoveCW:
+                kind = self.CW
+            elif name in CmdMoveCCW:
+                kind = self.CCW
+            else:
+                continue
+            params = cmd.Parameters
+            end = (params.get('X', pos[0]), params.get('Y', pos[1]), params.get('Z', pos[2]))
+            index.append(i)
+            kinds.append(kind)
+            starts.append(pos)
+            ends.append(end)
+            offsets.append((params.get('I', 0), params.get('J', 0), params.get('K', 0)))
+            pos = end
+
+        self.index = numpy.array(index, dtype=int)
+        self.kind = numpy.array(kinds, dtype=int)
+        self.start = numpy.array(starts, dtype=float).reshape(-1, 3)
+        self.end = numpy.array(ends, dtype=float).reshape(-1, 3)
+        self.center = self.start + numpy.array(offsets, dtype=float).reshape(-1, 3)
+        self.rapid = self.kind == self.Rapid
+        self.arc = self.kind >= self.CW
+        self._edges = {}
+
+    def __len__(self):
+        return len(self.kind)
+
+    def edge(self, i):
+        """(i)
+        Returns the Part.Edge of the i-th move, or None if the move has no length."""
+        i = int(i)
+        if i not in self._edges:
+            self._edges[i] = edgeForCmd(self.commands[self.index[i]], Vector(*self.start[i]))
+        return self._edges[i]
+
+    def edges(self, rapids = True):
+        """([rapids=True])
+        Returns the list of edges of all moves, excluding rapid moves if rapids is False."""
+        return [e for e in (self.edge(i) for i in range(len(self)) if rapids or not self.rapid[i]) if e is not None]
+
+    def wire(self):
+        """()
+        Returns the wire of all moves and the list of rapid edges, see wireForPath."""
+        edges = []
+        rapid = []
+        for i in range(len(self)):
+            edge = self.edge(i)
             if edge:
-                if cmd.Name in CmdMoveRapid:
+                if self.rapid[i]:
                     rapid.append(edge)
                 edges.append(edge)
-                startPoint = commandEndPoint(cmd, startPoint)
-    return (Part.Wire(edges), rapid)
+        return (Part.Wire(edges), rapid)
 
-def wiresForPath(path, startPoint = Vector(0, 0, 0)):
-    """(path, [startPoint=Vector(0,0,0)])
-    Returns a collection of wires, each representing a continuous cutting Path in path."""
-    wires = []
-    if hasattr(path, "Commands"):
+    def wires(self):
+        """()
+        Returns a wire for each continuous cutting path, see wiresForPath."""
+        wires = []
         edges = []
-        for cmd in path.Commands:
-            if cmd.Name in CmdMove:
-                edges.append(edgeForCmd(cmd, startPoint))
-                startPoint = commandEndPoint(cmd, startPoint)
-            elif cmd.Name in CmdMoveRapid:
+        for i in range(len(self)):
+            if self.rapid[i]:
                 wires.append(Part.Wire(edges))
                 edges = []
-                startPoint = commandEndPoint(cmd, startPoint)
+            else:
+                edge = self.edge(i)
+                if edge:
+                    edges.append(edge)
         if edges:
             wires.append(Part.Wire(edges))
-    return wires
+        return wires
+
+    def _select(self, rapids):
+        if rapids:
+            return numpy.ones(len(self), dtype=bool)
+        return ~self.rapid
+
+    def zLimits(self, rapids = False):
+        """([rapids=False])
+        Returns the lowest and highest Z value of all moves, excluding rapid moves if rapids is False.
+        Arcs and helixes change their Z value monotonically, so only the end points are considered."""
+        sel = self._select(rapids)
+        if not sel.any():
+            return (float('inf'), float('-inf'))
+        z = numpy.concatenate((self.start[sel, 2], self.end[sel, 2]))
+        return (float(z.min()), float(z.max()))
+
+    def edgesAt(self, z, rapids = True):
+        """(z, [rapids=True])
+        Returns the edges of all moves starting and ending at height z, excluding rapid moves if rapids is False."""
+        sel = self._select(rapids) & (numpy.fabs(self.start[:, 2] - z) <= Tolerance) & (numpy.fabs(self.end[:, 2] - z) <= Tolerance)
+        return [e for e in (self.edge(i) for i in numpy.flatnonzero(sel)) if e is not None]
+
+    def _sweep(self):
+        # start angle, swept angle in the direction of the arc and the direction (+1 CCW, -1 CW) of all arcs
+        a = self.start[:, :2] - self.center[:, :2]
+        b = self.end[:, :2] - self.center[:, :2]
+        a0 = numpy.arctan2(a[:, 1], a[:, 0])
+        a1 = numpy.arctan2(b[:, 1], b[:, 0])
+        direction = numpy.where(self.kind == self.CW, -1.0, 1.0)
+        sweep = numpy.mod(direction * (a1 - a0), 2 * math.pi)
+        full = numpy.all(numpy.fabs(self.start[:, :2] - self.end[:, :2]) <= Tolerance, axis=1)
+        sweep[full] = 2 * math.pi
+        return (a0, sweep, direction)
+
+    def boundBox(self, rapids = True):
+        """([rapids=True])
+        Returns the FreeCAD.BoundBox of all moves, including the extent of arcs, excluding rapid moves if rapids is False."""
+        sel = self._select(rapids)
+        if not sel.any():
+            return FreeCAD.BoundBox()
+        pts = [self.start[sel], self.end[sel]]
+        arcs = sel & self.arc
+        if arcs.any():
+            a0, sweep, direction = self._sweep()
+            radius = numpy.hypot(*(self.start[:, :2] - self.center[:, :2]).T)
+            for angle in [0, math.pi / 2, math.pi, 3 * math.pi / 2]:
+                hit = arcs & (numpy.mod(direction * (angle - a0), 2 * math.pi) <= sweep)
+                if hit.any():
+                    pt = self.center[hit].copy()
+                    pt[:, 0] += radius[hit] * math.cos(angle)
+                    pt[:, 1] += radius[hit] * math.sin(angle)
+                    pt[:, 2] = self.start[hit, 2]
+                    pts.append(pt)
+        pts = numpy.concatenate(pts)
+        lo = pts.min(axis=0)
+        hi = pts.max(axis=0)
+        return FreeCAD.BoundBox(lo[0], lo[1], lo[2], hi[0], hi[1], hi[2])
+
+    def nearestPoint(self, pt, rapids = False):
+        """(pt, [rapids=False])
+        Returns (i, point, distance) of the point on the path closest to pt, i being the index of the move.
+        Helixes are treated like arcs with a linear change in Z along their arc length.
+        Returns (None, None, None) if there are no moves."""
+        sel = self._select(rapids)
+        if not sel.any():
+            return (None, None, None)
+        p = numpy.array([pt.x, pt.y, pt.z], dtype=float)
+        s = self.start
+        d = self.end - s
+
+        # straight moves
+        dd = numpy.einsum('ij,ij->i', d, d)
+        t = numpy.einsum('ij,ij->i', p - s, d) / numpy.where(dd > 0, dd, 1)
+        t = numpy.clip(t, 0, 1)
+        q = s + d * t[:, None]
+
+        # arcs and helixes
+        arcs = sel & self.arc
+        if arcs.any():
+            a0, sweep, direction = self._sweep()
+            c = self.center[arcs]
+            radius = numpy.hypot(*(s[arcs, :2] - c[:, :2]).T)
+            u = numpy.mod(direction[arcs] * (numpy.arctan2(p[1] - c[:, 1], p[0] - c[:, 0]) - a0[arcs]), 2 * math.pi)
+            sw = sweep[arcs]
+            outside = u > sw
+            u = numpy.where(outside, numpy.where(u - sw < 2 * math.pi - u, sw, 0), u)
+            frac = u / numpy.where(sw > 0, sw, 1)
+            angle = a0[arcs] + direction[arcs] * u
+            qa = numpy.empty_like(c)
+            qa[:, 0] = c[:, 0] + radius * numpy.cos(angle)
+            qa[:, 1] = c[:, 1] + radius * numpy.sin(angle)
+            qa[:, 2] = s[arcs, 2] + d[arcs, 2] * frac
+            q[arcs] = qa
+
+        dist = numpy.linalg.norm(q - p, axis=1)
+        dist[~sel] = numpy.inf
+        i = int(numpy.argmin(dist))
+        return (i, Vector(*q[i]), float(dist[i]))
+
+
+GeometryCacheSize = 32
+_GeometryCache = collections.OrderedDict()
+
+def geometryForPath(path, startPoint = Vector(0, 0, 0)):
+    """(path, [startPoint=Vector(0,0,0)])
+    Returns the PathGeometry of path. Instances are cached by the hash of the path's G-code,
+    so dressups and other consumers of the same path share the edges already created."""
+    if not hasattr(path, "Commands"):
+        return PathGeometry(path, startPoint)
+    key = (hashlib.sha1(path.toGCode().encode('utf-8')).hexdigest(), startPoint.x, startPoint.y, startPoint.z)
+    geom = _GeometryCache.pop(key, None)
+    if geom is None:
+        geom = PathGeometry(path, startPoint)
+        if len(_GeometryCache) >= GeometryCacheSize:
+            _GeometryCache.popitem(last=False)
+    _GeometryCache[key] = geom
+    return geom
+
+def clearGeometryCache():
+    """()
+    Drops all cached PathGeometry instances."""
+    _GeometryCache.clear()
+
+def wireForPath(path, startPoint = Vector(0, 0, 0)):
+    """(path, [startPoint=Vector(0,0,0)])
+    Returns a wire representing all move commands found in the given path."""
+    return geometryForPath(path, startPoint).wire()
+
+def wiresForPath(path, startPoint = Vector(0, 0, 0)):
+    """(path, [startPoint=Vector(0,0,0)])
+    Returns a collection of wires, each representing a continuous cutting Path in path."""
+    return geometryForPath(path, startPoint).wires()
 
 def arcToHelix(edge, z0, z1):
     """(edge, z0, z1)
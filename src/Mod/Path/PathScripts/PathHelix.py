@@ -42,6 +42,9 @@ def translate(context, text, disambig=None):
 class ObjectHelix(PathCircularHoleBase.ObjectOp):
     '''Proxy class for Helix operations.'''
 
+    # helix has always processed the holes in the order they were selected
+    DefaultSortingStrategy = 'None'
+
     def circularHoleFeatures(self, obj):
         '''circularHoleFeatures(obj) ... enable features supported by Helix.'''
         return PathOp.FeatureStepDown | PathOp.FeatureBaseEdges | PathOp.FeatureBaseFaces | PathOp.FeatureBasePanels
@@ -197,6 +200,8 @@ def SetupProperties():
     setup.append("Direction")
     setup.append("StartSide")
     setup.append("StepOver")
+    setup.append("SortingStrategy")
+    setup.append("SortingTimeout")
     return setup
 
 def Create(name, obj = None):
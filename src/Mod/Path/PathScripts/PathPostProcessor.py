@@ -101,3 +101,144 @@ class PostProcessor:
 
     def export(self, obj, filename, args):
         return self.script.export(obj, filename, args)
+
+
+class GCodeWriter(object):
+    '''GCodeWriter(stream=None, lineNumbers=False, lineNr=100, lineIncrement=10, chunkSize=4096, keep=False) ... buffered line output for post processors.
+    Lines are collected and written to stream, a file handle or io buffer, in chunks of chunkSize lines.
+    If no stream is given, or keep is True, the chunks are kept and can be retrieved with getvalue().'''
+
+    def __init__(self, stream=None, lineNumbers=False, lineNr=100, lineIncrement=10, chunkSize=4096, keep=False):
+        self.stream = stream
+        self.keep = keep or stream is None
+        self.lineNumbers = lineNumbers
+        self.lineNr = lineNr
+        self.lineIncrement = lineIncrement
+        self.chunkSize = chunkSize
+        self.lines = []
+        self.chunks = []
+
+    def lineNumber(self):
+        '''lineNumber() ... return the next line number prefix, or an empty string if line numbers are off.'''
+        if self.lineNumbers:
+            self.lineNr += self.lineIncrement
+            return "N%d " % self.lineNr
+        return ""
+
+    def write(self, line, numbered=True):
+        '''write(line, numbered=True) ... append line, the newline is added by the writer.'''
+        if numbered and self.lineNumbers:
+            line = self.lineNumber() + line
+        self.lines.append(line)
+        if len(self.lines) >= self.chunkSize:
+            self.flush()
+
+    def writeBlock(self, text, numbered=True):
+        '''writeBlock(text, numbered=True) ... append every line of a multi line string like the preamble.'''
+        for line in text.splitlines():
+            self.write(line, numbered)
+
+    def flush(self):
+        '''flush() ... hand all pending lines over to the stream.'''
+        if self.lines:
+            self.lines.append('')
+            chunk = '\n'.join(self.lines)
+            self.lines = []
+            if self.stream is not None:
+                self.stream.write(chunk)
+            if self.keep:
+                self.chunks.append(chunk)
+
+    def getvalue(self):
+        '''getvalue() ... return all output as a single string, only available if no stream was given or keep is True.'''
+        self.flush()
+        return ''.join(self.chunks)
+
+
+def unitScale(unit, quantityType):
+    '''unitScale(unit, quantityType) ... return the factor converting FreeCAD's internal value of quantityType into unit.'''
+    return float(FreeCAD.Units.Quantity(1.0, quantityType).getValueAs(unit))
+
+
+class CommandFormatter(object):
+    '''CommandFormatter(params, ...) ... turns Path commands into G-code words.
+    The unit scale factors and the number formats are computed once, the modal and the duplicate
+    suppression state is kept in a list with one entry per parameter.
+
+    params         ... the parameters to output, in output order
+    precision      ... number of decimals for axis words
+    unitFormat     ... unit axis words are converted to, e.g. 'mm' or 'in'
+    speedFormat    ... unit the feed rate is converted to, e.g. 'mm/min' or 'in/min'
+    feedPrecision  ... number of decimals for the feed rate, defaults to precision
+    modal          ... suppress a command if it is the same as the previous one
+    outputDoubles  ... if False axis and feed words are suppressed if their value did not change
+    rapidMoves     ... commands for which no feed rate is output
+    positiveFeed   ... only output feed rates greater than zero
+    intParams      ... parameters output as integers
+    formats        ... dictionary of parameter to a function returning the formatted value
+    initialState   ... dictionary of parameter values assumed at the start of each path'''
+
+    AXIS = 0
+    FEED = 1
+    INT = 2
+    CUSTOM = 3
+
+    def __init__(self, params, precision=3, unitFormat='mm', speedFormat='mm/min', feedPrecision=None,
+                 modal=False, outputDoubles=True, rapidMoves=('G0', 'G00'), positiveFeed=False,
+                 intParams=('T', 'H', 'D', 'S'), formats=None, initialState=None):
+        self.modal = modal
+        self.outputDoubles = outputDoubles
+        self.rapidMoves = set(rapidMoves)
+        self.positiveFeed = positiveFeed
+        self.initialState = initialState if initialState else {}
+        self.axisScale = unitScale(unitFormat, FreeCAD.Units.Length)
+        self.feedScale = unitScale(speedFormat, FreeCAD.Units.Velocity)
+
+        axisFormat = '%%.%df' % int(precision)
+        feedFormat = '%%.%df' % int(precision if feedPrecision is None else feedPrecision)
+        formats = formats if formats else {}
+        self.params = []
+        for param in params:
+            if param in formats:
+                self.params.append((param, self.CUSTOM, formats[param]))
+            elif param == 'F':
+                self.params.append((param, self.FEED, param + feedFormat))
+            elif param in intParams:
+                self.params.append((param, self.INT, param + '%d'))
+            else:
+                self.params.append((param, self.AXIS, param + axisFormat))
+        self.reset()
+
+    def reset(self):
+        '''reset() ... forget the previous command and the parameter values, to be called at the start of each path.'''
+        self.lastCommand = None
+        self.state = [self.initialState.get(param) for (param, kind, fmt) in self.params]
+
+    def words(self, name, parameters):
+        '''words(name, parameters) ... return the list of G-code words for the command name with the given parameters.'''
+        words = []
+        if not (self.modal and name == self.lastCommand):
+            words.append(name)
+        self.lastCommand = name
+
+        if parameters:
+            state = self.state
+            doubles = self.outputDoubles
+            for i, (param, kind, fmt) in enumerate(self.params):
+                value = parameters.get(param)
+                if value is None:
+                    continue
+                if kind == self.AXIS:
+                    if doubles or state[i] != value:
+                        words.append(fmt % (value * self.axisScale))
+                elif kind == self.FEED:
+                    if name not in self.rapidMoves and (doubles or state[i] != value):
+                        speed = value * self.feedScale
+                        if speed > 0.0 or not self.positiveFeed:
+                            words.append(fmt % speed)
+                elif kind == self.INT:
+                    words.append(fmt % int(value))
+                else:
+                    words.append(param + fmt(value))
+                state[i] = value
+        return words
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import Mesh
+import PathScripts.PathDressup as PathDressup
+import PathScripts.PathGeom as PathGeom
+import PathScripts.PathLog as PathLog
+import math
+import numpy
+
+from multiprocessing.pool import ThreadPool
+
+__title__ = "Path Simulator Engine"
+__author__ = "FreeCAD Developers"
+__url__ = "http://www.freecadweb.org"
+__doc__ = "Headless stock removal simulation of Path commands on a heightfield."
+
+if False:
+    PathLog.setLevel(PathLog.Level.DEBUG, PathLog.thisModule())
+    PathLog.trackModule(PathLog.thisModule())
+else:
+    PathLog.setLevel(PathLog.Level.INFO, PathLog.thisModule())
+
+CmdDrillCycle = ['G81', 'G82', 'G83']
+
+
+class ToolProfile(object):
+    '''Rotational profile of a tool, the height of its cutting edge above the tool tip as a function
+    of the distance from the tool axis. Tool types are mapped to profiles like PathSimulator does.'''
+
+    Flat = 'Flat'
+    Chamfer = 'Chamfer'
+    Round = 'Round'
+
+    def __init__(self, kind, radius, angle=180):
+        self.kind = kind
+        self.radius = radius
+        self.ratio = 0
+        if kind == self.Chamfer:
+            if angle <= 0 or angle >= 180:
+                self.kind = self.Flat
+            else:
+                self.ratio = 1.0 / math.tan(math.radians(angle) / 2)
+
+    @classmethod
+    def fromTool(cls, tool):
+        '''fromTool(tool) ... return the profile for the given Path.Tool.'''
+        radius = tool.Diameter / 2.0
+        if tool.ToolType == 'BallEndMill':
+            return cls(cls.Round, radius)
+        if tool.ToolType in ['ChamferMill', 'Drill', 'CenterDrill', 'SlotCutter', 'CornerRound', 'Engraver', 'Undefined']:
+            return cls(cls.Chamfer, radius, tool.CuttingEdgeAngle)
+        return cls(cls.Flat, radius)
+
+    def heightAt(self, r):
+        '''heightAt(r) ... return the height of the profile at the distances r from the tool axis, inf outside the tool.'''
+        r = numpy.asarray(r, dtype=float)
+        if self.kind == self.Round:
+            h = self.radius - numpy.sqrt(numpy.maximum(self.radius ** 2 - r ** 2, 0))
+        elif self.kind == self.Chamfer:
+            h = r * self.ratio
+        else:
+            h = numpy.zeros(r.shape)
+        return numpy.where(r <= self.radius, h, numpy.inf)
+
+
+class HeightmapStock(object):
+    '''Stock represented by one height per cell of a regular grid in the XY plane.
+    Each cell is assumed to be solid material from zmin up to its height.'''
+
+    def __init__(self, xmin, ymin, xmax, ymax, zmin, zmax, resolution):
+        self.resolution = float(resolution)
+        self.xmin = xmin
+        self.ymin = ymin
+        self.zmin = zmin
+        self.zmax = zmax
+        nx = max(2, int(math.ceil((xmax - xmin) / self.resolution)))
+        ny = max(2, int(math.ceil((ymax - ymin) / self.resolution)))
+        # cell centers
+        self.x = xmin + (numpy.arange(nx) + 0.5) * self.resolution
+        self.y = ymin + (numpy.arange(ny) + 0.5) * self.resolution
+        self.heights = numpy.full((ny, nx), float(zmax))
+
+    @classmethod
+    def fromShape(cls, shape, resolution):
+        '''fromShape(shape, resolution) ... return the stock for shape, box shaped stock is filled
+        without tessellating it.'''
+        bb = shape.BoundBox
+        stock = cls(bb.XMin, bb.YMin, bb.XMax, bb.YMax, bb.ZMin, bb.ZMax, resolution)
+        if not PathGeom.isRoughly(shape.Volume, bb.XLength * bb.YLength * bb.ZLength, bb.XLength * bb.YLength * resolution / 100):
+            stock.heights = stock.heightsOf(shape)
+        return stock
+
+    def cellArea(self):
+        return self.resolution * self.resolution
+
+    def volume(self):
+        '''volume() ... return the volume of the remaining material.'''
+        return float((self.heights - self.zmin).sum()) * self.cellArea()
+
+    def heightsOf(self, shape, deflection=None):
+        '''heightsOf(shape, [deflection]) ... return the top of shape sampled at the cells of the stock.
+        Cells not covered by shape are set to zmin.'''
+        points, triangles = shape.tessellate(deflection if deflection else self.resolution / 2)
+        pts = numpy.array([(p.x, p.y, p.z) for p in points], dtype=float)
+        heights = numpy.full(self.heights.shape, float(self.zmin))
+        res = self.resolution
+        for tri in triangles:
+            (ax, ay, az), (bx, by, bz), (cx, cy, cz) = pts[list(tri)]
+            det = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
+            if math.fabs(det) < 1e-12:
+                continue
+            c0 = max(0, int(math.floor((min(ax, bx, cx) - self.xmin) / res)))
+            c1 = min(len(self.x), int(math.ceil((max(ax, bx, cx) - self.xmin) / res)) + 1)
+            r0 = max(0, int(math.floor((min(ay, by, cy) - self.ymin) / res)))
+            r1 = min(len(self.y), int(math.ceil((max(ay, by, cy) - self.ymin) / res)) + 1)
+            if c0 >= c1 or r0 >= r1:
+                continue
+            X = self.x[c0:c1][numpy.newaxis, :]
+            Y = self.y[r0:r1][:, numpy.newaxis]
+            l1 = ((by - cy) * (X - cx) + (cx - bx) * (Y - cy)) / det
+            l2 = ((cy - ay) * (X - cx) + (ax - cx) * (Y - cy)) / det
+            l3 = 1 - l1 - l2
+            inside = (l1 >= -1e-9) & (l2 >= -1e-9) & (l3 >= -1e-9)
+            z = numpy.where(inside, l1 * az + l2 * bz + l3 * cz, -numpy.inf)
+            window = heights[r0:r1, c0:c1]
+            numpy.maximum(window, z, out=window)
+        return heights
+
+    def getMesh(self):
+        '''getMesh() ... return a closed Mesh.Mesh of the stock through the cell centers.'''
+        X, Y = numpy.meshgrid(self.x, self.y)
+        top = numpy.dstack((X, Y, self.heights))
+        bottom = numpy.dstack((X, Y, numpy.full(X.shape, float(self.zmin))))
+
+        def quads(P, flip):
+            a, b, c, d = P[:-1, :-1], P[:-1, 1:], P[1:, 1:], P[1:, :-1]
+            if flip:
+                tris = [(a, c, b), (a, d, c)]
+            else:
+                tris = [(a, b, c), (a, c, d)]
+            return [numpy.stack(t, axis=-2).reshape(-1, 3, 3) for t in tris]
+
+        # boundary of the top counter clockwise, each edge gets a wall down to zmin
+        rim = numpy.concatenate((top[0, :-1], top[:-1, -1], top[-1, :0:-1], top[:0:-1, 0]))
+        rimBottom = rim.copy()
+        rimBottom[:, 2] = self.zmin
+        u, v = rim, numpy.roll(rim, -1, axis=0)
+        ub, vb = rimBottom, numpy.roll(rimBottom, -1, axis=0)
+        walls = [numpy.stack((u, ub, vb), axis=1), numpy.stack((u, vb, v), axis=1)]
+
+        facets = numpy.concatenate(quads(top, False) + quads(bottom, True) + walls)
+        return Mesh.Mesh(facets.reshape(-1, 3).tolist())
+
+
+class Simulation(object):
+    '''Applies Path commands to a HeightmapStock without any GUI interaction.
+    The stock can be split into tiles processed by several threads, the result does not depend on it.'''
+
+    def __init__(self, stock, threads=1, tolerance=None):
+        self.stock = stock
+        self.threads = max(1, threads)
+        self.tolerance = tolerance if tolerance is not None else stock.cellArea() * stock.resolution
+        self.tool = None
+        self.position = (0.0, 0.0, float(stock.zmax))
+        self.collisions = []
+        self.removed = []
+
+    def setTool(self, tool):
+        '''setTool(tool) ... set the tool used for all following commands, a Path.Tool or a ToolProfile.'''
+        if tool is not None and not isinstance(tool, ToolProfile):
+            tool = ToolProfile.fromTool(tool)
+        self.tool = tool
+
+    def applyOperation(self, op):
+        '''applyOperation(op) ... apply all commands of op with the tool of its ToolController.
+        Returns the removed volume of each command.'''
+        self.setTool(PathDressup.toolController(op).Tool)
+        return self.applyCommands(op.Path.Commands, op.Label)
+
+    def applyCommands(self, commands, label=None):
+        '''applyCommands(commands, [label]) ... apply all commands in one batch and return the removed volume of each command.
+        The volumes are also recorded in removed as (label, volumes), rapid moves which remove material
+        are recorded in collisions as (label, index, volume).'''
+        segments = []
+        rapids = []
+        pos = self.position
+        for i, cmd in enumerate(commands):
+            points, pos = self._commandPoints(cmd, pos)
+            for p, q in zip(points[:-1], points[1:]):
+                segments.extend((i, s, e) for s, e in self._splitRamp(p, q))
+            if cmd.Name in PathGeom.CmdMoveRapid:
+                rapids.append(i)
+        self.position = pos
+
+        removed = self._cut(segments, len(commands))
+        for i in rapids:
+            if removed[i] > self.tolerance:
+                PathLog.debug("rapid move #{} of {} removes {:.3f}".format(i, label, removed[i]))
+                self.collisions.append((label, i, float(removed[i])))
+        self.removed.append((label, removed.tolist()))
+        return removed.tolist()
+
+    def gouges(self, shape, tolerance=None):
+        '''gouges(shape, [tolerance]) ... return an array of (x, y, depth) for all cells of the stock
+        which were cut deeper than the top of shape.'''
+        if tolerance is None:
+            tolerance = self.stock.resolution
+        depth = self.stock.heightsOf(shape) - self.stock.heights
+        rows, cols = numpy.nonzero(depth > tolerance)
+        return numpy.column_stack((self.stock.x[cols], self.stock.y[rows], depth[rows, cols]))
+
+    def getResultMesh(self):
+        return self.stock.getMesh()
+
+    def _commandPoints(self, cmd, pos):
+        # returns the points the tool tip moves through and the final position
+        params = cmd.Parameters
+        if cmd.Name in PathGeom.CmdMoveRapid or cmd.Name in PathGeom.CmdMoveStraight:
+            end = (params.get('X', pos[0]), params.get('Y', pos[1]), params.get('Z', pos[2]))
+            return [pos, end], end
+
+        if cmd.Name in PathGeom.CmdMoveArc:
+            end = (params.get('X', pos[0]), params.get('Y', pos[1]), params.get('Z', pos[2]))
+            cx = pos[0] + params.get('I', 0)
+            cy = pos[1] + params.get('J', 0)
+            a0 = math.atan2(pos[1] - cy, pos[0] - cx)
+            a1 = math.atan2(end[1] - cy, end[0] - cx)
+            if cmd.Name in PathGeom.CmdMoveCW:
+                sweep = -((a0 - a1) % (2 * math.pi))
+            else:
+                sweep = (a1 - a0) % (2 * math.pi)
+            if PathGeom.isRoughly(sweep, 0):
+                sweep = 2 * math.pi if cmd.Name in PathGeom.CmdMoveCCW else -2 * math.pi
+            r = math.hypot(pos[0] - cx, pos[1] - cy)
+            steps = max(1, int(math.ceil(math.fabs(sweep) * r / self.stock.resolution)))
+            t = numpy.arange(1, steps) / float(steps)
+            ang = a0 + sweep * t
+            points = numpy.column_stack((cx + r * numpy.cos(ang), cy + r * numpy.sin(ang), pos[2] + (end[2] - pos[2]) * t))
+            return [pos] + [tuple(p) for p in points.tolist()] + [end], end
+
+        if cmd.Name in CmdDrillCycle:
+            x = params.get('X', pos[0])
+            y = params.get('Y', pos[1])
+            r = params.get('R', pos[2])
+            z = params.get('Z', pos[2])
+            end = (x, y, r)
+            return [pos, end, (x, y, z), end], end
+
+        return [pos], pos
+
+    def _splitRamp(self, p, q):
+        # ramps are cut in pieces so the depth of each piece only changes by the resolution
+        steps = 1
+        if math.hypot(q[0] - p[0], q[1] - p[1]) > self.stock.resolution:
+            steps = max(1, int(math.ceil(math.fabs(q[2] - p[2]) / self.stock.resolution)))
+        if steps == 1:
+            return [(p, q)]
+        pts = [tuple(p[k] + (q[k] - p[k]) * i / float(steps) for k in range(3)) for i in range(steps + 1)]
+        return list(zip(pts[:-1], pts[1:]))
+
+    def _cut(self, segments, count):
+        removed = numpy.zeros(count)
+        if self.tool is None or not segments:
+            return removed
+
+        stock = self.stock
+        res = stock.resolution
+        seg = numpy.array([p + q for i, p, q in segments], dtype=float)
+        index = numpy.array([i for i, p, q in segments])
+        rad = self.tool.radius
+        col0 = numpy.floor((numpy.minimum(seg[:, 0], seg[:, 3]) - rad - stock.xmin) / res).astype(int)
+        col1 = numpy.ceil((numpy.maximum(seg[:, 0], seg[:, 3]) + rad - stock.xmin) / res).astype(int) + 1
+        row0 = numpy.floor((numpy.minimum(seg[:, 1], seg[:, 4]) - rad - stock.ymin) / res).astype(int)
+        row1 = numpy.ceil((numpy.maximum(seg[:, 1], seg[:, 4]) + rad - stock.ymin) / res).astype(int) + 1
+
+        ny, nx = stock.heights.shape
+        strips = min(ny, self.threads * 4 if self.threads > 1 else 1)
+        bounds = numpy.linspace(0, ny, strips + 1).astype(int)
+
+        def cutStrip(strip):
+            lo, hi = strip
+            vol = numpy.zeros(count)
+            sel = numpy.nonzero((row0 < hi) & (row1 > lo) & (col0 < nx) & (col1 > 0))[0]
+            for s in sel:
+                rows = slice(max(row0[s], lo), min(row1[s], hi))
+                cols = slice(max(col0[s], 0), min(col1[s], nx))
+                vol[index[s]] += self._cutSegment(seg[s], rows, cols)
+            return vol
+
+        strips = list(zip(bounds[:-1], bounds[1:]))
+        if len(strips) > 1:
+            pool = ThreadPool(self.threads)
+            try:
+                results = pool.map(cutStrip, strips)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [cutStrip(s) for s in strips]
+        for vol in results:
+            removed += vol
+        return removed
+
+    def _cutSegment(self, s, rows, cols):
+        stock = self.stock
+        H = stock.heights[rows, cols]
+        if min(s[2], s[5]) >= H.max():
+            return 0.0
+        X = stock.x[cols][numpy.newaxis, :]
+        Y = stock.y[rows][:, numpy.newaxis]
+        dx = s[3] - s[0]
+        dy = s[4] - s[1]
+        l2 = dx * dx + dy * dy
+        if l2 < 1e-12:
+            tip = min(s[2], s[5]) + self.tool.heightAt(numpy.hypot(X - s[0], Y - s[1]))
+        else:
+            tc = ((X - s[0]) * dx + (Y - s[1]) * dy) / l2
+            if s[2] == s[5]:
+                offsets = [0]
+            else:
+                # the lowest tool position over a cell of a ramp is not the closest one, the edge
+                # of the tool is where a flat tool reaches it
+                perp = (X - s[0]) * dy - (Y - s[1]) * dx
+                width = numpy.sqrt(numpy.maximum(self.tool.radius ** 2 * l2 - perp * perp, 0)) / l2
+                offsets = [-1, -0.5, 0, 0.5, 1]
+            tip = None
+            for f in offsets:
+                t = numpy.clip(tc + f * width, 0, 1) if f else numpy.clip(tc, 0, 1)
+                z = s[2] + t * (s[5] - s[2]) + self.tool.heightAt(numpy.hypot(X - (s[0] + t * dx), Y - (s[1] + t * dy)))
+                tip = z if tip is None else numpy.minimum(tip, z)
+        cut = numpy.maximum(numpy.minimum(H, tip), stock.zmin)
+        vol = float((H - cut).sum()) * stock.cellArea()
+        H[...] = cut
+        return vol
+
+
+def simulate(job, operations=None, resolution=None, threads=1):
+    '''simulate(job, [operations], [resolution], [threads]) ... apply all active operations of job, or the given
+    operations, to the job's stock and return the Simulation. The default resolution splits the longer side
+    of the stock into 500 cells.'''
+    shape = job.Stock.Shape
+    if resolution is None:
+        resolution = max(shape.BoundBox.XLength, shape.BoundBox.YLength) / 500.0
+    sim = Simulation(HeightmapStock.fromShape(shape, resolution), threads)
+    if operations is None:
+        operations = [op for op in job.Operations.Group if getattr(op, 'Active', True)]
+    for op in operations:
+        sim.applyOperation(op)
+    return sim
@@ -64,8 +64,10 @@ import PathScripts.PathUtils as PathUtils
 import PathScripts.PathOp as PathOp
 
 from PySide import QtCore
+import hashlib
 import time
 import math
+import numpy
 
 
 __title__ = "Path Surface Operation"
@@ -108,6 +110,9 @@ class ObjectSurface(PathOp.ObjectOp):
     initOpStartDepth = None
     docRestored = False
 
+    # CL height map of the last planar scan, kept while the document is open
+    heightMap = None
+
     def baseObject(self):
         '''baseObject() ... returns super of receiver
         Used to call base implementation in overwritten functions.'''
@@ -123,6 +128,7 @@ class ObjectSurface(PathOp.ObjectOp):
         obj.addProperty("App::PropertyEnumeration", "DropCutterDir", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "The direction along which dropcutter lines are created"))
         obj.addProperty("App::PropertyEnumeration", "BoundBox", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Should the operation be limited by the stock object or by the bounding box of the base object"))
         obj.addProperty("App::PropertyVectorDistance", "DropCutterExtraOffset", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Additional offset to the selected bounding box"))
+        obj.addProperty("App::PropertyBool", "UseHeightMap", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Planar: Scan the model once into a height map which is reused for all lines and layers"))
         obj.addProperty("App::PropertyEnumeration", "ScanType", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Planar: Flat, 3D surface scan.  Rotational: 4th-axis rotational scan."))
         obj.addProperty("App::PropertyEnumeration", "LayerMode", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "The completion mode for the operation: single or multi-pass"))
         obj.addProperty("App::PropertyEnumeration", "CutMode", "Path", QtCore.QT_TRANSLATE_NOOP("App::Property", "The direction that the toolpath should go around the part: Climb(ClockWise) or Conventional(CounterClockWise)"))
@@ -168,6 +174,9 @@ class ObjectSurface(PathOp.ObjectOp):
             self.setEditorProperties(obj)
 
     def opOnDocumentRestored(self, obj):
+        if not hasattr(obj, 'UseHeightMap'):
+            obj.addProperty("App::PropertyBool", "UseHeightMap", "Algorithm", QtCore.QT_TRANSLATE_NOOP("App::Property", "Planar: Scan the model once into a height map which is reused for all lines and layers"))
+            obj.UseHeightMap = False
         self.setEditorProperties(obj)
         # Import FinalDepth from existing operation for use in recompute() operations
         self.initFinalDepth = obj.FinalDepth.Value
@@ -368,7 +377,7 @@ class ObjectSurface(PathOp.ObjectOp):
 
                     final = self._rotationalDropCutterOp(obj, stl, bb)
                 elif obj.ScanType == 'Planar':
-                    final = self._planarDropCutOp(obj, stl, bb)
+                    final = self._planarDropCutOp(obj, stl, bb, mesh)
             # End IF
             # Send final list of commands to operation object
             self.commandlist.extend(final)
@@ -379,31 +388,12 @@ class ObjectSurface(PathOp.ObjectOp):
 
         print(self.opReport)
 
-    def _planarDropCutOp(self, obj, stl, bb):
+    def _planarDropCutOp(self, obj, stl, bb, mesh):
         # t_before = time.time()
         pntsPerLine = 0
         ignoreWasteFlag = obj.IgnoreWaste
         ignoreMap = [1]
 
-        def createTopoMap(scanCLP, ignoreDepth):
-            topoMap = []
-            for pt in scanCLP:
-                if pt.z < ignoreDepth:
-                    topoMap.append(0)
-                else:
-                    topoMap.append(2)
-            return topoMap
-
-        # Convert linear list of points to multi-dimensional list
-        def listToMultiDimensional(points, nL, pPL):
-            multiDim = []
-            for L in range(0, nL):
-                multiDim.append([])
-                for P in range(0, pPL):
-                    pi = L * pPL + P
-                    multiDim[L].append(points[pi])
-            return multiDim
-
         # De-buffer multi dimensional list
         def debufferMultiDimenList(multi):
             multi.pop(0)
@@ -456,14 +446,19 @@ class ObjectSurface(PathOp.ObjectOp):
             exOff = obj.DropCutterExtraOffset.x
         numLines = int(math.ceil((bbLength + (2 * exOff)) / self.cutOut))  # Number of lines
 
-        # Scan the piece to depth
-        scanCLP = self._planarDropCutScan(obj, stl, bbLength, xmin, ymin, xmax, ymax, depthparams[lenDP - 1], numLines, self.cutOut)
+        # Scan the piece to depth, scanCLP holds one row of x, y, z per CL point
+        if obj.UseHeightMap:
+            clMap = self._planarHeightMap(obj, stl, mesh, xmin, ymin, xmax, ymax, numLines, self.cutOut)
+            scanCLP = self._planarHeightMapLines(obj, clMap)
+            scanCLP[:, 2] = numpy.maximum(scanCLP[:, 2], depthparams[lenDP - 1])
+        else:
+            clp = self._planarDropCutScan(obj, stl, bbLength, xmin, ymin, xmax, ymax, depthparams[lenDP - 1], numLines, self.cutOut)
+            scanCLP = numpy.array([(p.x, p.y, p.z) for p in clp], dtype=float).reshape(-1, 3)
 
         # Apply depth offset
         if obj.DepthOffset.Value != 0:
             self.reportThis("--Applying DepthOffset")
-            for pt in range(0, len(scanCLP)):
-                scanCLP[pt].z += obj.DepthOffset.Value
+            scanCLP[:, 2] += obj.DepthOffset.Value
 
         numPts = len(scanCLP)
         pntsPerLine = numPts / numLines
@@ -475,9 +470,9 @@ class ObjectSurface(PathOp.ObjectOp):
 
         # Create topo map for ignoring waste material
         if ignoreWasteFlag is True:
-            topoMap = createTopoMap(scanCLP, obj.IgnoreWasteDepth)
-            self.topoMap = listToMultiDimensional(topoMap, numLines, pntsPerLine)
-            self._bufferTopoMap(numLines, pntsPerLine)
+            zMap = scanCLP[:, 2].reshape(numLines, int(pntsPerLine))
+            self.topoMap = numpy.where(zMap < obj.IgnoreWasteDepth, 0, 2)
+            self._bufferTopoMap()
             self._highlightWaterline(4, 1)
             self.topoMap = debufferMultiDimenList(self.topoMap)
             ignoreMap = multiDimensionalToList(self.topoMap)
@@ -518,13 +513,7 @@ class ObjectSurface(PathOp.ObjectOp):
 
         if obj.DropCutterDir == 'X':
             # add Line objects to the path in this loop
-            for n in range(0, Nl):
-                if n == Nl - 1:
-                    if obj.StepOver > 50:
-                        cOut = (self.cutter.getDiameter() / 2)
-                    y = ymax - cOut
-                else:
-                    y = ymin - (self.cutter.getDiameter() / 2) + ((n + 1) * cOut)  # all lines are offset by 1/2 cutter diameter
+            for (n, y) in enumerate(self._planarLineOffsets(obj, ymin, ymax, Nl, cOut)):
                 p1 = ocl.Point(xmin, y, 0)   # start-point of line
                 p2 = ocl.Point(xmax, y, 0)   # end-point of line
 
@@ -532,13 +521,7 @@ class ObjectSurface(PathOp.ObjectOp):
                 path.append(lo)        # add the line to the path
         else:
             # add Line objects to the path in this loop
-            for n in range(0, Nl):
-                if n == Nl - 1:
-                    if obj.StepOver > 50:
-                        cOut = (self.cutter.getDiameter() / 2)
-                    x = xmax - cOut
-                else:
-                    x = xmin - (self.cutter.getDiameter() / 2) + ((n + 1) * cOut)  # all lines are offset by 1/2 cutter diameter
+            for (n, x) in enumerate(self._planarLineOffsets(obj, xmin, xmax, Nl, cOut)):
                 p1 = ocl.Point(x, ymin, 0)   # start-point of line
                 p2 = ocl.Point(x, ymax, 0)   # end-point of line
 
@@ -555,6 +538,77 @@ class ObjectSurface(PathOp.ObjectOp):
         # return the list the points
         return clp
 
+    def _planarLineOffsets(self, obj, vmin, vmax, Nl, cOut):
+        # Return the cross coordinate of each of the Nl scan lines
+        offsets = []
+        for n in range(0, Nl):
+            if n == Nl - 1:
+                if obj.StepOver > 50:
+                    cOut = (self.cutter.getDiameter() / 2)
+                offsets.append(vmax - cOut)
+            else:
+                offsets.append(vmin - (self.cutter.getDiameter() / 2) + ((n + 1) * cOut))  # all lines are offset by 1/2 cutter diameter
+        return offsets
+
+    def _planarHeightMap(self, obj, stl, mesh, xmin, ymin, xmax, ymax, Nl, cOut):
+        # Return the CL points of the Nl scan lines as an array of Nl x points per line x 3, in line order.
+        # The lines are placed at the exact _planarLineOffsets positions and sampled along the cut direction
+        # like PathDropCutter does, so the points match the per-line scan.
+        # The map is scanned without a depth limit, so it stays valid if depths or the cut pattern change,
+        # it is only rescanned if the model, cutter, sample interval, area or scan lines change.
+        smplInt = obj.SampleInterval
+        if obj.DropCutterDir == 'X':
+            (amin, amax, cmin, cmax) = (xmin, xmax, ymin, ymax)
+        else:
+            (amin, amax, cmin, cmax) = (ymin, ymax, xmin, xmax)
+        offsets = self._planarLineOffsets(obj, cmin, cmax, Nl, cOut)
+        (verts, facets) = mesh.Topology
+        sha = hashlib.sha1()
+        sha.update(numpy.array([(v.x, v.y, v.z) for v in verts], dtype=float).tobytes())
+        sha.update(numpy.array(facets, dtype=numpy.int64).tobytes())
+        sha.update(str((str(self.cutter), smplInt, obj.DropCutterDir, amin, amax, offsets)).encode())
+        key = sha.hexdigest()
+        if self.heightMap is not None and self.heightMap[0] == key:
+            self.reportThis("--Reusing height map of previous scan")
+            return self.heightMap[1]
+
+        t_before = time.time()
+        # same sampling as PathDropCutter: num_steps + 1 evenly spaced points over each line
+        numSteps = int((amax - amin) / smplInt + 1)
+        along = amin + (amax - amin) * numpy.arange(numSteps + 1) / float(numSteps)
+        # the cutter tip can reach below the model, points without contact stay at floor
+        floor = mesh.BoundBox.ZMin - self.cutter.getLength() - 1.0
+
+        # BatchDropCutter is OpenMP parallel, all lines are scanned in one run
+        bdc = ocl.BatchDropCutter()
+        bdc.setSTL(stl)
+        bdc.setCutter(self.cutter)
+        for c in offsets:
+            for a in along:
+                if obj.DropCutterDir == 'X':
+                    bdc.appendPoint(ocl.CLPoint(a, c, floor))
+                else:
+                    bdc.appendPoint(ocl.CLPoint(c, a, floor))
+        bdc.run()
+        clMap = numpy.array([(p.x, p.y, p.z) for p in bdc.getCLPoints()], dtype=float).reshape(Nl, len(along), 3)
+        self.reportThis("--OCL height map scan of " + str(Nl) + " x " + str(len(along)) + " points took " + str(time.time() - t_before) + " s")
+
+        self.heightMap = (key, clMap)
+        return clMap
+
+    def _planarHeightMapLines(self, obj, clMap):
+        # Return the CL points of the height map lines, in cutting order, as rows of x, y, z.
+        lines = []
+        for n in range(0, len(clMap)):
+            line = clMap[n]
+            if obj.CutPattern == 'ZigZag':
+                if n % 2 == 1:
+                    line = line[::-1]
+            elif obj.CutMode != 'Conventional':
+                line = line[::-1]
+            lines.append(line)
+        return numpy.vstack(lines)
+
     def _planarScanToGcode(self, obj, lc, prvDep, layDep, CLP, pntsPerLine, ignoreMap):
         output = []
         optimize = obj.Optimize
@@ -604,24 +658,24 @@ class ObjectSurface(PathOp.ObjectOp):
         if obj.ReleaseFromWaste is True:
             minIgnVal = 0
 
+        # Extract coordinates of the CL points, limited to the layer depth
+        clpX = CLP[:, 0].tolist()
+        clpY = CLP[:, 1].tolist()
+        clpZ = numpy.maximum(CLP[:, 2], layDep).tolist()
+
         # Set values for first gcode point in layer
-        pnt.x = CLP[0].x
-        pnt.y = CLP[0].y
-        pnt.z = CLP[0].z
-        if CLP[0].z < layDep:
-            pnt.z = layDep
+        pnt.x = clpX[0]
+        pnt.y = clpY[0]
+        pnt.z = clpZ[0]
 
         # generate the path commands
         # Begin processing ocl points list into gcode
         for i in range(0, lenCLP):
             # Calculate next point for consideration of next point
             if i < lastCLP:
-                nxt.x = CLP[i + 1].x
-                nxt.y = CLP[i + 1].y
-                if CLP[i + 1].z < layDep:
-                    nxt.z = layDep
-                else:
-                    nxt.z = CLP[i + 1].z
+                nxt.x = clpX[i + 1]
+                nxt.y = clpY[i + 1]
+                nxt.z = clpZ[i + 1]
             else:
                 optimize = False
 
@@ -1349,13 +1403,10 @@ class ObjectSurface(PathOp.ObjectOp):
         lenOS = len(oclScan)
         ptPrLn = int(lenOS / numScanLines)
 
-        # Convert oclScan list of points to multi-dimensional list
-        scanLines = []
-        for L in range(0, numScanLines):
-            scanLines.append([])
-            for P in range(0, ptPrLn):
-                pi = L * ptPrLn + P
-                scanLines[L].append(oclScan[pi])
+        # Convert oclScan list of points to multi-dimensional list and a height map,
+        # all layers are extracted from this single scan
+        scanLines = [oclScan[L * ptPrLn:(L + 1) * ptPrLn] for L in range(0, numScanLines)]
+        zMap = numpy.array([p.z for p in oclScan[:numScanLines * ptPrLn]], dtype=float).reshape(numScanLines, ptPrLn)
         lenSL = len(scanLines)
         pntsPerLine = len(scanLines[0])
         self.reportThis("--OCL scan: " + str(lenSL * pntsPerLine) + " points, with " + str(numScanLines) + " lines and " + str(pntsPerLine) + " pts/line")
@@ -1367,7 +1418,7 @@ class ObjectSurface(PathOp.ObjectOp):
         layTime = time.time()
         self.topoMap = []
         for layDep in depthparams:
-            cmds = self._getWaterline(obj, scanLines, layDep, lyr, lenSL, pntsPerLine)
+            cmds = self._getWaterline(obj, scanLines, zMap, layDep, lyr)
             commands.extend(cmds)
             lyr += 1
         self.reportThis("--All layer scans combined took " + str(time.time() - layTime) + " s")
@@ -1394,132 +1445,123 @@ class ObjectSurface(PathOp.ObjectOp):
         # return the list the points
         return pdc.getCLPoints()
 
-    def _getWaterline(self, obj, scanLines, layDep, lyr, lenSL, pntsPerLine):
+    def _getWaterline(self, obj, scanLines, zMap, layDep, lyr):
         commands = []
         cmds = []
         loopList = []
-        self.topoMap = []
-        # Create topo map from scanLines (highs and lows)
-        self.topoMap = self._createTopoMap(scanLines, layDep, lenSL, pntsPerLine)
+        # Create topo map from the height map (highs and lows)
+        self.topoMap = self._createTopoMap(zMap, layDep)
         # Add buffer lines and columns to topo map
-        self._bufferTopoMap(lenSL, pntsPerLine)
+        self._bufferTopoMap()
         # Identify layer waterline from OCL scan
         self._highlightWaterline(4, 9)
         # Extract waterline and convert to gcode
         loopList = self._extractWaterlines(obj, scanLines, lyr, layDep)
-        time.sleep(0.1)
         # save commands
         for loop in loopList:
             cmds = self._loopToGcode(obj, layDep, loop)
             commands.extend(cmds)
         return commands
 
-    def _createTopoMap(self, scanLines, layDep, lenSL, pntsPerLine):
-        topoMap = []
-        for L in range(0, lenSL):
-            topoMap.append([])
-            for P in range(0, pntsPerLine):
-                if scanLines[L][P].z > layDep:
-                    topoMap[L].append(2)
-                else:
-                    topoMap[L].append(0)
-        return topoMap
-
-    def _bufferTopoMap(self, lenSL, pntsPerLine):
-        # add buffer boarder of zeros to all sides to topoMap data
-        pre = [0, 0]
-        post = [0, 0]
-        for p in range(0, pntsPerLine):
-            pre.append(0)
-            post.append(0)
-        for l in range(0, lenSL):
-            self.topoMap[l].insert(0, 0)
-            self.topoMap[l].append(0)
-        self.topoMap.insert(0, pre)
-        self.topoMap.append(post)
+    def _createTopoMap(self, zMap, layDep):
+        # mark all points of the height map above the layer depth as high (2)
+        return numpy.where(zMap > layDep, 2, 0).astype(numpy.int8)
+
+    def _bufferTopoMap(self):
+        # add buffer border of zeros to all sides of topoMap data
+        self.topoMap = numpy.pad(self.topoMap, 1, 'constant')
         return True
 
     def _highlightWaterline(self, extraMaterial, insCorn):
+        # self.topoMap is a 2D array of 0 (low) and 2 (high) values, on return
+        # it is a nested list with the waterline ridge marked by 1
         TM = self.topoMap
-        lastPnt = len(TM[1]) - 1
-        lastLn = len(TM) - 1
-        highFlag = 0
+        lastLn = TM.shape[0] - 1
+        lastPnt = TM.shape[1] - 1
+
+        high = TM == 2
+        inner = numpy.zeros(TM.shape, dtype=bool)
+        inner[1:lastLn, 1:lastPnt] = True
+        low = (TM == 0) & inner
 
         # self.reportThis("--Convert parallel data to ridges")
-        for lin in range(1, lastLn):
-            for pt in range(1, lastPnt):  # Ignore first and last points
-                if TM[lin][pt] == 0:
-                    if TM[lin][pt + 1] == 2:  # step up
-                        TM[lin][pt] = 1
-                    if TM[lin][pt - 1] == 2:  # step down
-                        TM[lin][pt] = 1
+        ridgeP = numpy.zeros(TM.shape, dtype=bool)
+        ridgeP[:, 1:-1] = high[:, 2:] | high[:, :-2]
+        ridgeP &= low
 
         # self.reportThis("--Convert perpendicular data to ridges and highlight ridges")
-        for pt in range(1, lastPnt):  # Ignore first and last points
-            for lin in range(1, lastLn):
-                if TM[lin][pt] == 0:
-                    highFlag = 0
-                    if TM[lin + 1][pt] == 2:  # step up
-                        TM[lin][pt] = 1
-                    if TM[lin - 1][pt] == 2:  # step down
-                        TM[lin][pt] = 1
-                elif TM[lin][pt] == 2:
-                    highFlag += 1
-                    if highFlag == 3:
-                        if TM[lin - 1][pt - 1] < 2 or TM[lin - 1][pt + 1] < 2:
-                            highFlag = 2
-                        else:
-                            TM[lin - 1][pt] = extraMaterial
-                            highFlag = 2
+        ridge = numpy.zeros(TM.shape, dtype=bool)
+        ridge[1:-1, :] = high[2:, :] | high[:-2, :]
+        ridge = (ridge & low) | ridgeP
+
+        # The perpendicular scan walks all columns in one go and counts the high
+        # points since the last low point, from the third high point on the point
+        # before is marked as extra material if its diagonal neighbours are high.
+        seqHigh = high[1:lastLn, 1:lastPnt].T.ravel()
+        seqLow = (low & ~ridgeP)[1:lastLn, 1:lastPnt].T.ravel()
+        highCount = numpy.cumsum(seqHigh)
+        highCount -= numpy.maximum.accumulate(numpy.where(seqLow, highCount, 0))
+        trigger = numpy.zeros(TM.shape, dtype=bool)
+        trigger[1:lastLn, 1:lastPnt] = (seqHigh & (highCount >= 3)).reshape(lastPnt - 1, lastLn - 1).T
+
+        # marks depend on the marks of the previous column
+        material = numpy.zeros(TM.shape, dtype=bool)
+        atLeastHigh = high.copy()
+        for pt in numpy.unique(numpy.nonzero(trigger)[1]):
+            lin = numpy.nonzero(trigger[:, pt])[0] - 1
+            lin = lin[atLeastHigh[lin, pt - 1] & atLeastHigh[lin, pt + 1]]
+            material[lin, pt] = True
+            atLeastHigh[lin, pt] = True
+
+        TM = numpy.where(high, 2, 0)
+        TM[ridge] = 1
+        TM[material] = extraMaterial
+        ridgePnts = numpy.transpose(numpy.nonzero(TM.T == 1)).tolist()
+        TM = TM.tolist()
 
         # Square corners
         # self.reportThis("--Square corners")
-        for pt in range(1, lastPnt):
-            for lin in range(1, lastLn):
-                if TM[lin][pt] == 1:                    # point == 1
-                    cont = True
-                    if TM[lin + 1][pt] == 0:            # forward == 0
-                        if TM[lin + 1][pt - 1] == 1:    # forward left == 1
-                            if TM[lin][pt - 1] == 2:    # left == 2
-                                TM[lin + 1][pt] = 1     # square the corner
-                                cont = False
-
-                        if cont is True and TM[lin + 1][pt + 1] == 1:  # forward right == 1
-                            if TM[lin][pt + 1] == 2:    # right == 2
-                                TM[lin + 1][pt] = 1     # square the corner
-                        cont = True
-
-                    if TM[lin - 1][pt] == 0:          # back == 0
-                        if TM[lin - 1][pt - 1] == 1:    # back left == 1
-                            if TM[lin][pt - 1] == 2:    # left == 2
-                                TM[lin - 1][pt] = 1     # square the corner
-                                cont = False
-
-                        if cont is True and TM[lin - 1][pt + 1] == 1:  # back right == 1
-                            if TM[lin][pt + 1] == 2:    # right == 2
-                                TM[lin - 1][pt] = 1     # square the corner
+        ones = []
+        for pt, lin in ridgePnts:
+            while lin < lastLn and TM[lin][pt] == 1:   # point == 1
+                ones.append((lin, pt))
+                squared = False
+                if TM[lin + 1][pt] == 0:                # forward == 0
+                    if TM[lin + 1][pt - 1] == 1 and TM[lin][pt - 1] == 2:    # forward left == 1 and left == 2
+                        squared = True
+                    elif TM[lin + 1][pt + 1] == 1 and TM[lin][pt + 1] == 2:  # forward right == 1 and right == 2
+                        squared = True
+                    if squared:
+                        TM[lin + 1][pt] = 1             # square the corner
+
+                if TM[lin - 1][pt] == 0:                # back == 0
+                    if (TM[lin - 1][pt - 1] == 1 and TM[lin][pt - 1] == 2) or (TM[lin - 1][pt + 1] == 1 and TM[lin][pt + 1] == 2):
+                        TM[lin - 1][pt] = 1             # square the corner
+                        ones.append((lin - 1, pt))
+
+                if not squared:
+                    break
+                # the squared corner is the next point of the scan
+                lin += 1
 
         # remove inside corners
         # self.reportThis("--Remove inside corners")
-        for pt in range(1, lastPnt):
-            for lin in range(1, lastLn):
-                if TM[lin][pt] == 1:                    # point == 1
-                    if TM[lin][pt + 1] == 1:
-                        if TM[lin - 1][pt + 1] == 1 or TM[lin + 1][pt + 1] == 1:
-                            TM[lin][pt + 1] = insCorn
-                    elif TM[lin][pt - 1] == 1:
-                        if TM[lin - 1][pt - 1] == 1 or TM[lin + 1][pt - 1] == 1:
-                            TM[lin][pt - 1] = insCorn
-
-        # PathLog.debug("\n-------------")
-        # for li in TM:
-        #    PathLog.debug("Line: " + str(li))
+        ones = sorted(set(p for p in ones if 0 < p[0] < lastLn), key=lambda p: (p[1], p[0]))
+        for lin, pt in ones:
+            if TM[lin][pt] == 1:                    # point == 1
+                if TM[lin][pt + 1] == 1:
+                    if TM[lin - 1][pt + 1] == 1 or TM[lin + 1][pt + 1] == 1:
+                        TM[lin][pt + 1] = insCorn
+                elif TM[lin][pt - 1] == 1:
+                    if TM[lin - 1][pt - 1] == 1 or TM[lin + 1][pt - 1] == 1:
+                        TM[lin][pt - 1] = insCorn
+
+        self.topoMap = TM
+        self.ridgePnts = sorted(p for p in ones if TM[p[0]][p[1]] == 1)
         return True
 
     def _extractWaterlines(self, obj, oclScan, lyr, layDep):
         srch = True
-        lastPnt = len(self.topoMap[0]) - 1
-        lastLn = len(self.topoMap) - 1
         maxSrchs = 5
         srchCnt = 1
         loopList = []
@@ -1533,20 +1575,22 @@ class ObjectSurface(PathOp.ObjectOp):
             lC = [-1, -1, -1, 0, 1, 1, 1, 0, -1, -1, -1, 0, 1, 1, 1, 0, -1, -1, -1, 0, 1, 1, 1, 0]
             pC = [-1, 0, 1, 1, 1, 0, -1, -1, -1, 0, 1, 1, 1, 0, -1, -1, -1, 0, 1, 1, 1, 0, -1, -1]
 
+        # only points of the ridge can start a loop, tracking a loop never adds new ones
+        ridgePnts = self.ridgePnts
         while srch is True:
             srch = False
             if srchCnt > maxSrchs:
                 self.reportThis("Max search scans, " + str(maxSrchs) + " reached\nPossible incomplete waterline result!")
                 break
-            for L in range(1, lastLn):
-                for P in range(1, lastPnt):
-                    if self.topoMap[L][P] == 1:
-                        # start loop follow
-                        srch = True
-                        loopNum += 1
-                        loop = self._trackLoop(oclScan, lC, pC, L, P, loopNum)
-                        self.topoMap[L][P] = 0  # Mute the starting point
-                        loopList.append(loop)
+            ridgePnts = [(L, P) for L, P in ridgePnts if self.topoMap[L][P] == 1]
+            for L, P in ridgePnts:
+                if self.topoMap[L][P] == 1:
+                    # start loop follow
+                    srch = True
+                    loopNum += 1
+                    loop = self._trackLoop(oclScan, lC, pC, L, P, loopNum)
+                    self.topoMap[L][P] = 0  # Mute the starting point
+                    loopList.append(loop)
             srchCnt += 1
         # self.reportThis("Search count for layer " + str(lyr) + " is " + str(srchCnt) + ", with " + str(loopNum) + " loops.")
         return loopList
@@ -1698,15 +1742,9 @@ class ObjectSurface(PathOp.ObjectOp):
 
     def subsectionCLP(self, CLP, xmin, ymin, xmax, ymax):
         # This function returns a subsection of the CLP scan, limited to the min/max values supplied
-        section = []
-        lenCLP = len(CLP)
-        for i in range(0, lenCLP):
-            if CLP[i].x < xmax:
-                if CLP[i].y < ymax:
-                    if CLP[i].x > xmin:
-                        if CLP[i].y > ymin:
-                            section.append(CLP[i])
-        return section
+        x = CLP[:, 0]
+        y = CLP[:, 1]
+        return CLP[(x < xmax) & (y < ymax) & (x > xmin) & (y > ymin)]
 
     def getMaxHeight(self, finalDepth, p1, p2, cutter, CLP):
         # This function connects two HOLD points with line
@@ -1721,15 +1759,14 @@ class ObjectSurface(PathOp.ObjectOp):
 
         avoidTool = round(cutter * 0.75, 1)  # 1/2 diam. of cutter is theoretically safe, but 3/4 diam is used for extra clearance
         zMax = finalDepth
-        lenCLP = len(CLP)
-        for i in range(0, lenCLP):
-            mSqrd = m**2
-            if mSqrd < 0.0000001:
-                mSqrd = 0.0000001
-            perpDist = math.sqrt((CLP[i].y - (m * CLP[i].x) - b)**2 / (1 + 1 / (mSqrd)))
-            if perpDist < avoidTool:  # if point within cutter reach on line of travel, test z height and update as needed
-                if CLP[i].z > zMax:
-                    zMax = CLP[i].z
+        mSqrd = m**2
+        if mSqrd < 0.0000001:
+            mSqrd = 0.0000001
+        perpDist = numpy.sqrt((CLP[:, 1] - (m * CLP[:, 0]) - b)**2 / (1 + 1 / (mSqrd)))
+        # points within cutter reach on line of travel determine the clearance height
+        reach = CLP[perpDist < avoidTool, 2]
+        if len(reach) > 0 and reach.max() > zMax:
+            zMax = float(reach.max())
         return zMax + 2.0
 
     def holdStopPerpCmds(self, obj, zMax, pd, p2, aor, ang, txt):
@@ -1863,6 +1900,7 @@ class ObjectSurface(PathOp.ObjectOp):
         obj.StartIndex = 0.0
         obj.StopIndex = 360.0
         obj.SampleInterval = 1.0
+        obj.UseHeightMap = True
 
         # need to overwrite the default depth calculations for facing
         job = PathUtils.findParentJob(obj)
@@ -1907,6 +1945,7 @@ def SetupProperties():
     setup.append("StopIndex")
     setup.append("CutterTilt")
     setup.append("CutPattern")
+    setup.append("UseHeightMap")
     setup.append("IgnoreWasteDepth")
     setup.append("IgnoreWaste")
     setup.append("ReleaseFromWaste")
@@ -669,54 +669,153 @@ def sort_jobs(locations, keys, attractors=[]):
     """ sort holes by the nearest neighbor method
         keys: two-element list of keys for X and Y coordinates. for example ['x','y']
         originally written by m0n5t3r for PathHelix
+        The locations are bucketed into a regular grid so only the cells around
+        the last location have to be searched for the next one. The resulting
+        order is identical to a brute force search over all remaining locations.
     """
-    try:
-        from queue import PriorityQueue
-    except ImportError:
-        from Queue import PriorityQueue
+    import itertools
     from collections import defaultdict
 
     attractors = attractors or [keys[0]]
 
-    def sqdist(a, b):
-        """ square Euclidean distance """
-        d = 0
-        for k in keys:
-            d += (a[k] - b[k]) ** 2
-
-        return d
+    if not locations:
+        return []
 
-    def weight(location):
+    coords = [tuple(loc[k] for k in keys) for loc in locations]
+    weights = []
+    for loc in locations:
         w = 0
-
         for k in attractors:
-            w += abs(location[k])
+            w += abs(loc[k])
+        weights.append(w)
 
-        return w
+    def priority(i, pos):
+        """ square Euclidean distance plus the weight of the attractors """
+        d = 0
+        for a, b in zip(coords[i], pos):
+            d += (a - b) ** 2
+        return d + weights[i]
+
+    dim = len(keys)
+    pts = numpy.array(coords, dtype=float)
+    lo = pts.min(axis=0)
+    extent = float((pts.max(axis=0) - lo).max())
+    cells = max(1, int(len(locations) ** (1.0 / dim)))
+    size = extent / cells if extent > 0 else 1.0
+
+    def cellOf(pos):
+        return tuple(int(math.floor((p - l) / size)) for p, l in zip(pos, lo))
+
+    grid = defaultdict(list)
+    for i, pos in enumerate(coords):
+        grid[cellOf(pos)].append(i)
+
+    rings = {}
+
+    def ring(r):
+        if r not in rings:
+            rings[r] = [o for o in itertools.product(range(-r, r + 1), repeat=dim) if max(abs(v) for v in o) == r]
+        return rings[r]
+
+    def closest(pos):
+        best = None
+        center = cellOf(pos)
+        r = 0
+        while True:
+            for offset in ring(r):
+                for i in grid.get(tuple(c + o for c, o in zip(center, offset)), []):
+                    candidate = (priority(i, pos), i)
+                    if best is None or candidate < best:
+                        best = candidate
+            # every location outside the rings searched so far is at least r cells away
+            if best is not None and (r * size) ** 2 > best[0]:
+                return best[1]
+            if r > cells:
+                return best[1]
+            r += 1
+
+    # the start point might be anywhere, search all locations for the first one
+    zero = tuple(0 for k in keys)
+    i = min(range(len(locations)), key=lambda j: (priority(j, zero), j))
 
-    def find_closest(location_list, location, dist):
-        q = PriorityQueue()
+    out = []
+    remaining = len(locations)
+    while True:
+        out.append(locations[i])
+        bucket = grid[cellOf(coords[i])]
+        bucket.remove(i)
+        if not bucket:
+            del grid[cellOf(coords[i])]
+        remaining -= 1
+        if not remaining:
+            break
+        i = closest(coords[i])
 
-        for i, j in enumerate(location_list):
-            # prevent dictionary comparison by inserting the index
-            q.put((dist(j, location) + weight(j), i, j))
+    return out
 
-        prio, i, result = q.get()
 
-        return result
+def optimize_jobs(locations, keys, timeout=1.0):
+    """ improve the order of holes with 2-opt moves until no more improvements
+        are found or timeout seconds have passed.
+        keys: list of keys for the coordinates, for example ['x','y']
+        The tool is assumed to start at the origin, the path is not closed.
+    """
+    import time
+
+    if len(locations) < 3:
+        return list(locations)
+
+    start = time.time()
+    pts = numpy.array([[0.0] * len(keys)] + [[loc[k] for k in keys] for loc in locations], dtype=float)
+    order = numpy.arange(len(pts))
+    n = len(pts) - 1
+
+    def dist(a, b):
+        return numpy.sqrt(((a - b) ** 2).sum(axis=-1))
+
+    improved = True
+    while improved and time.time() - start < timeout:
+        improved = False
+        for i in range(1, n):
+            p = pts[order]
+            # reversing order[i:j+1] replaces the edges (i-1,i) and (j,j+1)
+            # with (i-1,j) and (i,j+1), the last location has no outgoing edge
+            j = numpy.arange(i + 1, n + 1)
+            gain = dist(p[i - 1], p[i]) - dist(p[i - 1], p[j])
+            tail = j < n
+            gain[tail] += dist(p[j[tail]], p[j[tail] + 1]) - dist(p[i], p[j[tail] + 1])
+            k = int(gain.argmax())
+            if gain[k] > PathGeom.Tolerance:
+                order[i:j[k] + 1] = order[i:j[k] + 1][::-1].copy()
+                improved = True
+            if time.time() - start >= timeout:
+                break
+
+    return [locations[o - 1] for o in order[1:]]
+
+
+def rapid_length(locations, keys):
+    """ return the length of all rapid moves visiting locations in the given order,
+        starting at the origin. """
+    if not locations:
+        return 0.0
+    pts = numpy.array([[0.0] * len(keys)] + [[loc[k] for k in keys] for loc in locations], dtype=float)
+    return float(numpy.sqrt((numpy.diff(pts, axis=0) ** 2).sum(axis=1)).sum())
 
-    out = []
-    zero = defaultdict(lambda: 0)
 
-    out.append(find_closest(locations, zero, sqdist))
-    locations.remove(out[-1])
+SortingStrategies = ['None', 'NearestNeighbor', 'NearestNeighbor2Opt']
 
-    while locations:
-        closest = find_closest(locations, out[-1], sqdist)
-        out.append(closest)
-        locations.remove(closest)
 
-    return out
+def order_jobs(locations, keys, strategy='NearestNeighbor', timeout=1.0):
+    """ order holes according to strategy, one of SortingStrategies.
+        'None' keeps the given order, 'NearestNeighbor' uses sort_jobs and
+        'NearestNeighbor2Opt' additionally runs optimize_jobs for up to timeout seconds.
+    """
+    if strategy == 'NearestNeighbor':
+        return sort_jobs(locations, keys)
+    if strategy == 'NearestNeighbor2Opt':
+        return optimize_jobs(sort_jobs(locations, keys), keys, timeout)
+    return list(locations)
 
 
 def guessDepths(objshape, subs=None):
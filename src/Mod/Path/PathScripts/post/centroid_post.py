@@ -43,9 +43,9 @@ Arguments for centroid:
     --axis-precision=4               ... number of digits of precision for axis moves.  Default=4
 '''
 import FreeCAD
-from FreeCAD import Units
 import datetime
 import PathScripts
+from PathScripts import PathPostProcessor
 from PathScripts import PostUtils
 #from PathScripts import PathUtils
 
@@ -152,6 +152,7 @@ def export(objectslist, filename, argstring):
         print (i.Name)
     global UNITS
     global UNIT_FORMAT
+    global LINENR
 
     # ISJOB = (len(objectslist) == 1) and isinstance(objectslist[0].Proxy, PathScripts.PathJob.ObjectJob)
     # print("isjob: {} {}".format(ISJOB, len(objectslist)))
@@ -163,55 +164,73 @@ def export(objectslist, filename, argstring):
     #             return
 
     print("postprocessing...")
-    gcode = ""
-
-    # write header
-    if OUTPUT_HEADER:
-        gcode += HEADER
+    # params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
+    # the order of parameters
+    # centroid doesn't want K properties on XY plane  Arcs need work.
+    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H']
+    formatter = PathPostProcessor.CommandFormatter(params, AXIS_PRECISION, speedFormat=UNIT_FORMAT,
+                                                   feedPrecision=FEED_PRECISION, modal=MODAL,
+                                                   intParams=['T', 'H'],
+                                                   formats={'S': lambda s: PostUtils.fmt(s, SPINDLE_DECIMALS, "G21")})
+
+    # without the editor the G-code is streamed to the file while it is collected for the return value
+    gfile = None
+    if not filename == '-' and not SHOW_EDITOR:
+        gfile = pythonopen(filename, "w")
+    out = PathPostProcessor.GCodeWriter(gfile, lineNumbers=OUTPUT_LINE_NUMBERS, lineNr=LINENR, keep=True)
+    try:
+        # write header
+        if OUTPUT_HEADER:
+            out.writeBlock(HEADER, False)
 
-    gcode += SAFETYBLOCK
+        out.writeBlock(SAFETYBLOCK, False)
 
-    # Write the preamble
-    if OUTPUT_COMMENTS:
-        for item in objectslist:
-            if isinstance (item.Proxy, PathScripts.PathToolController.ToolController):
-                gcode += ";T{}={}\n".format(item.ToolNumber, item.Name)
-        gcode += linenumber() + ";begin preamble\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
+        # Write the preamble
+        if OUTPUT_COMMENTS:
+            for item in objectslist:
+                if isinstance (item.Proxy, PathScripts.PathToolController.ToolController):
+                    out.write(";T{}={}".format(item.ToolNumber, item.Name), False)
+            out.write(";begin preamble")
+        out.writeBlock(PREAMBLE)
 
-    gcode += linenumber() + UNITS + "\n"
+        out.write(UNITS)
 
-    for obj in objectslist:
-        #skip postprocessing tools
-       # if isinstance (obj.Proxy, PathScripts.PathToolController.ToolController):
-       #     continue
+        for obj in objectslist:
+            #skip postprocessing tools
+           # if isinstance (obj.Proxy, PathScripts.PathToolController.ToolController):
+           #     continue
 
 
-        # do the pre_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + ";begin operation\n"
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            # do the pre_op
+            if OUTPUT_COMMENTS:
+                out.write(";begin operation")
+            out.writeBlock(PRE_OPERATION)
 
-        gcode += parse(obj)
+            parse(obj, out, formatter)
 
-        # do the post_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + ";end operation: %s\n" % obj.Label
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            # do the post_op
+            if OUTPUT_COMMENTS:
+                out.write(";end operation: %s" % obj.Label)
+            out.writeBlock(POST_OPERATION)
 
-    # do the post_amble
+        # do the post_amble
 
-    if OUTPUT_COMMENTS:
-        gcode += ";begin postamble\n"
-    for line in TOOLRETURN.splitlines(True):
-        gcode += linenumber() + line
-    for line in SAFETYBLOCK.splitlines(True):
-        gcode += linenumber() + line
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+        if OUTPUT_COMMENTS:
+            out.write(";begin postamble", False)
+        out.writeBlock(TOOLRETURN)
+        out.writeBlock(SAFETYBLOCK)
+        out.writeBlock(POSTAMBLE)
+        out.flush()
+    finally:
+        if gfile is not None:
+            gfile.close()
+    LINENR = out.lineNr
+
+    if gfile is not None:
+        print("done postprocessing.")
+        return out.getvalue()
+
+    gcode = out.getvalue()
 
     if SHOW_EDITOR:
         dia = PostUtils.GCodeEditorDialog()
@@ -234,105 +253,38 @@ def export(objectslist, filename, argstring):
     return final
 
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS is True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
-
-def parse(pathobj):
-    global AXIS_PRECISION
-    global FEED_PRECISION
-    out = ""
-    lastcommand = None
-    axis_precision_string = '.' + str(AXIS_PRECISION) +'f'
-    feed_precision_string = '.' + str(FEED_PRECISION) +'f'
-    # params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control
-    # the order of parameters
-    # centroid doesn't want K properties on XY plane  Arcs need work.
-    params = ['X', 'Y', 'Z', 'A', 'B', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H']
-
+def parse(pathobj, out, formatter):
     if hasattr(pathobj, "Group"):  # We have a compound or project.
         # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(compound: " + pathobj.Label + ")\n"
+        #     out.write("(compound: " + pathobj.Label + ")")
         for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else:  # parsing simple path
+            parse(p, out, formatter)
+        return
 
-        # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return out
+    # groups might contain non-path things like stock.
+    if not hasattr(pathobj, "Path"):
+        return
 
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(" + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            commandlist = [] #list of elements in the command, code and params.
-            command = c.Name #command M or G code or comment string
-
-            if command[0]=='(':
-                command = PostUtils.fcoms(command, COMMENT)
-
-            commandlist.append(command)
-            # if modal: only print the command if it is not the same as the
-            # last one
-            if MODAL is True:
-                if command == lastcommand:
-                    commandlist.pop(0)
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        if c.Name not in ["G0", "G00"]: #centroid doesn't use rapid speeds
-                            speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
-                            commandlist.append(
-                                param + format(float(speed.getValueAs(UNIT_FORMAT)), feed_precision_string) )
-                    elif param == 'H':
-                        commandlist.append(param + str(int(c.Parameters['H'])))
-                    elif param == 'S':
-                        commandlist.append(param + PostUtils.fmt(c.Parameters['S'], SPINDLE_DECIMALS, "G21"))
-                    elif param == 'T':
-                        commandlist.append(param + str(int(c.Parameters['T'])))
-                    else:
-                        commandlist.append(
-                            param + format(c.Parameters[param], axis_precision_string))
-            outstr = str(commandlist)
-            outstr =outstr.replace('[','')
-            outstr =outstr.replace(']','')
-            outstr =outstr.replace("'",'')
-            outstr =outstr.replace(",",'')
-            #out += outstr + '\n'
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                # if OUTPUT_COMMENTS:
-                #     out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            # if command == "message":
-            #     if OUTPUT_COMMENTS is False:
-            #         out = []
-            #     else:
-            #         commandlist.pop(0)  # remove the command
-
-            # prepend a line number and append a newline
-            if len(commandlist) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    commandlist.insert(0, (linenumber()))
-
-                # append the line to the final output
-                for w in commandlist:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
-
-        return out
+    # if OUTPUT_COMMENTS:
+    #     out.write("(" + pathobj.Label + ")")
+
+    formatter.reset()
+    for c in pathobj.Path.Commands:
+        command = c.Name #command M or G code or comment string
+
+        if command[0]=='(':
+            command = PostUtils.fcoms(command, COMMENT)
+
+        words = formatter.words(command, c.Parameters)
+
+        # Check for Tool Change:
+        if command == 'M6':
+            # if OUTPUT_COMMENTS:
+            #     out.write("(begin toolchange)")
+            out.writeBlock(TOOL_CHANGE)
+
+        if words:
+            out.write(COMMAND_SPACE.join(words))
 
 
 print(__name__ + " gcode postprocessor loaded.")
@@ -30,6 +30,7 @@ grbl_post.export(object,"/path/to/file.ncc")
 '''
 
 import FreeCAD
+import PathScripts.PathPostProcessor as PostProcessor
 import PathScripts.PostUtils as PostUtils
 import argparse
 import datetime
@@ -152,6 +153,7 @@ def export(objectslist,filename,argstring):
         return None
 
     global UNITS
+    global LINENR
 
     for obj in objectslist:
         if not hasattr(obj,"Path"):
@@ -159,7 +161,10 @@ def export(objectslist,filename,argstring):
             return
 
     print("postprocessing...")
-    gcode = ""
+    #params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control the order of parameters
+    params = ['X','Y','Z','A','B','I','J','F','S','T','Q','R','L'] #linuxcnc doesn't want K properties on XY plane  Arcs need work.
+    formatter = PostProcessor.CommandFormatter(params, PRECISION, feedPrecision=2, modal=MODAL,
+                                               rapidMoves=RAPID_MOVES, intParams=['T'])
 
     #Find the machine.
     #The user my have overridden post processor defaults in the GUI.  Make sure we're using the current values in the Machine Def.
@@ -178,37 +183,50 @@ def export(objectslist,filename,argstring):
            UNITS = "G20"
 
 
-    # write header
-    if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ +")\n"
-        gcode += linenumber() + "(Output Time:"+str(now)+")\n"
+    # without the editor the G-code is streamed to the file instead of being collected
+    gfile = None
+    if not (FreeCAD.GuiUp and SHOW_EDITOR):
+        gfile = pythonopen(filename, "w")
+    out = PostProcessor.GCodeWriter(gfile, lineNumbers=OUTPUT_LINE_NUMBERS, lineNr=LINENR)
+    try:
+        # write header
+        if OUTPUT_HEADER:
+            out.write("(Exported by FreeCAD)")
+            out.write("(Post Processor: " + __name__ +")")
+            out.write("(Output Time:"+str(now)+")")
 
-    #Write the preamble
-    if OUTPUT_COMMENTS: gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(True):
-        gcode += linenumber() + line
-    gcode += linenumber() + UNITS + "\n"
+        #Write the preamble
+        if OUTPUT_COMMENTS: out.write("(begin preamble)")
+        out.writeBlock(PREAMBLE)
+        out.write(UNITS)
 
-    for obj in objectslist:
+        for obj in objectslist:
+
+            #do the pre_op
+            if OUTPUT_COMMENTS: out.write("(begin operation: " + obj.Label + ")")
+            out.writeBlock(PRE_OPERATION)
 
-        #do the pre_op
-        if OUTPUT_COMMENTS: gcode += linenumber() + "(begin operation: " + obj.Label + ")\n"
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            parse(obj, out, formatter)
 
-        gcode += parse(obj)
+            #do the post_op
+            if OUTPUT_COMMENTS: out.write("(finish operation: " + obj.Label + ")")
+            out.writeBlock(POST_OPERATION)
 
-        #do the post_op
-        if OUTPUT_COMMENTS: gcode += linenumber() + "(finish operation: " + obj.Label + ")\n"
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+        #do the post_amble
 
-    #do the post_amble
+        if OUTPUT_COMMENTS: out.write("(begin postamble)", False)
+        out.writeBlock(POSTAMBLE)
+        out.flush()
+    finally:
+        if gfile is not None:
+            gfile.close()
+    LINENR = out.lineNr
 
-    if OUTPUT_COMMENTS: gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+    if gfile is not None:
+        print("done postprocessing.")
+        return None
+
+    gcode = out.getvalue()
 
     if FreeCAD.GuiUp and SHOW_EDITOR:
         dia = PostUtils.GCodeEditorDialog()
@@ -228,89 +246,46 @@ def export(objectslist,filename,argstring):
     gfile.close()
 
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS == True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
-
-def parse(pathobj):
-    out = ""
-    lastcommand = None
-    precision_string = '.' + str(PRECISION) +'f'
+def parse(pathobj, out, formatter):
     global SUPPRESS_TOOL_CHANGE
 
-    #params = ['X','Y','Z','A','B','I','J','K','F','S'] #This list control the order of parameters
-    params = ['X','Y','Z','A','B','I','J','F','S','T','Q','R','L'] #linuxcnc doesn't want K properties on XY plane  Arcs need work.
-
     if hasattr(pathobj,"Group"): #We have a compound or project.
-        if OUTPUT_COMMENTS: out += linenumber() + "(compound: " + pathobj.Label + ")\n"
+        if OUTPUT_COMMENTS: out.write("(compound: " + pathobj.Label + ")")
         for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else: #parsing simple path
-
-        if not hasattr(pathobj,"Path"): #groups might contain non-path things like stock.
-            return out
-
-        if OUTPUT_COMMENTS: out += linenumber() + "(Path: " + pathobj.Label + ")\n"
-
-        for c in pathobj.Path.Commands:
-            outstring = []
-            command = c.Name
-            outstring.append(command)
-            # if modal: only print the command if it is not the same as the last one
-            if MODAL == True:
-                if command == lastcommand:
-                    outstring.pop(0)
-
-
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F':
-                        if command not in RAPID_MOVES:
-                            outstring.append(param + format(c.Parameters['F'] * 60, '.2f'))
-                    elif param == 'T':
-                        outstring.append(param + str(int(c.Parameters['T'])))
-                    else:
-                        outstring.append(param + format(c.Parameters[param], precision_string))
-
-            # store the latest command
-            lastcommand = command
-
-            # Check for Tool Change:
-            if command == 'M6':
-                if OUTPUT_COMMENTS:
-                    out += linenumber() + "(begin toolchange)\n"
-                if not OUTPUT_TOOL_CHANGE or SUPPRESS_TOOL_CHANGE > 0:
-                    outstring.insert(0, ";")
-                    SUPPRESS_TOOL_CHANGE = SUPPRESS_TOOL_CHANGE - 1
-                else:
-                    for line in TOOL_CHANGE.splitlines(True):
-                        out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS == False:
-                    out = []
-                else:
-                    outstring.pop(0) #remove the command
-
-            if command in SUPPRESS_COMMANDS:
-                outstring.insert(0, ";")
-
-            #prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0,(linenumber()))
-
-                #append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
-
-        return out
+            parse(p, out, formatter)
+        return
+
+    if not hasattr(pathobj,"Path"): #groups might contain non-path things like stock.
+        return
+
+    if OUTPUT_COMMENTS: out.write("(Path: " + pathobj.Label + ")")
+
+    formatter.reset()
+    for c in pathobj.Path.Commands:
+        command = c.Name
+        words = formatter.words(command, c.Parameters)
+
+        # Check for Tool Change:
+        if command == 'M6':
+            if OUTPUT_COMMENTS:
+                out.write("(begin toolchange)")
+            if not OUTPUT_TOOL_CHANGE or SUPPRESS_TOOL_CHANGE > 0:
+                words.insert(0, ";")
+                SUPPRESS_TOOL_CHANGE = SUPPRESS_TOOL_CHANGE - 1
+            else:
+                out.writeBlock(TOOL_CHANGE)
+
+        if command == "message":
+            if OUTPUT_COMMENTS == False:
+                continue
+            if words and words[0] == command:
+                words.pop(0) #remove the command
+
+        if command in SUPPRESS_COMMANDS:
+            words.insert(0, ";")
+
+        if words:
+            out.write(COMMAND_SPACE.join(words))
 
 
 print(__name__ + " gcode postprocessor loaded.")
@@ -22,12 +22,12 @@
 # ***************************************************************************/
 from __future__ import print_function
 import FreeCAD
-from FreeCAD import Units
 import Path
 import argparse
 import datetime
 import shlex
 from PathScripts import PostUtils
+from PathScripts import PathPostProcessor
 from PathScripts import PathUtils
 
 TOOLTIP = '''
@@ -154,6 +154,7 @@ def export(objectslist, filename, argstring):
     global UNITS
     global UNIT_FORMAT
     global UNIT_SPEED_FORMAT
+    global LINENR
 
     for obj in objectslist:
         if not hasattr(obj, "Path"):
@@ -161,61 +162,72 @@ def export(objectslist, filename, argstring):
             return None
 
     print("postprocessing...")
-    gcode = ""
+    # without the editor the G-code is streamed to the file while it is collected for the return value
+    gfile = None
+    if not filename == '-' and not (FreeCAD.GuiUp and SHOW_EDITOR):
+        gfile = pythonopen(filename, "w")
+    out = PathPostProcessor.GCodeWriter(gfile, lineNumbers=OUTPUT_LINE_NUMBERS, lineNr=LINENR, keep=True)
+    try:
+        # write header
+        if OUTPUT_HEADER:
+            out.write("(Exported by FreeCAD)")
+            out.write("(Post Processor: " + __name__ + ")")
+            out.write("(Output Time:" + str(now) + ")")
 
-    # write header
-    if OUTPUT_HEADER:
-        gcode += linenumber() + "(Exported by FreeCAD)\n"
-        gcode += linenumber() + "(Post Processor: " + __name__ + ")\n"
-        gcode += linenumber() + "(Output Time:" + str(now) + ")\n"
+        # Write the preamble
+        if OUTPUT_COMMENTS:
+            out.write("(begin preamble)")
+        out.writeBlock(PREAMBLE)
+        out.write(UNITS)
 
-    # Write the preamble
-    if OUTPUT_COMMENTS:
-        gcode += linenumber() + "(begin preamble)\n"
-    for line in PREAMBLE.splitlines(False):
-        gcode += linenumber() + line + "\n"
-    gcode += linenumber() + UNITS + "\n"
+        for obj in objectslist:
 
-    for obj in objectslist:
+            # fetch machine details
+            job = PathUtils.findParentJob(obj)
 
-        # fetch machine details
-        job = PathUtils.findParentJob(obj)
+            myMachine = 'not set'
 
-        myMachine = 'not set'
+            if hasattr(job, "MachineName"):
+                myMachine = job.MachineName
 
-        if hasattr(job, "MachineName"):
-            myMachine = job.MachineName
+            if hasattr(job, "MachineUnits"):
+                if job.MachineUnits == "Metric":
+                    UNITS = "G21"
+                    UNIT_FORMAT = 'mm'
+                    UNIT_SPEED_FORMAT = 'mm/min'
+                else:
+                    UNITS = "G20"
+                    UNIT_FORMAT = 'in'
+                    UNIT_SPEED_FORMAT = 'in/min'
 
-        if hasattr(job, "MachineUnits"):
-            if job.MachineUnits == "Metric":
-                UNITS = "G21"
-                UNIT_FORMAT = 'mm'
-                UNIT_SPEED_FORMAT = 'mm/min'
-            else:
-                UNITS = "G20"
-                UNIT_FORMAT = 'in'
-                UNIT_SPEED_FORMAT = 'in/min'
+            # do the pre_op
+            if OUTPUT_COMMENTS:
+                out.write("(begin operation: %s)" % obj.Label)
+                out.write("(machine: %s, %s)" % (myMachine, UNIT_SPEED_FORMAT))
+            out.writeBlock(PRE_OPERATION)
 
-        # do the pre_op
-        if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(begin operation: %s)\n" % obj.Label
-            gcode += linenumber() + "(machine: %s, %s)\n" % (myMachine, UNIT_SPEED_FORMAT)
-        for line in PRE_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            parse(obj, out, commandFormatter())
 
-        gcode += parse(obj)
+            # do the post_op
+            if OUTPUT_COMMENTS:
+                out.write("(finish operation: %s)" % obj.Label)
+            out.writeBlock(POST_OPERATION)
 
-        # do the post_op
+        # do the post_amble
         if OUTPUT_COMMENTS:
-            gcode += linenumber() + "(finish operation: %s)\n" % obj.Label
-        for line in POST_OPERATION.splitlines(True):
-            gcode += linenumber() + line
+            out.write("(begin postamble)", False)
+        out.writeBlock(POSTAMBLE)
+        out.flush()
+    finally:
+        if gfile is not None:
+            gfile.close()
+    LINENR = out.lineNr
+
+    if gfile is not None:
+        print("done postprocessing.")
+        return out.getvalue()
 
-    # do the post_amble
-    if OUTPUT_COMMENTS:
-        gcode += "(begin postamble)\n"
-    for line in POSTAMBLE.splitlines(True):
-        gcode += linenumber() + line
+    gcode = out.getvalue()
 
     if FreeCAD.GuiUp and SHOW_EDITOR:
         dia = PostUtils.GCodeEditorDialog()
@@ -238,114 +250,47 @@ def export(objectslist, filename, argstring):
     return final
 
 
-def linenumber():
-    global LINENR
-    if OUTPUT_LINE_NUMBERS is True:
-        LINENR += 10
-        return "N" + str(LINENR) + " "
-    return ""
-
-
-def parse(pathobj):
-    global PRECISION
-    global MODAL
-    global OUTPUT_DOUBLES
-    global UNIT_FORMAT
-    global UNIT_SPEED_FORMAT
-
-    out = ""
-    lastcommand = None
-    precision_string = '.' + str(PRECISION) + 'f'
-    currLocation = {}  # keep track for no doubles
-
+def commandFormatter():
     # the order of parameters
     # linuxcnc doesn't want K properties on XY plane  Arcs need work.
     params = ['X', 'Y', 'Z', 'A', 'B', 'C', 'I', 'J', 'F', 'S', 'T', 'Q', 'R', 'L', 'H', 'D', 'P']
-    firstmove = Path.Command("G0", {"X": -1, "Y": -1, "Z": -1, "F": 0.0})
-    currLocation.update(firstmove.Parameters)  # set First location Parameters
+    return PathPostProcessor.CommandFormatter(params, PRECISION, UNIT_FORMAT, UNIT_SPEED_FORMAT,
+                                              modal=MODAL, outputDoubles=OUTPUT_DOUBLES,
+                                              positiveFeed=True,  # linuxcnc doesn't use rapid speeds
+                                              initialState={'X': -1, 'Y': -1, 'Z': -1, 'F': 0.0})
+
 
+def parse(pathobj, out, formatter):
     if hasattr(pathobj, "Group"):  # We have a compound or project.
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(compound: " + pathobj.Label + ")\n"
         for p in pathobj.Group:
-            out += parse(p)
-        return out
-    else:  # parsing simple path
+            parse(p, out, formatter)
+        return
 
-        # groups might contain non-path things like stock.
-        if not hasattr(pathobj, "Path"):
-            return out
+    # groups might contain non-path things like stock.
+    if not hasattr(pathobj, "Path"):
+        return
 
-        # if OUTPUT_COMMENTS:
-        #     out += linenumber() + "(" + pathobj.Label + ")\n"
+    formatter.reset()
+    for c in pathobj.Path.Commands:
+        command = c.Name
 
-        for c in pathobj.Path.Commands:
+        if command[0] == '(' and not OUTPUT_COMMENTS:  # command is a comment
+            continue
 
-            outstring = []
-            command = c.Name
-            outstring.append(command)
+        words = formatter.words(command, c.Parameters)
 
-            # if modal: suppress the command if it is the same as the last one
-            if MODAL is True:
-                if command == lastcommand:
-                    outstring.pop(0)
+        # Check for Tool Change:
+        if command == 'M6':
+            out.writeBlock(TOOL_CHANGE)
 
-            if c.Name[0] == '(' and not OUTPUT_COMMENTS: # command is a comment
+        if command == "message":
+            if OUTPUT_COMMENTS is False:
                 continue
+            if words and words[0] == command:
+                words.pop(0)  # remove the command
 
-            # Now add the remaining parameters in order
-            for param in params:
-                if param in c.Parameters:
-                    if param == 'F' and (currLocation[param] != c.Parameters[param] or OUTPUT_DOUBLES):
-                        if c.Name not in ["G0", "G00"]:  # linuxcnc doesn't use rapid speeds
-                            speed = Units.Quantity(c.Parameters['F'], FreeCAD.Units.Velocity)
-                            if speed.getValueAs(UNIT_SPEED_FORMAT) > 0.0:
-                                outstring.append(param + format(float(speed.getValueAs(UNIT_SPEED_FORMAT)), precision_string))
-                        else:
-                            continue
-                    elif param == 'T':
-                        outstring.append(param + str(int(c.Parameters['T'])))
-                    elif param == 'H':
-                        outstring.append(param + str(int(c.Parameters['H'])))
-                    elif param == 'D':
-                        outstring.append(param + str(int(c.Parameters['D'])))
-                    elif param == 'S':
-                        outstring.append(param + str(int(c.Parameters['S'])))
-                    else:
-                        if (not OUTPUT_DOUBLES) and (param in currLocation) and (currLocation[param] == c.Parameters[param]):
-                            continue
-                        else:
-                            pos = Units.Quantity(c.Parameters[param], FreeCAD.Units.Length)
-                            outstring.append(
-                                param + format(float(pos.getValueAs(UNIT_FORMAT)), precision_string))
-
-            # store the latest command
-            lastcommand = command
-            currLocation.update(c.Parameters)
-
-            # Check for Tool Change:
-            if command == 'M6':
-                # if OUTPUT_COMMENTS:
-                #     out += linenumber() + "(begin toolchange)\n"
-                for line in TOOL_CHANGE.splitlines(True):
-                    out += linenumber() + line
-
-            if command == "message":
-                if OUTPUT_COMMENTS is False:
-                    out = []
-                else:
-                    outstring.pop(0)  # remove the command
-
-            # prepend a line number and append a newline
-            if len(outstring) >= 1:
-                if OUTPUT_LINE_NUMBERS:
-                    outstring.insert(0, (linenumber()))
-
-                # append the line to the final output
-                for w in outstring:
-                    out += w + COMMAND_SPACE
-                out = out.strip() + "\n"
+        if words:
+            out.write(COMMAND_SPACE.join(words))
 
-        return out
 
 print(__name__ + " gcode postprocessor loaded.")
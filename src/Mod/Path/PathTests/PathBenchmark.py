@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+'''
+Benchmarks of the Path workbench, they are not part of the unit tests and are run on demand.
+Each benchmark prints its results and returns them as a list of dicts.
+
+# run from within FreeCAD or from shell in build dir
+./bin/FreeCADCmd -c "from PathTests import PathBenchmark; PathBenchmark.sortJobs()"
+./bin/FreeCADCmd -c "from PathTests import PathBenchmark; PathBenchmark.postProcessors()"
+'''
+
+import Path
+import PathScripts.PathUtils as PathUtils
+import os
+import random
+import tempfile
+import time
+
+
+def randomHoles(count, size):
+    '''Return count holes spread randomly over a square of 2*size.'''
+    return [{'x': random.uniform(-size, size), 'y': random.uniform(-size, size)} for i in range(count)]
+
+
+def gridHoles(columns, rows, pitch):
+    '''Return the holes of a perforated plate in random order.'''
+    holes = [{'x': c * pitch, 'y': r * pitch} for r in range(rows) for c in range(columns)]
+    random.shuffle(holes)
+    return holes
+
+
+def sortJobs(randomCount=5000, gridSize=(150, 140), timeout=2.0):
+    '''Time the ordering of a random and a perforated hole layout with each of the
+    PathUtils.SortingStrategies, and report the rapid travel length of the result.'''
+    random.seed(4711)
+    results = []
+    for name, holes in [('random', randomHoles(randomCount, 500)), ('perforated', gridHoles(gridSize[0], gridSize[1], 4))]:
+        for strategy in PathUtils.SortingStrategies:
+            begin = time.time()
+            ordered = PathUtils.order_jobs(holes, ['x', 'y'], strategy, timeout)
+            elapsed = time.time() - begin
+            length = PathUtils.rapid_length(ordered, ['x', 'y'])
+            print("{} holes ({}), {}: {:.3f}s, rapid length {:.1f}".format(len(holes), name, strategy, elapsed, length))
+            results.append({'layout': name, 'holes': len(holes), 'strategy': strategy, 'time': elapsed, 'rapid_length': length})
+    return results
+
+
+class PathObject(object):
+    '''Minimal stand-in for a Path object as seen by the post processors.'''
+
+    def __init__(self, commands):
+        self.Name = 'Surface'
+        self.Label = 'Surface'
+        self.Path = Path.Path(commands)
+        self.InList = []
+        self.Proxy = None
+
+
+def surfaceCommands(count):
+    '''Return count commands of a surfacing path, a rapid move followed by feed moves on a grid.'''
+    commands = [Path.Command('G0', {'X': 0, 'Y': 0, 'Z': 5}), Path.Command('G1', {'Z': -1, 'F': 5})]
+    for i in range(count - 2):
+        commands.append(Path.Command('G1', {'X': (i % 1000) * 0.1, 'Y': (i // 1000) * 0.1, 'Z': -1 - (i % 7) * 0.01, 'F': 10}))
+    return commands
+
+
+def postProcessors(count=5000000, posts=('linuxcnc', 'grbl', 'centroid')):
+    '''Time posting a surfacing path of count commands to a file with each of the given post processors.'''
+    import importlib
+    obj = PathObject(surfaceCommands(count))
+    args = '--no-header --no-comments --no-show-editor'
+    results = []
+    (fd, filename) = tempfile.mkstemp('.ngc')
+    os.close(fd)
+    try:
+        for name in posts:
+            post = importlib.import_module('PathScripts.post.%s_post' % name)
+            begin = time.time()
+            post.export([obj], filename, args)
+            elapsed = time.time() - begin
+            size = os.path.getsize(filename)
+            print("{} commands, {}: {:.3f}s, {} bytes".format(count, name, elapsed, size))
+            results.append({'post': name, 'commands': count, 'time': elapsed, 'size': size})
+    finally:
+        os.remove(filename)
+    return results
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import PathScripts.PathAdaptive as PathAdaptive
+
+from PathTests.PathTestUtils import PathTestBase
+
+
+def square(x, y, size):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+class TestPathAdaptive(PathTestBase):
+    '''Unit tests for the region handling of the Adaptive operation.'''
+
+    def test00(self):
+        '''Verify paths are grouped into independent regions.'''
+        outer = square(0, 0, 10)
+        hole = square(4, 4, 2)
+        other = square(30, 0, 10)
+        close = square(11, 0, 5)
+
+        regions = PathAdaptive.splitRegions([outer, other, hole], 1)
+        self.assertEqual([[outer, hole], [other]], regions)
+
+        regions = PathAdaptive.splitRegions([outer, other, close], 1)
+        self.assertEqual([[outer, close], [other]], regions)
+
+        regions = PathAdaptive.splitRegions([outer, other, close], 0.1)
+        self.assertEqual([[outer], [other], [close]], regions)
+
+    def test01(self):
+        '''Verify region keys depend on the region geometry and the parameters only.'''
+        state = {'tool': 6.0, 'stepover': 20.0, 'geometry': [square(0, 0, 10)]}
+        key = PathAdaptive.regionKey([square(0, 0, 10)], state)
+
+        self.assertEqual(key, PathAdaptive.regionKey([square(0, 0, 10)], dict(state, geometry=[])))
+        self.assertNotEqual(key, PathAdaptive.regionKey([square(0, 0, 11)], state))
+        self.assertNotEqual(key, PathAdaptive.regionKey([square(0, 0, 10)], dict(state, tool=5.0)))
@@ -74,3 +74,16 @@ class TestHoldingTags(PathTestBase):
         print(h)
         self.assertConeAt(tag.solid, Vector(0,0,-h * 0.01), 2.5, 0, h)
 
+    def test10(self):
+        """Verify the tag index only reports tags close to an edge."""
+        tags = [Tag(i, 10 * i, 0, 4, 5, 90, 0, True) for i in range(20)]
+        for tag in tags:
+            tag.createSolidsAt(0, 0)
+        index = PathScripts.PathDressupHoldingTags._TagIndex.forTags(tags)
+
+        edge = Part.Edge(Part.LineSegment(Vector(25, 0, 1), Vector(45, 0, 1)))
+        self.assertEqual([3, 4], index.candidates(edge.BoundBox))
+        edge = Part.Edge(Part.LineSegment(Vector(-50, 5, 1), Vector(500, 5, 1)))
+        self.assertEqual([], index.candidates(edge.BoundBox))
+        edge = Part.Edge(Part.LineSegment(Vector(-50, 1, 1), Vector(500, 1, 1)))
+        self.assertEqual(list(range(20)), index.candidates(edge.BoundBox))
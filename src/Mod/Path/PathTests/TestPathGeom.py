@@ -342,6 +342,53 @@ class TestPathGeom(PathTestBase):
         self.assertEqual(len(wires[1].Edges), 1)
         self.assertLine(wires[1].Edges[0], Vector(0,1,0), Vector(0,0,0))
 
+    def test51(self):
+        """Verify PathGeometry queries and caching."""
+        commands = []
+        commands.append(Path.Command('G0', {'X': 10, 'Y': 0, 'Z': 5}))
+        commands.append(Path.Command('G1', {'Z': -2}))
+        commands.append(Path.Command('G3', {'X': -10, 'Y': 0, 'I': -10, 'J': 0}))
+        commands.append(Path.Command('G2', {'X': 0, 'Y': -10, 'I': 10, 'J': 0}))
+        commands.append(Path.Command('M5', {}))
+        path = Path.Path(commands)
+
+        geom = PathGeom.geometryForPath(path)
+        self.assertEqual(4, len(geom))
+        self.assertIs(geom, PathGeom.geometryForPath(Path.Path(commands)))
+        self.assertIsNot(geom, PathGeom.geometryForPath(path, Vector(0, 0, 10)))
+
+        self.assertEqual((-2, 5), geom.zLimits())
+        self.assertEqual((-2, 5), geom.zLimits(True))
+        self.assertEqual(2, len(geom.edgesAt(-2)))
+
+        bb = geom.boundBox(False)
+        self.assertRoughly(-10, bb.XMin)
+        self.assertRoughly(10, bb.XMax)
+        self.assertRoughly(-10, bb.YMin)
+        self.assertRoughly(10, bb.YMax)
+        self.assertRoughly(-2, bb.ZMin)
+        self.assertRoughly(5, bb.ZMax)
+        bb = geom.boundBox()
+        self.assertRoughly(0, bb.XMin - geom.boundBox(False).XMin)
+
+        (i, pt, dist) = geom.nearestPoint(Vector(0, 20, -2))
+        self.assertEqual(2, i)
+        self.assertCoincide(Vector(0, 10, -2), pt)
+        self.assertRoughly(10, dist)
+        (i, pt, dist) = geom.nearestPoint(Vector(10, 0, 2))
+        self.assertEqual(1, i)
+        self.assertCoincide(Vector(10, 0, 2), pt)
+        self.assertRoughly(0, dist)
+        (i, pt, dist) = geom.nearestPoint(Vector(5, -1, 2.5), True)
+        self.assertEqual(0, i)
+        self.assertCoincide(Vector(5, 0, 2.5), pt)
+
+        wire, rapid = geom.wire()
+        self.assertEqual(4, len(wire.Edges))
+        self.assertEqual(1, len(rapid))
+        self.assertEqual(3, len(geom.edges(False)))
+        self.assertIs(geom.edge(2), geom.edge(2))
+
 
     def test60(self):
         """Verify arcToHelix returns proper helix."""
@@ -56,7 +56,10 @@ class PathPostTestCases(unittest.TestCase):
     def testLinuxCNC(self):
         from PathScripts.post import linuxcnc_post as postprocessor
         args = '--no-header --no-line-numbers --no-comments --no-show-editor --precision=2'
-        gcode = postprocessor.export(self.postlist, 'gcode.tmp', args)
+        result = postprocessor.export(self.postlist, 'gcode.tmp', args)
+        with open('gcode.tmp', 'r') as fp:
+            gcode = fp.read()
+        self.assertEqual(gcode, result)
 
         referenceFile = FreeCAD.getHomePath() + 'Mod/Path/PathTests/test_linuxcnc_00.ngc'
         with open(referenceFile, 'r') as fp:
@@ -74,7 +77,10 @@ class PathPostTestCases(unittest.TestCase):
     def testLinuxCNCImperial(self):
         from PathScripts.post import linuxcnc_post as postprocessor
         args = '--no-header --no-line-numbers --no-comments --no-show-editor --precision=2 --inches'
-        gcode = postprocessor.export(self.postlist, 'gcode.tmp', args)
+        result = postprocessor.export(self.postlist, 'gcode.tmp', args)
+        with open('gcode.tmp', 'r') as fp:
+            gcode = fp.read()
+        self.assertEqual(gcode, result)
 
         referenceFile = FreeCAD.getHomePath() + 'Mod/Path/PathTests/test_linuxcnc_10.ngc'
         with open(referenceFile, 'r') as fp:
@@ -92,7 +98,10 @@ class PathPostTestCases(unittest.TestCase):
     def testCentroid(self):
         from PathScripts.post import centroid_post as postprocessor
         args = '--no-header --no-line-numbers --no-comments --no-show-editor --axis-precision=2 --feed-precision=2'
-        gcode = postprocessor.export(self.postlist, 'gcode.tmp', args)
+        result = postprocessor.export(self.postlist, 'gcode.tmp', args)
+        with open('gcode.tmp', 'r') as fp:
+            gcode = fp.read()
+        self.assertEqual(gcode, result)
 
         referenceFile = FreeCAD.getHomePath() + 'Mod/Path/PathTests/test_centroid_00.ngc'
         with open(referenceFile, 'r') as fp:
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import FreeCAD
+import Path
+import PathScripts.PathPostProcessor as PathPostProcessor
+import io
+import os
+import tempfile
+
+from PathTests.PathTestUtils import PathTestBase
+
+
+class PathObject(object):
+    '''Minimal stand-in for a Path object as seen by the post processors.'''
+
+    def __init__(self, commands):
+        self.Name = 'Surface'
+        self.Label = 'Surface'
+        self.Path = Path.Path(commands)
+        self.InList = []
+        self.Proxy = None
+
+
+class TestPathPostProcessor(PathTestBase):
+    '''Unit tests for the shared post processing core.'''
+
+    def setUp(self):
+        self.doc = FreeCAD.newDocument("TestPathPostProcessor")
+
+    def tearDown(self):
+        FreeCAD.closeDocument("TestPathPostProcessor")
+
+    def surfaceCommands(self, count):
+        commands = [Path.Command('G0', {'X': 0, 'Y': 0, 'Z': 5}), Path.Command('G1', {'Z': -1, 'F': 5})]
+        for i in range(count - 2):
+            commands.append(Path.Command('G1', {'X': (i % 1000) * 0.1, 'Y': (i // 1000) * 0.1, 'Z': -1 - (i % 7) * 0.01, 'F': 10}))
+        return commands
+
+    def test00(self):
+        '''Verify line numbers and chunked output of GCodeWriter.'''
+        stream = io.StringIO()
+        out = PathPostProcessor.GCodeWriter(stream, lineNumbers=True, chunkSize=2)
+        out.write(u'G0 X1')
+        out.write(u'G0 X2')
+        self.assertEqual(u'N110 G0 X1\nN120 G0 X2\n', stream.getvalue())
+        out.write(u'(comment)', False)
+        out.writeBlock(u'M5\nM2\n')
+        out.flush()
+        self.assertEqual(u'N110 G0 X1\nN120 G0 X2\n(comment)\nN130 M5\nN140 M2\n', stream.getvalue())
+        self.assertEqual(140, out.lineNr)
+
+        out = PathPostProcessor.GCodeWriter()
+        out.writeBlock('G17\nG90\n')
+        self.assertEqual('G17\nG90\n', out.getvalue())
+
+    def test01(self):
+        '''Verify unit conversion and number formats of CommandFormatter.'''
+        fmt = PathPostProcessor.CommandFormatter(['X', 'Y', 'F', 'T'], 3)
+        self.assertEqual(['G1', 'X1.000', 'Y-2.500', 'F600.000'], fmt.words('G1', {'X': 1, 'Y': -2.5, 'F': 10}))
+        self.assertEqual(['G0', 'X1.000'], fmt.words('G0', {'X': 1, 'F': 10}))
+        self.assertEqual(['M6', 'T2'], fmt.words('M6', {'T': 2.0}))
+
+        fmt = PathPostProcessor.CommandFormatter(['X', 'F'], 4, 'in', 'in/min', feedPrecision=1)
+        self.assertEqual(['G1', 'X1.0000', 'F23.6'], fmt.words('G1', {'X': 25.4, 'F': 10}))
+
+        fmt = PathPostProcessor.CommandFormatter(['S'], 2, formats={'S': lambda s: "%d" % (s / 2)})
+        self.assertEqual(['M3', 'S500'], fmt.words('M3', {'S': 1000}))
+
+    def test02(self):
+        '''Verify modal and duplicate suppression of CommandFormatter.'''
+        fmt = PathPostProcessor.CommandFormatter(['X', 'Y', 'F'], 1, modal=True, outputDoubles=False, positiveFeed=True, initialState={'X': -1})
+        self.assertEqual(['G1', 'Y0.0'], fmt.words('G1', {'X': -1, 'Y': 0}))
+        self.assertEqual(['X2.0', 'F60.0'], fmt.words('G1', {'X': 2, 'Y': 0, 'F': 1}))
+        self.assertEqual([], fmt.words('G1', {'X': 2, 'F': 1}))
+        self.assertEqual(['G0'], fmt.words('G0', {'F': 0}))
+        self.assertEqual(['G1'], fmt.words('G1', {'F': 0}))
+        fmt.reset()
+        self.assertEqual(['G1', 'X2.0', 'Y0.0'], fmt.words('G1', {'X': 2, 'Y': 0}))
+
+    def test10(self):
+        '''Verify linuxcnc output of a simple path.'''
+        from PathScripts.post import linuxcnc_post as postprocessor
+        obj = PathObject([Path.Command('G0', {'X': 1, 'Y': 2, 'Z': 5}),
+                          Path.Command('G1', {'Z': -1, 'F': 1}),
+                          Path.Command('M6', {'T': 3})])
+        args = '--no-header --no-comments --no-show-editor --precision=2'
+        gcode = postprocessor.export([obj], '-', args)
+        self.assertEqual('G17 G54 G40 G49 G80 G90\nG21\nG0 X1.00 Y2.00 Z5.00\nG1 Z-1.00 F60.00\nM6 T3\nM05\nG17 G54 G90 G80 G40\nM2\n', gcode)
+
+    def test90(self):
+        '''Verify linuxcnc, grbl and centroid stream a surfacing path to the output file.'''
+        from PathScripts.post import linuxcnc_post, grbl_post, centroid_post
+        count = 10000
+        obj = PathObject(self.surfaceCommands(count))
+        args = '--no-header --no-comments --no-show-editor'
+        (fd, filename) = tempfile.mkstemp('.ngc')
+        os.close(fd)
+        try:
+            for post in [linuxcnc_post, grbl_post, centroid_post]:
+                result = post.export([obj], filename, args)
+                with open(filename) as fp:
+                    gcode = fp.read()
+                self.assertEqual(count - 1, sum(1 for line in gcode.splitlines() if line.startswith('G1 ')))
+                if post is grbl_post:
+                    self.assertIsNone(result)
+                else:
+                    # streamed output is still returned like the collected one
+                    self.assertEqual(gcode, result)
+                    self.assertEqual(post.export([obj], '-', args), gcode)
+        finally:
+            os.remove(filename)
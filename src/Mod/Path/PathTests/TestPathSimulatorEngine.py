@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import Part
+import Path
+import PathScripts.PathSimulatorEngine as PathSimulatorEngine
+import math
+
+from PathTests.PathTestUtils import PathTestBase
+
+
+class TestPathSimulatorEngine(PathTestBase):
+    '''Unit tests for the headless heightfield simulation.'''
+
+    def simulation(self, threads=1):
+        stock = PathSimulatorEngine.HeightmapStock.fromShape(Part.makeBox(100, 50, 20), 0.25)
+        sim = PathSimulatorEngine.Simulation(stock, threads)
+        sim.setTool(Path.Tool("endmill", tooltype="EndMill", diameter=6))
+        return sim
+
+    def slotCommands(self):
+        return [Path.Command('G0', {'X': 10, 'Y': 25, 'Z': 25}),
+                Path.Command('G1', {'Z': 15}),
+                Path.Command('G1', {'X': 90}),
+                Path.Command('G0', {'Z': 25}),
+                Path.Command('G0', {'X': 50, 'Y': 25}),
+                Path.Command('G2', {'X': 50, 'Y': 25, 'Z': 12, 'I': 0, 'J': 10}),
+                Path.Command('G0', {'Z': 25})]
+
+    def test00(self):
+        '''Verify tool profiles.'''
+        ball = PathSimulatorEngine.ToolProfile.fromTool(Path.Tool("ball", tooltype="BallEndMill", diameter=6))
+        self.assertRoughly(0, ball.heightAt(0))
+        self.assertRoughly(3, ball.heightAt(3))
+        self.assertRoughly(3 - math.sqrt(9 - 2.25), ball.heightAt(1.5))
+        self.assertEqual(float('inf'), ball.heightAt(3.1))
+
+        vbit = PathSimulatorEngine.ToolProfile.fromTool(Path.Tool("vbit", tooltype="ChamferMill", diameter=6, cuttingEdgeAngle=90))
+        self.assertRoughly(1.5, vbit.heightAt(1.5))
+
+        flat = PathSimulatorEngine.ToolProfile.fromTool(Path.Tool("flat", tooltype="EndMill", diameter=6))
+        self.assertRoughly(0, flat.heightAt(2.9))
+
+    def test01(self):
+        '''Verify removed volume of a slot and a helix.'''
+        sim = self.simulation()
+        before = sim.stock.volume()
+        removed = sim.applyCommands(self.slotCommands(), 'slot')
+
+        self.assertEqual(7, len(removed))
+        self.assertRoughly(0, removed[0])
+        self.assertTrue(math.fabs(removed[1] - math.pi * 9 * 5) < 5)
+        self.assertTrue(math.fabs(removed[2] - 80 * 6 * 5) < 10)
+        self.assertTrue(removed[5] > 0)
+        self.assertRoughly(before - sum(removed), sim.stock.volume(), 0.001)
+        self.assertEqual([], sim.collisions)
+        self.assertEqual([('slot', removed)], sim.removed)
+
+    def test02(self):
+        '''Verify rapid moves through the stock are reported.'''
+        sim = self.simulation()
+        sim.applyCommands([Path.Command('G0', {'X': 5, 'Y': 5, 'Z': 10}), Path.Command('G0', {'X': 20})], 'rapid')
+        self.assertEqual(2, len(sim.collisions))
+        self.assertEqual(('rapid', 0), sim.collisions[0][:2])
+
+    def test03(self):
+        '''Verify the result does not depend on the number of threads.'''
+        sim1 = self.simulation()
+        sim4 = self.simulation(4)
+        removed1 = sim1.applyCommands(self.slotCommands())
+        removed4 = sim4.applyCommands(self.slotCommands())
+        self.assertEqual(sim1.stock.heights.tolist(), sim4.stock.heights.tolist())
+        for v1, v4 in zip(removed1, removed4):
+            self.assertRoughly(v1, v4, 0.001)
+
+    def test04(self):
+        '''Verify gouges and the result mesh.'''
+        sim = self.simulation()
+        sim.applyCommands(self.slotCommands())
+
+        self.assertEqual(0, len(sim.gouges(Part.makeBox(100, 50, 10))))
+        gouges = sim.gouges(Part.makeBox(100, 50, 18))
+        self.assertTrue(len(gouges) > 0)
+        self.assertRoughly(6, max(gouges[:, 2]), 0.01)
+
+        mesh = sim.getResultMesh()
+        self.assertTrue(mesh.isSolid())
+        self.assertTrue(mesh.Volume < 100 * 50 * 20)
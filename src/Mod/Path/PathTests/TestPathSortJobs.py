@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2018 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import PathScripts.PathUtils as PathUtils
+import random
+
+from PathTests.PathTestUtils import PathTestBase
+
+
+def bruteForceSort(locations, keys):
+    '''Reference implementation, searches all remaining locations for each step.'''
+    remaining = list(locations)
+    out = []
+    pos = dict((k, 0) for k in keys)
+    while remaining:
+        def prio(i):
+            loc = remaining[i]
+            d = 0
+            for k in keys:
+                d += (loc[k] - pos[k]) ** 2
+            return (d + abs(loc[keys[0]]), i)
+        i = min(range(len(remaining)), key=prio)
+        pos = remaining.pop(i)
+        out.append(pos)
+    return out
+
+
+class TestPathSortJobs(PathTestBase):
+    '''Unit tests for the ordering of holes in PathUtils.'''
+
+    def setUp(self):
+        random.seed(4711)
+
+    def randomHoles(self, count, size):
+        return [{'x': random.uniform(-size, size), 'y': random.uniform(-size, size), 'r': i} for i in range(count)]
+
+    def gridHoles(self, columns, rows, pitch):
+        holes = [{'x': c * pitch, 'y': r * pitch, 'r': 0} for r in range(rows) for c in range(columns)]
+        random.shuffle(holes)
+        return holes
+
+    def assertSameOrder(self, a, b):
+        self.assertEqual([id(loc) for loc in a], [id(loc) for loc in b])
+
+    def test00(self):
+        '''Verify sort_jobs produces the same order as a brute force search.'''
+        for count in [1, 2, 17, 250]:
+            holes = self.randomHoles(count, 100)
+            self.assertSameOrder(PathUtils.sort_jobs(holes, ['x', 'y']), bruteForceSort(holes, ['x', 'y']))
+
+    def test01(self):
+        '''Verify sort_jobs resolves ties and duplicate locations like a brute force search.'''
+        holes = self.gridHoles(12, 9, 2.5) + self.gridHoles(3, 3, 2.5)
+        self.assertSameOrder(PathUtils.sort_jobs(holes, ['x', 'y']), bruteForceSort(holes, ['x', 'y']))
+
+        holes = [{'x': 1, 'y': 1} for i in range(10)]
+        self.assertSameOrder(PathUtils.sort_jobs(holes, ['x', 'y']), holes)
+
+    def test02(self):
+        '''Verify sort_jobs does not modify the given list.'''
+        holes = self.randomHoles(20, 10)
+        copy = list(holes)
+        PathUtils.sort_jobs(holes, ['x', 'y'])
+        self.assertSameOrder(holes, copy)
+        self.assertEqual([], PathUtils.sort_jobs([], ['x', 'y']))
+
+    def test10(self):
+        '''Verify optimize_jobs keeps all holes and never makes the rapid moves longer.'''
+        holes = PathUtils.sort_jobs(self.randomHoles(300, 100), ['x', 'y'])
+        optimized = PathUtils.optimize_jobs(holes, ['x', 'y'], 10)
+        self.assertEqual(sorted(id(loc) for loc in holes), sorted(id(loc) for loc in optimized))
+        self.assertLess(PathUtils.rapid_length(optimized, ['x', 'y']), PathUtils.rapid_length(holes, ['x', 'y']))
+
+    def test11(self):
+        '''Verify order_jobs applies the requested strategy.'''
+        holes = self.randomHoles(50, 100)
+        self.assertSameOrder(PathUtils.order_jobs(holes, ['x', 'y'], 'None'), holes)
+        self.assertSameOrder(PathUtils.order_jobs(holes, ['x', 'y'], 'NearestNeighbor'), PathUtils.sort_jobs(holes, ['x', 'y']))
+        nn2opt = PathUtils.order_jobs(holes, ['x', 'y'], 'NearestNeighbor2Opt', 10)
+        self.assertLessEqual(PathUtils.rapid_length(nn2opt, ['x', 'y']), PathUtils.rapid_length(PathUtils.sort_jobs(holes, ['x', 'y']), ['x', 'y']))
+
+    def test90(self):
+        '''Verify all sorting strategies return every hole of random and perforated layouts once.'''
+        for holes in [self.randomHoles(400, 100), self.gridHoles(20, 20, 4)]:
+            for strategy in PathUtils.SortingStrategies:
+                ordered = PathUtils.order_jobs(holes, ['x', 'y'], strategy, 1)
+                self.assertEqual(sorted(id(loc) for loc in holes), sorted(id(loc) for loc in ordered))
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *                                                                         *
+# *   Copyright (c) 2019 - FreeCAD Developers                               *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+import FreeCAD
+import MeshPart
+import Part
+import numpy
+import unittest
+
+from PathTests.PathTestUtils import PathTestBase
+
+# PathSurface exits if OpenCamLib is missing, so it is only imported if ocl is there
+try:
+    import ocl
+except ImportError:
+    ocl = None
+
+
+class SurfaceObject(object):
+    '''Minimal stand-in for the properties of a Surface operation used by the height map.'''
+
+    def __init__(self, sampleInterval, dropCutterDir='X', stepOver=100):
+        self.SampleInterval = sampleInterval
+        self.DropCutterDir = dropCutterDir
+        self.StepOver = stepOver
+        self.CutPattern = 'ZigZag'
+        self.CutMode = 'Conventional'
+
+
+@unittest.skipIf(ocl is None, "OpenCamLib is not installed")
+class TestPathSurface(PathTestBase):
+    '''Unit tests for the planar drop cutter height map of the Surface operation.'''
+
+    def setUp(self):
+        # a dome covering the whole scan area, so every CL point touches the model
+        shape = Part.makeSphere(50, FreeCAD.Vector(0, 0, -45))
+        self.mesh = MeshPart.meshFromShape(Shape=shape, LinearDeflection=0.1, AngularDeflection=0.1)
+        self.stl = ocl.STLSurf()
+        for f in self.mesh.Facets:
+            self.stl.addTriangle(ocl.Triangle(*[ocl.Point(p[0], p[1], p[2]) for p in f.Points]))
+        self.cutter = ocl.BallCutter(2.0, 10.0)
+
+    def surface(self):
+        import PathScripts.PathSurface as PathSurface
+        op = PathSurface.ObjectSurface.__new__(PathSurface.ObjectSurface)
+        op.resetOpVariables()
+        op.cutter = self.cutter
+        return op
+
+    def dropCutterScan(self, obj, op, xmin, ymin, xmax, ymax, Nl, cOut):
+        clp = op._planarDropCutScan(obj, self.stl, 0, xmin, ymin, xmax, ymax, -100, Nl, cOut)
+        return numpy.array([(p.x, p.y, p.z) for p in clp], dtype=float).reshape(-1, 3)
+
+    def assertScansMatch(self, obj, Nl, cOut):
+        op = self.surface()
+        scan = op._planarHeightMapLines(obj, op._planarHeightMap(obj, self.stl, self.mesh, -5, -4, 5, 4, Nl, cOut))
+        ref = self.dropCutterScan(obj, op, -5, -4, 5, 4, Nl, cOut)
+        self.assertEqual(ref.shape, scan.shape)
+        self.assertTrue(numpy.allclose(ref, scan, atol=0.001))
+
+    def test00(self):
+        '''Verify the height map gives the CL points of a PathDropCutter scan along X.'''
+        self.assertScansMatch(SurfaceObject(0.5), 5, 2.0)
+
+    def test01(self):
+        '''Verify the height map gives the CL points of a PathDropCutter scan along Y.'''
+        self.assertScansMatch(SurfaceObject(0.5, 'Y'), 6, 2.0)
+
+    def test02(self):
+        '''Verify lines closer than the sample interval are scanned at their own position.'''
+        obj = SurfaceObject(1.0, stepOver=10)
+        self.assertScansMatch(obj, 41, 0.2)
+        op = self.surface()
+        clMap = op._planarHeightMap(obj, self.stl, self.mesh, -5, -4, 5, 4, 41, 0.2)
+        self.assertEqual(41, len(numpy.unique(clMap[:, 0, 1])))
+
+    def test03(self):
+        '''Verify the height map is reused if the model and the scan lines do not change.'''
+        obj = SurfaceObject(1.0)
+        op = self.surface()
+        clMap = op._planarHeightMap(obj, self.stl, self.mesh, -2, -2, 2, 2, 2, 2.0)
+        self.assertTrue(clMap is op._planarHeightMap(obj, self.stl, self.mesh, -2, -2, 2, 2, 2, 2.0))
+        self.assertFalse(clMap is op._planarHeightMap(obj, self.stl, self.mesh, -2, -2, 2, 2, 3, 1.5))
@@ -26,10 +26,15 @@ import TestApp
 
 from PathTests.TestPathLog   import TestPathLog
 from PathTests.TestPathCore  import TestPathCore
+from PathTests.TestPathAdaptive import TestPathAdaptive
 #from PathTests.TestPathPost  import PathPostTestCases
+from PathTests.TestPathPostProcessor import TestPathPostProcessor
 from PathTests.TestPathGeom  import TestPathGeom
 from PathTests.TestPathOpTools  import TestPathOpTools
 from PathTests.TestPathUtil  import TestPathUtil
+from PathTests.TestPathSortJobs import TestPathSortJobs
+from PathTests.TestPathSimulatorEngine import TestPathSimulatorEngine
+from PathTests.TestPathSurface import TestPathSurface
 from PathTests.TestPathDepthParams        import depthTestCases
 from PathTests.TestPathDressupHoldingTags import TestHoldingTags
 from PathTests.TestPathDressupDogbone import TestDressupDogbone
@@ -383,7 +383,9 @@ void init_pyarea(py::module &m){
 
 	py::class_<Adaptive2d>(m, "Adaptive2d")
 		.def(py::init<>())
-		.def("Execute",&Adaptive2d::Execute)
+		// release the GIL so several instances can run in parallel threads,
+		// the progress callback re-acquires it when calling into Python
+		.def("Execute",&Adaptive2d::Execute, py::call_guard<py::gil_scoped_release>())
 	 	.def_readwrite("stepOverFactor", &Adaptive2d::stepOverFactor)
 	 	.def_readwrite("toolDiameter", &Adaptive2d::toolDiameter)
         .def_readwrite("stockToLeave", &Adaptive2d::stockToLeave)